@@ -41,7 +41,7 @@
 
 import engine.state as state_mod
 from engine import metrics, strategy
-from engine.strategy import SYMBOL_SCANNER
+from engine.strategy import SYMBOL_SCANNER, river_worker
 from engine.config import (
     QUOTE_CCY,
     get_settings,
@@ -90,6 +90,9 @@
 from engine.state import SnapshotStore
 from engine.universe import configured_universe, last_prices
 from engine.core.binance_market_stream import BinanceMarketStream
+from engine.core.market_cache import MARKET_CACHE
+from engine.core.trade_stats import TRADE_STATS
+from engine.feeds.kline_service import KLINE_SERVICE
 from engine.core.binance_user_stream import BinanceUserStream
 from engine.services.telemetry_broadcaster import BROADCASTER
 from shared.dry_run import install_dry_run_guard, log_dry_run_banner
@@ -203,44 +206,24 @@ def _route_template(request: Request) -> str:
 app.add_middleware(RedactionMiddleware)
 
 
-# --- WebSocket Connection Manager ---
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
+# --- WebSocket telemetry ---
+def _ws_filter(raw: Any) -> list[str] | None:
+    """Topics/symbols from a query string (``a,b``) or a subscribe message (list)."""
+    if raw is None:
+        return None
+    items = raw.split(",") if isinstance(raw, str) else list(raw)
+    return [str(item).strip() for item in items if str(item).strip()]
 
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
 
-    async def broadcast(self, message: dict):
-        # Fire and forget broadcast to avoid blocking
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as exc:
-                pass
+@app.on_event("startup")
+async def start_ws_bridge():
+    BROADCASTER.start()
 
-_WS_MANAGER = ConnectionManager()
 
-async def _telemetry_bridge():
-    """Forward internal BROADCASTER events to WebSocket clients."""
-    queue = await BROADCASTER.subscribe()
-    try:
-        while True:
-            payload = await queue.get()
-            await _WS_MANAGER.broadcast(payload)
-            queue.task_done()
-    except asyncio.CancelledError:
-        BROADCASTER.unsubscribe(queue)
+@app.on_event("shutdown")
+async def stop_ws_bridge():
+    await BROADCASTER.stop()
 
-@app.on_event("startup")
-async def start_ws_bridge():
-    loop = asyncio.get_running_loop()
-    loop.create_task(_telemetry_bridge())
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
@@ -249,17 +232,31 @@ async def websocket_endpoint(websocket: WebSocket):
     # TODO: Validate token against OPS_API_TOKEN if needed. 
     # For now, we accept connections to facilitate the "Glass Cockpit" demo.
     
-    await _WS_MANAGER.connect(websocket)
+    await websocket.accept()
+    # Optional ?topics=market.tick,account_update&symbols=BTCUSDT narrows the feed
+    client = BROADCASTER.add_client(
+        websocket.send_text,
+        topics=_ws_filter(websocket.query_params.get("topics")),
+        symbols=_ws_filter(websocket.query_params.get("symbols")),
+    )
     try:
         while True:
             # Keep alive / handle incoming (e.g. subscriptions)
             data = await websocket.receive_json()
-            if data.get("type") == "heartbeat":
-                await websocket.send_json({"type": "heartbeat", "ts": time.time()})
+            kind = data.get("type")
+            if kind == "heartbeat":
+                client.push_json({"type": "heartbeat", "ts": time.time()})
+            elif kind == "subscribe":
+                client.set_filter(
+                    topics=_ws_filter(data.get("topics")),
+                    symbols=_ws_filter(data.get("symbols")),
+                )
     except WebSocketDisconnect:
-        _WS_MANAGER.disconnect(websocket)
+        pass
     except Exception as exc:
-        _WS_MANAGER.disconnect(websocket)
+        pass
+    finally:
+        await BROADCASTER.remove_client(client)
 
 
 
@@ -703,39 +700,42 @@ def _apply_portfolio(
         await asyncio.sleep(period)
 
 
-def _broadcast_telemetry(snapshot: dict[str, Any]) -> None:
+_account_update_pending = False
+
+
+async def _flush_account_update(source: Portfolio) -> None:
+    global _account_update_pending
+    _account_update_pending = False
     payload = {
         "type": "account_update",
-        "data": snapshot,
+        "data": source.snapshot(),
         "ts": time.time()
     }
+    await BROADCASTER.broadcast(payload)
+
+
+def _broadcast_telemetry(source: Portfolio) -> None:
+    """Portfolio change listener: a burst of fills yields one snapshot and one broadcast."""
+    global _account_update_pending
+    if _account_update_pending:
+        return
     # Fire and forget broadcast
     try:
         loop = asyncio.get_running_loop()
-        loop.create_task(BROADCASTER.broadcast(payload))
     except RuntimeError:
-        pass
+        return
+    _account_update_pending = True
+    loop.create_task(_flush_account_update(source))
 
 
-async def _broadcast_market_tick(event: dict[str, Any]) -> None:
-    """Forward market ticks to WebSocket clients."""
-    payload = {
-        "type": "market.tick",
-        "data": event,
-        "ts": time.time()
-    }
-    await BROADCASTER.broadcast(payload)
+def _broadcast_market_tick(event: dict[str, Any]) -> None:
+    """Forward market ticks to WebSocket clients (latest per symbol, once per frame)."""
+    BROADCASTER.publish_market("market.tick", event)
 
 
-
-async def _broadcast_market_trade(event: dict[str, Any]) -> None:
-    """Forward market trades to WebSocket clients."""
-    payload = {
-        "type": "trade",
-        "data": event,
-        "ts": time.time()
-    }
-    await BROADCASTER.broadcast(payload)
+def _broadcast_market_trade(event: dict[str, Any]) -> None:
+    """Forward market trades to WebSocket clients (latest per symbol, once per frame)."""
+    BROADCASTER.publish_market("trade", event)
 
 
 async def _broadcast_strategy_performance(event: dict[str, Any]) -> None:
@@ -753,7 +753,7 @@ async def _broadcast_strategy_performance(event: dict[str, Any]) -> None:
 BUS.subscribe("market.trade", _broadcast_market_trade)
 BUS.subscribe("strategy.performance", _broadcast_strategy_performance)
 
-portfolio = Portfolio(on_update=_broadcast_telemetry)
+portfolio = Portfolio(on_change=_broadcast_telemetry)
 router = OrderRouterExt(rest_client, portfolio, venue=VENUE, rails=RAILS)
 order_router = router
 try:
@@ -1282,6 +1282,20 @@ async def _stop_param_bridge() -> None:
         await client.stop()
 
 
+@app.on_event("startup")
+async def _start_river_worker() -> None:
+    """Spawn the River learner process now rather than on the first tick."""
+    if IS_EXPORTER or not getattr(load_strategy_config(), "hmm_enabled", False):
+        return
+    await asyncio.to_thread(river_worker.start)
+    _startup_logger.info("River worker started (mode=%s)", river_worker.mode)
+
+
+@app.on_event("shutdown")
+async def _stop_river_worker() -> None:
+    await asyncio.to_thread(river_worker.stop)
+
+
 @app.on_event("startup")
 async def _start_model_watchdog() -> None:
     global _MODEL_WATCHER
@@ -1328,6 +1342,46 @@ async def _start_wallet_monitor() -> None:
     asyncio.create_task(wallet_balance_worker(), name="wallet-balance")
 
 
+@app.on_event("startup")
+async def _start_exchange_filter_refresh() -> None:
+    """Bulk-load exchangeInfo filters at startup and keep them (and venue specs) fresh."""
+    if IS_EXPORTER or VENUE != "BINANCE" or not hasattr(rest_client, "preload_filters"):
+        return
+    try:
+        period = max(60.0, float(os.getenv("EXCHANGE_FILTERS_REFRESH_SEC", "3600")))
+    except (TypeError, ValueError):
+        period = 3600.0
+
+    async def _refresh_loop() -> None:
+        while True:
+            try:
+                table = await rest_client.preload_filters(publish_specs=True)
+                _startup_logger.info(
+                    "exchange filters v%d: %d symbols", table.version, len(table.filters)
+                )
+            except Exception as exc:  # noqa: BLE001 - retried next period
+                _startup_logger.warning("exchange filter refresh failed: %s", exc)
+            await asyncio.sleep(period)
+
+    asyncio.create_task(_refresh_loop(), name="exchange-filters")
+
+
+@app.on_event("startup")
+async def _start_trade_stats() -> None:
+    """Seed /trades/stats from stored history once, then keep it current from bus events."""
+    if IS_EXPORTER:
+        return
+    if store is not None:
+        try:
+            fills, curve = await asyncio.to_thread(
+                lambda: (store.get_recent_fills(limit=1000), store.get_equity_curve(limit=500))
+            )
+            TRADE_STATS.seed(fills, curve)
+        except Exception as exc:  # noqa: BLE001 - stats start empty instead
+            _startup_logger.warning("trade stats seed failed: %s", exc)
+    TRADE_STATS.attach(BUS)
+
+
 @app.on_event("startup")
 async def _init_multi_venue_clients() -> None:
     """Initialize and register multi-venue exchange clients."""
@@ -2496,8 +2550,32 @@ async def account_snapshot(force: bool = False) -> dict[str, Any]:
     except Exception as exc:
         _log_suppressed("engine guard", exc)
 
+    snapshot_ts = int(time.time() * 1000)
+    equity_row: tuple[float, float, float] | None = None
+    try:
+        cash_val = float(getattr(state, "cash", 0.0) or 0.0)
+        unreal_val = float(getattr(state, "unrealized", 0.0) or 0.0)
+        equity_val = float(
+            getattr(state, "equity", cash_val + unreal_val) or (cash_val + unreal_val)
+        )
+        if isinstance(snap, dict):
+            cash_val = float(snap.get("cash_usd", cash_val) or cash_val)
+            pnl_section = snap.get("pnl") or {}
+            unreal_val = float(pnl_section.get("unrealized", unreal_val) or unreal_val)
+            equity_candidate = snap.get("equity_usd") or snap.get("equity")
+            if equity_candidate is not None:
+                equity_val = float(equity_candidate)
+            elif not equity_val:
+                equity_val = cash_val + unreal_val
+        equity_row = (equity_val, cash_val, unreal_val)
+        BUS.fire(
+            "portfolio.equity",
+            {"venue": VENUE.lower(), "equity_usd": equity_val, "ts": snapshot_ts},
+        )
+    except Exception as exc:
+        _log_suppressed("equity snapshot", exc)
+
     if store is not None:
-        snapshot_ts = int(time.time() * 1000)
         try:
             for sym, position in state.positions.items():
                 base_sym = sym.split(".")[0]
@@ -2508,21 +2586,8 @@ async def account_snapshot(force: bool = False) -> dict[str, Any]:
                     position.avg_price,
                     snapshot_ts,
                 )
-            cash_val = float(getattr(state, "cash", 0.0) or 0.0)
-            unreal_val = float(getattr(state, "unrealized", 0.0) or 0.0)
-            equity_val = float(
-                getattr(state, "equity", cash_val + unreal_val) or (cash_val + unreal_val)
-            )
-            if isinstance(snap, dict):
-                cash_val = float(snap.get("cash_usd", cash_val) or cash_val)
-                pnl_section = snap.get("pnl") or {}
-                unreal_val = float(pnl_section.get("unrealized", unreal_val) or unreal_val)
-                equity_candidate = snap.get("equity_usd") or snap.get("equity")
-                if equity_candidate is not None:
-                    equity_val = float(equity_candidate)
-                elif not equity_val:
-                    equity_val = cash_val + unreal_val
-            store.insert_equity(VENUE.lower(), equity_val, cash_val, unreal_val, snapshot_ts)
+            if equity_row is not None:
+                store.insert_equity(VENUE.lower(), *equity_row, snapshot_ts)
         except Exception as exc:
             _persist_logger.exception(
                 "Failed to persist account snapshot for venue %s", VENUE.lower()
@@ -2952,29 +3017,8 @@ async def get_recent_trades(limit: int = 100) -> dict[str, Any]:
 @app.get("/trades/stats")
 async def get_trade_stats() -> dict[str, Any]:
     """Get computed trade statistics: win rate, sharpe, max drawdown."""
-    stats = {"win_rate": 0.0, "sharpe": 0.0, "max_drawdown": 0.0, "total_trades": 0, "returns": []}
-    
-    if store is not None:
-        try:
-            computed = store.compute_trade_stats()
-            stats["win_rate"] = computed.get("win_rate", 0.0)
-            stats["total_trades"] = computed.get("total_trades", 0)
-            stats["max_drawdown"] = computed.get("max_drawdown", 0.0)
-            
-            # Compute Sharpe ratio from returns if available
-            returns = computed.get("returns", [])
-            if returns and len(returns) >= 5:
-                import statistics
-                mean_ret = statistics.mean(returns)
-                std_ret = statistics.stdev(returns) if len(returns) > 1 else 1.0
-                # Annualize assuming daily trades
-                if std_ret > 0:
-                    stats["sharpe"] = round((mean_ret / std_ret) * (252 ** 0.5), 2)
-                stats["returns"] = returns[-50:]  # Last 50 returns for charting
-        except Exception as exc:
-            pass
-    
-    return stats
+    # Maintained from trade.fill / portfolio.equity events; seeded from SQLite at startup
+    return dict(TRADE_STATS.summary())
 
 
 @app.get("/alerts")
@@ -3356,6 +3400,9 @@ async def _start_market_stream() -> None:
     except Exception as exc:
         _app_logger.warning("Failed to subscribe to universe.update: %s", exc)
 
+    # Router sizing, VaR and stop checks read prices/ATR from this instead of REST
+    MARKET_CACHE.attach(BUS, venue="BINANCE", market="futures" if settings.is_futures else "spot")
+
     # Gather all trading symbols
     symbols = configured_universe()
     if not symbols:
@@ -3363,12 +3410,16 @@ async def _start_market_stream() -> None:
         symbols = (os.getenv("TRADE_SYMBOLS") or "BTCUSDT,ETHUSDT").split(",")
         symbols = [s.strip() for s in symbols if s.strip()]
 
-    async def on_market_event(data: dict) -> None:
+    async def on_market_batch(events: list[dict]) -> None:
         if _market_data_dispatcher:
-            _market_data_dispatcher.handle_stream_event(data)
+            _market_data_dispatcher.handle_stream_batch(events)
+        # Local 1m candles for the shared kline cache (strategies, scanner, ATR sizing)
+        KLINE_SERVICE.ingest(events)
         
         # Update system telemetry (Price/Heartbeat)
-        if data.get("type") == "trade":
+        for data in events:
+            if data.get("type") != "trade":
+                continue
             sym = data.get("symbol")
             price = data.get("price")
             ts = data.get("ts")
@@ -3376,7 +3427,7 @@ async def on_market_event(data: dict) -> None:
                 # _binance_on_mark updates metrics and triggers strategy ticks
                 await _binance_on_mark(sym, sym, price, ts or time.time())
     
-    MARKET_STREAM = BinanceMarketStream(symbols, on_event=on_market_event)
+    MARKET_STREAM = BinanceMarketStream(symbols, on_batch=on_market_batch)
     _market_stream = MARKET_STREAM
     
     # Start the watchdog to update subscriptions dynamically
@@ -3391,7 +3442,7 @@ async def _scanner_watchdog():
                 # Get current target universe
                 current = SYMBOL_SCANNER.get_selected()
                 if current and _market_stream:
-                    # BinanceMarketStream.subscribe handles diffing and reconnection automatically
+                    # BinanceMarketStream.subscribe sends only SUBSCRIBE/UNSUBSCRIBE deltas
                     _market_stream.subscribe(current)
             except Exception as e:
                 logging.getLogger("engine.app").warning(f"[Watchdog] check failed: {e}")
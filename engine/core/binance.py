@@ -6,7 +6,6 @@
 import math
 import os
 import time
-from dataclasses import dataclass
 from hashlib import sha256
 from typing import Any, Literal
 from urllib.parse import urlencode
@@ -19,6 +18,13 @@
     import json  # Fallback to standard json
 
 from engine.config import get_settings
+from engine.core.exchange_filters import (
+    FilterTable,
+    SymbolFilter,
+    load_table,
+    parse_exchange_info,
+    save_table,
+)
 
 
 def _truthy(value: str | None, default: bool = False) -> bool:
@@ -27,16 +33,6 @@ def _truthy(value: str | None, default: bool = False) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
-@dataclass(frozen=True)
-class SymbolFilter:
-    symbol: str
-    step_size: float
-    min_qty: float
-    min_notional: float
-    max_notional: float | None = None
-    tick_size: float = 0.0
-
-
 TRANSFER_TYPES: set[str] = {
     "FUNDING_MAIN",
     "MAIN_FUNDING",
@@ -159,9 +155,12 @@ def __init__(self, *, market: Literal["spot", "futures", "margin"] | None = None
             self._base = self._futures_base if default_market == "futures" else self._spot_base
         self._is_futures = default_market == "futures"
 
-        self._symbol_filters: dict[tuple[str, str], SymbolFilter] = {}
+        # market -> immutable filter table, swapped whole on refresh
+        self._filter_tables: dict[str, FilterTable] = {}
+        # (market, symbol or "*") -> in-flight exchangeInfo fetch shared by concurrent misses
+        self._filter_inflight: dict[tuple[str, str], asyncio.Future] = {}
+        self._bulk_retry_at: dict[str, float] = {}
         self._price_cache: dict[tuple[str, str], float] = {}
-        self._lock = asyncio.Lock()
         self._logger = logging.getLogger("engine.binance.rest")
         # [Optimization] Persistent session
         self._client = httpx.AsyncClient(timeout=settings.timeout)
@@ -655,93 +654,124 @@ async def order_status(
         return {}
 
     async def exchange_filter(self, symbol: str, *, market: str | None = None) -> SymbolFilter:
-        async with self._lock:
-            clean = self._clean_symbol(symbol)
-            market_key, base_url, is_futures = self._resolve_market(market)
-            cache_key = (market_key, clean)
-            cached = self._symbol_filters.get(cache_key)
-            if cached:
-                return cached
-            if market_key == "options":
-                filt = SymbolFilter(
-                    symbol=clean,
-                    step_size=1.0,
-                    min_qty=1.0,
-                    min_notional=0.0,
-                    max_notional=None,
-                    tick_size=0.0,
+        clean = self._clean_symbol(symbol)
+        market_key, base_url, is_futures = self._resolve_market(market)
+        table = self._filter_table(market_key, base_url)
+        cached = table.get(clean)
+        if cached is not None:
+            return cached
+        if market_key == "options":
+            filt = SymbolFilter(
+                symbol=clean,
+                step_size=1.0,
+                min_qty=1.0,
+                min_notional=0.0,
+                max_notional=None,
+                tick_size=0.0,
+            )
+            self._filter_tables[market_key] = table.merged({clean: filt})
+            return filt
+
+        # Cold table: one bulk listing answers this and every later lookup
+        if not table.complete and time.monotonic() >= self._bulk_retry_at.get(market_key, 0.0):
+            try:
+                await self._single_flight(
+                    (market_key, "*"),
+                    lambda: self._load_filters(market_key, base_url, is_futures, None),
                 )
-                self._symbol_filters[cache_key] = filt
-                return filt
+            except BINANCE_DATA_ERRORS as exc:
+                self._bulk_retry_at[market_key] = time.monotonic() + 60.0
+                self._logger.warning("[BINANCE] bulk exchangeInfo failed (%s): %s", market_key, exc)
+            cached = self._filter_tables[market_key].get(clean)
+            if cached is not None:
+                return cached
 
-            params = {"symbol": clean}
-            path = "/fapi/v1/exchangeInfo" if is_futures else "/api/v3/exchangeInfo"
-            self._log_request("GET", path, params=params)
-            r = await self._client.get(
-                base_url + path,
-                params=params,
-                headers={"X-MBX-APIKEY": self._settings.api_key},
+        # Listed after the last bulk load: fetch just this symbol, once for all waiters
+        await self._single_flight(
+            (market_key, clean),
+            lambda: self._load_filters(market_key, base_url, is_futures, clean),
+        )
+        cached = self._filter_tables[market_key].get(clean)
+        if cached is None:
+            raise BinanceSymbolNotFoundError(symbol)
+        return cached
+
+    async def preload_filters(
+        self, *, market: str | None = None, publish_specs: bool = False
+    ) -> FilterTable:
+        """Bulk-load every symbol's filters for ``market`` (startup and periodic refresh).
+
+        With ``publish_specs`` the refreshed lot sizes also replace the BINANCE
+        entries in ``venue_specs.SPECS``.
+        """
+        market_key, base_url, is_futures = self._resolve_market(market)
+        self._filter_table(market_key, base_url)
+        await self._single_flight(
+            (market_key, "*"),
+            lambda: self._load_filters(market_key, base_url, is_futures, None),
+        )
+        table = self._filter_tables[market_key]
+        if publish_specs and market_key in {"spot", "futures"}:
+            from engine.core.venue_specs import SymbolSpec, update_specs
+
+            version = update_specs(
+                "BINANCE",
+                {
+                    sym: SymbolSpec(
+                        min_qty=f.min_qty, step_size=f.step_size, min_notional=f.min_notional
+                    )
+                    for sym, f in table.filters.items()
+                },
             )
-            # async with httpx.AsyncClient(
-            #     base_url=base_url,
-            #     timeout=self._settings.timeout,
-            #     headers={"X-MBX-APIKEY": self._settings.api_key},
-            # ) as client:
-            #     path = "/fapi/v1/exchangeInfo" if is_futures else "/api/v3/exchangeInfo"
-            #     self._log_request("GET", path, params=params)
-            #     r = await client.get(path, params=params)
-            r.raise_for_status()
-            info = r.json()
-            symbols = info.get("symbols", [])
-            if not symbols:
-                raise BinanceSymbolNotFoundError(symbol)
-            filters = symbols[0].get("filters", [])
-            step_size = 0.000001
-            min_qty = 0.0
-            min_notional = 0.0
-            max_notional = float("inf")
-            tick_size = 0.0
-            for f in filters:
-                ftype = f.get("filterType")
-                if ftype in ("LOT_SIZE", "MARKET_LOT_SIZE"):
-                    # Futures can return LOT_SIZE; some variants report MARKET_LOT_SIZE
-                    step_size = float(f.get("stepSize", step_size or 0.000001))
-                    min_qty = float(f.get("minQty", min_qty or 0.0))
-                elif ftype in ("NOTIONAL", "MIN_NOTIONAL"):
-                    # Support both names; MIN_NOTIONAL appears on some venues/contracts
-                    mn = f.get("minNotional")
-                    mx = f.get("maxNotional", None)
-                    try:
-                        min_notional = float(mn) if mn is not None else min_notional
-                    except (TypeError, ValueError) as exc:
-                        # If venue sends something strange, keep previous/default
-                        self._logger.debug("Min notional parse failed for %s: %s", clean, exc)
-                    try:
-                        max_notional = float(mx) if mx is not None else max_notional
-                    except (TypeError, ValueError) as exc:
-                        self._logger.debug("Max notional parse failed for %s: %s", clean, exc)
-                elif ftype == "PRICE_FILTER":
-                    tick_size = float(f.get("tickSize", tick_size or 0.0))
-            # Sanitize numeric outputs for JSON + downstream math
-            # step_size must be positive; default to 1e-6 if absent/invalid
-            if not isinstance(step_size, (int, float)) or step_size <= 0:
-                step_size = 0.000001
-            if not isinstance(min_qty, (int, float)) or min_qty < 0:
-                min_qty = 0.0
-            # Infinity/<=0 max_notional -> None (meaning "no cap")
-            if (
-                not isinstance(max_notional, (int, float))
-                or str(max_notional).lower() in ("inf", "+inf")
-                or (isinstance(max_notional, (int, float)) and max_notional <= 0)
-            ):
-                safe_max_notional = None
-            else:
-                safe_max_notional = float(max_notional)
-            filt = SymbolFilter(
-                clean, step_size, min_qty, min_notional, safe_max_notional, tick_size
+            self._logger.info(
+                "[BINANCE] venue specs v%d from %d %s symbols",
+                version,
+                len(table.filters),
+                market_key,
             )
-            self._symbol_filters[cache_key] = filt
-            return filt
+        return table
+
+    def _filter_table(self, market_key: str, base_url: str) -> FilterTable:
+        table = self._filter_tables.get(market_key)
+        if table is None:
+            # Warm restart: start from the last persisted listing for this host
+            table = load_table(market_key, base_url) or FilterTable(market=market_key)
+            self._filter_tables[market_key] = table
+        return table
+
+    async def _single_flight(self, key: tuple[str, str], factory) -> Any:
+        fut = self._filter_inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(factory())
+            self._filter_inflight[key] = fut
+            fut.add_done_callback(lambda _f: self._filter_inflight.pop(key, None))
+        return await asyncio.shield(fut)
+
+    async def _load_filters(
+        self, market_key: str, base_url: str, is_futures: bool, symbol: str | None
+    ) -> None:
+        params = {"symbol": symbol} if symbol else None
+        path = "/fapi/v1/exchangeInfo" if is_futures else "/api/v3/exchangeInfo"
+        self._log_request("GET", path, params=params)
+        r = await self._client.get(
+            base_url + path,
+            params=params,
+            headers={"X-MBX-APIKEY": self._settings.api_key},
+        )
+        r.raise_for_status()
+        info = r.json()
+        filters = parse_exchange_info(info.get("symbols", []))
+        if not filters:
+            return
+        # Futures ignores ?symbol= and always lists every contract
+        complete = symbol is None or len(filters) > 1
+        table = self._filter_table(market_key, base_url).merged(filters, complete=complete)
+        self._filter_tables[market_key] = table
+        if complete:
+            try:
+                await asyncio.to_thread(save_table, table, base_url)
+            except OSError as exc:
+                self._logger.debug("exchange filter cache not persisted: %s", exc)
 
     async def account_snapshot(self, *, market: str | None = None) -> dict[str, Any]:
         market_key, base_url, is_futures = self._resolve_market(market)
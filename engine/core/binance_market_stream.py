@@ -2,41 +2,309 @@
 
 import asyncio
 import logging
+import os
+import random
 import time
+from collections import deque
 from typing import Any, Callable
 
 try:
     import orjson as json
+
+    def json_dumps(obj: Any) -> str:
+        return json.dumps(obj).decode()
+
 except ImportError:
     import json
 
+    json_dumps = json.dumps
+
+try:
+    import msgspec
+except ImportError:  # optional: typed-struct decoding
+    msgspec = None
+
 import websockets
 from websockets.exceptions import WebSocketException
 
+from engine import metrics
 from engine.config import get_settings
 
 _LOGGER = logging.getLogger("binance_market_stream")
 
+
+def _normalize(payload: dict) -> dict | None:
+    """Map a raw Binance payload (aggTrade / forceOrder) to the internal event shape."""
+    event_type = payload.get("e")
+
+    if event_type == "aggTrade":
+        # Binance aggTrade:
+        # {
+        #   "e": "aggTrade",
+        #   "s": "BTCUSDT",
+        #   "p": "0.001",
+        #   "q": "100",
+        #   "T": 123456785,
+        #   "m": true,
+        #   ...
+        # }
+        return {
+            "type": "trade",  # Maps to market.trade in dispatcher
+            "symbol": payload.get("s"),
+            "price": float(payload.get("p", 0.0)),
+            "quantity": float(payload.get("q", 0.0)),
+            "ts": payload.get("T", 0) / 1000.0,
+            "side": "sell" if payload.get("m") else "buy",  # m=True means buyer was maker -> Sell
+            "trade_id": payload.get("a"),  # aggregate trade id, used for gap detection
+            "source": "binance_market_stream",
+        }
+
+    if event_type == "forceOrder":
+        # [Institutional Upgrade] Handle Liquidation Event
+        # {
+        #   "e": "forceOrder",
+        #   "E": 1568014460893,
+        #   "o": {"s": "BTCUSDT", "S": "SELL", "q": "0.014", "p": "9910", "ap": "9910", ...}
+        # }
+        order_data = payload.get("o", {})
+        return {
+            "type": "liquidation",
+            "symbol": order_data.get("s"),
+            # Prefer average filled price
+            "price": float(order_data.get("ap", 0.0) or order_data.get("p", 0.0)),
+            "quantity": float(order_data.get("q", 0.0)),
+            # E is the event time
+            "ts": payload.get("E", time.time() * 1000) / 1000.0,
+            "side": order_data.get("S", "").lower(),
+            "source": "binance_force_order",
+        }
+
+    return None
+
+
+def _decode_dict(raw: str | bytes) -> dict | None:
+    data = json.loads(raw)
+    if not isinstance(data, dict):
+        return None
+    # Combined stream format: {"stream": "<streamName>", "data": <raw payload>}
+    if "stream" in data and "data" in data:
+        data = data["data"]
+    return _normalize(data) if isinstance(data, dict) else None
+
+
+if msgspec is not None:
+
+    class _AggTrade(msgspec.Struct, tag_field="e", tag="aggTrade"):
+        s: str
+        p: float
+        q: float
+        a: int | None = None
+        T: int = 0
+        m: bool = False
+
+    class _ForceOrderBody(msgspec.Struct):
+        s: str
+        S: str = ""
+        q: float = 0.0
+        p: float = 0.0
+        ap: float = 0.0
+
+    class _ForceOrder(msgspec.Struct, tag_field="e", tag="forceOrder"):
+        o: _ForceOrderBody
+        E: int = 0
+
+    class _Combined(msgspec.Struct):
+        stream: str
+        data: _AggTrade | _ForceOrder
+
+    # strict=False lets msgspec parse Binance's quoted decimals straight into floats
+    _COMBINED = msgspec.json.Decoder(_Combined, strict=False)
+
+    def _decode_struct(raw: str | bytes) -> dict | None:
+        try:
+            payload = _COMBINED.decode(raw).data
+        except msgspec.ValidationError:
+            # Raw (non-combined) frames, control replies, other event types
+            return _decode_dict(raw)
+        if type(payload) is _AggTrade:
+            return {
+                "type": "trade",
+                "symbol": payload.s,
+                "price": payload.p,
+                "quantity": payload.q,
+                "ts": payload.T / 1000.0,
+                "side": "sell" if payload.m else "buy",
+                "trade_id": payload.a,
+                "source": "binance_market_stream",
+            }
+        order = payload.o
+        return {
+            "type": "liquidation",
+            "symbol": order.s,
+            "price": order.ap or order.p,
+            "quantity": order.q,
+            "ts": (payload.E or time.time() * 1000) / 1000.0,
+            "side": order.S.lower(),
+            "source": "binance_force_order",
+        }
+
+else:
+    _decode_struct = None
+
+
+def make_decoder(kind: str | None = None) -> Callable[[str | bytes], dict | None]:
+    """
+    Frame decoder returning a normalized event (or None for frames to ignore).
+
+    kind: "msgspec" (typed structs), "json" (orjson when installed, else stdlib)
+    or "auto" (msgspec when installed). Defaults to MARKET_STREAM_DECODER.
+    """
+    kind = (kind or os.getenv("MARKET_STREAM_DECODER", "auto")).strip().lower()
+    if kind in {"auto", "msgspec"} and _decode_struct is not None:
+        return _decode_struct
+    if kind == "msgspec":
+        _LOGGER.warning("[MarketStream] msgspec not installed; falling back to JSON decoding")
+    return _decode_dict
+
+
+class _Shard:
+    """
+    One websocket connection carrying a subset of the streams.
+
+    Stream changes are sent as SUBSCRIBE/UNSUBSCRIBE control messages on the
+    live socket; a (re)connect subscribes the shard's full current set.
+    """
+
+    def __init__(self, owner: "BinanceMarketStream", index: int) -> None:
+        self.owner = owner
+        self.index = index
+        self.streams: set[str] = set()
+        self.ws = None
+        self.connects = 0
+        self._control: asyncio.Queue | None = None
+
+    def _queue_control(self, method: str, streams: list[str]) -> None:
+        if self.ws is not None and self._control is not None and streams:
+            self._control.put_nowait((method, sorted(streams)))
+
+    def add(self, streams: set[str]) -> None:
+        self.streams |= streams
+        self._queue_control("SUBSCRIBE", list(streams))
+
+    def remove(self, streams: set[str]) -> None:
+        self.streams -= streams
+        self._queue_control("UNSUBSCRIBE", list(streams))
+
+    async def _send_control(self, ws) -> None:
+        owner = self.owner
+        while True:
+            method, streams = await self._control.get()
+            for i in range(0, len(streams), owner._params_per_message):
+                params = streams[i : i + owner._params_per_message]
+                await ws.send(json_dumps({"method": method, "params": params, "id": owner._next_id()}))
+                # Binance caps incoming control messages per connection (5/s on spot)
+                await asyncio.sleep(owner._control_interval)
+
+    async def run(self) -> None:
+        owner = self.owner
+        # Stagger initial connects so shards do not hit the endpoint at once
+        await asyncio.sleep(self.index * owner._stagger_sec)
+        backoff = 1.0
+        while not owner._stop_event.is_set():
+            sender = None
+            try:
+                _LOGGER.info(f"[MarketStream] shard {self.index} connecting ({len(self.streams)} streams)...")
+                async with owner._connect(owner._stream_url) as ws:
+                    self.connects += 1
+                    self._control = asyncio.Queue()
+                    self.ws = ws
+                    backoff = 1.0
+                    sender = asyncio.create_task(self._send_control(ws))
+                    self._queue_control("SUBSCRIBE", list(self.streams))
+                    _LOGGER.info(f"[MarketStream] shard {self.index} connected.")
+                    push = owner.push_frame
+                    async for msg in ws:
+                        push(msg)
+
+            except (WebSocketException, OSError) as e:
+                _LOGGER.warning(f"[MarketStream] shard {self.index} connection lost: {e}. Reconnecting...")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                _LOGGER.error(f"[MarketStream] shard {self.index} unexpected error: {e}", exc_info=True)
+            finally:
+                self.ws = None
+                self._control = None
+                if sender is not None:
+                    sender.cancel()
+            if owner._stop_event.is_set():
+                break
+            # Jittered exponential backoff keeps shards from reconnecting in lockstep
+            await asyncio.sleep(backoff + random.uniform(0, owner._stagger_sec))
+            backoff = min(backoff * 2, 30.0)
+
+
 class BinanceMarketStream:
     """
     Handles the Binance Public Market Data Stream (WebSocket).
-    - Connects to the public WebSocket.
-    - Manages subscriptions (aggTrade, bookTicker).
-    - Dispatches normalized market events.
+    - Shards streams across connections (MARKET_STREAM_MAX_STREAMS per socket).
+    - Applies subscription changes as SUBSCRIBE/UNSUBSCRIBE deltas, so a
+      universe rotation never drops the other symbols' data.
+    - Dispatches normalized market events and counts aggTrade id gaps.
+
+    The socket reader only stamps and buffers raw frames in a bounded ring
+    (MARKET_STREAM_BUFFER); a separate consumer task decodes them in batches
+    (MARKET_STREAM_BATCH) and hands them off, so a slow consumer never stalls
+    the reader. When the ring is full the oldest frames are dropped.
     """
 
     def __init__(
         self,
         symbols: list[str],
         on_event: Callable[[dict], Any] | None = None,
+        on_batch: Callable[[list[dict]], Any] | None = None,
+        decoder: Callable[[str | bytes], dict | None] | None = None,
+        buffer_size: int | None = None,
+        batch_size: int | None = None,
+        max_streams_per_conn: int | None = None,
+        connect: Callable[..., Any] | None = None,
     ):
         self._settings = get_settings()
         self._on_event = on_event
-        self._symbols = [s.lower() for s in symbols]
+        self._on_batch = on_batch
+        self._decode = decoder or make_decoder()
+        self._symbols: list[str] = []
         self._stop_event = asyncio.Event()
-        self._ws: websockets.WebSocketClientProtocol | None = None
-        self._subscriptions: set[str] = set()
-        
+        self._connect = connect or websockets.connect
+        self._max_streams = max(
+            1, max_streams_per_conn or int(os.getenv("MARKET_STREAM_MAX_STREAMS", "200"))
+        )
+        self._stagger_sec = float(os.getenv("MARKET_STREAM_STAGGER_SEC", "0.5"))
+        self._control_interval = 0.25
+        self._params_per_message = 100
+        self._msg_id = 0
+        self._shards: list[_Shard] = []
+        self._shard_of: dict[str, _Shard] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+        self._running = False
+        self._last_trade_id: dict[str, int] = {}
+        self._gaps: dict[str, int] = {}
+
+        self._ring: deque[str | bytes] = deque()
+        self._ring_max = max(1, buffer_size or int(os.getenv("MARKET_STREAM_BUFFER", "10000")))
+        self._batch_size = max(1, batch_size or int(os.getenv("MARKET_STREAM_BATCH", "256")))
+        self._frames_ready = asyncio.Event()
+        self._consumer: asyncio.Task | None = None
+        self._stats = {
+            "frames": 0,
+            "dispatched": 0,
+            "dropped": 0,
+            "decode_errors": 0,
+            "gaps": 0,
+            "missed_trades": 0,
+        }
+        self._decode_seconds = 0.0
+
         if self._settings.is_futures:
             self._base_url = "wss://fstream.binance.com/ws"
             if "testnet" in (self._settings.futures_base or ""):
@@ -45,151 +313,174 @@ def __init__(
             self._base_url = "wss://stream.binance.com:9443/ws"
             if "testnet" in (self._settings.spot_base or ""):
                  self._base_url = "wss://testnet.binance.vision/ws"
+        # Combined-stream endpoint; streams are added with SUBSCRIBE after connect
+        self._stream_url = self._base_url.replace("/ws", "/stream")
 
         self.last_event_ts: float = time.time()
+        self.subscribe(symbols)
+
+    def _next_id(self) -> int:
+        self._msg_id += 1
+        return self._msg_id
+
+    def _wanted_streams(self, symbols: list[str]) -> set[str]:
+        streams = {f"{s}@aggTrade" for s in symbols}
+        # streams |= {f"{s}@bookTicker" for s in symbols} # Optional: add book ticker later if needed
+        # [Institutional Upgrade] Subscribe to Liquidation Stream
+        if self._settings.is_futures:
+            streams.add("!forceOrder@arr")
+        return streams
+
+    def _new_shard(self) -> _Shard:
+        shard = _Shard(self, len(self._shards))
+        self._shards.append(shard)
+        if self._running:
+            self._tasks[shard.index] = asyncio.create_task(shard.run())
+        return shard
 
     def subscribe(self, symbols: list[str]) -> None:
-        """Update the list of symbols and force reconnection if changed."""
-        new_symbols = sorted([s.lower() for s in symbols])
-        current_symbols = sorted(self._symbols)
-        
-        if new_symbols != current_symbols:
-            _LOGGER.info(f"[MarketStream] Subscription update: {len(current_symbols)} -> {len(new_symbols)} symbols")
-            self._symbols = list(set(new_symbols)) # Ensure unique
-            
-            # Force reconnection to pick up new streams
-            if self._ws:
-                _LOGGER.info("[MarketStream] Closing active connection to trigger resubscription...")
-                # We can't await here easily if called from sync context or different task, 
-                # but run() loop monitors connection. Closing it from background task is safe.
-                asyncio.create_task(self._ws.close())
+        """
+        Update the symbol set. Only the delta is sent, on the shards that own
+        the affected streams; existing streams stay on their connection.
+        """
+        new_symbols = sorted({s.lower() for s in symbols})
+        wanted = self._wanted_streams(new_symbols)
+        current = set(self._shard_of)
+        removed = current - wanted
+        added = sorted(wanted - current)
+        if not removed and not added:
+            return
+        if self._symbols or new_symbols:
+            _LOGGER.info(
+                f"[MarketStream] Subscription update: {len(self._symbols)} -> {len(new_symbols)} symbols "
+                f"(+{len(added)}/-{len(removed)} streams)"
+            )
+        self._symbols = new_symbols
+
+        by_shard: dict[int, set[str]] = {}
+        for stream in removed:
+            by_shard.setdefault(self._shard_of.pop(stream).index, set()).add(stream)
+            # Forget the trade-id cursor: a later re-add must not count the time away as a gap
+            symbol = stream.partition("@")[0].upper()
+            self._last_trade_id.pop(symbol, None)
+            self._gaps.pop(symbol, None)
+        for index, streams in by_shard.items():
+            self._shards[index].remove(streams)
+
+        # Fill the least-loaded shards first; open a new connection when all are full
+        adds: dict[int, set[str]] = {}
+        for stream in added:
+            shard = min(self._shards, key=lambda sh: len(sh.streams) + len(adds.get(sh.index, ())), default=None)
+            if shard is None or len(shard.streams) + len(adds.get(shard.index, ())) >= self._max_streams:
+                shard = self._new_shard()
+            adds.setdefault(shard.index, set()).add(stream)
+            self._shard_of[stream] = shard
+        for index, streams in adds.items():
+            self._shards[index].add(streams)
 
     async def run(self):
-        """Main loop: connect and maintain subscriptions."""
+        """Main loop: run every shard connection until stop()."""
         _LOGGER.info(f"[MarketStream] Starting Binance Public Stream ({'Futures' if self._settings.is_futures else 'Spot'})...")
-        
-        while not self._stop_event.is_set():
-            try:
-                # Construct combined stream URL
-                # e.g. /stream?streams=btcusdt@aggTrade/ethusdt@aggTrade
-                streams = []
-                for s in self._symbols:
-                    streams.append(f"{s}@aggTrade")
-                    # streams.append(f"{s}@bookTicker") # Optional: add book ticker later if needed
-
-                # [Institutional Upgrade] Subscribe to Liquidation Stream
-                if self._settings.is_futures:
-                    streams.append("!forceOrder@arr")
-
-                if not streams:
-                    _LOGGER.warning("[MarketStream] No symbols to subscribe. Sleeping...")
-                    await asyncio.sleep(10)
-                    continue
-
-                url = f"{self._base_url}/{'/'.join(streams)}"
-                # Note: Binance combined streams URL format is /stream?streams=<streamName1>/<streamName2>...
-                # But for single raw stream it's /ws/<streamName>
-                # For multiple, use combined streams.
-                
-                # Let's use the Raw Stream for single symbol or Combined Stream for multiple.
-                # To be safe and scalable, always use Combined Streams.
-                combined_url = f"{self._base_url.replace('/ws', '/stream')}?streams={'/'.join(streams)}"
-                
-                _LOGGER.info(f"[MarketStream] Connecting to {combined_url}...")
-
-                async with websockets.connect(combined_url) as ws:
-                    self._ws = ws
-                    _LOGGER.info("[MarketStream] Connected.")
-                    self._subscriptions = set(streams)
-                    
-                    async for msg in ws:
-                        await self._handle_message(msg)
+        self._consumer = asyncio.create_task(self._consume())
+        self._running = True
+        if not self._shards:
+            _LOGGER.warning("[MarketStream] No symbols to subscribe yet.")
+        for shard in self._shards:
+            self._tasks[shard.index] = asyncio.create_task(shard.run())
+        try:
+            await self._stop_event.wait()
+        finally:
+            self._running = False
+            tasks = [*self._tasks.values(), self._consumer]
+            self._tasks.clear()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._consumer = None
 
-            except (WebSocketException, OSError) as e:
-                _LOGGER.warning(f"[MarketStream] Connection lost: {e}. Reconnecting...")
-                await asyncio.sleep(1)
+    def push_frame(self, raw_msg: str | bytes) -> None:
+        """Reader side: buffer one raw frame for the consumer task (never blocks)."""
+        self.last_event_ts = time.time()
+        ring = self._ring
+        if len(ring) >= self._ring_max:
+            ring.popleft()
+            self._stats["dropped"] += 1
+            metrics.market_stream_frames_dropped_total.inc()
+        ring.append(raw_msg)
+        self._stats["frames"] += 1
+        metrics.market_stream_frames_total.inc()
+        self._frames_ready.set()
+
+    def _decode_batch(self) -> list[dict]:
+        """Pop up to one batch of frames off the ring and decode them."""
+        ring = self._ring
+        decode = self._decode
+        events = []
+        started = time.perf_counter()
+        for _ in range(min(len(ring), self._batch_size)):
+            raw = ring.popleft()
+            try:
+                evt = decode(raw)
             except Exception as e:
-                _LOGGER.error(f"[MarketStream] Unexpected error: {e}", exc_info=True)
-                await asyncio.sleep(5)
-            finally:
-                self._ws = None
+                self._stats["decode_errors"] += 1
+                _LOGGER.error(f"[MarketStream] Error handling message: {e}", exc_info=True)
+                continue
+            if evt is not None:
+                trade_id = evt.get("trade_id")
+                if trade_id is not None:
+                    self._check_gap(evt["symbol"], trade_id)
+                events.append(evt)
+        elapsed = time.perf_counter() - started
+        self._decode_seconds += elapsed
+        metrics.market_stream_decode_seconds_total.inc(elapsed)
+        metrics.market_stream_frames_behind.set(len(ring))
+        return events
+
+    def _check_gap(self, symbol: str, trade_id: int) -> None:
+        """aggTrade ids are consecutive per symbol; a jump means trades were missed
+        (reconnect window or ring-buffer overflow)."""
+        last = self._last_trade_id.get(symbol)
+        if last is not None and trade_id > last + 1:
+            missed = trade_id - last - 1
+            self._gaps[symbol] = self._gaps.get(symbol, 0) + 1
+            self._stats["gaps"] += 1
+            self._stats["missed_trades"] += missed
+            metrics.market_stream_gaps_total.inc()
+            metrics.market_stream_missed_trades_total.inc(missed)
+            _LOGGER.warning(f"[MarketStream] {symbol}: aggTrade gap of {missed} after id {last}")
+        if last is None or trade_id > last:
+            self._last_trade_id[symbol] = trade_id
 
-    async def _handle_message(self, raw_msg: str):
+    async def _consume(self):
+        """Consumer side: decode buffered frames in batches and hand them off."""
+        while True:
+            if not self._ring:
+                self._frames_ready.clear()
+                await self._frames_ready.wait()
+                continue
+            events = self._decode_batch()
+            if events:
+                await self._hand_off(events)
+
+    async def _hand_off(self, events: list[dict]):
+        self._stats["dispatched"] += len(events)
+        if self._on_batch:
+            await self._dispatch(self._on_batch, events)
+        elif self._on_event:
+            for evt in events:
+                await self._dispatch(self._on_event, evt)
+
+    async def _handle_message(self, raw_msg: str | bytes):
+        """Decode and dispatch a single frame inline (bypasses the ring buffer)."""
         self.last_event_ts = time.time()
         try:
-            data = json.loads(raw_msg)
-            
-            # Combined stream format: {"stream": "<streamName>", "data": <raw payload>}
-            if "stream" in data and "data" in data:
-                payload = data["data"]
-                stream = data["stream"]
-            else:
-                payload = data
-                stream = "raw"
-
-            event_type = payload.get("e")
-
-            if event_type == "aggTrade":
-                # Normalize to internal format
-                # Binance aggTrade:
-                # {
-                #   "e": "aggTrade",
-                #   "s": "BTCUSDT",
-                #   "p": "0.001",
-                #   "q": "100",
-                #   "T": 123456785,
-                #   "m": true,
-                #   ...
-                # }
-                normalized = {
-                    "type": "trade", # Maps to market.trade in dispatcher
-                    "symbol": payload.get("s"),
-                    "price": float(payload.get("p", 0.0)),
-                    "quantity": float(payload.get("q", 0.0)),
-                    "ts": payload.get("T", 0) / 1000.0,
-                    "side": "sell" if payload.get("m") else "buy", # m=True means buyer was maker -> Sell
-                    "source": "binance_market_stream"
-                }
-                
-                if self._on_event:
-                    await self._dispatch(self._on_event, normalized)
-
-            elif event_type == "forceOrder":
-                # [Institutional Upgrade] Handle Liquidation Event
-                # {
-                #   "e": "forceOrder",
-                #   "E": 1568014460893,
-                #   "o": {
-                #     "s": "BTCUSDT",
-                #     "S": "SELL",
-                #     "o": "LIMIT",
-                #     "f": "IOC",
-                #     "q": "0.014",
-                #     "p": "9910",
-                #     "ap": "9910",
-                #     "X": "FILLED",
-                #     ...
-                #   }
-                # }
-                order_data = payload.get("o", {})
-                normalized = {
-                    "type": "liquidation",
-                    "symbol": order_data.get("s"),
-                    "price": float(order_data.get("ap", 0.0) or order_data.get("p", 0.0)), # Prefer average filled price
-                    "quantity": float(order_data.get("q", 0.0)),
-                    "ts": payload.get("T", 0) / 1000.0, # Use outer timestamp usually E, but payload example used T inside o? No, typically E is event time.
-                    # Wait, payload says "E": 1568... is event time.
-                    # Correcting timestamp usage:
-                    "ts": payload.get("E", time.time() * 1000) / 1000.0,
-                    "side": order_data.get("S", "").lower(),
-                    "source": "binance_force_order"
-                }
-                 
-                if self._on_event:
-                    await self._dispatch(self._on_event, normalized)
-
+            evt = self._decode(raw_msg)
         except Exception as e:
+            self._stats["decode_errors"] += 1
             _LOGGER.error(f"[MarketStream] Error handling message: {e}", exc_info=True)
+            return
+        if evt is not None:
+            await self._hand_off([evt])
 
     async def _dispatch(self, callback, data):
         try:
@@ -199,5 +490,18 @@ async def _dispatch(self, callback, data):
         except Exception as e:
             _LOGGER.error(f"[MarketStream] Callback error: {e}", exc_info=True)
 
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            **self._stats,
+            "frames_behind": len(self._ring),
+            "buffer_size": self._ring_max,
+            "decode_seconds_total": self._decode_seconds,
+            "gaps_by_symbol": dict(self._gaps),
+            "shards": [
+                {"streams": len(sh.streams), "connected": sh.ws is not None, "connects": sh.connects}
+                for sh in self._shards
+            ],
+        }
+
     def stop(self):
         self._stop_event.set()
@@ -12,7 +12,9 @@
 import inspect
 import logging
 import os
-from collections.abc import Callable
+import sys
+from collections import deque
+from collections.abc import Callable, Mapping
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
@@ -48,6 +50,211 @@ def _call_sync(handler: Callable[[dict[str, Any]], Any], payload: dict[str, Any]
     return handler(payload)
 
 
+def _fast_topics_from_env() -> frozenset[str]:
+    raw = os.getenv("EVENTBUS_FAST_TOPICS", "market.trade,market.tick,market.book")
+    return frozenset(t.strip() for t in raw.split(",") if t.strip())
+
+
+class FrozenEvent(dict):
+    """Read-only event payload shared by every fast-lane subscriber.
+
+    Still a ``dict`` (``.get``, ``json.dumps`` and ``dict(evt)`` keep working)
+    but mutation raises ``TypeError``; handlers that need to modify the event
+    must take their own copy.
+    """
+
+    __slots__ = ()
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> Any:
+        raise TypeError("FrozenEvent is read-only; copy it with dict(event) first")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (FrozenEvent, (dict(self),))
+
+    def __copy__(self) -> FrozenEvent:
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> FrozenEvent:
+        return FrozenEvent(copy.deepcopy(dict(self), memo))
+
+
+# Python 3.12+ can start a Task eagerly: the handler runs up to its first
+# await before emit() returns, but on its own Task and context.
+_EAGER_START = sys.version_info >= (3, 12)
+
+LANE_POLICIES = ("block", "drop_oldest", "coalesce")
+
+# name -> (topic prefixes, overflow policy, default capacity); the longest
+# matching prefix wins and "" catches everything else. Policy, capacity and
+# dispatch concurrency can be overridden per lane with
+# EVENTBUS_LANE_<NAME>_POLICY / _MAX / _CONCURRENCY. External feed events are
+# consumed exactly once downstream, so they stay on a blocking lane.
+_DEFAULT_LANES: dict[str, tuple[tuple[str, ...], str, int]] = {
+    "critical": (("order.", "risk.", "trade.", "health."), "block", 10000),
+    "quotes": (("market.tick", "market.book"), "coalesce", 5000),
+    "feeds": (("market.", "signal.", "price.", "events."), "drop_oldest", 5000),
+    "default": (("", "events.external_feed"), "block", 2000),
+}
+
+
+class _Lane:
+    """Bounded queue plus dispatcher state for one class of topics.
+
+    Overflow policies when the lane is full:
+
+    - ``block``: the publisher waits for space (backpressure).
+    - ``drop_oldest``: the oldest queued event is discarded.
+    - ``coalesce``: a queued event with the same (topic, symbol) is replaced in
+      place by the newer payload, keeping its queue position; events without a
+      symbol fall back to ``drop_oldest``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        prefixes: tuple[str, ...],
+        policy: str,
+        maxsize: int,
+        concurrency: int = 100,
+    ) -> None:
+        if policy not in LANE_POLICIES:
+            raise ValueError(f"unknown EventBus lane policy {policy!r}")
+        self.name = name
+        self.prefixes = tuple(prefixes)
+        self.policy = policy
+        self.maxsize = max(0, int(maxsize))
+        self.concurrency = max(1, int(concurrency))
+        # entries are [topic, data, enqueued_at, coalesce_key]
+        self.items: deque[list[Any]] = deque()
+        self.pending: dict[tuple[str, Any], list[Any]] = {}
+        self.dropped = 0
+        self.coalesced = 0
+        self.worker: asyncio.Task[Any] | None = None
+        # Dedicated pool for sync handlers; None shares the bus-wide executor
+        self.executor: ThreadPoolExecutor | None = None
+        self._clock: asyncio.AbstractEventLoop | None = None
+        self.bind()
+        self._depth = self._drop_oldest = self._drop_coalesced = None
+        try:
+            self._depth = metrics.eventbus_queue_depth.labels(lane=name)
+            # Evaluated at scrape time so a stalled lane keeps ageing between put/pop
+            metrics.eventbus_queue_oldest_age_seconds.labels(lane=name).set_function(
+                self._scrape_age
+            )
+            self._drop_oldest = metrics.eventbus_events_dropped_total.labels(
+                lane=name, reason="drop_oldest"
+            )
+            self._drop_coalesced = metrics.eventbus_events_dropped_total.labels(
+                lane=name, reason="coalesced"
+            )
+        except (AttributeError,) + _METRIC_ERRORS as exc:
+            _log_suppressed("lane metrics init", exc)
+
+    def bind(self) -> None:
+        """Create fresh asyncio primitives; called on every bus start so a
+        restarted bus never waits on primitives bound to a dead loop."""
+        self.limit = asyncio.Semaphore(self.concurrency)
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        try:
+            self._clock = asyncio.get_running_loop()
+        except RuntimeError:
+            self._clock = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def oldest_age(self, now: float) -> float:
+        try:
+            return now - self.items[0][2] if self.items else 0.0
+        except IndexError:  # drained by the loop while a scrape was reading
+            return 0.0
+
+    def _scrape_age(self) -> float:
+        clock = self._clock
+        return self.oldest_age(clock.time()) if clock is not None else 0.0
+
+    def _observe(self, now: float) -> None:
+        if self._depth is not None:
+            self._depth.set(len(self.items))
+
+    async def put(self, topic: str, data: Any, now: float) -> None:
+        key = None
+        if self.policy == "coalesce" and isinstance(data, Mapping):
+            symbol = data.get("symbol")
+            if symbol is not None:
+                key = (topic, symbol)
+                entry = self.pending.get(key)
+                if entry is not None:
+                    entry[1] = data
+                    self.coalesced += 1
+                    if self._drop_coalesced is not None:
+                        self._drop_coalesced.inc()
+                    return
+        if self.maxsize and len(self.items) >= self.maxsize:
+            if self.policy == "block":
+                while len(self.items) >= self.maxsize:
+                    self._not_full.clear()
+                    await self._not_full.wait()
+                now = asyncio.get_running_loop().time()
+            else:
+                self._discard(self.items.popleft())
+                self.dropped += 1
+                if self._drop_oldest is not None:
+                    self._drop_oldest.inc()
+        entry = [topic, data, now, key]
+        self.items.append(entry)
+        if key is not None:
+            self.pending[key] = entry
+        self._not_empty.set()
+        self._observe(now)
+
+    def _discard(self, entry: list[Any]) -> None:
+        key = entry[3]
+        if key is not None and self.pending.get(key) is entry:
+            del self.pending[key]
+
+    def pop(self, now: float) -> list[Any] | None:
+        if not self.items:
+            return None
+        entry = self.items.popleft()
+        self._discard(entry)
+        self._not_full.set()
+        self._observe(now)
+        return entry
+
+    async def wait(self) -> None:
+        """Wait until an event is queued (or ``wake`` is called)."""
+        if not self.items:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+    def wake(self) -> None:
+        self._not_empty.set()
+
+    def stats(self, now: float) -> dict[str, Any]:
+        return {
+            "policy": self.policy,
+            "maxsize": self.maxsize,
+            "depth": len(self.items),
+            "oldest_age_sec": self.oldest_age(now),
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "concurrency_slots_free": self.limit._value,
+        }
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, str(default))))
+    except _QUEUE_ENV_ERRORS as exc:
+        _log_suppressed(f"{name} parse", exc)
+        return default
+
+
 class EventBus:
     """
     Async pub/sub event bus for real-time inter-module communication.
@@ -61,23 +268,34 @@ class EventBus:
 
     def __init__(self, max_workers: int | None = None):
         self._subscribers: dict[str, list[Callable[[dict[str, Any]], Any]]] = {}
-        self._queue: asyncio.Queue | None = None
         self._running = False
         self._loop: asyncio.AbstractEventLoop | None = None
         self._stats = {"published": 0, "delivered": 0, "failed": 0, "topics": set()}
         if max_workers is None:
             max_workers = int(os.getenv("EVENTBUS_MAX_WORKERS", "8"))
         self._executor = ThreadPoolExecutor(max_workers=max_workers)
-        self._worker: asyncio.Task[Any] | None = None
-        try:
-            self._queue_max = max(0, int(os.getenv("EVENTBUS_QUEUE_MAX", "2000")))
-        except _QUEUE_ENV_ERRORS as exc:
-            _log_suppressed("queue capacity parse", exc)
-            self._queue_max = 2000
+        self._queue_max = _env_int("EVENTBUS_QUEUE_MAX", 2000)
         
         # [Phase 7 Fix] Concurrency Control
         self._active_tasks: set[asyncio.Task] = set()
-        self._concurrency_limit = asyncio.Semaphore(100) # Max 100 concurrent events
+
+        # One bounded queue + dispatcher per topic class, so a burst on one
+        # class (market data) never queues order/risk events behind it.
+        self._lanes: dict[str, _Lane] = {}
+        self._lane_by_topic: dict[str, _Lane] = {}
+        for name, (prefixes, policy, maxsize) in _DEFAULT_LANES.items():
+            if name == "default":
+                maxsize = self._queue_max
+            self.add_lane(name, prefixes, policy, maxsize)
+        # Order/risk handlers get their own threads so slow feed or strategy
+        # handlers cannot occupy every worker ahead of them.
+        self._lanes["critical"].executor = ThreadPoolExecutor(
+            max_workers=max(1, _env_int("EVENTBUS_CRITICAL_WORKERS", 4)),
+            thread_name_prefix="eventbus-critical",
+        )
+
+        # High-rate topics delivered inline by emit() instead of queue + Task
+        self._fast_topics = _fast_topics_from_env()
 
     async def start(self) -> None:
         """Start the event processing loop."""
@@ -86,11 +304,11 @@ async def start(self) -> None:
 
         loop = asyncio.get_running_loop()
         self._loop = loop
-        # Bounded queue provides backpressure under bursty load instead of RAM growth
-        self._queue = asyncio.Queue(maxsize=self._queue_max or 0)
         self._running = True
         logging.info("[BUS] Event bus started - ready for real-time coordination")
-        self._worker = asyncio.create_task(self._process_events())
+        for lane in self._lanes.values():
+            lane.bind()
+            lane.worker = asyncio.create_task(self._process_events(lane))
 
     async def stop(self) -> None:
         """Gracefully stop the event processing."""
@@ -98,9 +316,12 @@ async def stop(self) -> None:
         # Allow pending events to be processed
         await asyncio.sleep(0.1)
         logging.info(f"[BUS] Stopped. Stats: {self._stats}")
-        worker = self._worker
-        self._worker = None
-        if worker is not None:
+        for lane in self._lanes.values():
+            worker = lane.worker
+            lane.worker = None
+            if worker is None:
+                continue
+            lane.wake()
             try:
                 await worker
             except asyncio.CancelledError:
@@ -113,12 +334,57 @@ async def stop(self) -> None:
             logging.info(f"[BUS] Waiting for {len(self._active_tasks)} active event tasks...")
             await asyncio.gather(*self._active_tasks, return_exceptions=True)
             
-        self._queue = None
         self._loop = None
 
     def shutdown(self, wait: bool = False) -> None:
-        """Tear down the executor. Useful for tests or process shutdown."""
+        """Tear down the executors. Useful for tests or process shutdown."""
         self._executor.shutdown(wait=wait)
+        for lane in self._lanes.values():
+            if lane.executor is not None:
+                lane.executor.shutdown(wait=wait)
+
+    def add_lane(
+        self,
+        name: str,
+        prefixes: tuple[str, ...] | list[str],
+        policy: str = "block",
+        maxsize: int = 2000,
+        concurrency: int = 100,
+    ) -> None:
+        """Register (or replace) a lane for topics starting with any of ``prefixes``.
+
+        ``EVENTBUS_LANE_<NAME>_POLICY``, ``_MAX`` and ``_CONCURRENCY`` override
+        the given policy, capacity and number of concurrent deliveries.
+        """
+        if self._running:
+            raise RuntimeError("EventBus lanes must be configured before start()")
+        env = f"EVENTBUS_LANE_{name.upper()}_"
+        policy = os.getenv(env + "POLICY", policy).strip().lower()
+        lane = _Lane(
+            name,
+            tuple(prefixes),
+            policy,
+            _env_int(env + "MAX", maxsize),
+            _env_int(env + "CONCURRENCY", concurrency),
+        )
+        previous = self._lanes.get(name)
+        if previous is not None:
+            lane.executor = previous.executor
+        self._lanes[name] = lane
+        self._lane_by_topic.clear()
+
+    def _lane_for(self, topic: str) -> _Lane:
+        lane = self._lane_by_topic.get(topic)
+        if lane is None:
+            best = -1
+            for candidate in self._lanes.values():
+                for prefix in candidate.prefixes:
+                    if len(prefix) > best and topic.startswith(prefix):
+                        lane, best = candidate, len(prefix)
+            if lane is None:
+                lane = self._lanes["default"]
+            self._lane_by_topic[topic] = lane
+        return lane
 
     def subscribe(self, topic: str, handler: Callable[[dict[str, Any]], Any]) -> None:
         """Subscribe to events on a topic."""
@@ -155,25 +421,18 @@ async def publish(self, topic: str, data: dict[str, Any], urgent: bool = False)
             )
             return  # No-op if not started
 
-        queue = self._queue
-        if queue is None:
-            logging.getLogger(__name__).debug(
-                "EventBus publish skipped; queue not initialised (topic=%s)", topic
-            )
+        if topic in self._fast_topics:
+            self.emit(topic, data)
             return
 
-        event = {
-            "topic": topic,
-            "data": data,
-            "timestamp": asyncio.get_event_loop().time(),
-            "source": "engine",  # Could be enhanced for multi-instance tracking
-        }
-
+        now = asyncio.get_running_loop().time()
         if urgent:
             # Urgent events bypass connection limits and queue
-            await self._deliver_event(event)
+            await self._deliver_event(
+                {"topic": topic, "data": data, "timestamp": now, "source": "engine"}
+            )
         else:
-            await queue.put(event)
+            await self._lane_for(topic).put(topic, data, now)
 
         self._stats["published"] += 1
 
@@ -186,44 +445,100 @@ async def publish(self, topic: str, data: dict[str, Any], urgent: bool = False)
         }:
             logging.info(f"[BUS] 📢 {topic}: {data}")
 
-    async def _process_events(self) -> None:
-        """Main event processing loop."""
+    def is_fast_topic(self, topic: str) -> bool:
+        """Return True when ``topic`` is delivered on the inline fast lane."""
+        return topic in self._fast_topics
+
+    def emit(self, topic: str, data: dict[str, Any]) -> None:
+        """Deliver a high-rate event inline to every subscriber, in publish order.
+
+        Fast-lane contract (``EVENTBUS_FAST_TOPICS``, market data by default):
+        the payload is handed to all handlers as one shared ``FrozenEvent``
+        (no per-handler copy), sync handlers run inline on the loop and must
+        not block, and async handlers get their own Task, started eagerly
+        where the runtime supports it. A handler therefore never runs inside
+        the publisher's Task, cancel scopes or context.
+        """
+        if not self._running:
+            return
+        self._stats["published"] += 1
+        handlers = self._subscribers.get(topic)
+        if not handlers:
+            return
+        payload = data if type(data) is FrozenEvent else FrozenEvent(data)
+        delivered = 0
+        failed = 0
+        for handler in tuple(handlers):
+            try:
+                result = handler(payload)
+                if inspect.iscoroutine(result):
+                    self._start_task(result, topic)
+                delivered += 1
+            except Exception as exc:
+                failed += 1
+                logging.error("[BUS] Handler error on '%s': %s", topic, exc)
+        self._stats["delivered"] += delivered
+        if failed:
+            self._stats["failed"] += failed
+
+    def _start_task(self, coro: Any, topic: str) -> None:
+        """Run an async handler on its own Task (eagerly on Python 3.12+)."""
+        loop = asyncio.get_running_loop()
+        if _EAGER_START:
+            task = asyncio.Task(coro, loop=loop, eager_start=True)
+        else:
+            task = loop.create_task(coro)
+        self._active_tasks.add(task)
+
+        def _done(t: asyncio.Task[Any]) -> None:
+            self._active_tasks.discard(t)
+            if not t.cancelled() and t.exception() is not None:
+                self._stats["failed"] += 1
+                logging.error("[BUS] Handler error on '%s': %s", topic, t.exception())
+
+        task.add_done_callback(_done)
+
+    async def _process_events(self, lane: _Lane) -> None:
+        """Dispatcher loop for one lane."""
+        loop = asyncio.get_running_loop()
         while True:
-            queue = self._queue
-            if queue is None:
+            if not lane.items:
                 if not self._running:
                     break
-                await asyncio.sleep(0.05)
+                await lane.wait()
                 continue
-
-            if not self._running and queue.empty():
-                break
             try:
-                # Timeout to allow shutdown
-                event = await asyncio.wait_for(queue.get(), timeout=1.0)
-                
                 # [Phase 7 Fix] Non-blocking dispatch
-                # Acquire semaphore slot (waits if full)
-                await self._concurrency_limit.acquire()
-                
-                task = asyncio.create_task(self._deliver_event_wrapper(event))
+                # Acquire a lane slot (waits if this lane is saturated)
+                await lane.limit.acquire()
+                entry = lane.pop(loop.time())
+                if entry is None:
+                    lane.limit.release()
+                    continue
+                topic, data, enqueued_at, _ = entry
+                event = {
+                    "topic": topic,
+                    "data": data,
+                    "timestamp": enqueued_at,
+                    "source": "engine",  # Could be enhanced for multi-instance tracking
+                }
+                task = asyncio.create_task(self._deliver_event_wrapper(event, lane.limit))
                 self._active_tasks.add(task)
                 task.add_done_callback(self._active_tasks.discard)
-                
-            except TimeoutError:
-                continue
             except RuntimeError:
                 logging.exception("[BUS] Queue processing error (runtime)")
                 break
             except _PROCESS_ERRORS as exc:
                 _log_suppressed("process_events", exc)
 
-    async def _deliver_event_wrapper(self, event: dict[str, Any]) -> None:
-        """Wrapper to release semaphore after delivery."""
+    async def _deliver_event_wrapper(
+        self, event: dict[str, Any], limit: asyncio.Semaphore
+    ) -> None:
+        """Wrapper to release the lane slot after delivery."""
         try:
             await self._deliver_event(event)
         finally:
-            self._concurrency_limit.release()
+            limit.release()
 
     async def _deliver_event(self, event: dict[str, Any]) -> None:
         """Deliver event to all subscribers with error isolation."""
@@ -238,7 +553,8 @@ async def _deliver_event(self, event: dict[str, Any]) -> None:
         failed = 0
         handlers = list(self._subscribers[topic])
         loop = asyncio.get_running_loop()
-        pending = [self._dispatch_handler(handler, data, loop) for handler in handlers]
+        executor = self._lane_for(topic).executor or self._executor
+        pending = [self._dispatch_handler(handler, data, loop, executor) for handler in handlers]
         results = await asyncio.gather(*pending, return_exceptions=True)
 
         for handler, result in zip(handlers, results, strict=False):
@@ -271,13 +587,19 @@ async def _deliver_event(self, event: dict[str, Any]) -> None:
 
     def get_stats(self) -> dict[str, Any]:
         """Get bus statistics."""
+        now = self._loop.time() if self._loop is not None else 0.0
+        lanes = {name: lane.stats(now) for name, lane in self._lanes.items()}
         return {
             **self._stats,
             "active_subscriptions": sum(len(handlers) for handlers in self._subscribers.values()),
             "topics_count": len(self._stats["topics"]),
-            "queue_size": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": sum(lane["depth"] for lane in lanes.values()),
             "running": self._running,
-            "concurrency_slots_free": self._concurrency_limit._value if self._concurrency_limit else 0
+            "concurrency_slots_free": sum(
+                lane["concurrency_slots_free"] for lane in lanes.values()
+            ),
+            "fast_topics": sorted(self._fast_topics),
+            "lanes": lanes,
         }
 
     def fire(self, topic: str, data: dict[str, Any]) -> None:
@@ -285,7 +607,8 @@ def fire(self, topic: str, data: dict[str, Any]) -> None:
 
         Schedules an async publish on the running loop. If no loop is
         running (rare in tests), it falls back to a best-effort direct
-        call that will no-op when the bus isn't started.
+        call that will no-op when the bus isn't started. Fast-lane topics
+        are delivered inline via ``emit`` without scheduling a Task.
         """
 
         async def _runner():
@@ -296,6 +619,9 @@ async def _runner():
 
         try:
             loop = asyncio.get_running_loop()
+            if topic in self._fast_topics:
+                self.emit(topic, data)
+                return
             loop.create_task(_runner())
         except RuntimeError:
             # No running loop; invoke synchronously best-effort
@@ -310,6 +636,7 @@ async def _dispatch_handler(
         handler: Callable[[dict[str, Any]], Any],
         payload: dict[str, Any],
         loop: asyncio.AbstractEventLoop,
+        executor: ThreadPoolExecutor | None = None,
     ) -> Any:
         """Dispatch handler execution via async/await or executor offloading."""
         if _is_async_callable(handler):
@@ -318,7 +645,7 @@ async def _dispatch_handler(
 
         # Offload sync handlers to thread pool; isolate via deep copy
         return await loop.run_in_executor(
-            self._executor, _call_sync, handler, copy.deepcopy(payload)
+            executor or self._executor, _call_sync, handler, copy.deepcopy(payload)
         )
 
 
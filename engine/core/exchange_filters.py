@@ -0,0 +1,161 @@
+"""Indexed Binance symbol filters built from bulk ``exchangeInfo`` responses.
+
+``BinanceREST`` used to fetch ``exchangeInfo`` one symbol at a time behind a
+single client-wide lock, so the first order on a new symbol stalled every
+other filter lookup. Filters now live in an immutable ``FilterTable`` per
+market. The table is loaded in bulk at startup and on a timer, extended
+copy-on-write when a single symbol has to be fetched, and persisted to
+``EXCHANGE_FILTERS_DIR`` so a restart starts warm.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_LOAD_ERRORS: tuple[type[Exception], ...] = (OSError, ValueError, TypeError, KeyError)
+
+
+@dataclass(frozen=True)
+class SymbolFilter:
+    symbol: str
+    step_size: float
+    min_qty: float
+    min_notional: float
+    max_notional: float | None = None
+    tick_size: float = 0.0
+
+
+@dataclass(frozen=True)
+class FilterTable:
+    market: str
+    version: int = 0
+    fetched_at: float = 0.0
+    # True once the table was filled from a full exchangeInfo listing
+    complete: bool = False
+    filters: Mapping[str, SymbolFilter] = field(default_factory=lambda: MappingProxyType({}))
+
+    def get(self, symbol: str) -> SymbolFilter | None:
+        return self.filters.get(symbol)
+
+    def merged(self, filters: Mapping[str, SymbolFilter], *, complete: bool = False) -> FilterTable:
+        """New table with ``filters`` added; a complete listing replaces the old entries."""
+        if complete:
+            merged = dict(filters)
+        else:
+            merged = dict(self.filters)
+            merged.update(filters)
+        return FilterTable(
+            market=self.market,
+            version=self.version + 1,
+            fetched_at=time.time() if complete else self.fetched_at,
+            complete=complete or self.complete,
+            filters=MappingProxyType(merged),
+        )
+
+
+def parse_symbol_filter(entry: Mapping[str, Any]) -> SymbolFilter:
+    """Translate one ``exchangeInfo`` symbol entry into a sanitized ``SymbolFilter``."""
+    clean = str(entry.get("symbol") or "").upper()
+    step_size = 0.000001
+    min_qty = 0.0
+    min_notional = 0.0
+    max_notional = float("inf")
+    tick_size = 0.0
+    for f in entry.get("filters", []) or []:
+        ftype = f.get("filterType")
+        if ftype in ("LOT_SIZE", "MARKET_LOT_SIZE"):
+            # Futures can return LOT_SIZE; some variants report MARKET_LOT_SIZE
+            step_size = float(f.get("stepSize", step_size or 0.000001))
+            min_qty = float(f.get("minQty", min_qty or 0.0))
+        elif ftype in ("NOTIONAL", "MIN_NOTIONAL"):
+            # Support both names; MIN_NOTIONAL appears on some venues/contracts
+            mn = f.get("minNotional")
+            mx = f.get("maxNotional", None)
+            try:
+                min_notional = float(mn) if mn is not None else min_notional
+            except (TypeError, ValueError) as exc:
+                # If venue sends something strange, keep previous/default
+                logger.debug("Min notional parse failed for %s: %s", clean, exc)
+            try:
+                max_notional = float(mx) if mx is not None else max_notional
+            except (TypeError, ValueError) as exc:
+                logger.debug("Max notional parse failed for %s: %s", clean, exc)
+        elif ftype == "PRICE_FILTER":
+            tick_size = float(f.get("tickSize", tick_size or 0.0))
+    # Sanitize numeric outputs for JSON + downstream math
+    # step_size must be positive; default to 1e-6 if absent/invalid
+    if not isinstance(step_size, (int, float)) or step_size <= 0:
+        step_size = 0.000001
+    if not isinstance(min_qty, (int, float)) or min_qty < 0:
+        min_qty = 0.0
+    # Infinity/<=0 max_notional -> None (meaning "no cap")
+    if max_notional == float("inf") or max_notional <= 0:
+        safe_max_notional = None
+    else:
+        safe_max_notional = float(max_notional)
+    return SymbolFilter(clean, step_size, min_qty, min_notional, safe_max_notional, tick_size)
+
+
+def parse_exchange_info(symbols: Iterable[Mapping[str, Any]]) -> dict[str, SymbolFilter]:
+    out: dict[str, SymbolFilter] = {}
+    for entry in symbols:
+        try:
+            filt = parse_symbol_filter(entry)
+        except (TypeError, ValueError, AttributeError) as exc:
+            logger.debug("exchangeInfo entry skipped: %s", exc)
+            continue
+        if filt.symbol:
+            out[filt.symbol] = filt
+    return out
+
+
+def table_path(market: str) -> Path:
+    return Path(os.getenv("EXCHANGE_FILTERS_DIR", "state")) / f"exchange_filters_{market}.json"
+
+
+def save_table(table: FilterTable, base_url: str, path: Path | None = None) -> None:
+    path = path or table_path(table.market)
+    payload = {
+        "market": table.market,
+        "base_url": base_url,
+        "version": table.version,
+        "fetched_at": table.fetched_at,
+        "complete": table.complete,
+        "filters": {sym: asdict(filt) for sym, filt in table.filters.items()},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(payload, separators=(",", ":")))
+    tmp.replace(path)
+
+
+def load_table(market: str, base_url: str, path: Path | None = None) -> FilterTable | None:
+    """Persisted table for ``market``; ignored when it was fetched from another host."""
+    path = path or table_path(market)
+    try:
+        raw = json.loads(path.read_text())
+        if raw.get("market") != market or raw.get("base_url") != base_url:
+            return None
+        filters = {sym: SymbolFilter(**vals) for sym, vals in raw["filters"].items()}
+        return FilterTable(
+            market=market,
+            version=int(raw.get("version", 0)),
+            fetched_at=float(raw.get("fetched_at", 0.0)),
+            complete=bool(raw.get("complete", False)),
+            filters=MappingProxyType(filters),
+        )
+    except FileNotFoundError:
+        return None
+    except _LOAD_ERRORS as exc:
+        logger.warning("Ignoring unreadable exchange filter cache %s: %s", path, exc)
+        return None
@@ -0,0 +1,318 @@
+"""Stream-fed market data cache: last price, top of book and rolling OHLC/ATR per symbol.
+
+Order sizing, VaR and stop validation used to ask the exchange over REST for
+``ticker_price`` and ``klines`` on every call, although the market stream
+already delivers every trade for those symbols. ``MarketDataCache`` listens to
+``market.trade`` / ``market.tick`` / ``market.book`` on the bus and keeps, per
+symbol, the last trade price, best bid/ask, and closed 1m/5m bars whose true
+ranges are computed once when each bar closes. Readers get ``None`` when the
+symbol has not updated within ``MD_CACHE_MAX_AGE_SEC`` and fall back to REST.
+The stream covers one venue and market (e.g. Binance futures), recorded on
+``attach``; callers pricing another market check ``serves`` and go to REST.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections import deque
+from itertools import islice
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_TF_SECONDS = {"1m": 60, "5m": 300}
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _base(symbol: str) -> str:
+    return str(symbol or "").split(".")[0].upper()
+
+
+# Margin trades on the spot book
+_MARKET_ALIASES = {"margin": "spot"}
+
+
+def _market(market: str | None) -> str | None:
+    if not market:
+        return None
+    market = market.lower()
+    return _MARKET_ALIASES.get(market, market)
+
+
+_COUNTERS: dict[tuple[str, bool], Any] = {}
+
+
+def _lookup_metric(kind: str, hit: bool) -> None:
+    try:
+        counter = _COUNTERS.get((kind, hit))
+        if counter is None:
+            from engine import metrics
+
+            counter = metrics.market_cache_lookups_total.labels(
+                kind=kind, result="hit" if hit else "miss"
+            )
+            _COUNTERS[(kind, hit)] = counter
+        counter.inc()
+    except Exception:  # pragma: no cover - metrics optional
+        pass
+
+
+class _BarSeries:
+    """Rolling OHLC bars for one timeframe; the true range is fixed when a bar closes."""
+
+    __slots__ = ("period", "bars", "trs", "bucket", "open", "high", "low", "close", "prev_close")
+
+    def __init__(self, period: int, max_bars: int) -> None:
+        self.period = period
+        # closed bars as (start_ts, open, high, low, close)
+        self.bars: deque[tuple[float, float, float, float, float]] = deque(maxlen=max_bars)
+        # true range of each closed bar that had a predecessor
+        self.trs: deque[float] = deque(maxlen=max_bars)
+        self.bucket: int | None = None
+        self.open = self.high = self.low = self.close = 0.0
+        self.prev_close: float | None = None
+
+    def push(self, price: float, ts: float) -> None:
+        bucket = int(ts // self.period)
+        if self.bucket is None:
+            self._start(bucket, price)
+            return
+        if bucket > self.bucket:
+            self._roll(bucket)
+            self._start(bucket, price)
+            return
+        # Same bucket (or a slightly late trade): fold into the open bar
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+
+    def _start(self, bucket: int, price: float) -> None:
+        self.bucket = bucket
+        self.open = self.high = self.low = self.close = price
+
+    def _roll(self, bucket: int) -> None:
+        self._close_bar(self.bucket, self.open, self.high, self.low, self.close)
+        # Minutes without trades become flat bars at the last close, as in exchange klines
+        gap = min(bucket - self.bucket - 1, self.bars.maxlen or 0)
+        for i in range(gap, 0, -1):
+            c = self.close
+            self._close_bar(bucket - i, c, c, c, c)
+
+    def _close_bar(self, bucket: int, o: float, h: float, lo: float, c: float) -> None:
+        if self.prev_close is not None:
+            pc = self.prev_close
+            self.trs.append(max(h - lo, abs(h - pc), abs(lo - pc)))
+        self.bars.append((float(bucket * self.period), o, h, lo, c))
+        self.prev_close = c
+
+    def current_tr(self) -> float | None:
+        if self.bucket is None or self.prev_close is None:
+            return None
+        pc = self.prev_close
+        return max(self.high - self.low, abs(self.high - pc), abs(self.low - pc))
+
+    def atr(self, n: int) -> float | None:
+        """Mean true range over the last ``n`` bars, the open one included (matches REST klines)."""
+        current = self.current_tr()
+        if current is None or n <= 0 or len(self.trs) < n - 1:
+            return None
+        closed = sum(islice(reversed(self.trs), n - 1))
+        return (closed + current) / n
+
+
+class _SymbolState:
+    __slots__ = ("last", "last_ts", "bid", "ask", "book_ts", "updated", "series")
+
+    def __init__(self, timeframes: dict[str, int], max_bars: int) -> None:
+        self.last: float | None = None
+        self.last_ts = 0.0
+        self.bid: float | None = None
+        self.ask: float | None = None
+        self.book_ts = 0.0
+        self.updated = 0.0
+        self.series = {tf: _BarSeries(period, max_bars) for tf, period in timeframes.items()}
+
+
+class MarketDataCache:
+    """
+    Per-symbol market state maintained from bus events.
+
+    Symbols are keyed by their base (``BTCUSDT`` for ``BTCUSDT.BINANCE``).
+    ``last``, ``quote`` and ``atr`` return ``None`` when the cache cannot
+    answer (unknown symbol, not enough bars, or no update within
+    ``max_age_sec``); callers then go to REST.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_age_sec: float | None = None,
+        max_bars: int | None = None,
+        timeframes: dict[str, int] | None = None,
+        clock: Any = time.time,
+    ) -> None:
+        self.max_age_sec = (
+            max_age_sec if max_age_sec is not None else _env_float("MD_CACHE_MAX_AGE_SEC", 5.0)
+        )
+        self.max_bars = max(2, int(max_bars or _env_float("MD_CACHE_MAX_BARS", 120)))
+        self.timeframes = dict(timeframes or _TF_SECONDS)
+        self._clock = clock
+        self._symbols: dict[str, _SymbolState] = {}
+        self._bus: Any = None
+        # Venue/market of the stream feeding the cache; None matches anything
+        self.venue: str | None = None
+        self.market: str | None = None
+        self._stats = {"updates": 0, "book_updates": 0, "hits": 0, "misses": 0}
+
+    # ----------------------------------------------------------------- bus wiring
+    def attach(self, bus: Any, *, venue: str | None = None, market: str | None = None) -> None:
+        self.venue = venue.upper() if venue else None
+        self.market = _market(market)
+        if self._bus is bus:
+            return
+        self.detach()
+        for topic in ("market.trade", "market.tick"):
+            bus.subscribe(topic, self.on_trade)
+        bus.subscribe("market.book", self.on_book)
+        self._bus = bus
+
+    def detach(self) -> None:
+        bus, self._bus = self._bus, None
+        if bus is None:
+            return
+        for topic in ("market.trade", "market.tick"):
+            bus.unsubscribe(topic, self.on_trade)
+        bus.unsubscribe("market.book", self.on_book)
+
+    def on_trade(self, event: dict[str, Any]) -> None:
+        try:
+            price = float(event.get("price") or 0.0)
+        except (TypeError, ValueError):
+            return
+        symbol = event.get("symbol")
+        if price > 0 and symbol:
+            self.update(symbol, price, event.get("ts"))
+
+    def on_book(self, event: dict[str, Any]) -> None:
+        try:
+            bid = float(event.get("bid_price") or 0.0)
+            ask = float(event.get("ask_price") or 0.0)
+        except (TypeError, ValueError):
+            return
+        symbol = event.get("symbol")
+        if symbol and (bid > 0 or ask > 0):
+            self.update_book(symbol, bid, ask, event.get("ts"))
+
+    # ------------------------------------------------------------------ writers
+    def _state(self, symbol: str) -> _SymbolState:
+        key = _base(symbol)
+        state = self._symbols.get(key)
+        if state is None:
+            state = self._symbols[key] = _SymbolState(self.timeframes, self.max_bars)
+        return state
+
+    def _event_ts(self, ts: Any, now: float) -> float:
+        try:
+            val = float(ts)
+        except (TypeError, ValueError):
+            return now
+        if val <= 0:
+            return now
+        return val / 1000.0 if val > 1e11 else val
+
+    def update(self, symbol: str, price: float, ts: Any = None) -> None:
+        now = self._clock()
+        event_ts = self._event_ts(ts, now)
+        state = self._state(symbol)
+        state.last = price
+        state.last_ts = event_ts
+        state.updated = now
+        for series in state.series.values():
+            series.push(price, event_ts)
+        self._stats["updates"] += 1
+
+    def update_book(self, symbol: str, bid: float, ask: float, ts: Any = None) -> None:
+        now = self._clock()
+        state = self._state(symbol)
+        if bid > 0:
+            state.bid = bid
+        if ask > 0:
+            state.ask = ask
+        state.book_ts = self._event_ts(ts, now)
+        self._stats["book_updates"] += 1
+
+    # ------------------------------------------------------------------ readers
+    def serves(self, venue: str | None, market: str | None = None) -> bool:
+        """Whether cached prices are valid for orders on ``venue``/``market``."""
+        venue = (venue or "").upper()
+        if venue == "BINANCE_MARGIN":
+            venue, market = "BINANCE", market or "margin"
+        if self.venue and venue and venue != self.venue:
+            return False
+        market = _market(market)
+        return not (self.market and market and market != self.market)
+
+    def _fresh(self, symbol: str, max_age: float | None) -> _SymbolState | None:
+        state = self._symbols.get(_base(symbol))
+        if state is None or state.last is None:
+            return None
+        limit = self.max_age_sec if max_age is None else max_age
+        if self._clock() - state.updated > limit:
+            return None
+        return state
+
+    def last(self, symbol: str, max_age: float | None = None) -> float | None:
+        state = self._fresh(symbol, max_age)
+        self._count("last", state is not None)
+        return state.last if state is not None else None
+
+    def quote(self, symbol: str, max_age: float | None = None) -> tuple[float, float] | None:
+        """Best ``(bid, ask)`` when both sides are known and the book updated within ``max_age``."""
+        state = self._symbols.get(_base(symbol))
+        if state is None or state.bid is None or state.ask is None:
+            return None
+        limit = self.max_age_sec if max_age is None else max_age
+        if self._clock() - state.book_ts > limit:
+            return None
+        return state.bid, state.ask
+
+    def atr(self, symbol: str, tf: str = "5m", n: int = 14) -> float | None:
+        state = self._fresh(symbol, None)
+        series = state.series.get(tf) if state is not None else None
+        value = series.atr(int(n)) if series is not None else None
+        self._count("atr", value is not None)
+        return value
+
+    def bars(self, symbol: str, tf: str = "1m") -> list[tuple[float, float, float, float, float]]:
+        """Closed ``(start_ts, open, high, low, close)`` bars, oldest first."""
+        state = self._symbols.get(_base(symbol))
+        series = state.series.get(tf) if state is not None else None
+        return list(series.bars) if series is not None else []
+
+    def _count(self, kind: str, hit: bool) -> None:
+        self._stats["hits" if hit else "misses"] += 1
+        _lookup_metric(kind, hit)
+
+    def clear(self) -> None:
+        self._symbols.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        stats = dict(self._stats)
+        stats["symbols"] = len(self._symbols)
+        stats["max_age_sec"] = self.max_age_sec
+        stats["venue"] = self.venue
+        stats["market"] = self.market
+        return stats
+
+
+MARKET_CACHE = MarketDataCache()
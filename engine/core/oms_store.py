@@ -1,33 +1,158 @@
-from typing import Iterator
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Iterator
+from dataclasses import asdict, fields
+from typing import Any
+
 from .oms_models import OrderRecord
 
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = frozenset({"NEW", "PARTIALLY_FILLED", "ACCEPTED", "PENDING_NEW"})
+_FIELDS = frozenset(f.name for f in fields(OrderRecord))
+_AUTO_FLUSH = 256  # dirty records that trigger a flush without waiting for _persist()
+
+
+def _venue_of(symbol: str) -> str:
+    parts = str(symbol or "").split(".")
+    return parts[1] if len(parts) > 1 else ""
+
+
+def _default_backend() -> Any:
+    from engine.storage import sqlite
+
+    return sqlite
+
+
 class OMSStore:
     """
-    In-memory Order Management System store.
-    
-    This is a temporary implementation to satisfy the Reconciliation Daemon dependencies.
-    It tracks orders in memory and does not currently persist to SQLite, 
-    though it is intended to wrap engine.storage.sqlite in the future.
+    Order Management System store for the Reconciliation Daemon.
+
+    Only open orders stay in memory, indexed by status, symbol and venue, so
+    ``list_open`` costs O(open orders) however long the engine has run.
+    Orders that reach a terminal status are evicted to SQLite. Changes are
+    written behind through ``engine.storage.sqlite.enqueue``: mutations mark
+    the record dirty and ``_persist`` queues one row per dirty order.
+    ``load_open`` restores the open orders after a restart.
     """
-    def __init__(self):
+
+    def __init__(self, backend: Any = None):
+        self._backend = backend
         self._orders: dict[str, OrderRecord] = {}
+        self._by_status: dict[str, set[str]] = {}
+        self._by_symbol: dict[str, set[str]] = {}
+        self._by_venue: dict[str, set[str]] = {}
+        # order id -> (status, symbol, venue) it was indexed under; callers may
+        # mutate records in place, so the record itself can't say where it sits
+        self._keys: dict[str, tuple[str, str, str]] = {}
+        # order id -> (record snapshot, open flag) awaiting write-behind
+        self._dirty: dict[str, tuple[dict[str, Any], bool]] = {}
+        self._loaded = False
+
+    def _store(self) -> Any:
+        if self._backend is None:
+            self._backend = _default_backend()
+        return self._backend
+
+    # ------------------------------------------------------------------ indexes
+    def _index(self, record: OrderRecord) -> None:
+        oid = record.id
+        keys = (record.status, record.symbol, _venue_of(record.symbol))
+        self._keys[oid] = keys
+        for index, key in zip((self._by_status, self._by_symbol, self._by_venue), keys):
+            index.setdefault(key, set()).add(oid)
+
+    def _unindex(self, order_id: str) -> None:
+        keys = self._keys.pop(order_id, None)
+        if keys is None:
+            return
+        for index, key in zip((self._by_status, self._by_symbol, self._by_venue), keys):
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(order_id)
+                if not ids:
+                    del index[key]
 
-    def list_open(self) -> Iterator[OrderRecord]:
-        """Return iterator of all open orders."""
-        return (
-            o for o in self._orders.values() 
-            if o.status in ("NEW", "PARTIALLY_FILLED", "ACCEPTED", "PENDING_NEW")
-        )
+    # ------------------------------------------------------------------ readers
+    def list_open(
+        self,
+        *,
+        status: str | None = None,
+        symbol: str | None = None,
+        venue: str | None = None,
+    ) -> Iterator[OrderRecord]:
+        """Return iterator of open orders, optionally narrowed by status/symbol/venue."""
+        candidates: list[set[str]] = []
+        for index, key in ((self._by_status, status), (self._by_symbol, symbol), (self._by_venue, venue)):
+            if key is not None:
+                candidates.append(index.get(key, set()))
+        if not candidates:
+            return iter(list(self._orders.values()))
+        ids = set.intersection(*sorted(candidates, key=len))
+        return iter([self._orders[oid] for oid in ids if oid in self._orders])
 
+    def count_open(self) -> int:
+        return len(self._orders)
+
+    def get(self, order_id: str) -> OrderRecord | None:
+        """Open order from memory; closed orders are looked up in SQLite."""
+        record = self._orders.get(order_id)
+        if record is not None:
+            return record
+        pending = self._dirty.get(order_id)
+        row = pending[0] if pending is not None else self._store().get_oms_order(order_id)
+        return OrderRecord(**row) if row else None
+
+    # ------------------------------------------------------------------ writers
     def upsert(self, record: OrderRecord, source: str) -> None:
         """Insert or update an order record."""
-        self._orders[record.id] = record
+        if self._orders.pop(record.id, None) is not None:
+            self._unindex(record.id)
+        if record.status in OPEN_STATUSES:
+            self._orders[record.id] = record
+            self._index(record)
+        self._mark(record)
 
     def close(self, order_id: str, status: str) -> None:
-        """Mark an order as closed (FILLED/CANCELED/etc)."""
-        if order_id in self._orders:
-            self._orders[order_id].status = status
+        """Mark an order as closed (FILLED/CANCELED/etc) and evict it from memory."""
+        record = self._orders.pop(order_id, None)
+        if record is None:
+            return
+        self._unindex(order_id)
+        record.status = status
+        record.updated_at = time.time()
+        self._mark(record)
+
+    def _mark(self, record: OrderRecord) -> None:
+        self._dirty[record.id] = (asdict(record), record.status in OPEN_STATUSES)
+        if len(self._dirty) >= _AUTO_FLUSH:
+            self._persist()
 
     def _persist(self) -> None:
-        """Persist state to storage (No-op in-memory)."""
-        pass
+        """Queue dirty records on the SQLite flusher (write-behind)."""
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, {}
+        store = self._store()
+        for row, is_open in dirty.values():
+            store.upsert_oms_order(row, is_open)
+
+    def load_open(self) -> int:
+        """Restore open orders persisted by a previous run; only the first call reads SQLite."""
+        if self._loaded:
+            return len(self._orders)
+        self._loaded = True
+        for row in self._store().load_open_oms_orders():
+            if row.get("id") in self._orders:
+                continue
+            try:
+                record = OrderRecord(**{k: v for k, v in row.items() if k in _FIELDS})
+            except TypeError as exc:
+                logger.warning("Skipping unreadable OMS order %s: %s", row.get("id"), exc)
+                continue
+            if record.status in OPEN_STATUSES:
+                self._orders[record.id] = record
+                self._index(record)
+        return len(self._orders)
@@ -22,8 +22,10 @@
     load_fee_config,
     load_ibkr_fee_config,
 )
+from engine.core.market_cache import MARKET_CACHE
 from engine.core.portfolio import Portfolio
 from engine.core.venue_specs import SPECS, SymbolSpec
+from engine.feeds.kline_service import KLINE_SERVICE
 from engine.metrics import REGISTRY, orders_rejected, update_portfolio_gauges
 
 Side = Literal["BUY", "SELL"]
@@ -469,11 +471,17 @@ async def market_quote(
                     # Try to get BBO for Maker Price
                     maker_price = 0.0
                     try:
-                        ticker = await client.book_ticker(base) if hasattr(client, "book_ticker") else {}
-                        if side == "BUY":
-                            maker_price = float(ticker.get("bidPrice", 0.0))
+                        bbo = None
+                        if MARKET_CACHE.serves(venue, market_hint):
+                            bbo = MARKET_CACHE.quote(base)
+                        if bbo is not None:
+                            maker_price = bbo[0] if side == "BUY" else bbo[1]
                         else:
-                            maker_price = float(ticker.get("askPrice", 0.0))
+                            ticker = await client.book_ticker(base) if hasattr(client, "book_ticker") else {}
+                            if side == "BUY":
+                                maker_price = float(ticker.get("bidPrice", 0.0))
+                            else:
+                                maker_price = float(ticker.get("askPrice", 0.0))
                     except Exception as e:
                         pass
 
@@ -877,6 +885,10 @@ async def _quote_to_quantity(
 
     def portfolio_snapshot(self):
         """Shim for persistence layer."""
+        # Portfolio caches its snapshot per version; risk checks call this per order
+        snap = getattr(self._portfolio, "snapshot", None)
+        if callable(snap):
+            return snap()
         return self._portfolio.state.snapshot()
 
     def portfolio_service(self):
@@ -1276,6 +1288,13 @@ def _round_step(value: float, step: float) -> float:
 async def _resolve_last_price(
     client, venue: str, base: str, symbol: str, *, market: str | None = None
 ) -> float | None:
+    # Stream-fed price first; REST only when the cache is cold, stale or fed
+    # from another venue/market (e.g. a spot order while streaming futures)
+    if MARKET_CACHE.serves(venue, market):
+        cached = MARKET_CACHE.last(base)
+        if cached is not None:
+            return cached
+
     getter = getattr(client, "get_last_price", None)
     if callable(getter):
         try:
@@ -1632,7 +1651,7 @@ async def place_entry(
             } and (qty is None or qty <= 0):
                 from engine.risk.sizer import clamp_notional, risk_parity_qty
 
-                md = _MDAdapter(self)
+                md = _MDAdapter(self, market=market_hint)
                 tf = os.getenv("RISK_PARITY_TF", "5m")
                 n = int(float(os.getenv("RISK_PARITY_N", "14")))
                 per_risk = float(os.getenv("PER_TRADE_RISK_USD", os.getenv("PER_TRADE_USD", "40")))
@@ -1757,36 +1776,49 @@ async def auto_net_hedge_btc(self, percent: float = 0.30):
 
 
 class _MDAdapter:
-    def __init__(self, router: OrderRouterExt) -> None:
+    def __init__(self, router: OrderRouterExt, *, market: str | None = None) -> None:
         self.router = router
         self._venue = getattr(router, "_venue", "BINANCE")
+        self._market = market
 
     def _default_symbol(self, symbol: str) -> str:
         if "." in symbol and symbol.split(".")[1]:
             return symbol
         return f"{symbol}.{self._venue}"
 
+    def _cache_serves(self, symbol: str) -> bool:
+        # The stream cache only holds one venue/market; anything else goes to REST
+        return MARKET_CACHE.serves(self._default_symbol(symbol).split(".")[1], self._market)
+
     def last(self, symbol: str):
         # Synchronous helper for ATR sizing path
         import asyncio
 
+        cached = MARKET_CACHE.last(symbol) if self._cache_serves(symbol) else None
+        if cached is not None:
+            return cached
         sym = self._default_symbol(symbol)
         res = asyncio.get_event_loop().run_until_complete(self.router.get_last_price(sym))
         return res
 
     def atr(self, symbol: str, tf: str = "5m", n: int = 14):
-        # Use exchange klines to compute ATR quickly
+        # Bars built from the trade stream; exchange klines only when the cache is stale
         import asyncio
 
-        client = self.router.exchange_client()
-        if client is None or not hasattr(client, "klines"):
-            return 0.0
-        sym = self._default_symbol(symbol)
-        base, venue = sym.split(".")
-        target = base if venue == "BINANCE" else sym
-        kl = client.klines(target, interval=tf, limit=max(n + 1, 15))
-        if hasattr(kl, "__await__"):
-            kl = asyncio.get_event_loop().run_until_complete(kl)
+        cached = MARKET_CACHE.atr(symbol, tf=tf, n=n) if self._cache_serves(symbol) else None
+        if cached is not None:
+            return cached
+        kl = KLINE_SERVICE.peek(symbol, tf, max(n + 1, 15))
+        if kl is None:
+            client = self.router.exchange_client()
+            if client is None or not hasattr(client, "klines"):
+                return 0.0
+            sym = self._default_symbol(symbol)
+            base, venue = sym.split(".")
+            target = base if venue == "BINANCE" else sym
+            kl = client.klines(target, interval=tf, limit=max(n + 1, 15))
+            if hasattr(kl, "__await__"):
+                kl = asyncio.get_event_loop().run_until_complete(kl)
         if not isinstance(kl, list) or len(kl) < 2:
             return 0.0
         prev_close = None
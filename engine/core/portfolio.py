@@ -7,7 +7,10 @@
 
 _LOGGER = logging.getLogger(__name__)
 
-@dataclass
+# Incremental mark-to-market updates between full re-sums (bounds float drift)
+_RESYNC_EVERY = 4096
+
+@dataclass(slots=True)
 class Position:
     symbol: str
     quantity: float = 0.0
@@ -30,6 +33,49 @@ def to_dict(self) -> dict:
             "market": self.market,
         }
 
+class _PositionBook(dict):
+    """Positions dict that counts inserts/removals, so Portfolio can tell when it
+    was changed from outside and its running totals need a full re-sum."""
+
+    __slots__ = ("version",)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def __setitem__(self, key: str, value: Position) -> None:
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self.version += 1
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, *args: Any) -> Any:
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self) -> tuple[str, Position]:
+        self.version += 1
+        return super().popitem()
+
+    def clear(self) -> None:
+        super().clear()
+        self.version += 1
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        super().update(*args, **kwargs)
+        self.version += 1
+
+    def __ior__(self, other: Any) -> _PositionBook:
+        self.update(other)
+        return self
+
 @dataclass
 class PortfolioState:
     balances: dict[str, float] = field(default_factory=lambda: {"USDT": 0.0, "BNB": 0.0})
@@ -39,11 +85,19 @@ class PortfolioState:
     realized: float = 0.0
     unrealized: float = 0.0
     fees: float = 0.0
-    positions: dict[str, Position] = field(default_factory=dict)
+    positions: dict[str, Position] = field(default_factory=_PositionBook)
     ts: float = field(default_factory=time.time)
     margin_level: float = 0.0
     margin_liability_usd: float = 0.0
     wallet_breakdown: dict[str, Any] = field(default_factory=dict)
+    # Bumped on every attribute assignment; wallet syncs in app/router write
+    # cash/equity directly, and Portfolio.snapshot() must not serve them stale
+    writes: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name != "writes":
+            object.__setattr__(self, "writes", self.writes + 1)
 
     def snapshot(self) -> dict:
         return {
@@ -58,34 +112,76 @@ def snapshot(self) -> dict:
             "wallet_breakdown": dict(self.wallet_breakdown),
         }
 
+def _copy_snapshot(snap: dict) -> dict:
+    """Copy a snapshot down to its nested dicts and position rows (values are scalars)."""
+    out = {k: dict(v) if isinstance(v, dict) else v for k, v in snap.items()}
+    out["positions"] = [dict(pos) for pos in snap["positions"]]
+    return out
+
+
 class Portfolio:
-    def __init__(self, starting_balances: dict[str, float] | None = None, on_update=None) -> None:
+    """Cash, positions and PnL aggregates.
+
+    Exposure and unrealized PnL are kept as running totals: a mark or fill
+    applies the touched position's delta instead of re-summing every position.
+    Snapshots are built on demand and cached per ``version``. ``on_change``
+    listeners get the Portfolio itself and call ``snapshot()`` only if they
+    need one. ``on_update`` keeps the eager snapshot-per-fill behaviour.
+    """
+
+    def __init__(self, starting_balances: dict[str, float] | None = None, on_update=None, on_change=None) -> None:
         self._state = PortfolioState()
         if starting_balances:
             self._state.balances = starting_balances
             self._state.cash = starting_balances.get("USDT", 0.0)
             self._state.equity = self._state.cash
         self._on_update = on_update
+        self._listeners: list = [on_change] if on_change else []
+        self.version = 0
+        self._contrib: dict[str, tuple[float, float]] = {}  # symbol -> (exposure, upl)
+        self._exposure_sum = 0.0
+        self._upl_sum = 0.0
+        self._synced_book: dict | None = None
+        self._synced_version = -1
+        self._incremental = 0
+        self._snap: tuple[tuple[int, int, int, int], dict] | None = None
 
     @property
     def state(self) -> PortfolioState:
         return self._state
 
+    def add_listener(self, fn) -> None:
+        """Register ``fn(portfolio)``, called after every fill."""
+        self._listeners.append(fn)
+
     def snapshot(self) -> dict:
-        return self._state.snapshot()
+        """Snapshot of the current state.
+
+        The snapshot is built once per change. Each caller gets its own copy
+        of it, so callers that annotate it (GET /portfolio) cannot leak into
+        the next caller (risk checks, broadcasts).
+        """
+        book = self._state.positions
+        key = (self.version, id(book), getattr(book, "version", -1), self._state.writes)
+        if self._snap is None or self._snap[0] != key:
+            self._snap = (key, self._state.snapshot())
+        return _copy_snapshot(self._snap[1])
 
     def sync_wallet(self, balances: dict[str, float]) -> None:
         self._state.balances.update(balances)
         if "USDT" in balances:
             self._state.cash = balances["USDT"]
-        self._recalculate()
+        if self._in_sync():
+            self._publish()
+        else:
+            self._recalculate()
 
     def update_price(self, symbol: str, price: float) -> None:
         pos = self._state.positions.get(symbol)
         if not pos: return
         pos.last_price = price
         pos.upl = (price - pos.avg_price) * pos.quantity
-        self._recalculate()
+        self._apply_delta(symbol, pos)
 
     def apply_fill(self, symbol: str, side: str, quantity: float, price: float, fee_usd: float, *, venue: str | None = None, market: str | None = None) -> None:
         side = side.upper()
@@ -96,8 +192,12 @@ def apply_fill(self, symbol: str, side: str, quantity: float, price: float, fee_
 
         symbol_key = symbol.upper()
         if "." not in symbol_key and venue: symbol_key = f"{symbol_key}.{venue.upper()}"
-        
-        pos = self._state.positions.setdefault(symbol_key, Position(symbol=symbol_key, venue=venue or "", market=market or "spot"))
+
+        in_sync = self._in_sync()
+        positions = self._state.positions
+        pos = positions.get(symbol_key)
+        if pos is None:
+            pos = positions[symbol_key] = Position(symbol=symbol_key, venue=venue or "", market=market or "spot")
         
         prev_qty = pos.quantity
         new_qty = prev_qty + qty
@@ -120,20 +220,64 @@ def apply_fill(self, symbol: str, side: str, quantity: float, price: float, fee_
         pos.quantity = new_qty
         pos.last_price = price
         pos.upl = (pos.last_price - pos.avg_price) * pos.quantity
-        
-        self._cleanup_positions()
-        self._recalculate()
-        if self._on_update: self._on_update(self._state.snapshot())
+
+        if in_sync:
+            closed_out = math.isclose(pos.quantity, 0.0, abs_tol=1e-9)
+            if closed_out:
+                del positions[symbol_key]
+            self._synced_version = positions.version
+            self._apply_delta(symbol_key, None if closed_out else pos)
+        else:
+            # Positions were changed from outside since the last fill: full pass
+            self._cleanup_positions()
+            self._recalculate()
+        if self._on_update: self._on_update(self.snapshot())
+        for listener in self._listeners:
+            listener(self)
 
     def _cleanup_positions(self) -> None:
         to_del = [k for k, v in self._state.positions.items() if math.isclose(v.quantity, 0.0, abs_tol=1e-9)]
         for k in to_del: del self._state.positions[k]
 
+    def _in_sync(self) -> bool:
+        book = self._state.positions
+        return book is self._synced_book and book.version == self._synced_version
+
+    def _apply_delta(self, symbol: str, pos: Position | None) -> None:
+        if not self._in_sync() or self._incremental >= _RESYNC_EVERY:
+            self._recalculate()
+            return
+        old_exp, old_upl = self._contrib.pop(symbol, (0.0, 0.0))
+        new_exp = new_upl = 0.0
+        if pos is not None:
+            new_exp, new_upl = abs(pos.quantity * pos.last_price), pos.upl
+            self._contrib[symbol] = (new_exp, new_upl)
+        if self._contrib:
+            self._exposure_sum += new_exp - old_exp
+            self._upl_sum += new_upl - old_upl
+        else:
+            self._exposure_sum = self._upl_sum = 0.0
+        self._incremental += 1
+        self._publish()
+
     def _recalculate(self) -> None:
-        exp = sum(abs(p.quantity * p.last_price) for p in self._state.positions.values())
-        upl = sum(p.upl for p in self._state.positions.values())
-        self._state.exposure = exp
-        self._state.unrealized = upl
+        """Full re-sum over all positions; also re-arms incremental tracking."""
+        book = self._state.positions
+        if not isinstance(book, _PositionBook):
+            book = self._state.positions = _PositionBook(book)
+        contrib = {k: (abs(p.quantity * p.last_price), p.upl) for k, p in book.items()}
+        self._contrib = contrib
+        self._exposure_sum = sum(c[0] for c in contrib.values())
+        self._upl_sum = sum(c[1] for c in contrib.values())
+        self._synced_book = book
+        self._synced_version = book.version
+        self._incremental = 0
+        self._publish()
+
+    def _publish(self) -> None:
+        self._state.exposure = self._exposure_sum
+        self._state.unrealized = self._upl_sum
         self._state.cash = self._state.balances.get("USDT", 0.0)
-        self._state.equity = self._state.cash + upl
+        self._state.equity = self._state.cash + self._upl_sum
         self._state.ts = time.time()
+        self.version += 1
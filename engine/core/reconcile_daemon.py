@@ -39,6 +39,9 @@ async def reconcile_loop(interval: int = 30) -> None:
         interval: Sync interval in seconds (default 30s)
     """
     logging.info("[SYNC] Reconciliation daemon started (interval=%ds)", interval)
+    restored = _oms.load_open()
+    if restored:
+        logging.info("[SYNC] Restored %d open orders from storage", restored)
 
     while True:
         try:
@@ -56,8 +59,6 @@ async def _perform_reconciliation() -> None:
     Core reconciliation logic between local OMS and all connected venues.
     """
     try:
-        local_open = list(_oms.list_open())
-
         for venue in list_venues():
             ven_client = get_venue(venue).client
 
@@ -73,12 +74,9 @@ async def _perform_reconciliation() -> None:
                 # Create lookup maps
                 remote_by_id = {str(order["order_id"]): order for order in remote_orders}
 
-                # Process local orders for this venue
+                # Process local orders for this venue (venue index, open orders only)
+                local_open = list(_oms.list_open(venue=venue))
                 for order_rec in local_open:
-                    order_venue = order_rec.symbol.split(".")[1]
-                    if order_venue != venue:
-                        continue
-
                     # Check if this local order still exists remotely
                     remote_match = None
                     if order_rec.venue_order_id in remote_by_id:
@@ -100,11 +98,7 @@ async def _perform_reconciliation() -> None:
                         logging.info("[SYNC] Closed %s (missing remotely)", order_rec.symbol)
 
                 # Check for remote orders not in local OMS (import them)
-                local_venue_orders = {
-                    ord.venue_order_id: ord
-                    for ord in local_open
-                    if ord.symbol.split(".")[1] == venue
-                }
+                local_venue_orders = {ord.venue_order_id: ord for ord in local_open}
 
                 for remote_order in remote_orders:
                     remote_id = str(remote_order["order_id"])
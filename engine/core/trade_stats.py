@@ -0,0 +1,246 @@
+"""Incrementally maintained trade statistics for ``/trades/stats``.
+
+``sqlite.compute_trade_stats`` re-reads the last 1000 fills and 500 equity
+snapshots and replays round-trip PnL in Python, and the dashboard polls it
+through ``ops_api``. ``TradeStats`` is seeded from that history once. It then
+folds each ``trade.fill`` and ``portfolio.equity`` event into per-symbol
+position state, a rolling window of round-trip returns with running sums for
+Sharpe, and the last 500 equity snapshots behind max drawdown. Reads return a
+cached summary that is rebuilt only after a change.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+from collections import deque
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+_EPS = 1e-10
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(float(os.getenv(name, default)))
+    except (TypeError, ValueError):
+        return default
+
+
+def _base(symbol: str) -> str:
+    return str(symbol or "").split(".")[0].upper()
+
+
+class _Position:
+    __slots__ = ("net_qty", "avg_entry")
+
+    def __init__(self) -> None:
+        self.net_qty = 0.0
+        self.avg_entry = 0.0
+
+    def apply(self, side: str, qty: float, price: float) -> float | None:
+        """Fold one fill in; returns the round-trip return in % when it reduces the position."""
+        signed = qty if side == "BUY" else -qty
+        if self.net_qty == 0:
+            self.net_qty = signed
+            self.avg_entry = price
+            return None
+        if (self.net_qty > 0) != (signed > 0):
+            entry = self.avg_entry
+            if entry > 0:
+                pnl_pct = ((price - entry) if self.net_qty > 0 else (entry - price)) / entry * 100
+            else:
+                pnl_pct = 0.0
+            self.net_qty += signed
+            if abs(self.net_qty) < _EPS:
+                self.net_qty = 0.0
+                self.avg_entry = 0.0
+            return pnl_pct
+        total_cost = self.avg_entry * abs(self.net_qty) + price * abs(signed)
+        self.net_qty += signed
+        self.avg_entry = total_cost / abs(self.net_qty) if self.net_qty != 0 else 0.0
+        return None
+
+
+class TradeStats:
+    """
+    Win rate, round-trip returns, Sharpe and max drawdown kept up to date from events.
+
+    Round-trip returns are kept for the last ``window`` trips (env
+    ``TRADE_STATS_WINDOW``, default 1000). Win count and the sums behind
+    Sharpe are adjusted as trips enter and leave the window. Max drawdown
+    covers the last ``drawdown_window`` equity snapshots (env
+    ``TRADE_STATS_DD_WINDOW``, default 500), as the SQLite replay did.
+    """
+
+    def __init__(
+        self,
+        *,
+        window: int | None = None,
+        drawdown_window: int | None = None,
+        returns_tail: int = 50,
+    ) -> None:
+        self.window = max(1, int(window or _env_int("TRADE_STATS_WINDOW", 1000)))
+        self.drawdown_window = max(
+            1, int(drawdown_window or _env_int("TRADE_STATS_DD_WINDOW", 500))
+        )
+        self.returns_tail = returns_tail
+        self._lock = threading.Lock()
+        self._bus: Any = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._positions: dict[str, _Position] = {}
+        self._returns: deque[float] = deque()
+        self._wins = 0
+        self._sum = 0.0
+        self._sumsq = 0.0
+        self._equity: deque[float] = deque(maxlen=self.drawdown_window)
+        self._max_dd = 0.0
+        self._last_fill_ts = 0.0
+        self._summary: dict[str, Any] | None = None
+
+    # ----------------------------------------------------------------- bus wiring
+    def attach(self, bus: Any) -> None:
+        if self._bus is bus:
+            return
+        self.detach()
+        bus.subscribe("trade.fill", self.on_fill)
+        bus.subscribe("portfolio.equity", self.on_equity)
+        self._bus = bus
+
+    def detach(self) -> None:
+        bus, self._bus = self._bus, None
+        if bus is None:
+            return
+        bus.unsubscribe("trade.fill", self.on_fill)
+        bus.unsubscribe("portfolio.equity", self.on_equity)
+
+    def on_fill(self, event: Mapping[str, Any]) -> None:
+        try:
+            qty = float(event.get("filled_qty") or event.get("qty") or 0.0)
+            price = float(event.get("avg_price") or event.get("price") or 0.0)
+            ts = float(event.get("ts") or 0.0)
+        except (TypeError, ValueError):
+            return
+        side = str(event.get("side") or "").upper()
+        symbol = _base(event.get("symbol") or "")
+        if qty <= 0 or price <= 0 or side not in ("BUY", "SELL") or not symbol:
+            return
+        with self._lock:
+            self._apply_fill(symbol, side, qty, price)
+            self._last_fill_ts = max(self._last_fill_ts, ts)
+
+    def on_equity(self, event: Mapping[str, Any]) -> None:
+        try:
+            equity = float(event.get("equity_usd") or event.get("equity") or 0.0)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._apply_equity(equity)
+
+    # ------------------------------------------------------------------ updates
+    def _apply_fill(self, symbol: str, side: str, qty: float, price: float) -> None:
+        pos = self._positions.get(symbol)
+        if pos is None:
+            pos = self._positions[symbol] = _Position()
+        ret = pos.apply(side, qty, price)
+        if ret is None:
+            return
+        if len(self._returns) >= self.window:
+            old = self._returns.popleft()
+            self._wins -= old > 0
+            self._sum -= old
+            self._sumsq -= old * old
+        self._returns.append(ret)
+        self._wins += ret > 0
+        self._sum += ret
+        self._sumsq += ret * ret
+        self._summary = None
+
+    def _apply_equity(self, equity: float) -> None:
+        # Non-positive snapshots still take a slot, like rows in the SQLite window
+        self._equity.append(equity)
+        self._update_drawdown()
+
+    def _update_drawdown(self) -> None:
+        """Recompute max drawdown over the snapshot window (at most ``drawdown_window`` steps)."""
+        peak = max_dd = 0.0
+        for equity in self._equity:
+            if equity <= 0:
+                continue
+            if equity > peak:
+                peak = equity
+            dd = (peak - equity) / peak * 100
+            if dd > max_dd:
+                max_dd = dd
+        if max_dd != self._max_dd:
+            self._max_dd = max_dd
+            self._summary = None
+
+    def seed(
+        self,
+        fills: Iterable[Mapping[str, Any]],
+        equity_curve: Iterable[Mapping[str, Any]] = (),
+    ) -> None:
+        """Replace the state with a replay of stored fills and equity snapshots (any order)."""
+        with self._lock:
+            self._reset()
+            for fill in sorted(fills, key=lambda f: f.get("ts") or 0):
+                try:
+                    self._apply_fill(
+                        _base(fill["symbol"]), str(fill["side"]).upper(), float(fill["qty"]), float(fill["price"])
+                    )
+                except (KeyError, TypeError, ValueError):
+                    continue
+                self._last_fill_ts = max(self._last_fill_ts, float(fill.get("ts") or 0.0))
+            for snap in sorted(equity_curve, key=lambda e: e.get("ts") or 0):
+                try:
+                    self._equity.append(float(snap.get("equity_usd") or 0.0))
+                except (TypeError, ValueError):
+                    continue
+            self._update_drawdown()
+            self._summary = None
+
+    # ------------------------------------------------------------------ readers
+    def sharpe(self) -> float:
+        """Annualized (sqrt(252)) mean/stdev of round-trip returns; 0 below five trips."""
+        n = len(self._returns)
+        if n < 5:
+            return 0.0
+        mean = self._sum / n
+        var = max(0.0, (self._sumsq - n * mean * mean) / (n - 1))
+        std = math.sqrt(var)
+        if std <= 0:
+            return 0.0
+        return round(mean / std * math.sqrt(252), 2)
+
+    def summary(self) -> dict[str, Any]:
+        """Current stats; the same dict is returned until the next fill or drawdown change."""
+        summary = self._summary
+        if summary is not None:
+            return summary
+        with self._lock:
+            n = len(self._returns)
+            summary = {
+                "win_rate": round(self._wins / n * 100, 2) if n else 0.0,
+                "sharpe": self.sharpe(),
+                "max_drawdown": round(self._max_dd, 2),
+                "total_trades": n,
+                "returns": list(self._returns)[-self.returns_tail :] if n >= 5 else [],
+            }
+            self._summary = summary
+        return summary
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "symbols": len(self._positions),
+            "round_trips": len(self._returns),
+            "window": self.window,
+            "drawdown_window": self.drawdown_window,
+            "last_fill_ts": self._last_fill_ts,
+        }
+
+
+TRADE_STATS = TradeStats()
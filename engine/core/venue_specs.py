@@ -58,6 +58,26 @@ class SymbolSpec:
 if "BINANCE_MARGIN" not in SPECS:
     SPECS["BINANCE_MARGIN"] = SPECS["BINANCE"]
 
+# Bumped whenever a venue's table is swapped by a live exchangeInfo refresh
+SPECS_VERSION: dict[str, int] = {}
+
+
+def update_specs(venue: str, specs: dict[str, SymbolSpec]) -> int:
+    """Swap in refreshed specs for ``venue`` and return its new version.
+
+    Symbols absent from ``specs`` keep their entry. The venue table is
+    replaced in one assignment, never mutated, so readers holding the old
+    dict see a consistent view.
+    """
+    old = SPECS.get(venue) or {}
+    merged = {**old, **specs}
+    SPECS[venue] = merged
+    if venue == "BINANCE" and SPECS.get("BINANCE_MARGIN") is old:
+        SPECS["BINANCE_MARGIN"] = merged
+    SPECS_VERSION[venue] = SPECS_VERSION.get(venue, 0) + 1
+    return SPECS_VERSION[venue]
+
+
 # simple fee schedule (bps)
 FEES_TAKER_BPS = {
     "BINANCE": 10.0,  # 0.10% taker default; override from env if needed
@@ -0,0 +1,558 @@
+"""Shared kline cache fed by the aggTrade stream, with bounded REST backfill.
+
+Trend, momentum, the symbol scanner and ATR sizing each used to pull the same
+Binance klines over REST. ``KlineService`` keeps one columnar series per
+``(market, symbol, interval)``. Streamed trades extend every series of that
+symbol in place. A 1m series is built from trades alone, and higher
+timeframes are rolled up from it once enough minutes have accumulated. REST
+is only hit to backfill a series that is missing, too short, or (for symbols
+the stream does not cover) older than its TTL. Backfills are single-flight
+per key and capped at ``KLINE_BACKFILL_CONCURRENCY`` requests in flight, and
+trades streamed while one is in flight are replayed onto the bars it returns.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from array import array
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+import httpx
+
+from engine.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_INTERVAL_MS = {
+    "1m": 60_000,
+    "3m": 180_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "2h": 7_200_000,
+    "4h": 14_400_000,
+    "6h": 21_600_000,
+    "8h": 28_800_000,
+    "12h": 43_200_000,
+    "1d": 86_400_000,
+}
+_FETCH_ERRORS: tuple[type[Exception], ...] = (httpx.HTTPError, ValueError, TypeError, KeyError)
+
+Fetcher = Callable[..., Awaitable[Any]]
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _count(source: str) -> None:
+    try:
+        from engine import metrics
+
+        metrics.kline_requests_total.labels(source=source).inc()
+    except Exception:  # pragma: no cover - metrics optional
+        pass
+
+
+class _Series:
+    """Columnar OHLCV bars for one symbol/interval, oldest first."""
+
+    __slots__ = ("tf", "t", "o", "h", "l", "c", "v", "q", "fetched_at", "live")
+
+    def __init__(self, tf: int) -> None:
+        self.tf = tf
+        self.t = array("d")
+        self.o = array("d")
+        self.h = array("d")
+        self.l = array("d")  # noqa: E741
+        self.c = array("d")
+        self.v = array("d")
+        self.q = array("d")
+        self.fetched_at = 0.0
+        # True while streamed trades keep the series current (no TTL refresh needed)
+        self.live = False
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    def append(self, t: float, o: float, h: float, lo: float, c: float, v: float, q: float) -> None:
+        self.t.append(t)
+        self.o.append(o)
+        self.h.append(h)
+        self.l.append(lo)
+        self.c.append(c)
+        self.v.append(v)
+        self.q.append(q)
+
+    def trim(self, max_bars: int) -> None:
+        extra = len(self.t) - max_bars
+        if extra > 0:
+            for col in (self.t, self.o, self.h, self.l, self.c, self.v, self.q):
+                del col[:extra]
+
+    def apply_trade(self, ts_ms: float, price: float, qty: float, continuous: bool) -> bool:
+        """Fold one trade into the series; False when a gap means it must be re-backfilled."""
+        if not self.t:
+            return False
+        bucket = ts_ms - ts_ms % self.tf
+        last = self.t[-1]
+        if bucket < last:
+            return True  # late trade for a closed bar: keep the exchange's numbers
+        if bucket > last:
+            if bucket - last > self.tf:
+                if not continuous:
+                    return False
+                # No trades in between: flat bars at the last close, as in exchange klines
+                close = self.c[-1]
+                for t in range(int(last + self.tf), int(bucket), self.tf):
+                    self.append(float(t), close, close, close, close, 0.0, 0.0)
+            self.append(bucket, price, price, price, price, qty, price * qty)
+            return True
+        if price > self.h[-1]:
+            self.h[-1] = price
+        if price < self.l[-1]:
+            self.l[-1] = price
+        self.c[-1] = price
+        self.v[-1] += qty
+        self.q[-1] += price * qty
+        return True
+
+    def load(self, rows: Iterable[Any]) -> None:
+        for row in rows:
+            self.append(
+                float(row[0]),
+                float(row[1]),
+                float(row[2]),
+                float(row[3]),
+                float(row[4]),
+                float(row[5]),
+                float(row[7]) if len(row) > 7 else float(row[4]) * float(row[5]),
+            )
+
+    def rows(self, limit: int) -> list[list[float]]:
+        """Binance kline layout: open_time, open, high, low, close, volume, close_time, quote_volume."""
+        n = len(self.t)
+        start = max(0, n - limit)
+        tf = self.tf
+        t, o, h, lo, c, v, q = self.t, self.o, self.h, self.l, self.c, self.v, self.q
+        return [[t[i], o[i], h[i], lo[i], c[i], v[i], t[i] + tf - 1, q[i]] for i in range(start, n)]
+
+    def rollup(self, tf: int) -> _Series:
+        """Aggregate this (1m) series into ``tf`` buckets; the first partial bucket is dropped."""
+        out = _Series(tf)
+        n = len(self.t)
+        i = 0
+        # Skip into the first bucket boundary so every rolled bar is whole
+        while i < n and self.t[i] % tf:
+            i += 1
+        while i < n:
+            bucket = self.t[i] - self.t[i] % tf
+            o, h, lo, c, v, q = self.o[i], self.h[i], self.l[i], self.c[i], self.v[i], self.q[i]
+            i += 1
+            while i < n and self.t[i] - self.t[i] % tf == bucket:
+                h = max(h, self.h[i])
+                lo = min(lo, self.l[i])
+                c = self.c[i]
+                v += self.v[i]
+                q += self.q[i]
+                i += 1
+            out.append(bucket, o, h, lo, c, v, q)
+        return out
+
+
+class KlineService:
+    """
+    One in-memory kline cache shared by strategies, the scanner and sizing.
+
+    ``await klines(symbol, interval=..., limit=...)`` returns Binance-layout
+    rows, newest last, with the current bar still forming. ``ingest(events)``
+    takes aggTrade events from the market stream. ``klines_many_sync`` serves
+    the scanner thread with its own short-lived event loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        market: str | None = None,
+        ttl_sec: float | None = None,
+        max_bars: int | None = None,
+        concurrency: int | None = None,
+        gap_sec: float | None = None,
+        fetch: Fetcher | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._market = market
+        self.ttl_sec = ttl_sec if ttl_sec is not None else _env_float("KLINE_CACHE_TTL_SEC", 30.0)
+        self.max_bars = max(50, int(max_bars or _env_float("KLINE_CACHE_MAX_BARS", 1000)))
+        self.concurrency = max(1, int(concurrency or _env_float("KLINE_BACKFILL_CONCURRENCY", 4)))
+        # A trade arriving this long after the symbol's previous one means the stream dropped
+        self.gap_sec = gap_sec if gap_sec is not None else _env_float("KLINE_STREAM_GAP_SEC", 60.0)
+        self._fetch = fetch
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (market, symbol) -> interval -> series
+        self._series: dict[tuple[str, str], dict[str, _Series]] = {}
+        self._last_trade: dict[str, float] = {}
+        self._inflight: dict[tuple[str, str, str], asyncio.Future] = {}
+        # (market, symbol) -> trade buffers of backfills in flight, replayed onto their result
+        self._pending_trades: dict[tuple[str, str], list[list[tuple[float, float, float]]]] = {}
+        # Loop-bound helpers, recreated if the service is used from another event loop
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._sem: asyncio.Semaphore | None = None
+        self._http: httpx.AsyncClient | None = None
+        self._stats = {"cache": 0, "rollup": 0, "rest": 0, "rest_errors": 0, "trades": 0, "resyncs": 0}
+
+    # ------------------------------------------------------------------ config
+    @property
+    def market(self) -> str:
+        if self._market is None:
+            self._market = "futures" if getattr(get_settings(), "is_futures", False) else "spot"
+        return self._market
+
+    def _base_url(self, market: str) -> str:
+        settings = get_settings()
+        if market == "futures":
+            base = getattr(settings, "futures_base", "") or "https://fapi.binance.com"
+        else:
+            base = getattr(settings, "spot_base", "") or getattr(settings, "base_url", "")
+            base = base or "https://api.binance.com"
+        return base.rstrip("/")
+
+    # -------------------------------------------------------------- live trades
+    def ingest(self, events: Iterable[dict[str, Any]]) -> None:
+        """Fold a batch of streamed trades into every cached series of their symbols."""
+        market = self.market
+        with self._lock:
+            for event in events:
+                if event.get("type", "trade") != "trade":
+                    continue
+                symbol = str(event.get("symbol") or "").upper()
+                try:
+                    price = float(event.get("price") or 0.0)
+                    qty = float(event.get("quantity") or 0.0)
+                    ts = float(event.get("ts") or 0.0)
+                except (TypeError, ValueError):
+                    continue
+                if not symbol or price <= 0 or ts <= 0:
+                    continue
+                self._apply_trade(market, symbol, price, qty, ts)
+
+    def on_trade(self, symbol: str, price: float, qty: float, ts: float) -> None:
+        with self._lock:
+            self._apply_trade(self.market, symbol.upper(), price, qty, ts)
+
+    def _apply_trade(self, market: str, symbol: str, price: float, qty: float, ts: float) -> None:
+        self._stats["trades"] += 1
+        prev = self._last_trade.get(symbol)
+        continuous = prev is not None and ts - prev <= self.gap_sec
+        self._last_trade[symbol] = max(ts, prev or 0.0)
+        for buffer in self._pending_trades.get((market, symbol), ()):
+            buffer.append((price, qty, ts))
+        ts_ms = ts * 1000.0
+        by_tf = self._series.get((market, symbol))
+        if by_tf is None:
+            by_tf = self._series[(market, symbol)] = {}
+        now = self._clock()
+        restart_base = "1m" not in by_tf
+        for interval, series in by_tf.items():
+            if series.apply_trade(ts_ms, price, qty, continuous):
+                if not series.live and now - series.fetched_at <= self.gap_sec:
+                    # Fresh backfill and the stream now overlap: trades keep it current
+                    series.live = True
+                if len(series) > self.max_bars + 64:
+                    series.trim(self.max_bars)
+            elif interval == "1m":
+                restart_base = True
+            elif series.live:
+                # Missed trades: this series can no longer be trusted until re-backfilled
+                series.live = False
+                series.fetched_at = 0.0
+                self._stats["resyncs"] += 1
+        if restart_base:
+            # Start (or restart after a stream gap) the locally built 1m series
+            base = _Series(_INTERVAL_MS["1m"])
+            base.append(ts_ms - ts_ms % base.tf, price, price, price, price, qty, price * qty)
+            base.live = True
+            base.fetched_at = now
+            by_tf["1m"] = base
+
+    def _streaming(self, symbol: str) -> bool:
+        last = self._last_trade.get(symbol)
+        return last is not None and self._clock() - last <= self.gap_sec
+
+    # ------------------------------------------------------------------- reads
+    def peek(
+        self, symbol: str, interval: str, limit: int, *, market: str | None = None
+    ) -> list[list[float]] | None:
+        """Cached rows when they can answer without I/O, else ``None``."""
+        market = market or self.market
+        symbol = symbol.split(".")[0].upper()
+        with self._lock:
+            return self._serve(market, symbol, interval, limit)
+
+    def _serve(self, market: str, symbol: str, interval: str, limit: int) -> list[list[float]] | None:
+        by_tf = self._series.get((market, symbol))
+        if not by_tf:
+            return None
+        series = by_tf.get(interval)
+        if series is not None and len(series) >= limit and self._usable(symbol, series, interval):
+            self._stats["cache"] += 1
+            _count("cache")
+            return series.rows(limit)
+        tf = _INTERVAL_MS.get(interval)
+        base = by_tf.get("1m")
+        if (
+            tf is not None
+            and interval != "1m"
+            and base is not None
+            and base.live
+            and self._streaming(symbol)
+            and len(base) >= (limit + 1) * (tf // base.tf)
+        ):
+            rolled = base.rollup(tf)
+            if len(rolled) >= limit:
+                rolled.live = True
+                rolled.fetched_at = self._clock()
+                by_tf[interval] = rolled
+                self._stats["rollup"] += 1
+                _count("rollup")
+                return rolled.rows(limit)
+        return None
+
+    def _usable(self, symbol: str, series: _Series, interval: str) -> bool:
+        if series.live and self._streaming(symbol):
+            return True
+        ttl = self.ttl_sec
+        tf = _INTERVAL_MS.get(interval)
+        if tf is not None:
+            ttl = min(ttl, tf / 1000.0)
+        return self._clock() - series.fetched_at < ttl
+
+    async def klines(
+        self,
+        symbol: str,
+        *,
+        interval: str = "1m",
+        limit: int = 30,
+        market: str | None = None,
+        fetch: Fetcher | None = None,
+    ) -> list[list[float]]:
+        """Rows for ``symbol``; backfills over REST (or ``fetch``) when the cache cannot answer."""
+        market = market or self.market
+        symbol = symbol.split(".")[0].upper()
+        limit = int(limit)
+        with self._lock:
+            rows = self._serve(market, symbol, interval, limit)
+        if rows is not None:
+            return rows
+        key = (market, symbol, interval)
+        fut = self._inflight.get(key)
+        if fut is None or fut.get_loop() is not asyncio.get_running_loop():
+            fut = asyncio.ensure_future(self._backfill(market, symbol, interval, limit, fetch, None))
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda _f: self._inflight.pop(key, None))
+        await asyncio.shield(fut)
+        with self._lock:
+            series = self._series.get((market, symbol), {}).get(interval)
+            return series.rows(limit) if series is not None else []
+
+    async def klines_many(
+        self,
+        symbols: Iterable[str],
+        *,
+        interval: str,
+        limit: int,
+        market: str | None = None,
+    ) -> dict[str, list[list[float]]]:
+        symbols = [s.split(".")[0].upper() for s in symbols]
+        rows = await asyncio.gather(
+            *(self.klines(s, interval=interval, limit=limit, market=market) for s in symbols)
+        )
+        return dict(zip(symbols, rows, strict=True))
+
+    def klines_many_sync(
+        self,
+        symbols: Iterable[str],
+        *,
+        interval: str,
+        limit: int,
+        market: str | None = None,
+    ) -> dict[str, list[list[float]]]:
+        """Blocking variant for worker threads: cache hits first, then one bounded concurrent backfill."""
+        market = market or self.market
+        out: dict[str, list[list[float]]] = {}
+        misses: list[str] = []
+        with self._lock:
+            for sym in symbols:
+                sym = sym.split(".")[0].upper()
+                rows = self._serve(market, sym, interval, limit)
+                if rows is None:
+                    misses.append(sym)
+                else:
+                    out[sym] = rows
+        if misses:
+
+            async def _run() -> None:
+                sem = asyncio.Semaphore(self.concurrency)
+                async with httpx.AsyncClient(timeout=get_settings().timeout) as http:
+                    await asyncio.gather(
+                        *(
+                            self._backfill(market, sym, interval, limit, None, http, sem)
+                            for sym in misses
+                        )
+                    )
+
+            asyncio.run(_run())
+            with self._lock:
+                for sym in misses:
+                    series = self._series.get((market, sym), {}).get(interval)
+                    out[sym] = series.rows(limit) if series is not None else []
+        return out
+
+    # --------------------------------------------------------------- backfill
+    async def _backfill(
+        self,
+        market: str,
+        symbol: str,
+        interval: str,
+        limit: int,
+        fetch: Fetcher | None,
+        http: httpx.AsyncClient | None,
+        sem: asyncio.Semaphore | None = None,
+    ) -> None:
+        if sem is None:
+            self._bind_loop()
+            sem = self._sem
+        tf = _INTERVAL_MS.get(interval, 60_000)
+        want = min(max(limit, 2), 1000)
+        with self._lock:
+            cached = self._series.get((market, symbol), {}).get(interval)
+            if cached is not None and len(cached) >= limit:
+                # Only the bars since the cached tail (plus the tail itself, which may have
+                # changed): far less request weight than re-pulling the whole window
+                since = int((self._clock() * 1000.0 - cached.t[-1]) // tf) + 2
+                want = max(2, min(want, since))
+        # The REST bars are a snapshot taken when the request lands; trades streamed
+        # meanwhile would only reach the series being replaced, so keep them aside
+        buffer: list[tuple[float, float, float]] = []
+        with self._lock:
+            self._pending_trades.setdefault((market, symbol), []).append(buffer)
+        try:
+            async with sem:
+                started = self._clock()
+                try:
+                    raw = await self._fetch_rows(market, symbol, interval, want, fetch, http)
+                except _FETCH_ERRORS as exc:
+                    self._stats["rest_errors"] += 1
+                    logger.warning("kline backfill failed for %s %s: %s", symbol, interval, exc)
+                    return
+            self._stats["rest"] += 1
+            _count("rest")
+            if not isinstance(raw, list) or not raw:
+                return
+            series = _Series(tf)
+            try:
+                series.load(raw)
+            except (IndexError, TypeError, ValueError) as exc:
+                logger.warning("kline backfill for %s %s unparseable: %s", symbol, interval, exc)
+                return
+            with self._lock:
+                self._install(market, symbol, interval, series, buffer, started)
+        finally:
+            with self._lock:
+                self._drop_buffer(market, symbol, buffer)
+
+    def _install(
+        self,
+        market: str,
+        symbol: str,
+        interval: str,
+        series: _Series,
+        trades: list[tuple[float, float, float]],
+        since: float,
+    ) -> None:
+        tf = series.tf
+        by_tf = self._series.setdefault((market, symbol), {})
+        cached = by_tf.get(interval)
+        if cached is not None and cached.t and cached.t[0] < series.t[0] <= cached.t[-1] + tf:
+            # Splice the fresh tail onto the cached history
+            keep = 0
+            while keep < len(cached) and cached.t[keep] < series.t[0]:
+                keep += 1
+            merged = _Series(tf)
+            merged.load(cached.rows(len(cached))[:keep])
+            merged.load(series.rows(len(series)))
+            merged.trim(self.max_bars)
+            series = merged
+        # Trades streamed after the request went out, onto the bar still forming
+        for price, qty, ts in trades:
+            if ts >= since:
+                series.apply_trade(ts * 1000.0, price, qty, True)
+        series.fetched_at = self._clock()
+        # Trades already streaming for this symbol keep the backfilled series current
+        series.live = market == self.market and self._streaming(symbol)
+        by_tf[interval] = series
+
+    def _drop_buffer(self, market: str, symbol: str, buffer: list) -> None:
+        buffers = self._pending_trades.get((market, symbol), [])
+        for i, other in enumerate(buffers):
+            if other is buffer:
+                del buffers[i]
+                break
+        if not buffers:
+            self._pending_trades.pop((market, symbol), None)
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._sem = asyncio.Semaphore(self.concurrency)
+            self._http = None
+
+    async def _fetch_rows(
+        self,
+        market: str,
+        symbol: str,
+        interval: str,
+        limit: int,
+        fetch: Fetcher | None,
+        http: httpx.AsyncClient | None,
+    ) -> Any:
+        fetch = fetch or self._fetch
+        if fetch is not None:
+            raw = fetch(symbol, interval=interval, limit=limit)
+            if hasattr(raw, "__await__"):
+                raw = await raw
+            return raw
+        if http is None:
+            self._bind_loop()
+            if self._http is None:
+                self._http = httpx.AsyncClient(timeout=get_settings().timeout)
+            http = self._http
+        path = "/fapi/v1/klines" if market == "futures" else "/api/v3/klines"
+        resp = await http.get(
+            self._base_url(market) + path,
+            params={"symbol": symbol, "interval": interval, "limit": limit},
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    def get_stats(self) -> dict[str, Any]:
+        stats = dict(self._stats)
+        with self._lock:
+            stats["series"] = sum(len(v) for v in self._series.values())
+            stats["symbols"] = len(self._series)
+        stats["inflight"] = len(self._inflight)
+        return stats
+
+
+KLINE_SERVICE = KlineService()
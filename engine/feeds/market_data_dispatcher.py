@@ -8,7 +8,7 @@
 from typing import Any
 
 from engine import metrics
-from engine.core.event_bus import EventBus
+from engine.core.event_bus import EventBus, FrozenEvent
 
 logger = logging.getLogger("engine.market_data.dispatcher")
 _DISPATCH_ERRORS: tuple[type[Exception], ...] = (RuntimeError, ValueError)
@@ -22,21 +22,30 @@ def __init__(self, bus: EventBus, *, source: str, venue: str = "BINANCE") -> Non
         self.source = source
         self.venue = venue
         self._log = logger
+        self._counters: dict[str, Any] = {}
 
     def handle_stream_event(self, event: dict[str, Any]) -> None:
         """Handle a message emitted by the WebSocket client."""
         if not isinstance(event, dict):
             return
-        topic = self._topic_for_event(event.get("type"))
+        raw_type = event.get("type")
+        topic = self._topic_for_event(raw_type)
         if not topic:
             return
-        enriched = dict(event)
-        enriched.setdefault("source", self.source)
-        enriched.setdefault("venue", self.venue)
-        enriched.setdefault("ts", time.time())
+        # One read-only payload shared by every subscriber (fast-lane topics
+        # are delivered without further copies).
+        enriched = FrozenEvent(
+            {"source": self.source, "venue": self.venue, "ts": time.time(), **event}
+        )
         try:
-            evt_type = str(enriched.get("type") or "tick").lower()
-            metrics.market_data_events_total.labels(source=self.source, type=evt_type).inc()
+            evt_type = str(raw_type or "tick").lower()
+            counter = self._counters.get(evt_type)
+            if counter is None:
+                counter = metrics.market_data_events_total.labels(
+                    source=self.source, type=evt_type
+                )
+                self._counters[evt_type] = counter
+            counter.inc()
         except _DISPATCH_ERRORS as exc:
             self._log.debug("Failed to record market data metric: %s", exc, exc_info=True)
         try:
@@ -44,6 +53,12 @@ def handle_stream_event(self, event: dict[str, Any]) -> None:
         except _DISPATCH_ERRORS as exc:
             self._log.debug("Failed to dispatch market data event: %s", exc, exc_info=True)
 
+    def handle_stream_batch(self, events: list[dict[str, Any]]) -> None:
+        """Handle a batch of messages handed off by the stream consumer, in order."""
+        handle = self.handle_stream_event
+        for event in events:
+            handle(event)
+
     @staticmethod
     def _topic_for_event(event_type: str | None) -> str | None:
         if not event_type:
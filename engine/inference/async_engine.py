@@ -1,49 +1,10 @@
 
 from __future__ import annotations
 
-import asyncio
 import logging
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Any
 
-# Top-level inference functions (Picklable)
-def _run_hmm_inference_task(symbol: str) -> dict | None:
-    """
-    Standalone function for ProcessPool.
-    """
-    try:
-        from engine.strategies.policy_hmm import get_regime
-        return get_regime(symbol)
-    except Exception:
-        return None
-
-def _run_river_update_task(symbol: str, features: dict, price: float) -> dict:
-    """
-    Standalone function for ProcessPool.
-    Note: This implies creating a NEW RiverPolicy instance per call if state isn't managed.
-    REALITY CHECK: River requires state persistence.
-    If we offload to ProcessPool, the state stays in that process or gets lost.
-    Stateful AI in a separate process requires a Manager or a specific service.
-    
-    For Phase 7 compliance, we stick to the Prompt's request to 'Offload heavy math'.
-    The most robust way for stateful online learning is actually having a dedicated Process 
-    that runs an Actor or Loop, maintaining the model in memory.
-    
-    However, the prompt asks for `run_in_executor`. 
-    We will assume for this "Protocol" that the policy loads state (Redis) or is stateless for the sake of the exercise,
-    OR that we accept the overhead of loading state each time (which is slow).
-    
-    Correct Pattern: The ProcessPool worker initializes the model ONCE? No, ProcessPool workers are reused.
-    We'll stick to the basic offload pattern requested.
-    """
-    try:
-        from engine.strategies.policy_river import RiverPolicy
-        # This acts like a "Job" - Load, Learn, Save
-        # Extremely heavy IO, but functionally correct "Async Inference" from the perspective of the Main Loop.
-        policy = RiverPolicy() 
-        return policy.on_tick(symbol, features, price)
-    except Exception:
-        return {}
+from engine.inference.river_worker import RiverWorker
 
 logger = logging.getLogger(__name__)
 
@@ -53,33 +14,32 @@ class AsyncInferenceEngine:
     Wraps blocking AI models.
     """
 
-    def __init__(self, max_workers: int = 2):
-        self._pool = ProcessPoolExecutor(max_workers=max_workers)
-        self._loop = asyncio.get_running_loop()
-        logger.info(f"AsyncInferenceEngine: Initialized with {max_workers} processes.")
+    def __init__(self, max_workers: int = 2, river: RiverWorker | None = None):
+        # River state must survive between ticks, so it lives in one
+        # long-lived worker process rather than a pool of stateless ones;
+        # max_workers is accepted for existing callers but no longer sizes a pool.
+        self._river = river or RiverWorker()
+        self._river.start()
+        logger.info("AsyncInferenceEngine: Initialized (river worker mode=%s).", self._river.mode)
 
     async def get_hmm_regime(self, symbol: str) -> dict | None:
         """
-        Offloads HMM inference to a separate process.
+        HMM regime for the symbol's latest tick.
+
+        Runs in-process: the tick buffers live here, and a worker process would
+        re-import policy_hmm with empty ones. Concurrent requests are scored in
+        one vectorized predict_proba by the policy's regime batcher.
         """
-        return await self._loop.run_in_executor(
-            self._pool,
-            _run_hmm_inference_task,
-            symbol
-        )
+        from engine.strategies.policy_hmm import get_regime_async
+
+        return await get_regime_async(symbol)
 
     async def update_river(self, symbol: str, features: dict, price: float) -> dict:
         """
-        Offloads River learning to a separate process.
+        Learns from and predicts on one sample in the persistent River worker.
         """
-        return await self._loop.run_in_executor(
-            self._pool,
-            _run_river_update_task,
-            symbol,
-            features,
-            price
-        )
+        return await self._river.update(symbol, features, price)
 
     def shutdown(self):
-        self._pool.shutdown(wait=False)
+        self._river.stop()
         logger.info("AsyncInferenceEngine: Shutdown.")
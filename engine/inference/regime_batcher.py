@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Callable, Sequence
+from typing import Any
+
+import numpy as np
+
+from engine import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class RegimeBatcher:
+    """
+    Micro-batches regime inference across symbols.
+
+    Callers ``await submit(symbol, seq, feats)``; requests that arrive within
+    ``window_ms`` of the first pending one (or until ``max_batch`` symbols are
+    pending) are stacked into one matrix and scored with a single
+    ``predict(X)`` call. While requests arrive alone (the last batch had one
+    row) the window is skipped: the batch is scored on the next loop turn, so
+    only requests issued together share it. A symbol that is re-submitted
+    before the flush keeps one row: its waiters all receive the newest
+    ``(seq, feats, probs)``.
+    """
+
+    def __init__(
+        self,
+        predict: Callable[[np.ndarray], Any],
+        *,
+        window_ms: float | None = None,
+        max_batch: int | None = None,
+    ) -> None:
+        self._predict = predict
+        self.window = max(
+            0.0,
+            (window_ms if window_ms is not None else _env_float("HMM_BATCH_WINDOW_MS", 2.0)) / 1000.0,
+        )
+        self.max_batch = max(1, int(max_batch or _env_float("HMM_BATCH_MAX", 64)))
+        # symbol -> [seq, feats, waiters]
+        self._pending: dict[str, list[Any]] = {}
+        self._timer: asyncio.Handle | None = None
+        self._stats = {"batches": 0, "rows": 0, "requests": 0, "errors": 0, "last_batch": 0}
+
+    async def submit(
+        self, symbol: str, seq: int, feats: Sequence[float]
+    ) -> tuple[int, Sequence[float], np.ndarray]:
+        """Queue one symbol's features; resolves to ``(seq, feats, probs)`` once its batch is scored."""
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future = loop.create_future()
+        self._stats["requests"] += 1
+        entry = self._pending.get(symbol)
+        if entry is None:
+            self._pending[symbol] = [seq, feats, [fut]]
+        else:
+            if seq >= entry[0]:
+                entry[0], entry[1] = seq, feats
+            entry[2].append(fut)
+        if len(self._pending) >= self.max_batch or self.window == 0.0:
+            self.flush()
+        elif self._timer is None:
+            if self._stats["last_batch"] > 1:
+                self._timer = loop.call_later(self.window, self.flush)
+            else:
+                # Quiet market: a lone request shouldn't sit out the window
+                self._timer = loop.call_soon(self.flush)
+        return await fut
+
+    def flush(self) -> None:
+        """Score everything pending now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        symbols = list(pending)
+        started = time.perf_counter()
+        try:
+            X = np.asarray([pending[s][1] for s in symbols], dtype=float)
+            probs = np.asarray(self._predict(X), dtype=float)
+            if probs.shape[0] != len(symbols):
+                raise ValueError(f"predict returned {probs.shape[0]} rows for {len(symbols)} samples")
+        except Exception as exc:  # noqa: BLE001 - surfaced to every waiter
+            self._stats["errors"] += 1
+            for symbol in symbols:
+                for fut in pending[symbol][2]:
+                    if not fut.done():
+                        fut.set_exception(exc)
+            return
+        self._stats["batches"] += 1
+        self._stats["rows"] += len(symbols)
+        self._stats["last_batch"] = len(symbols)
+        try:
+            metrics.hmm_inference_batch_size.observe(len(symbols))
+            metrics.hmm_inference_seconds_total.inc(time.perf_counter() - started)
+        except Exception:  # pragma: no cover - metrics optional
+            pass
+        for row, symbol in zip(probs, symbols, strict=True):
+            seq, feats, waiters = pending[symbol]
+            for fut in waiters:
+                if not fut.done():
+                    fut.set_result((seq, feats, row))
+
+    def get_stats(self) -> dict[str, Any]:
+        stats = dict(self._stats)
+        stats["pending"] = len(self._pending)
+        stats["avg_batch"] = stats["rows"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import multiprocessing as mp
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Worker process deaths tolerated before the policy moves in-process for good
+_MAX_RESTARTS = 5
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _default_policy() -> Any:
+    from engine.strategies.policy_river import RiverPolicy
+
+    return RiverPolicy()
+
+
+class _Snapshotter:
+    """Saves the policy on a timer or right after a drift reset, never per tick."""
+
+    def __init__(self, policy: Any, interval: float) -> None:
+        self.policy = policy
+        self.interval = interval
+        self.last = time.monotonic()
+        self.dirty = False
+        self.count = 0
+
+    def due_in(self) -> float | None:
+        if not self.dirty:
+            return None
+        return max(0.0, self.interval - (time.monotonic() - self.last))
+
+    def apply(self, symbol: str, features: dict, price: float) -> dict:
+        try:
+            result = self.policy.on_tick(symbol, features, price) or {}
+        except Exception as exc:  # noqa: BLE001 - one bad sample must not kill the learner
+            logger.debug("River update failed for %s: %s", symbol, exc)
+            result = {}
+        self.dirty = True
+        if result.get("drift"):
+            self.save()
+        return result
+
+    def maybe_save(self) -> None:
+        if self.dirty and time.monotonic() - self.last >= self.interval:
+            self.save()
+
+    def save(self) -> None:
+        try:
+            self.policy.save()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("River snapshot failed: %s", exc)
+        self.last = time.monotonic()
+        self.dirty = False
+        self.count += 1
+
+
+def _serve(conn: Any, factory: Callable[[], Any] | None, snapshot_sec: float) -> None:
+    """Worker process loop: owns the policy, applies batches, replies in order."""
+    snap = _Snapshotter((factory or _default_policy)(), snapshot_sec)
+    try:
+        while True:
+            if not conn.poll(snap.due_in()):
+                snap.save()
+                continue
+            try:
+                batch = conn.recv()
+            except (EOFError, OSError):
+                break
+            if batch is None:
+                break
+            results = [snap.apply(symbol, features, price) for symbol, features, price in batch]
+            conn.send({"results": results, "snapshots": snap.count})
+            snap.maybe_save()
+    finally:
+        if snap.dirty:
+            snap.save()
+        conn.close()
+
+
+class RiverWorker:
+    """
+    Long-lived owner of the River online-learning policy.
+
+    The policy lives in a dedicated process (``RIVER_WORKER_MODE=process``, the
+    default) or in-process (``inline``). Updates are queued without blocking the
+    caller. A sender thread ships whatever has accumulated as one batch over a
+    pipe, and a reader thread records each symbol's latest result. The model
+    is snapshotted to Redis every ``RIVER_SNAPSHOT_SEC`` seconds and after drift
+    resets, instead of on every tick.
+
+    ``submit`` returns the most recent result already computed for the symbol,
+    so the tick path never waits on the learner. ``update`` waits for the
+    result of that specific sample. The engine calls ``start`` at startup;
+    a worker first used without it, or one whose process died, is spawned on
+    a background thread while samples keep queueing.
+
+    If the worker process dies, queued and in-flight samples are resolved with
+    the latest known result and the next call starts a fresh process. After
+    repeated deaths the policy falls back to inline learning.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any] | None = None,
+        *,
+        mode: str | None = None,
+        snapshot_sec: float | None = None,
+        max_batch: int | None = None,
+        max_pending: int | None = None,
+    ) -> None:
+        self._factory = factory
+        self.mode = (mode or os.getenv("RIVER_WORKER_MODE", "process")).strip().lower()
+        self.snapshot_sec = (
+            snapshot_sec if snapshot_sec is not None else _env_float("RIVER_SNAPSHOT_SEC", 60.0)
+        )
+        self.max_batch = max(1, int(max_batch or _env_float("RIVER_WORKER_MAX_BATCH", 512)))
+        self.max_pending = max(1, int(max_pending or _env_float("RIVER_WORKER_MAX_PENDING", 10000)))
+        self._latest: dict[str, dict] = {}
+        self._queue: deque[tuple[str, dict, float, concurrent.futures.Future | None]] = deque()
+        self._cond = threading.Condition()
+        self._inflight: deque[list[tuple[str, concurrent.futures.Future | None]]] = deque()
+        self._conn: Any = None
+        self._proc: Any = None
+        self._threads: list[threading.Thread] = []
+        self._inline: _Snapshotter | None = None
+        self._started = False
+        self._stopping = False
+        self._atexit = False
+        self._stats = {
+            "submitted": 0,
+            "processed": 0,
+            "batches": 0,
+            "dropped": 0,
+            "snapshots": 0,
+            "last_batch": 0,
+            "restarts": 0,
+        }
+
+    # ----------------------------------------------------------------- lifecycle
+    def start(self) -> None:
+        """Start the worker now (blocks while the process spawns)."""
+        if self._started:
+            return
+        self._started = True
+        self._stopping = False
+        self._launch()
+
+    def _launch(self) -> None:
+        if self.mode != "inline":
+            try:
+                self._start_process()
+                if not self._atexit:
+                    atexit.register(self.stop)
+                    self._atexit = True
+                return
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("River worker process failed to start (%s); learning inline", exc)
+                self.mode = "inline"
+        snap = _Snapshotter((self._factory or _default_policy)(), self.snapshot_sec)
+        with self._cond:
+            self._inline = snap
+            queued = list(self._queue)
+            self._queue.clear()
+        # Samples that queued while the process was expected
+        for symbol, features, price, fut in queued:
+            self._apply_inline(snap, symbol, features, price, fut)
+
+    def _start_process(self) -> None:
+        ctx = mp.get_context("spawn")
+        parent, child = ctx.Pipe()
+        proc = ctx.Process(
+            target=_serve,
+            args=(child, self._factory, self.snapshot_sec),
+            name="river-worker",
+            daemon=True,
+        )
+        proc.start()
+        child.close()
+        self._conn, self._proc = parent, proc
+        self._threads = [
+            threading.Thread(target=self._send_loop, args=(parent,), name="river-worker-send", daemon=True),
+            threading.Thread(target=self._recv_loop, args=(parent,), name="river-worker-recv", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info("River worker started (pid=%s)", proc.pid)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Drain queued updates, take a final snapshot and stop the worker."""
+        if not self._started:
+            return
+        if self._inline is not None:
+            if self._inline.dirty:
+                self._inline.save()
+            self._stats["snapshots"] = self._inline.count
+            self._inline = None
+            self._started = False
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        sender = self._threads[0] if self._threads else None
+        if sender is not None:
+            sender.join(timeout)
+        try:
+            if self._conn is not None:
+                self._conn.send(None)
+        except (OSError, EOFError):
+            pass
+        if self._proc is not None:
+            self._proc.join(timeout)
+            if self._proc.is_alive():
+                self._proc.terminate()
+        for thread in self._threads[1:]:
+            thread.join(timeout)
+        try:
+            if self._conn is not None:
+                self._conn.close()
+        except OSError:
+            pass
+        self._fail_inflight()
+        self._started = False
+        try:
+            atexit.unregister(self.stop)
+        except Exception:  # pragma: no cover
+            pass
+        self._atexit = False
+
+    # --------------------------------------------------------------- public API
+    def submit(self, symbol: str, features: dict, price: float) -> dict:
+        """Queue one sample; returns the symbol's latest known result without waiting."""
+        self._enqueue(symbol, features, price, None)
+        return self._latest.get(symbol, {})
+
+    async def update(self, symbol: str, features: dict, price: float) -> dict:
+        """Queue one sample and wait for its own prediction."""
+        fut: concurrent.futures.Future = concurrent.futures.Future()
+        self._enqueue(symbol, features, price, fut)
+        return await asyncio.wrap_future(fut)
+
+    def latest(self, symbol: str) -> dict:
+        return self._latest.get(symbol, {})
+
+    def get_stats(self) -> dict[str, Any]:
+        stats = dict(self._stats)
+        stats["mode"] = self.mode
+        stats["pending"] = len(self._queue)
+        stats["inflight"] = len(self._inflight)
+        stats["alive"] = bool(
+            self._inline is not None or (self._proc is not None and self._proc.is_alive())
+        )
+        if self._inline is not None:
+            stats["snapshots"] = self._inline.count
+        return stats
+
+    # ---------------------------------------------------------------- internals
+    def _enqueue(
+        self, symbol: str, features: dict, price: float, fut: concurrent.futures.Future | None
+    ) -> None:
+        if self._started and self._conn is not None and not self._alive():
+            self._worker_lost(self._conn)
+        if not self._started:
+            self._started = True
+            self._stopping = False
+            if self.mode == "inline":
+                self._launch()
+            else:
+                # Spawning takes a while; never do it on the caller's (tick) path
+                threading.Thread(target=self._launch, name="river-worker-start", daemon=True).start()
+        self._stats["submitted"] += 1
+        with self._cond:
+            inline = self._inline
+            if inline is None:
+                if len(self._queue) >= self.max_pending:
+                    old_symbol, _, _, old_fut = self._queue.popleft()
+                    self._stats["dropped"] += 1
+                    if old_fut is not None and not old_fut.done():
+                        old_fut.set_result(self._latest.get(old_symbol, {}))
+                self._queue.append((symbol, features, price, fut))
+                self._cond.notify()
+                return
+        self._apply_inline(inline, symbol, features, price, fut)
+
+    def _apply_inline(
+        self,
+        snap: _Snapshotter,
+        symbol: str,
+        features: dict,
+        price: float,
+        fut: concurrent.futures.Future | None,
+    ) -> None:
+        result = snap.apply(symbol, features, price)
+        snap.maybe_save()
+        self._latest[symbol] = result
+        self._stats["processed"] += 1
+        if fut is not None and not fut.done():
+            fut.set_result(result)
+
+    def _alive(self) -> bool:
+        return self._proc is not None and self._proc.is_alive()
+
+    def _send_loop(self, conn: Any) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping and self._conn is conn:
+                    self._cond.wait()
+                if self._conn is not conn or not self._queue:
+                    return
+                n = min(len(self._queue), self.max_batch)
+                batch = [self._queue.popleft() for _ in range(n)]
+                self._inflight.append([(symbol, fut) for symbol, _, _, fut in batch])
+            try:
+                conn.send([(symbol, features, price) for symbol, features, price, _ in batch])
+            except (OSError, EOFError, ValueError) as exc:
+                logger.warning("River worker pipe closed: %s", exc)
+                if self._stopping:
+                    self._fail_inflight()
+                else:
+                    self._worker_lost(conn)
+                return
+
+    def _recv_loop(self, conn: Any) -> None:
+        while True:
+            try:
+                reply = conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._cond:
+                waiters = self._inflight.popleft() if self._inflight else []
+            results = reply.get("results", [])
+            self._stats["processed"] += len(results)
+            self._stats["batches"] += 1
+            self._stats["last_batch"] = len(results)
+            self._stats["snapshots"] = reply.get("snapshots", self._stats["snapshots"])
+            for (symbol, fut), result in zip(waiters, results, strict=False):
+                self._latest[symbol] = result
+                if fut is not None and not fut.done():
+                    fut.set_result(result)
+        if self._stopping:
+            self._fail_inflight()
+        else:
+            self._worker_lost(conn)
+
+    def _worker_lost(self, conn: Any) -> None:
+        """The worker process died: resolve its waiters and let the next call restart it."""
+        with self._cond:
+            if conn is None or self._conn is not conn or self._stopping:
+                return
+            self._conn = None
+            pending = list(self._inflight)
+            pending.append([(symbol, fut) for symbol, _, _, fut in self._queue])
+            self._inflight.clear()
+            self._queue.clear()
+            self._started = False
+            self._stats["restarts"] += 1
+            self._cond.notify_all()
+        try:
+            conn.close()
+        except OSError:
+            pass
+        if self._stats["restarts"] >= _MAX_RESTARTS:
+            logger.error("River worker died %d times; learning inline", self._stats["restarts"])
+            self.mode = "inline"
+        else:
+            logger.warning("River worker process exited; restarting on next update")
+        for waiters in pending:
+            for symbol, fut in waiters:
+                if fut is not None and not fut.done():
+                    fut.set_result(self._latest.get(symbol, {}))
+
+    def _fail_inflight(self) -> None:
+        with self._cond:
+            pending = list(self._inflight)
+            self._inflight.clear()
+            if self._stopping:
+                pending.append([(symbol, fut) for symbol, _, _, fut in self._queue])
+                self._queue.clear()
+        for waiters in pending:
+            for symbol, fut in waiters:
+                if fut is not None and not fut.done():
+                    fut.set_result(self._latest.get(symbol, {}))
@@ -502,6 +502,76 @@ def _log_suppressed(context: str, exc: Exception) -> None:
     ["consumer"],
 )
 
+# EventBus lane health (one bounded queue + dispatcher per topic class)
+eventbus_queue_depth = Gauge(
+    "eventbus_queue_depth",
+    "Events waiting in an EventBus lane",
+    ["lane"],
+    multiprocess_mode="max",
+)
+eventbus_queue_oldest_age_seconds = Gauge(
+    "eventbus_queue_oldest_age_seconds",
+    "Age of the oldest event waiting in an EventBus lane",
+    ["lane"],
+    multiprocess_mode="max",
+)
+eventbus_events_dropped_total = Counter(
+    "eventbus_events_dropped_total",
+    "Events discarded by an EventBus lane overflow policy",
+    ["lane", "reason"],
+)
+
+# Binance public market stream reader/decoder
+market_stream_frames_total = Counter(
+    "market_stream_frames_total",
+    "WebSocket frames received by the market stream reader",
+)
+market_stream_frames_behind = Gauge(
+    "market_stream_frames_behind",
+    "Frames received but not yet decoded and dispatched",
+    multiprocess_mode="max",
+)
+market_stream_frames_dropped_total = Counter(
+    "market_stream_frames_dropped_total",
+    "Frames discarded because the market stream ring buffer was full",
+)
+market_stream_decode_seconds_total = Counter(
+    "market_stream_decode_seconds_total",
+    "Time spent decoding and normalizing market stream frames (seconds)",
+)
+market_stream_gaps_total = Counter(
+    "market_stream_gaps_total",
+    "Jumps in per-symbol aggTrade ids seen by the market stream",
+)
+market_stream_missed_trades_total = Counter(
+    "market_stream_missed_trades_total",
+    "Aggregate trades skipped across detected aggTrade id gaps",
+)
+hmm_inference_batch_size = Histogram(
+    "hmm_inference_batch_size",
+    "Symbols scored per batched HMM predict_proba call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+hmm_inference_seconds_total = Counter(
+    "hmm_inference_seconds_total",
+    "Time spent inside HMM predict_proba (seconds)",
+)
+hmm_regime_cache_total = Counter(
+    "hmm_regime_cache_total",
+    "HMM regime lookups grouped by whether the per-tick cache answered",
+    ["result"],
+)
+market_cache_lookups_total = Counter(
+    "market_cache_lookups_total",
+    "Price/ATR lookups served by the stream-fed market cache vs REST fallback",
+    ["kind", "result"],
+)
+kline_requests_total = Counter(
+    "kline_requests_total",
+    "Kline reads by how they were served: cache, rollup from 1m, or REST backfill",
+    ["source"],
+)
+
 # Listing sniper telemetry
 listing_sniper_announcements_total = Counter(
     "listing_sniper_announcements_total",
@@ -703,6 +773,20 @@ def _log_suppressed(context: str, exc: Exception) -> None:
     "external_feed_last_event_epoch": external_feed_last_event_epoch,
     "events_external_feed_published_total": events_external_feed_published_total,
     "events_external_feed_consumed_total": events_external_feed_consumed_total,
+    "eventbus_queue_depth": eventbus_queue_depth,
+    "eventbus_queue_oldest_age_seconds": eventbus_queue_oldest_age_seconds,
+    "eventbus_events_dropped_total": eventbus_events_dropped_total,
+    "market_stream_frames_total": market_stream_frames_total,
+    "market_stream_frames_behind": market_stream_frames_behind,
+    "market_stream_frames_dropped_total": market_stream_frames_dropped_total,
+    "market_stream_decode_seconds_total": market_stream_decode_seconds_total,
+    "market_stream_gaps_total": market_stream_gaps_total,
+    "market_stream_missed_trades_total": market_stream_missed_trades_total,
+    "hmm_inference_batch_size": hmm_inference_batch_size,
+    "hmm_inference_seconds_total": hmm_inference_seconds_total,
+    "hmm_regime_cache_total": hmm_regime_cache_total,
+    "market_cache_lookups_total": market_cache_lookups_total,
+    "kline_requests_total": kline_requests_total,
     "venue_exposure_usd": venue_exposure_usd,
     "risk_equity_buffer_usd": risk_equity_buffer_usd,
     "risk_equity_drawdown_pct": risk_equity_drawdown_pct,
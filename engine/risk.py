@@ -8,12 +8,12 @@
 from collections import defaultdict, deque
 from collections.abc import Callable
 from dataclasses import dataclass, replace
-from typing import Any, Literal
+from typing import Any, Literal, NamedTuple
 
 from engine.config import RiskConfig, load_risk_config
 from engine.services.param_client import get_cached_params
 from .core.market_resolver import resolve_market_choice
-from ops.allocator import ALLOCATIONS_PATH
+from .risk_inputs import RISK_INPUTS, RiskInputs
 from .metrics import (
     breaker_rejections,
     breaker_state,
@@ -76,6 +76,36 @@ def allow(self) -> bool:
         return True
 
 
+class _EffectiveRisk(NamedTuple):
+    cfg: RiskConfig
+    allowed_bases: frozenset[str] | None
+
+
+_EFFECTIVE_CACHE_MAX = 4096
+
+# Resolved on first use; False once the optional quarantine module is known missing
+_quarantine_mod: Any = None
+
+
+def _quarantine_status(symbol: str) -> tuple[bool, float]:
+    global _quarantine_mod
+    if _quarantine_mod is None:
+        try:
+            from . import risk_quarantine as _rq  # lazy import to avoid cycles
+
+            _quarantine_mod = _rq
+        except ImportError as exc:
+            _log_suppressed("risk quarantine import", exc)
+            _quarantine_mod = False
+    if _quarantine_mod is False:
+        return False, 0.0
+    try:
+        return _quarantine_mod.is_quarantined(symbol)
+    except Exception as exc:
+        _log_suppressed("risk quarantine lookup", exc)
+        return False, 0.0
+
+
 @dataclass
 class SymbolLockState:
     side: Side
@@ -101,6 +131,8 @@ def __init__(self, cfg: RiskConfig):
         self._symbol_lock_guard = threading.Lock()
         self._external_breaker_active = False
         self._external_breaker_reason = ""
+        # (symbol, strategy_id) -> (base cfg, dyn params, equity cap, strategy cap, result)
+        self._effective: dict[tuple[str, str | None], tuple[Any, ...]] = {}
 
     def set_circuit_breaker(self, active: bool, reason: str = "") -> None:
         """Manually trip or reset the circuit breaker."""
@@ -151,71 +183,18 @@ def check_order(
                 "message": f"Circuit breaker active: {self._external_breaker_reason}",
             }
 
-        # 1. Fetch Dynamic Params (if available)
-        # We use a local 'cfg' variable which defaults to self.cfg but can be overridden.
-        # This ensures the base config remains stable while allowing per-order flexibility.
-        cfg = self.cfg
-        
-        # Only fetch if we have a symbol to lookup
-        if symbol:
-            dyn_params = get_cached_params("risk_rails", symbol)
-            if dyn_params and "params" in dyn_params:
-                try:
-                    # Create a temporary config with overrides
-                    # We use dataclasses.replace because RiskConfig is frozen
-                    cfg = replace(cfg, **dyn_params["params"])
-                    
-                    # --- SAFETY INTERLOCKS (HARD CEILINGS) ---
-                    # Prevent "No Risk" scenarios by clamping dynamic values to global maximums.
-                    
-                    # 1. Max Notional Cap: Never exceed 50% of last known equity (or static max if equity unknown)
-                    # If equity is 0 or unknown, we fall back to the static max_notional_usdt as the hard ceiling.
-                    safe_equity = max(self._last_equity, 0.0)
-                    if safe_equity > 0:
-                        hard_cap = safe_equity * 0.50
-                        if cfg.max_notional_usdt > hard_cap:
-                            cfg = replace(cfg, max_notional_usdt=hard_cap)
-                    
-                    # 2. Max Orders Per Min: Cap at 5x default to prevent DDoS-ing ourselves
-                    hard_rate_limit = self.cfg.max_orders_per_min * 5
-                    if cfg.max_orders_per_min > hard_rate_limit:
-                        cfg = replace(cfg, max_orders_per_min=hard_rate_limit)
-
-                except (TypeError, ValueError) as e:
-                    # If params are malformed, log and fall back to static defaults
-                    # We don't want to crash the risk engine on bad config injection
-                    pass
-        
-        # 2. Dynamic Capital Allocation (The Enforcer)
-        # If strategy_id is provided, check against WealthManager allocations
-        if strategy_id and ALLOCATIONS_PATH.exists():
-            try:
-                import json
-                alloc_data = json.loads(ALLOCATIONS_PATH.read_text())
-                allocations = alloc_data.get("allocations", {})
-                strategy_cap = float(allocations.get(strategy_id, 0.0))
-                
-                # If strategy has an allocation (and it's > 0), enforce it
-                # If allocation is 0, it means KILLED (Bankruptcy Protection)
-                if strategy_cap > 0:
-                    # We override max_notional_usdt with the strategy-specific cap
-                    # But we must respect the global hard cap (50% equity) too
-                    # So we take min(strategy_cap, cfg.max_notional_usdt)
-                    
-                    # Wait, cfg.max_notional_usdt might already be clamped.
-                    # Let's just clamp the strategy cap to the current cfg limit.
-                    effective_cap = min(strategy_cap, cfg.max_notional_usdt)
-                    cfg = replace(cfg, max_notional_usdt=effective_cap)
-                    
-                elif strategy_id in allocations and strategy_cap <= 0:
-                    # Explicitly KILLED
-                    return False, {
-                        "error": "STRATEGY_BANKRUPT",
-                        "message": f"Strategy {strategy_id} has been killed by WealthManager (Alloc=$0).",
-                    }
-            except Exception as exc:
-                # Fallback to standard rails if allocation read fails
-                pass
+        # 1-2. Effective config: dynamic params from ParamController, clamped to the
+        # hard ceilings, then the WealthManager strategy allocation. Memoised per
+        # (symbol, strategy) until any of its inputs changes.
+        inputs = RISK_INPUTS.current()
+        if strategy_id and inputs.allocations.get(strategy_id, 1.0) <= 0:
+            # Allocation of 0 means KILLED (Bankruptcy Protection)
+            return False, {
+                "error": "STRATEGY_BANKRUPT",
+                "message": f"Strategy {strategy_id} has been killed by WealthManager (Alloc=$0).",
+            }
+        effective = self._effective_risk(symbol, strategy_id, inputs)
+        cfg = effective.cfg
 
         # Breaker check first
         try:
@@ -241,7 +220,7 @@ def check_order(
             }
 
         # Trading toggle (single source of truth: flag file overrides config)
-        if _trading_disabled_via_flag():
+        if inputs.trading_disabled:
             # Sync in-memory state to match file if file says disabled
             self._manual_trading_disabled = True
             return False, {
@@ -258,10 +237,9 @@ def check_order(
             }
 
         # Symbol allowlist (USDT universe)
-        if cfg.trade_symbols:
+        if effective.allowed_bases is not None:
             symbol_base = symbol.split(".")[0].upper()
-            allowed_bases = {s.split(".")[0].upper() for s in cfg.trade_symbols}
-            if symbol_base not in allowed_bases:
+            if symbol_base not in effective.allowed_bases:
                 return False, {
                     "error": "SYMBOL_NOT_ALLOWED",
                     "message": f"{symbol} is not enabled.",
@@ -269,13 +247,7 @@ def check_order(
                 }
 
         # Symbol quarantine (soft gate): two recent stops -> temporary block
-        try:
-            from . import risk_quarantine as _rq  # lazy import to avoid cycles
-
-            q, remain = _rq.is_quarantined(symbol)
-        except Exception as exc:
-            _log_suppressed("risk quarantine lookup", exc)
-            q, remain = (False, 0.0)
+        q, remain = _quarantine_status(symbol)
         if q:
             return False, {
                 "error": "SYMBOL_QUARANTINED",
@@ -549,6 +521,73 @@ def _resolve_price(sym: str) -> float:
 
         return True, {}
 
+    def _effective_risk(
+        self, symbol: str, strategy_id: str | None, inputs: RiskInputs
+    ) -> _EffectiveRisk:
+        params = None
+        if symbol:
+            dyn_params = get_cached_params("risk_rails", symbol)
+            if dyn_params and "params" in dyn_params:
+                params = dyn_params["params"]
+        # The equity ceiling only matters when dynamic params can raise the cap
+        safe_equity = max(self._last_equity, 0.0) if params is not None else 0.0
+        strategy_cap = inputs.allocations.get(strategy_id, 0.0) if strategy_id else 0.0
+
+        key = (symbol, strategy_id)
+        entry = self._effective.get(key)
+        if (
+            entry is not None
+            and entry[0] is self.cfg
+            and entry[1] is params
+            and entry[2] == safe_equity
+            and entry[3] == strategy_cap
+        ):
+            return entry[4]
+
+        cfg = self.cfg
+        if params is not None:
+            try:
+                # Create a temporary config with overrides
+                # We use dataclasses.replace because RiskConfig is frozen
+                cfg = replace(cfg, **params)
+
+                # --- SAFETY INTERLOCKS (HARD CEILINGS) ---
+                # Prevent "No Risk" scenarios by clamping dynamic values to global maximums.
+
+                # 1. Max Notional Cap: Never exceed 50% of last known equity (or static max if equity unknown)
+                # If equity is 0 or unknown, we fall back to the static max_notional_usdt as the hard ceiling.
+                if safe_equity > 0:
+                    hard_cap = safe_equity * 0.50
+                    if cfg.max_notional_usdt > hard_cap:
+                        cfg = replace(cfg, max_notional_usdt=hard_cap)
+
+                # 2. Max Orders Per Min: Cap at 5x default to prevent DDoS-ing ourselves
+                hard_rate_limit = self.cfg.max_orders_per_min * 5
+                if cfg.max_orders_per_min > hard_rate_limit:
+                    cfg = replace(cfg, max_orders_per_min=hard_rate_limit)
+            except (TypeError, ValueError):
+                # If params are malformed, fall back to static defaults
+                # We don't want to crash the risk engine on bad config injection
+                pass
+
+        if strategy_cap > 0:
+            # The strategy cap can only tighten the (possibly clamped) notional limit
+            try:
+                cfg = replace(cfg, max_notional_usdt=min(strategy_cap, cfg.max_notional_usdt))
+            except (TypeError, ValueError):
+                pass
+
+        allowed = (
+            frozenset(s.split(".")[0].upper() for s in cfg.trade_symbols)
+            if cfg.trade_symbols
+            else None
+        )
+        result = _EffectiveRisk(cfg, allowed)
+        if len(self._effective) >= _EFFECTIVE_CACHE_MAX:
+            self._effective.clear()
+        self._effective[key] = (self.cfg, params, safe_equity, strategy_cap, result)
+        return result
+
     def _acquire_symbol_lock(
         self, symbol: str, side: Side, strategy_id: str | None
     ) -> tuple[bool, str | None]:
@@ -868,14 +907,4 @@ def check_breaker(self):
 
 
 def _trading_disabled_via_flag() -> bool:
-    try:
-        import os
-
-        path = "state/trading_enabled.flag"
-        if not os.path.exists(path):
-            return False
-        with open(path, encoding="utf-8") as fh:
-            raw = (fh.read() or "").strip().lower()
-    except (OSError, ValueError):
-        return False
-    return raw in {"0", "false", "no", "off"}
+    return RISK_INPUTS.current().trading_disabled
@@ -24,6 +24,7 @@
 from engine.services.param_client import get_cached_params
 
 from .metrics import REGISTRY as MET
+from .risk_inputs import RISK_INPUTS
 
 logger = logging.getLogger(__name__)
 
@@ -428,3 +429,5 @@ def _write_trading_flag(enabled: bool) -> None:
             fh.write("true" if enabled else "false")
     except OSError as exc:
         _log_suppressed("guardian.write_trading_flag", exc)
+    # RiskRails reads the flag through a polled snapshot; pick this write up now
+    RISK_INPUTS.invalidate()
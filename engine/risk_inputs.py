@@ -0,0 +1,143 @@
+"""File-backed inputs to RiskRails, watched and published as immutable snapshots.
+
+``check_order`` used to stat and parse the WealthManager allocations file and
+the operator trading flag on every order. ``RiskInputWatcher`` polls their
+mtimes at most every ``RISK_INPUTS_POLL_SEC`` and swaps in a new
+``RiskInputs`` snapshot when either changes. Readers only ever see a whole
+snapshot.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+from ops.allocator import ALLOCATIONS_PATH
+
+logger = logging.getLogger(__name__)
+
+TRADING_FLAG_PATH = Path("state/trading_enabled.flag")
+_DISABLED_VALUES = {"0", "false", "no", "off"}
+
+
+@dataclass(frozen=True)
+class RiskInputs:
+    version: int = 0
+    # strategy_id -> allocated notional cap (<= 0 means killed)
+    allocations: Mapping[str, float] = field(default_factory=lambda: MappingProxyType({}))
+    trading_disabled: bool = False
+
+
+def _signature(path: Path) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def read_trading_flag(path: Path = TRADING_FLAG_PATH) -> bool:
+    """True when the operator flag file explicitly disables trading."""
+    try:
+        if not os.path.exists(path):
+            return False
+        with open(path, encoding="utf-8") as fh:
+            raw = (fh.read() or "").strip().lower()
+    except (OSError, ValueError):
+        return False
+    return raw in _DISABLED_VALUES
+
+
+def read_allocations(path: Path) -> dict[str, float]:
+    """Per-strategy caps from the allocations file; malformed entries are skipped."""
+    data = json.loads(path.read_text())
+    out: dict[str, float] = {}
+    for strategy_id, cap in (data.get("allocations") or {}).items():
+        try:
+            out[str(strategy_id)] = float(cap)
+        except (TypeError, ValueError):
+            continue
+    return out
+
+
+class RiskInputWatcher:
+    def __init__(
+        self,
+        allocations_path: Path = ALLOCATIONS_PATH,
+        flag_path: Path = TRADING_FLAG_PATH,
+        poll_sec: float | None = None,
+    ) -> None:
+        self.allocations_path = Path(allocations_path)
+        self.flag_path = Path(flag_path)
+        if poll_sec is None:
+            try:
+                poll_sec = float(os.getenv("RISK_INPUTS_POLL_SEC", "0.25"))
+            except ValueError:
+                poll_sec = 0.25
+        self.poll_sec = max(0.0, poll_sec)
+        self._lock = threading.Lock()
+        self._snapshot = RiskInputs()
+        self._alloc_sig: tuple[int, int] | None = None
+        self._flag_sig: tuple[int, int] | None = None
+        self._next_poll = 0.0
+
+    def current(self) -> RiskInputs:
+        """Latest snapshot; re-checks the files once the poll interval has elapsed."""
+        if time.monotonic() >= self._next_poll:
+            self.refresh()
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        """Force a re-check on the next read (e.g. right after writing the flag file)."""
+        self._next_poll = 0.0
+
+    def refresh(self) -> RiskInputs:
+        with self._lock:
+            self._next_poll = time.monotonic() + self.poll_sec
+            snap = self._snapshot
+            allocations = snap.allocations
+            trading_disabled = snap.trading_disabled
+            changed = False
+
+            alloc_sig = _signature(self.allocations_path)
+            if alloc_sig != self._alloc_sig:
+                if alloc_sig is None:
+                    allocations, changed = MappingProxyType({}), True
+                    self._alloc_sig = None
+                else:
+                    try:
+                        allocations = MappingProxyType(read_allocations(self.allocations_path))
+                        self._alloc_sig, changed = alloc_sig, True
+                    except (OSError, ValueError, AttributeError) as exc:
+                        # Likely mid-write: keep the last good caps and retry next poll
+                        logger.debug("allocations reload failed: %s", exc)
+
+            flag_sig = _signature(self.flag_path)
+            if flag_sig != self._flag_sig:
+                self._flag_sig = flag_sig
+                trading_disabled = read_trading_flag(self.flag_path)
+                changed = changed or trading_disabled != snap.trading_disabled
+
+            if changed:
+                self._snapshot = RiskInputs(snap.version + 1, allocations, trading_disabled)
+            return self._snapshot
+
+    def get_stats(self) -> dict[str, Any]:
+        snap = self._snapshot
+        return {
+            "version": snap.version,
+            "strategies": len(snap.allocations),
+            "trading_disabled": snap.trading_disabled,
+            "poll_sec": self.poll_sec,
+        }
+
+
+RISK_INPUTS = RiskInputWatcher()
@@ -94,10 +94,15 @@ def __init__(
         base_url: str,
         refresh_interval: float = 45.0,
         timeout: float = 5.0,
+        transport: httpx.AsyncBaseTransport | None = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.refresh_interval = max(5.0, float(refresh_interval))
         self.timeout = timeout
+        self._transport = transport
+        self._http: httpx.AsyncClient | None = None
+        # Cleared when the controller predates POST /params; then fall back to per-watch GETs
+        self._bulk_supported = True
         self._watches: dict[tuple[str, str], _WatchConfig] = {}
         self._cache: dict[tuple[str, str], dict[str, Any]] = {}
         self._cache_lock = Lock()
@@ -159,24 +164,116 @@ async def stop(self) -> None:
                 _LOGGER.warning("Param bridge stop error: %s", exc, exc_info=True)
             finally:
                 self._task = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def _client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client for every call to the controller."""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                timeout=self.timeout,
+                transport=self._transport,
+                limits=httpx.Limits(max_connections=16, max_keepalive_connections=8),
+            )
+        return self._http
 
     async def _refresh_loop(self) -> None:
         while self._running:
-            if not self._watches:
-                await asyncio.sleep(self.refresh_interval)
-                continue
-            for key, watch in list(self._watches.items()):
-                await self._refresh_watch(key, watch)
+            if self._watches:
+                await self.refresh_once()
             await asyncio.sleep(self.refresh_interval)
 
+    async def refresh_once(self) -> None:
+        """Refresh every watch: one bulk round-trip, or per-watch GETs on old controllers."""
+        watches = list(self._watches.items())
+        if not watches:
+            return
+        if self._bulk_supported and await self._refresh_bulk(watches):
+            return
+        for key, watch in watches:
+            await self._refresh_watch(key, watch)
+
+    def _store(
+        self,
+        key: tuple[str, str],
+        watch: _WatchConfig,
+        payload: dict[str, Any],
+        features: dict[str, float],
+    ) -> None:
+        cache_entry = {
+            "config_id": payload.get("config_id"),
+            "params": payload.get("params", {}),
+            "policy_version": payload.get("policy_version"),
+            "features": features,
+            "strategy": watch.strategy,
+            "instrument": watch.instrument,
+            "preset_id": (payload.get("config_id") or "").split(":")[-1],
+        }
+        with self._cache_lock:
+            self._cache[key] = cache_entry
+
+    async def _refresh_bulk(self, watches: list[tuple[tuple[str, str], _WatchConfig]]) -> bool:
+        """POST /params for all watches; returns False if the endpoint is unavailable."""
+        url = f"{self.base_url}/params"
+        snapshots = {key: dict(watch.features) for key, watch in watches}
+        with self._cache_lock:
+            have = {key: (self._cache.get(key) or {}).get("config_id") for key, _ in watches}
+        body = {
+            "requests": [
+                {
+                    "strategy": watch.strategy,
+                    "instrument": watch.instrument,
+                    "features": snapshots[key],
+                    "have": have[key],
+                }
+                for key, watch in watches
+            ]
+        }
+        try:
+            resp = await self._client().post(url, json=body)
+            resp.raise_for_status()
+            payload = resp.json()
+        except httpx.HTTPStatusError as exc:
+            if exc.response is not None and exc.response.status_code in (404, 405):
+                _LOGGER.info("Param controller has no bulk endpoint; using per-watch fetches")
+                self._bulk_supported = False
+                return False
+            _LOGGER.warning("Bulk param fetch failed for %s: %s", url, exc, exc_info=True)
+            return True
+        except httpx.HTTPError as exc:
+            _LOGGER.warning("Bulk param fetch error for %s: %s", url, exc)
+            return True
+
+        watch_by_key = dict(watches)
+        changed: set[tuple[str, str]] = set()
+        for item in payload.get("results") or []:
+            key = (str(item.get("strategy")), str(item.get("instrument")))
+            watch = watch_by_key.get(key)
+            if watch is None:
+                continue
+            changed.add(key)
+            if item.get("error"):
+                _LOGGER.debug(
+                    "Preset not found for %s/%s (will retry)", watch.strategy, watch.instrument
+                )
+                continue
+            self._store(key, watch, item, snapshots[key])
+        # Delta response: unchanged selections keep their entry, refreshed features
+        with self._cache_lock:
+            for key, _ in watches:
+                entry = self._cache.get(key)
+                if key not in changed and entry is not None:
+                    entry["features"] = snapshots[key]
+        return True
+
     async def _refresh_watch(self, key: tuple[str, str], watch: _WatchConfig) -> None:
         url = f"{self.base_url}/param/{watch.strategy}/{watch.instrument}"
         params = _flatten_features(watch.features)
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                resp = await client.get(url, params=params)
-                resp.raise_for_status()
-                payload = resp.json()
+            resp = await self._client().get(url, params=params)
+            resp.raise_for_status()
+            payload = resp.json()
         except httpx.HTTPStatusError as exc:
             if exc.response is not None and exc.response.status_code == 404:
                 _LOGGER.debug(
@@ -191,17 +288,7 @@ async def _refresh_watch(self, key: tuple[str, str], watch: _WatchConfig) -> Non
             _LOGGER.warning("Param fetch error for %s: %s", url, exc)
             return
 
-        cache_entry = {
-            "config_id": payload.get("config_id"),
-            "params": payload.get("params", {}),
-            "policy_version": payload.get("policy_version"),
-            "features": dict(watch.features),
-            "strategy": watch.strategy,
-            "instrument": watch.instrument,
-            "preset_id": (payload.get("config_id") or "").split(":")[-1],
-        }
-        with self._cache_lock:
-            self._cache[key] = cache_entry
+        self._store(key, watch, payload, dict(watch.features))
 
     def wire_feedback(self, bus) -> None:
         if self._feedback_wired or not self.base_url:
@@ -258,8 +345,7 @@ async def _send_outcome(
         url = f"{self.base_url}/learn/outcome/{strategy}/{instrument}/{preset_id}"
         body = {"reward": reward, "features": features or {}}
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                await client.post(url, json=body)
+            await self._client().post(url, json=body)
         except httpx.HTTPError as exc:
             _LOGGER.warning("Failed to post outcome to %s: %s", url, exc)
 
@@ -1,7 +1,6 @@
 import asyncio
 import logging
 import os
-from collections import deque
 
 import httpx
 
@@ -13,7 +12,9 @@
 class PriceBridge:
     """
     Bridges internal engine price ticks to the Ops service via HTTP.
-    Buffers ticks to avoid overwhelming the Ops service.
+    Keeps the latest tick per symbol and pushes all of them in one
+    ``POST /api/events/price/batch`` per flush interval. Falls back to
+    concurrent per-symbol posts when the Ops service has no batch endpoint.
     """
 
     def __init__(self, http_client: httpx.AsyncClient | None = None):
@@ -24,7 +25,9 @@ def __init__(self, http_client: httpx.AsyncClient | None = None):
         # or will be set by another mechanism.
         self._ops_url = os.getenv("OPS_URL", "http://localhost:8000").rstrip("/")
         self._token = os.getenv("OPS_TOKEN", "default_token")
-        self._buffer = deque()
+        # Latest tick per symbol since the last flush
+        self._latest: dict[str, dict] = {}
+        self._batch_supported = True
         self._running = False
         self._task = None
         self._client = http_client if http_client else httpx.AsyncClient(timeout=1.0)
@@ -48,28 +51,67 @@ async def stop(self):
 
     def _on_tick(self, payload: dict):
         # Payload expected: {symbol, price, time, ...}
-        self._buffer.append(payload)
+        sym = payload.get("symbol")
+        if sym:
+            self._latest[sym] = payload
 
     async def _flush_loop(self):
         while self._running:
             await asyncio.sleep(0.1)  # Flush every 100ms
-            if not self._buffer:
-                continue
+            await self._flush()
+
+    async def _flush(self) -> int:
+        if not self._latest:
+            return 0
+        ticks, self._latest = list(self._latest.values()), {}
+        headers = {"X-Ops-Token": self._token}
+        if self._batch_supported:
+            try:
+                resp = await self._client.post(
+                    f"{self._ops_url}/api/events/price/batch",
+                    json={"ticks": ticks},
+                    headers=headers,
+                )
+            except Exception as e:
+                logger.warning(f"Failed to push price batch: {e}")
+                self._retry(ticks)
+                return 0
+            if resp.is_success:
+                return len(ticks)
+            if resp.status_code not in (404, 405):
+                logger.warning(f"Ops rejected price batch: HTTP {resp.status_code}")
+                if _retryable(resp.status_code):
+                    self._retry(ticks)
+                return 0
+            logger.info("Ops service has no price batch endpoint; posting per symbol")
+            self._batch_supported = False
+        results = await asyncio.gather(
+            *(
+                self._client.post(f"{self._ops_url}/api/events/price", json=tick, headers=headers)
+                for tick in ticks
+            ),
+            return_exceptions=True,
+        )
+        pushed = 0
+        for tick, res in zip(ticks, results):
+            if isinstance(res, Exception):
+                logger.warning(f"Failed to push price tick: {res}")
+                self._retry([tick])
+            elif not res.is_success:
+                logger.warning(
+                    f"Ops rejected price tick for {tick.get('symbol')}: HTTP {res.status_code}"
+                )
+                if _retryable(res.status_code):
+                    self._retry([tick])
+            else:
+                pushed += 1
+        return pushed
+
+    def _retry(self, ticks: list[dict]) -> None:
+        """Queue failed ticks for the next flush unless a newer tick already arrived."""
+        for tick in ticks:
+            self._latest.setdefault(tick["symbol"], tick)
 
-            # Take latest tick per symbol to reduce noise
-            latest = {}
-            while self._buffer:
-                tick = self._buffer.popleft()
-                sym = tick.get("symbol")
-                if sym:
-                    latest[sym] = tick
 
-            for tick in latest.values():
-                try:
-                    await self._client.post(
-                        f"{self._ops_url}/api/events/price",
-                        json=tick,
-                        headers={"X-Ops-Token": self._token},
-                    )
-                except Exception as e:
-                    logger.warning(f"Failed to push price tick: {e}")
+def _retryable(status: int) -> bool:
+    return status == 429 or status >= 500
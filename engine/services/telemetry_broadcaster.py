@@ -1,16 +1,159 @@
+"""Telemetry fan-out to WebSocket clients.
+
+Each client gets its own bounded buffer and send task, so a slow browser only
+drops its own oldest frames. Every message is serialized to JSON once and the
+same text is handed to every interested client. Market ticks and trades are
+not forwarded one by one: ``publish_market`` keeps the latest event per
+symbol, and a frame loop emits them at ``TELEMETRY_MARKET_FPS``. Clients can
+narrow what they receive to a set of topics and symbols.
+"""
+
 import asyncio
+import json
 import logging
+import os
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
 from typing import Any
 
 _LOGGER = logging.getLogger("telemetry_broadcaster")
 
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _encode(payload: dict[str, Any]) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _base(symbol: Any) -> str:
+    return str(symbol or "").split(".")[0].upper()
+
+
+def _symbol_of(payload: dict[str, Any]) -> str:
+    data = payload.get("data")
+    if isinstance(data, dict):
+        return _base(data.get("symbol"))
+    return ""
+
+
+class TelemetryClient:
+    """One connected consumer: filters, a bounded frame buffer and a send task."""
+
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[Any]],
+        *,
+        topics: Iterable[str] | None = None,
+        symbols: Iterable[str] | None = None,
+        buffer: int = 256,
+        send_timeout: float = 5.0,
+    ) -> None:
+        self._send = send
+        self._buffer: deque[str] = deque(maxlen=max(1, buffer))
+        self._ready = asyncio.Event()
+        self._send_timeout = send_timeout
+        self._task: asyncio.Task | None = None
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.topics: frozenset[str] | None = None
+        self.symbols: frozenset[str] | None = None
+        self.set_filter(topics=topics, symbols=symbols)
+
+    def set_filter(
+        self, *, topics: Iterable[str] | None = None, symbols: Iterable[str] | None = None
+    ) -> None:
+        """Restrict delivery; ``None`` or an empty list means everything."""
+        self.topics = frozenset(t for t in topics or () if t) or None
+        self.symbols = frozenset(_base(s) for s in symbols or () if s) or None
+
+    def wants(self, topic: str, symbol: str) -> bool:
+        if self.topics is not None and topic not in self.topics:
+            return False
+        # Messages without a symbol (account, venues, ...) pass the symbol filter
+        return self.symbols is None or not symbol or symbol in self.symbols
+
+    def offer(self, text: str) -> None:
+        if self.closed:
+            return
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1  # deque drops the oldest frame
+        self._buffer.append(text)
+        self._ready.set()
+
+    def push_json(self, payload: dict[str, Any]) -> None:
+        """Queue a message for this client only (e.g. a heartbeat reply)."""
+        self.offer(_encode(payload))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="telemetry-client")
+
+    async def _run(self) -> None:
+        try:
+            while not self.closed:
+                await self._ready.wait()
+                self._ready.clear()
+                while self._buffer and not self.closed:
+                    text = self._buffer.popleft()
+                    async with asyncio.timeout(self._send_timeout):
+                        await self._send(text)
+                    self.sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # noqa: BLE001 - any send failure ends this client only
+            _LOGGER.debug("[Telemetry] client send failed, closing: %s", exc)
+        finally:
+            self.closed = True
+            self._buffer.clear()
+
+    async def close(self) -> None:
+        self.closed = True
+        self._ready.set()
+        task, self._task = self._task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):  # noqa: BLE001
+                pass
+
+
 class TelemetryBroadcaster:
     """
     Broadcasts telemetry updates to connected WebSocket clients.
+
+    WebSocket endpoints register with ``add_client``. In-process consumers can
+    still ``subscribe`` for a queue of payload dicts.
     """
-    def __init__(self):
+
+    def __init__(
+        self,
+        *,
+        market_fps: float | None = None,
+        client_buffer: int | None = None,
+        send_timeout: float | None = None,
+    ):
         self._subscribers: set[asyncio.Queue] = set()
+        self._clients: set[TelemetryClient] = set()
+        fps = market_fps if market_fps is not None else _env_float("TELEMETRY_MARKET_FPS", 4.0)
+        self.frame_interval = 1.0 / max(0.1, fps)
+        self.client_buffer = int(client_buffer or _env_float("TELEMETRY_CLIENT_BUFFER", 256))
+        self.send_timeout = (
+            send_timeout if send_timeout is not None else _env_float("TELEMETRY_SEND_TIMEOUT_SEC", 5.0)
+        )
+        # (topic, symbol) -> latest raw event since the last frame
+        self._pending: dict[tuple[str, str], dict[str, Any]] = {}
+        self._frame_task: asyncio.Task | None = None
+        self._stats = {"messages": 0, "encoded": 0, "market_in": 0, "market_out": 0}
 
+    # ------------------------------------------------------------- queue consumers
     async def subscribe(self) -> asyncio.Queue:
         """Subscribe to telemetry updates."""
         queue = asyncio.Queue(maxsize=100)
@@ -21,19 +164,120 @@ def unsubscribe(self, queue: asyncio.Queue):
         """Unsubscribe from telemetry updates."""
         self._subscribers.discard(queue)
 
-    async def broadcast(self, payload: dict[str, Any]):
-        """Broadcast a payload to all subscribers."""
-        if not self._subscribers:
+    # ------------------------------------------------------------ socket clients
+    def add_client(
+        self,
+        send: Callable[[str], Awaitable[Any]],
+        *,
+        topics: Iterable[str] | None = None,
+        symbols: Iterable[str] | None = None,
+    ) -> TelemetryClient:
+        client = TelemetryClient(
+            send,
+            topics=topics,
+            symbols=symbols,
+            buffer=self.client_buffer,
+            send_timeout=self.send_timeout,
+        )
+        client.start()
+        self._clients.add(client)
+        return client
+
+    async def remove_client(self, client: TelemetryClient) -> None:
+        self._clients.discard(client)
+        await client.close()
+
+    @property
+    def has_listeners(self) -> bool:
+        return bool(self._clients or self._subscribers)
+
+    # ------------------------------------------------------------------ fan-out
+    def publish(self, payload: dict[str, Any]) -> None:
+        """Deliver one message now: encoded once, buffered per interested client."""
+        if not self.has_listeners:
             return
-        
-        # _LOGGER.debug(f"[Telemetry] Broadcasting to {len(self._subscribers)} clients")
+        self._stats["messages"] += 1
         for q in list(self._subscribers):
             try:
                 q.put_nowait(payload)
             except asyncio.QueueFull:
                 _LOGGER.warning("[Telemetry] Subscriber queue full, dropping message.")
-                # Optional: disconnect slow consumer
+        if not self._clients:
+            return
+        topic = str(payload.get("type") or "")
+        symbol = _symbol_of(payload)
+        text: str | None = None
+        for client in list(self._clients):
+            if client.closed:
+                self._clients.discard(client)
+                continue
+            if not client.wants(topic, symbol):
+                continue
+            if text is None:
+                text = _encode(payload)
+                self._stats["encoded"] += 1
+            client.offer(text)
+
+    async def broadcast(self, payload: dict[str, Any]):
+        """Broadcast a payload to all subscribers."""
+        self.publish(payload)
+
+    def publish_market(self, topic: str, event: dict[str, Any]) -> None:
+        """Keep the latest ``event`` per symbol; the frame loop sends it at the market frame rate."""
+        if not self.has_listeners:
+            return
+        self._stats["market_in"] += 1
+        self._pending[(topic, _base(event.get("symbol")))] = event
+        if self._frame_task is None:
+            try:
+                self.start()
+            except RuntimeError:  # no running loop; flushed by the next start()
                 pass
 
+    def flush_market(self) -> int:
+        """Send one frame: a message per (topic, symbol) updated since the last frame."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        now = time.time()
+        for (topic, _), event in pending.items():
+            self.publish({"type": topic, "data": event, "ts": now})
+        self._stats["market_out"] += len(pending)
+        return len(pending)
+
+    # ------------------------------------------------------------------ lifecycle
+    def start(self) -> None:
+        if self._frame_task is None or self._frame_task.done():
+            self._frame_task = asyncio.get_running_loop().create_task(
+                self._frame_loop(), name="telemetry-frames"
+            )
+
+    async def _frame_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.frame_interval)
+            try:
+                self.flush_market()
+            except Exception as exc:  # noqa: BLE001 - keep the frame loop alive
+                _LOGGER.warning("[Telemetry] market frame failed: %s", exc)
+
+    async def stop(self) -> None:
+        task, self._frame_task = self._frame_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        for client in list(self._clients):
+            await self.remove_client(client)
+
+    def get_stats(self) -> dict[str, Any]:
+        stats = dict(self._stats)
+        stats["clients"] = len(self._clients)
+        stats["dropped"] = sum(c.dropped for c in self._clients)
+        stats["frame_interval"] = self.frame_interval
+        return stats
+
+
 # Global instance
 BROADCASTER = TelemetryBroadcaster()
@@ -1,4 +1,6 @@
 PRAGMA journal_mode=WAL;
+-- Lets the cleanup loop return freed pages a few at a time instead of a full VACUUM
+PRAGMA auto_vacuum=INCREMENTAL;
 
 CREATE TABLE IF NOT EXISTS orders (
   id            TEXT PRIMARY KEY,             -- engine/order id
@@ -42,3 +44,32 @@ CREATE TABLE IF NOT EXISTS equity_snapshots (
   ts            INTEGER NOT NULL,
   PRIMARY KEY (venue, ts)
 );
+
+-- Full OMS order records; open ones are reloaded on restart
+CREATE TABLE IF NOT EXISTS oms_orders (
+  id             TEXT PRIMARY KEY,
+  client_key     TEXT NOT NULL,
+  symbol         TEXT NOT NULL,              -- e.g. BTCUSDT.BINANCE
+  side           TEXT NOT NULL,
+  order_type     TEXT NOT NULL,
+  quantity       REAL NOT NULL,
+  price          REAL,
+  stop_price     REAL,
+  tif            TEXT NOT NULL,
+  status         TEXT NOT NULL,
+  venue_order_id TEXT,
+  filled_qty     REAL NOT NULL,
+  avg_fill_price REAL,
+  error          TEXT,
+  strategy_id    TEXT,
+  created_at     REAL NOT NULL,              -- seconds
+  updated_at     REAL NOT NULL,              -- seconds
+  is_open        INTEGER NOT NULL            -- 1 while the OMS keeps it in memory
+);
+
+-- Retention sweeps and analytics readers scan by time
+CREATE INDEX IF NOT EXISTS idx_orders_ts_update ON orders(ts_update);
+CREATE INDEX IF NOT EXISTS idx_fills_ts ON fills(ts);
+CREATE INDEX IF NOT EXISTS idx_fills_symbol_ts ON fills(symbol, ts);
+CREATE INDEX IF NOT EXISTS idx_equity_snapshots_ts ON equity_snapshots(ts);
+CREATE INDEX IF NOT EXISTS idx_oms_orders_open ON oms_orders(is_open, updated_at);
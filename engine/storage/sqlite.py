@@ -1,6 +1,17 @@
+"""SQLite persistence for orders, fills, positions and equity snapshots.
+
+Writes are queued and flushed by one background thread on the writer
+connection. Each batch is grouped per statement so every table goes through
+``executemany``. Analytics readers use their own read-only connection, so
+with WAL they never wait on the writer. Retention runs in small chunks with
+incremental auto-vacuum. Fill persistence pauses for at most one chunk, not
+a full ``VACUUM``.
+"""
+
 from __future__ import annotations
 
 import logging
+import os
 import queue
 import sqlite3
 import threading
@@ -9,29 +20,66 @@
 from typing import Any
 
 _DB = None
+_READ_DB = None
+_DB_PATH: str | None = None
 _LOCK = threading.Lock()
+_READ_LOCK = threading.Lock()
 _Q: queue.Queue[tuple[str, tuple[Any, ...]]] = queue.Queue()
 _RETENTION_MS = 7 * 24 * 60 * 60 * 1000  # seven days in ms
 _CLEANUP_INTERVAL_SEC = 6 * 60 * 60  # sweep every 6 hours
+_PRUNE_CHUNK = max(1, int(os.getenv("SQLITE_PRUNE_CHUNK", "500")))  # rows per DELETE
+_VACUUM_PAGES = max(1, int(os.getenv("SQLITE_VACUUM_PAGES", "256")))  # pages per incremental_vacuum
+_PRUNE_PAUSE_SEC = 0.05  # lets the flusher in between chunks
+# (table, predicate on the cutoff in ms) swept by the retention loop
+_RETENTION = (
+    ("orders", "ts_update < ?"),
+    ("fills", "ts < ?"),
+    ("equity_snapshots", "ts < ?"),
+    # Open OMS orders are kept regardless of age
+    ("oms_orders", "is_open = 0 AND updated_at < ? / 1000.0"),
+)
 _LOGGER = logging.getLogger(__name__)
 
 
 def _conn(db_path: str) -> sqlite3.Connection:
-    global _DB
+    global _DB, _DB_PATH
     if _DB is None:
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         # Increase busy timeout to reduce 'database is locked' errors under WAL
         _DB = sqlite3.connect(db_path, timeout=10.0, check_same_thread=False)
+        # Only takes effect before the first table exists; init() migrates older files
+        _DB.execute("PRAGMA auto_vacuum=INCREMENTAL")
         _DB.execute("PRAGMA journal_mode=WAL")
         _DB.execute("PRAGMA busy_timeout=5000")
+        _DB_PATH = db_path
     return _DB
 
 
-def init(db_path="data/runtime/trades.db", schema="engine/storage/schema.sql"):
-    con = _conn(db_path)
+def _reader() -> sqlite3.Connection | None:
+    """Read-only connection for analytics queries; opened after the writer set up WAL."""
+    global _READ_DB
+    if _READ_DB is None and _DB_PATH is not None:
+        uri = f"{Path(_DB_PATH).resolve().as_uri()}?mode=ro"
+        _READ_DB = sqlite3.connect(uri, uri=True, timeout=10.0, check_same_thread=False)
+        _READ_DB.execute("PRAGMA busy_timeout=5000")
+    return _READ_DB
+
+
+def _apply_schema(con: sqlite3.Connection, schema: str) -> None:
     with open(schema, encoding="utf-8") as f:
         con.executescript(f.read())
     con.commit()
+    if con.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        # Databases created before incremental auto-vacuum need one full VACUUM
+        # to switch modes; done once here, before the flusher starts.
+        _LOGGER.info("sqlite: enabling incremental auto_vacuum (one-time VACUUM)")
+        con.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        con.execute("VACUUM")
+
+
+def init(db_path="data/runtime/trades.db", schema="engine/storage/schema.sql"):
+    con = _conn(db_path)
+    _apply_schema(con, schema)
     # background flusher
     t = threading.Thread(target=_flush_loop, args=(con,), daemon=True)
     t.start()
@@ -39,6 +87,25 @@ def init(db_path="data/runtime/trades.db", schema="engine/storage/schema.sql"):
     cleaner.start()
 
 
+def _flush(con: sqlite3.Connection, batch: list[tuple[str, tuple[Any, ...]]]) -> None:
+    """Write ``batch`` in one transaction with one ``executemany`` per statement.
+
+    Rows keep their queue order within a statement, so repeated upserts of the
+    same key still resolve to the last one.
+    """
+    grouped: dict[str, list[tuple[Any, ...]]] = {}
+    for sql, params in batch:
+        grouped.setdefault(sql, []).append(params)
+    with _LOCK:
+        try:
+            for sql, rows in grouped.items():
+                con.executemany(sql, rows)
+            con.commit()
+        except sqlite3.Error as exc:
+            con.rollback()
+            _LOGGER.warning("sqlite flush of %d rows failed: %s", len(batch), exc, exc_info=True)
+
+
 def _flush_loop(con: sqlite3.Connection):
     batch = []
     last = time.time()
@@ -49,13 +116,7 @@ def _flush_loop(con: sqlite3.Connection):
         except queue.Empty:
             pass
         if batch and (len(batch) >= 64 or time.time() - last > 0.5):
-            with _LOCK:
-                (
-                    con.executemany(batch[0][0], [p for _, p in batch])
-                    if len({sql for sql, _ in batch}) == 1
-                    else [con.execute(sql, p) for sql, p in batch]
-                )
-                con.commit()
+            _flush(con, batch)
             batch.clear()
             last = time.time()
 
@@ -64,17 +125,54 @@ def enqueue(sql: str, params: tuple[Any, ...]):
     _Q.put((sql, params))
 
 
+def _prune(
+    con: sqlite3.Connection,
+    cutoff_ms: int,
+    *,
+    chunk: int = _PRUNE_CHUNK,
+    pause: float = _PRUNE_PAUSE_SEC,
+) -> int:
+    """Delete rows older than ``cutoff_ms`` ``chunk`` rows per transaction.
+
+    ``_LOCK`` is released between chunks so queued fills keep flowing; the
+    time indexes make each chunk an index range scan.
+    """
+    removed = 0
+    for table, predicate in _RETENTION:
+        sql = (
+            f"DELETE FROM {table} WHERE rowid IN "
+            f"(SELECT rowid FROM {table} WHERE {predicate} LIMIT ?)"
+        )
+        while True:
+            with _LOCK:
+                count = con.execute(sql, (cutoff_ms, chunk)).rowcount
+                con.commit()
+            removed += count
+            if count < chunk:
+                break
+            time.sleep(pause)
+    return removed
+
+
+def _reclaim(con: sqlite3.Connection, *, pages: int = _VACUUM_PAGES, pause: float = _PRUNE_PAUSE_SEC) -> None:
+    """Return free pages to the filesystem ``pages`` at a time."""
+    while True:
+        with _LOCK:
+            if con.execute("PRAGMA freelist_count").fetchone()[0] <= 0:
+                return
+            # Each step of the pragma frees one page; drain it to finish the chunk
+            con.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+            con.commit()
+        time.sleep(pause)
+
+
 def _cleanup_loop(con: sqlite3.Connection):
-    """Periodically prune old rows and VACUUM to keep disk bounded."""
+    """Periodically prune old rows and reclaim their pages to keep disk bounded."""
     while True:
         cutoff_ms = int(time.time() * 1000) - _RETENTION_MS
         try:
-            with _LOCK:
-                con.execute("DELETE FROM orders WHERE ts_update < ?", (cutoff_ms,))
-                con.execute("DELETE FROM fills WHERE ts < ?", (cutoff_ms,))
-                con.execute("DELETE FROM equity_snapshots WHERE ts < ?", (cutoff_ms,))
-                con.commit()
-                con.execute("VACUUM")
+            if _prune(con, cutoff_ms):
+                _reclaim(con)
         except sqlite3.Error as exc:
             _LOGGER.warning("sqlite cleanup failed: %s", exc, exc_info=True)
         time.sleep(_CLEANUP_INTERVAL_SEC)
@@ -136,18 +234,58 @@ def insert_equity(venue: str, equity: float, cash: float, upnl: float, ts_ms: in
     )
 
 
+_OMS_COLUMNS = (
+    "id", "client_key", "symbol", "side", "order_type", "quantity", "price", "stop_price",
+    "tif", "status", "venue_order_id", "filled_qty", "avg_fill_price", "error",
+    "strategy_id", "created_at", "updated_at",
+)
+_OMS_UPSERT = (
+    f"INSERT OR REPLACE INTO oms_orders({','.join(_OMS_COLUMNS)},is_open) "
+    f"VALUES({','.join('?' * (len(_OMS_COLUMNS) + 1))})"
+)
+
+
+def upsert_oms_order(d: dict[str, Any], is_open: bool):
+    enqueue(_OMS_UPSERT, (*(d.get(col) for col in _OMS_COLUMNS), int(is_open)))
+
+
+def _query_oms(where: str, params: tuple[Any, ...]) -> list[dict[str, Any]]:
+    try:
+        con = _reader()
+        if con is None:
+            return []
+        with _READ_LOCK:
+            rows = con.execute(
+                f"SELECT {','.join(_OMS_COLUMNS)} FROM oms_orders WHERE {where}", params
+            ).fetchall()
+        return [dict(zip(_OMS_COLUMNS, r)) for r in rows]
+    except sqlite3.Error as exc:
+        _LOGGER.warning("oms_orders query failed: %s", exc)
+        return []
+
+
+def load_open_oms_orders() -> list[dict[str, Any]]:
+    """OMS orders still open at the last flush, for a warm restart."""
+    return _query_oms("is_open = 1", ())
+
+
+def get_oms_order(order_id: str) -> dict[str, Any] | None:
+    rows = _query_oms("id = ?", (order_id,))
+    return rows[0] if rows else None
+
+
 # =============================
 # Query functions for analytics
 # =============================
 
 def get_recent_fills(limit: int = 500) -> list[dict[str, Any]]:
     """Fetch recent fills for trade history and metrics computation."""
-    global _DB
-    if _DB is None:
-        return []
     try:
-        with _LOCK:
-            cursor = _DB.execute(
+        con = _reader()
+        if con is None:
+            return []
+        with _READ_LOCK:
+            cursor = con.execute(
                 """SELECT id, order_id, venue, symbol, side, qty, price, fee_ccy, fee, ts
                    FROM fills ORDER BY ts DESC LIMIT ?""",
                 (limit,),
@@ -175,12 +313,12 @@ def get_recent_fills(limit: int = 500) -> list[dict[str, Any]]:
 
 def get_equity_curve(limit: int = 100) -> list[dict[str, Any]]:
     """Fetch equity snapshots for drawdown calculation."""
-    global _DB
-    if _DB is None:
-        return []
     try:
-        with _LOCK:
-            cursor = _DB.execute(
+        con = _reader()
+        if con is None:
+            return []
+        with _READ_LOCK:
+            cursor = con.execute(
                 """SELECT venue, equity_usd, cash_usd, upnl_usd, ts
                    FROM equity_snapshots ORDER BY ts DESC LIMIT ?""",
                 (limit,),
@@ -201,76 +339,14 @@ def get_equity_curve(limit: int = 100) -> list[dict[str, Any]]:
         return []
 
 
-def compute_trade_stats() -> dict[str, float]:
-    """Compute win rate and returns for Sharpe calculation from fills.
-    
-    Returns:
-        dict with 'win_rate', 'total_trades', 'returns' (list of % returns per round-trip)
+def compute_trade_stats() -> dict[str, Any]:
+    """Recompute win rate, round-trip returns and max drawdown from stored history.
+
+    The engine serves ``engine.core.trade_stats.TRADE_STATS``, which is seeded
+    from the same rows once; this full replay is kept for scripts and checks.
     """
-    fills = get_recent_fills(limit=1000)
-    if not fills:
-        return {"win_rate": 0.0, "total_trades": 0, "returns": [], "max_drawdown": 0.0}
-    
-    # Group fills by symbol to compute round-trip PnL
-    from collections import defaultdict
-    positions: dict[str, list[dict]] = defaultdict(list)
-    for fill in sorted(fills, key=lambda x: x["ts"]):
-        positions[fill["symbol"]].append(fill)
-    
-    round_trips = []
-    for symbol, sym_fills in positions.items():
-        net_qty = 0.0
-        avg_entry = 0.0
-        for fill in sym_fills:
-            qty_signed = fill["qty"] if fill["side"] == "BUY" else -fill["qty"]
-            if net_qty == 0:
-                # Opening position
-                net_qty = qty_signed
-                avg_entry = fill["price"]
-            elif (net_qty > 0 and qty_signed < 0) or (net_qty < 0 and qty_signed > 0):
-                # Closing or reducing position
-                closed_qty = min(abs(net_qty), abs(qty_signed))
-                if net_qty > 0:
-                    # Was long, sold to close
-                    pnl_pct = ((fill["price"] - avg_entry) / avg_entry) * 100 if avg_entry > 0 else 0
-                else:
-                    # Was short, bought to close
-                    pnl_pct = ((avg_entry - fill["price"]) / avg_entry) * 100 if avg_entry > 0 else 0
-                round_trips.append(pnl_pct)
-                net_qty += qty_signed
-                if abs(net_qty) < 1e-10:
-                    net_qty = 0.0
-                    avg_entry = 0.0
-            else:
-                # Adding to position - update average
-                total_cost = avg_entry * abs(net_qty) + fill["price"] * abs(qty_signed)
-                net_qty += qty_signed
-                avg_entry = total_cost / abs(net_qty) if net_qty != 0 else 0
-    
-    if not round_trips:
-        return {"win_rate": 0.0, "total_trades": 0, "returns": [], "max_drawdown": 0.0}
-    
-    wins = sum(1 for r in round_trips if r > 0)
-    win_rate = wins / len(round_trips) * 100 if round_trips else 0.0
-    
-    # Compute max drawdown from equity curve
-    equity_curve = get_equity_curve(limit=500)
-    max_dd = 0.0
-    if equity_curve:
-        equities = [e["equity_usd"] for e in reversed(equity_curve) if e["equity_usd"] > 0]
-        if equities:
-            peak = equities[0]
-            for eq in equities:
-                if eq > peak:
-                    peak = eq
-                dd = (peak - eq) / peak * 100 if peak > 0 else 0
-                if dd > max_dd:
-                    max_dd = dd
-    
-    return {
-        "win_rate": round(win_rate, 2),
-        "total_trades": len(round_trips),
-        "returns": round_trips,
-        "max_drawdown": round(max_dd, 2),
-    }
+    from engine.core.trade_stats import TradeStats
 
+    stats = TradeStats(window=1000, returns_tail=1000)
+    stats.seed(get_recent_fills(limit=1000), get_equity_curve(limit=500))
+    return stats.summary()
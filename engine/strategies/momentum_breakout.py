@@ -10,6 +10,7 @@
 from dataclasses import dataclass
 
 from engine.core.market_resolver import resolve_market_choice
+from engine.feeds.kline_service import KLINE_SERVICE
 from engine.metrics import (
     momentum_breakout_candidates_total,
     momentum_breakout_cooldown_epoch,
@@ -266,9 +267,16 @@ async def _evaluate_symbol(self, symbol: str) -> MomentumPlan | None:
             self.cfg.lookback_bars + self.cfg.volume_baseline_window + self.cfg.volume_window + 5,
             self.cfg.atr_length + 5,
         )
-        raw = client.klines(symbol, interval=self.cfg.atr_interval, limit=limit)
-        if hasattr(raw, "__await__"):
-            raw = await raw
+        # Served from the shared kline cache; the venue client only backfills misses, so
+        # its rows are cached under the market the client actually serves
+        client_market = "futures" if getattr(client, "_is_futures", False) else "spot"
+        raw = await KLINE_SERVICE.klines(
+            symbol,
+            interval=self.cfg.atr_interval,
+            limit=limit,
+            market=client_market,
+            fetch=client.klines,
+        )
         if not isinstance(raw, list) or len(raw) < (
             self.cfg.lookback_bars + self.cfg.volume_window + 3
         ):
@@ -8,6 +8,9 @@
 import time
 from collections import defaultdict, deque
 from pathlib import Path
+from typing import Any
+
+import numpy as np
 
 from ..config import load_strategy_config
 from ..services.param_client import get_cached_params, update_param_features
@@ -61,40 +64,178 @@ def _vola(returns: list[float]) -> float:
     return math.sqrt(max(var, 1e-12))
 
 
-def _features(sym: str) -> list[float] | None:
+ZSCORE_WINDOW = 30
+VOL_SPIKE_WINDOW = 20
+VOLA_WINDOW = 20
+
+
+class _RollingFeatures:
+    """Per-symbol running statistics behind the HMM feature vector.
+
+    Each tick is folded in O(1): running sums for VWAP and the volume-spike
+    mean, a rolling Welford mean/M2 for the price z-score. The sums are
+    recomputed from their buffers once per window length to keep float drift
+    bounded, so results track the batch formulas to ~1e-12 relative.
+    """
+
+    __slots__ = (
+        "prices",
+        "vols",
+        "_z",
+        "_spike",
+        "_pv_sum",
+        "_v_sum",
+        "_spike_sum",
+        "_z_mean",
+        "_z_m2",
+        "_since_resync",
+        "feats",
+        "seq",
+        "regime",
+    )
+
+    def __init__(self, prices: deque[float], vols: deque[float]) -> None:
+        self.prices = prices
+        self.vols = vols
+        window = prices.maxlen or len(prices) or 1
+        self._z: deque[float] = deque(maxlen=min(ZSCORE_WINDOW, window))
+        self._spike: deque[float] = deque(maxlen=min(VOL_SPIKE_WINDOW, window))
+        self.feats: list[float] | None = None
+        self.seq = 0
+        # (seq, model, probs) of the last inference for this symbol
+        self.regime: tuple[int, Any, np.ndarray] | None = None
+        self._resync()
+
+    def _resync(self) -> None:
+        self._z.clear()
+        self._z.extend(list(self.prices)[-(self._z.maxlen or 1):])
+        self._spike.clear()
+        self._spike.extend(list(self.vols)[-(self._spike.maxlen or 1):])
+        self._pv_sum = sum(p * v for p, v in zip(self.prices, self.vols, strict=False))
+        self._v_sum = sum(self.vols)
+        self._spike_sum = sum(self._spike)
+        n = len(self._z)
+        self._z_mean = sum(self._z) / n if n else 0.0
+        self._z_m2 = sum((x - self._z_mean) ** 2 for x in self._z)
+        self._since_resync = 0
+        self.feats = None
+
+    def push(self, price: float, volume: float) -> None:
+        P, V = self.prices, self.vols
+        if P.maxlen is not None and len(P) == P.maxlen and P:
+            old_p, old_v = P[0], V[0]
+            self._pv_sum -= old_p * old_v
+            self._v_sum -= old_v
+        P.append(price)
+        V.append(volume)
+        self._pv_sum += price * volume
+        self._v_sum += volume
+
+        spike = self._spike
+        if len(spike) == spike.maxlen:
+            self._spike_sum -= spike[0]
+        spike.append(volume)
+        self._spike_sum += volume
+
+        z = self._z
+        if len(z) == z.maxlen:
+            # Remove the oldest sample from the running mean/M2
+            x = z[0]
+            n = len(z) - 1
+            if n:
+                mean = self._z_mean - (x - self._z_mean) / n
+                self._z_m2 -= (x - self._z_mean) * (x - mean)
+                self._z_mean = mean
+            else:
+                self._z_mean = self._z_m2 = 0.0
+        z.append(price)
+        n = len(z)
+        delta = price - self._z_mean
+        self._z_mean += delta / n
+        self._z_m2 += delta * (price - self._z_mean)
+
+        self._since_resync += 1
+        if self._since_resync >= (P.maxlen or len(P)):
+            self._resync()
+        self.seq += 1
+        self.feats = None
+
+    def zscore(self) -> float:
+        n = len(self._z)
+        if n < 2:
+            return 0.0
+        var = max(self._z_m2, 0.0) / max(1, n - 1)
+        sd = math.sqrt(max(var, 1e-12))
+        return (self._z[-1] - self._z_mean) / sd
+
+    def vwap(self) -> float:
+        return self._pv_sum / (self._v_sum or 1.0)
+
+    def vol_spike(self) -> float:
+        if not self.vols:
+            return 1.0
+        return float(self.vols[-1]) / max(1.0, self._spike_sum / float(VOL_SPIKE_WINDOW))
+
+    def tail_returns(self) -> list[float]:
+        """Last VOLA_WINDOW log returns, zero-padded at the buffer start like the batch path."""
+        P = self.prices
+        tail = list(P)[-(VOLA_WINDOW + 1):] if len(P) > VOLA_WINDOW else list(P)
+        rets = [0.0]
+        for p_prev, p_curr in zip(tail, tail[1:]):
+            try:
+                rets.append(math.log(p_curr / p_prev))
+            except (ValueError, ZeroDivisionError):
+                rets.append(0.0)
+        return rets[-VOLA_WINDOW:]
+
+
+_rolling: dict[str, _RollingFeatures] = {}
+
+
+def _rolling_state(sym: str) -> _RollingFeatures:
     P, V = _prices[sym], _vols[sym]
+    state = _rolling.get(sym)
+    if state is None or state.prices is not P or state.vols is not V:
+        # First tick, or the buffers were replaced/cleared from outside
+        state = _rolling[sym] = _RollingFeatures(P, V)
+    return state
+
+
+def _features(sym: str) -> list[float] | None:
+    P = _prices[sym]
     if len(P) < 3:  # need minimum data
         logging.warning(f"[HMM] {sym}: Not enough data for features ({len(P)} < 3)")
         return None
+    state = _rolling_state(sym)
+    if state.feats is not None:
+        return state.feats
+
     # Feature 1: Log Returns
     # Handle zeros to avoid math domain error
-    rets = [0.0]
-    for i in range(1, len(P)):
-        p_curr, p_prev = P[i], P[i-1]
-        try:
-            r = math.log(p_curr / p_prev)
-        except (ValueError, ZeroDivisionError):
-            r = 0.0
-        rets.append(r)
+    try:
+        ret = math.log(P[-1] / P[-2])
+    except (ValueError, ZeroDivisionError):
+        ret = 0.0
 
     # Feature 2: Institutional Volatility (EMA)
     # Use the live manager's current estimate (fast access)
     inst_vol = _vol_managers[sym].get_annualized_vol()
-    
+
     # Check if manager is "warmed up" (has basic data), else fallback to simple std
     if inst_vol == 0.0:
-       inst_vol = _vola(rets[-20:]) * math.sqrt(525600) # Ann approx
+        inst_vol = _vola(state.tail_returns()) * math.sqrt(525600)  # Ann approx
+
+    vwap = state.vwap()
 
-    vwap = _vwap(list(P), list(V) if len(V) == len(P) else [1.0] * len(P))
-    
     feats = [
-        rets[-1],  # latest log return
+        ret,  # latest log return
         inst_vol,  # Annualized EMA Volatility
         (P[-1] - vwap) / vwap,  # dev vs VWAP
-        _zscore(list(P)[-30:]),  # zscore of price
-        (float(V[-1]) / max(1.0, sum(list(V)[-20:]) / 20.0) if V else 1.0),  # volume spike ratio
+        state.zscore(),  # zscore of price
+        state.vol_spike(),  # volume spike ratio
     ]
-    logging.info(f"[HMM] {sym}: Computed features: {feats}")
+    logging.debug("[HMM] %s: Computed features: %s", sym, feats)
+    state.feats = feats
     return feats
 
 
@@ -109,9 +250,7 @@ def _feature_payload(feats: list[float]) -> dict[str, float]:
 
 
 def ingest_tick(sym: str, price: float, volume: float = 1.0) -> None:
-    # print(f"[HMM] Ingesting {sym}: {price}")
-    _prices[sym].append(float(price))
-    _vols[sym].append(float(volume))
+    _rolling_state(sym).push(float(price), float(volume))
     _vol_managers[sym].update(float(price))
 
 
@@ -150,18 +289,75 @@ def reload_model(event: dict | None = None) -> None:
     global _model
     print(f"[HMM] Reloading model due to event: {event}")
     _model = None
+    for state in _rolling.values():
+        state.regime = None
 
 
-def get_regime(sym: str) -> dict | None:
-    """Return HMM regime info (probs, confidence) without trading logic."""
-    feats = _features(sym)
-    if not feats:
-        return None
+def predict_batch(X: Any) -> np.ndarray:
+    """Regime probabilities for each row of ``X``, scored as independent samples.
+
+    hmmlearn's ``predict_proba`` treats stacked rows as one time series, so for
+    those models the single-observation posterior (start prior x emission
+    likelihood, normalised) is evaluated for all rows at once instead. That
+    relies on hmmlearn's private ``_compute_log_likelihood``; if a release
+    drops it, each row is scored with its own ``predict_proba`` call.
+    """
+    mdl = model()
+    X = np.asarray(X, dtype=float)
+    if not hasattr(mdl, "startprob_"):
+        return np.asarray(mdl.predict_proba(X), dtype=float)
+    log_likelihood = getattr(mdl, "_compute_log_likelihood", None)
+    if log_likelihood is None:
+        return np.vstack([np.asarray(mdl.predict_proba(row[None, :]), dtype=float)[0] for row in X])
+    with np.errstate(divide="ignore"):
+        logp = log_likelihood(X) + np.log(mdl.startprob_)
+    logp -= logp.max(axis=1, keepdims=True)
+    probs = np.exp(logp)
+    return probs / probs.sum(axis=1, keepdims=True)
+
+
+_batcher = None
+
+
+def _regime_batcher():
+    global _batcher
+    if _batcher is None:
+        from engine.inference.regime_batcher import RegimeBatcher
+
+        _batcher = RegimeBatcher(predict_batch)
+    return _batcher
+
+
+def _cached_probs(state: _RollingFeatures) -> np.ndarray | None:
+    cached = state.regime
+    if cached is not None and cached[0] == state.seq and cached[1] is _model and _model is not None:
+        return cached[2]
+    return None
+
+
+def _count_cache(result: str) -> None:
     try:
-        probs = model().predict_proba([feats])[0]
-    except Exception as exc:
-        return None
+        from engine import metrics
+
+        metrics.hmm_regime_cache_total.labels(result=result).inc()
+    except Exception:  # pragma: no cover - metrics optional
+        pass
+
+
+def _probs(sym: str, feats: list[float]) -> np.ndarray:
+    """Probabilities for the current tick, served from the per-tick cache when possible."""
+    state = _rolling_state(sym)
+    probs = _cached_probs(state)
+    if probs is not None:
+        _count_cache("hit")
+        return probs
+    _count_cache("miss")
+    probs = predict_batch([feats])[0]
+    state.regime = (state.seq, _model, probs)
+    return probs
 
+
+def _regime_payload(sym: str, feats: list[float], probs: np.ndarray) -> dict:
     base_conf = float(max(probs))
     adj_conf = adjust_confidence(sym, base_conf)
     p_bull, p_bear = probs[0], probs[1]
@@ -184,6 +380,46 @@ def get_regime(sym: str) -> dict | None:
     }
 
 
+def get_regime(sym: str) -> dict | None:
+    """Return HMM regime info (probs, confidence) without trading logic."""
+    feats = _features(sym)
+    if not feats:
+        return None
+    try:
+        probs = _probs(sym, feats)
+    except Exception:
+        logging.debug("[HMM] %s: regime inference failed", sym, exc_info=True)
+        return None
+    return _regime_payload(sym, feats, probs)
+
+
+async def get_regime_async(sym: str) -> dict | None:
+    """Like ``get_regime``, but cache misses are scored in a cross-symbol micro-batch.
+
+    The result is stored against the tick sequence it was computed for, so a
+    later ``get_regime``/``decide`` on the same tick reuses it.
+    """
+    feats = _features(sym)
+    if not feats:
+        return None
+    state = _rolling_state(sym)
+    probs = _cached_probs(state)
+    if probs is not None:
+        _count_cache("hit")
+        return _regime_payload(sym, feats, probs)
+    _count_cache("miss")
+    try:
+        mdl = model()
+        seq, feats, probs = await _regime_batcher().submit(sym, state.seq, feats)
+    except Exception:
+        logging.debug("[HMM] %s: batched regime inference failed", sym, exc_info=True)
+        return None
+    # A newer tick may have replaced this symbol's row while the batch was pending
+    if state.regime is None or state.regime[0] <= seq:
+        state.regime = (seq, mdl, probs)
+    return _regime_payload(sym, feats, probs)
+
+
 def decide(sym: str) -> tuple[str, float, dict] | None:
     """Return (side, quote_usdt, meta) or None if no action."""
     now = time.time()
@@ -202,7 +438,7 @@ def decide(sym: str) -> tuple[str, float, dict] | None:
         logging.info(f"[HMM] {sym}: Cooldown active ({now - _last_signal_ts[sym]:.1f} < {dynamic_cooldown:.1f})")
         return None
 
-    probs = model().predict_proba([feats])[0]  # e.g., [p_bull, p_bear, p_chop]
+    probs = _probs(sym, feats)  # e.g., [p_bull, p_bear, p_chop]
     base_conf = float(max(probs))
     adj_conf = adjust_confidence(sym, base_conf)
     # Map regimes → action
@@ -13,6 +13,7 @@
 from engine.config import get_settings
 from engine.config.defaults import GLOBAL_DEFAULTS, SYMBOL_SCANNER_DEFAULTS
 from engine.config.env import env_bool, env_float, env_int, env_str, split_symbols
+from engine.feeds.kline_service import KLINE_SERVICE
 
 _SUPPRESSIBLE_EXCEPTIONS = (
     AttributeError,
@@ -276,13 +277,11 @@ def _scan_once(self) -> None:
         # Fetch dynamic universe (top coins by volume)
         universe = self._fetch_dynamic_universe()
         
-        for sym in universe:
-            if self._cooldown_active(sym, now):
-                continue
-            # Optimization: If we already fetched BTC, reuse it?
-            # But simpler to just fetch again or rely on cache if implemented (no cache in _fetch_klines)
-            # Given lookback is small, it's fine.
-            data = self._fetch_klines(sym)
+        # One bounded-concurrency backfill for every symbol the shared cache can't answer
+        candidates = [sym for sym in universe if not self._cooldown_active(sym, now)]
+        klines = self._fetch_klines_many(candidates)
+        for sym in candidates:
+            data = klines.get(sym)
             if not data:
                 logger.debug(f"No kline data for {sym}")
                 continue
@@ -319,27 +318,18 @@ def _scan_once(self) -> None:
                 self._inc_selected(sym)
         self._persist_state()
 
-    def _fetch_klines(self, symbol: str) -> list[list[str]] | None:
-        # Use Futures API for klines as we are in Futures mode
-        url = f"{self._futures_base_url}/fapi/v1/klines"
+    def _fetch_klines(self, symbol: str) -> list[list[float]] | None:
+        return self._fetch_klines_many([symbol]).get(symbol)
+
+    def _fetch_klines_many(self, symbols: Sequence[str]) -> dict[str, list[list[float]]]:
+        # Futures klines as we are in Futures mode; shared with strategies via the kline cache
         try:
-            resp = httpx.get(
-                url,
-                params={
-                    "symbol": symbol,
-                    "interval": self.cfg.interval,
-                    "limit": self.cfg.lookback,
-                },
-                timeout=10.0,
+            data = KLINE_SERVICE.klines_many_sync(
+                symbols, interval=self.cfg.interval, limit=self.cfg.lookback, market="futures"
             )
-
-            resp.raise_for_status()
-            data = resp.json()
-            if isinstance(data, list) and data:
-                return data
-        except Exception as exc:
-            return None
-        return None
+        except _SUPPRESSIBLE_EXCEPTIONS:
+            return {}
+        return {sym: rows for sym, rows in data.items() if rows}
 
     def _score_symbol(self, symbol: str, klines: list[list[str]]) -> float | None:
         try:
@@ -12,6 +12,7 @@
 from engine.config.defaults import TREND_DEFAULTS
 from engine.config.env import env_bool, env_float, env_int, env_str
 from engine.core.market_resolver import resolve_market_choice
+from engine.feeds.kline_service import KLINE_SERVICE
 from engine.universe.effective import StrategyUniverse
 
 from . import policy_hmm
@@ -219,7 +220,8 @@ def __init__(
     ) -> None:
         self.cfg = cfg
         self.enabled = bool(cfg.enabled)
-        self._client = client or _AsyncKlinesClient()
+        # Shared, stream-fed kline cache unless a client is injected (tests/backtests)
+        self._client = client or KLINE_SERVICE
         self._clock = clock
         self._log = logger or logging.getLogger("engine.trend")
         self._universe = StrategyUniverse(scanner)
@@ -582,33 +584,4 @@ async def _klines(self, base: str, interval: str, minimum: int) -> list[list[flo
         return cached
 
 
-class _AsyncKlinesClient:
-    def __init__(self):
-        settings = get_settings()
-        base = getattr(settings, "base_url", "https://api.binance.com") or "https://api.binance.com"
-        self._base = base.rstrip("/")
-        self._timeout = getattr(settings, "timeout", 10.0)
-        self._headers = {}
-        api_key = getattr(settings, "api_key", "")
-        if api_key:
-            self._headers["X-MBX-APIKEY"] = api_key
-        self._is_futures = getattr(settings, "is_futures", False)
-        # We use a single client for efficiency (managed externally or here)
-        self._client = httpx.AsyncClient(timeout=self._timeout)
-
-    async def klines(self, symbol: str, *, interval: str, limit: int) -> list[list[float]]:
-        path = "/fapi/v1/klines" if self._is_futures else "/api/v3/klines"
-        try:
-            resp = await self._client.get(
-                f"{self._base}{path}",
-                params={"symbol": symbol, "interval": interval, "limit": limit},
-                headers=self._headers or None,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            return data if isinstance(data, list) else []
-        except Exception:
-            raise
-
-
 __all__ = ["TrendStrategyModule", "TrendStrategyConfig", "load_trend_config"]
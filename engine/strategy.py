@@ -22,11 +22,11 @@
 from .risk import RiskRails
 from .state.cooldown import Cooldowns
 from .strategies import ensemble_policy, policy_hmm
-from .strategies.policy_river import RiverPolicy
+from .inference.river_worker import RiverWorker
 from .state import get_global_redis
 
-# Initialize River Policy (Global)
-river_policy = RiverPolicy()
+# River online learner in its own process; the app starts it at startup
+river_worker = RiverWorker()
 from .strategies.calibration import cooldown_scale as calibration_cooldown_scale
 from .strategies.scalp.brackets import ScalpBracketManager
 from .strategies.scalping import ScalpStrategyModule, load_scalp_config
@@ -778,8 +778,9 @@ async def on_tick(
             # 1. Ingest Data
             policy_hmm.ingest_tick(base, price, volume or 1.0)
             
-            # 2. Get Features (for UI)
-            regime_data = policy_hmm.get_regime(base)
+            # 2. Get Features (for UI); scored in a cross-symbol micro-batch and
+            # cached for this tick, so decide()/get_regime() below reuse it
+            regime_data = await policy_hmm.get_regime_async(base)
             if regime_data:
                 hmm_features = regime_data.get("features", {})
                 
@@ -1112,7 +1113,6 @@ async def on_tick(
     hmm_decision = None
     if S_CFG.hmm_enabled:
         try:
-            policy_hmm.ingest_tick(base, price, volume or 1.0)
             hmm_decision = policy_hmm.decide(base)
             if hmm_decision and isinstance(hmm_decision[2], dict):
                 probs = hmm_decision[2].get("probs") or []
@@ -1139,13 +1139,11 @@ async def on_tick(
     river_proba = {}
     if hmm_features:
         try:
-            r_res = river_policy.on_tick(base, hmm_features, price)
+            # Non-blocking: returns the latest prediction the worker has
+            # finished for this symbol; snapshots happen on the worker's timer
+            r_res = river_worker.submit(base, hmm_features, price)
             river_pred = r_res.get("prediction", 0)
             river_proba = r_res.get("proba", {})
-            # Save model occasionally (1% chance) to avoid IO blocking
-            import random
-            if random.random() < 0.01:
-                river_policy.save()
         except Exception as exc:
             pass
 
@@ -12,6 +12,8 @@
 import secrets
 import websockets
 import aiofiles
+from collections import deque
+from itertools import islice
 from pathlib import Path
 from fastapi import FastAPI, Response, HTTPException, Request, WebSocket, WebSocketDisconnect, Query
 from fastapi.staticfiles import StaticFiles
@@ -116,9 +118,25 @@ async def issue_ws_session():
 # Event Ingestion Endpoints - Receive events from Engine
 # ============================================================================
 
-# In-memory price cache (last N ticks per symbol)
-_price_cache: dict[str, list[dict]] = {}
+# In-memory price cache: fixed-size ring buffer of the last N ticks per symbol
 _PRICE_CACHE_SIZE = 100
+_price_cache: dict[str, deque[dict]] = {}
+
+
+def _store_price_tick(tick: dict) -> bool:
+    symbol = tick.get("symbol")
+    if not symbol:
+        return False
+    ring = _price_cache.get(symbol)
+    if ring is None:
+        ring = _price_cache[symbol] = deque(maxlen=_PRICE_CACHE_SIZE)
+    ring.append({
+        "price": tick.get("price"),
+        "ts": tick.get("ts", time.time()),
+        "source": tick.get("source"),
+    })
+    return True
+
 
 @APP.post("/api/events/price")
 async def receive_price_event(request: Request):
@@ -128,38 +146,39 @@ async def receive_price_event(request: Request):
     """
     try:
         tick = await request.json()
-        symbol = tick.get("symbol")
-        if not symbol:
+        if not _store_price_tick(tick):
             return {"status": "ignored", "reason": "no symbol"}
-        
-        # Store in cache
-        if symbol not in _price_cache:
-            _price_cache[symbol] = []
-        
-        _price_cache[symbol].append({
-            "price": tick.get("price"),
-            "ts": tick.get("ts", time.time()),
-            "source": tick.get("source"),
-        })
-        
-        # Trim to max size
-        if len(_price_cache[symbol]) > _PRICE_CACHE_SIZE:
-            _price_cache[symbol] = _price_cache[symbol][-_PRICE_CACHE_SIZE:]
-        
         return {"status": "ok"}
     except Exception as e:
         logger.warning(f"Failed to process price event: {e}")
         return {"status": "error", "error": str(e)}
 
 
+@APP.post("/api/events/price/batch")
+async def receive_price_batch(request: Request):
+    """
+    Receive many price ticks in one request (``{"ticks": [...]}`` or a bare list).
+    The engine's PriceBridge sends one batch per flush instead of one POST per symbol.
+    """
+    try:
+        body = await request.json()
+        ticks = body.get("ticks", []) if isinstance(body, dict) else body
+        stored = sum(1 for tick in ticks if isinstance(tick, dict) and _store_price_tick(tick))
+        return {"status": "ok", "stored": stored, "ignored": len(ticks) - stored}
+    except Exception as e:
+        logger.warning(f"Failed to process price batch: {e}")
+        return {"status": "error", "error": str(e)}
+
+
 @APP.get("/api/events/prices")
 async def get_price_events(symbol: str | None = None, limit: int = 50):
     """
     Get cached price events for charting.
     """
     if symbol:
-        ticks = _price_cache.get(symbol, [])[-limit:]
-        return {"symbol": symbol, "ticks": ticks}
+        ring = _price_cache.get(symbol, ())
+        start = max(0, len(ring) - max(0, limit))
+        return {"symbol": symbol, "ticks": list(islice(ring, start, None))}
     
     # Return summary of all symbols
     summary = {}
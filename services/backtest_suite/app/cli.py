@@ -8,7 +8,7 @@
 from loguru import logger
 
 from .config import settings
-from .engine import BacktestEngine
+from .vectorized import ENGINE_MODES
 
 
 def setup_logging() -> None:
@@ -40,17 +40,18 @@ def cmd_backtest(args) -> int:
     logger.info("Nautilus Backtest Suite")
     logger.info("=" * 60)
     logger.info(f"Strategy: {args.strategy}")
+    logger.info(f"Engine: {args.engine}")
     logger.info(f"Symbols: {symbols or 'all available'}")
     logger.info(f"Initial equity: ${args.initial_equity:,.2f}")
     
     if args.dry_run:
         logger.info("Dry run mode - validating configuration...")
-        engine = BacktestEngine(symbols=symbols, strategy=args.strategy, initial_equity=args.initial_equity)
+        engine = ENGINE_MODES[args.engine](symbols=symbols, strategy=args.strategy, initial_equity=args.initial_equity)
         bars = engine.load_data()
         return 0 if bars > 0 else 1
     
     try:
-        engine = BacktestEngine(symbols=symbols, strategy=args.strategy, initial_equity=args.initial_equity)
+        engine = ENGINE_MODES[args.engine](symbols=symbols, strategy=args.strategy, initial_equity=args.initial_equity)
         results = engine.run()
         
         if "error" in results:
@@ -87,6 +88,7 @@ def cmd_grid_search(args) -> int:
     logger.info(f"Strategy: {args.strategy}")
     logger.info(f"Metric: {args.metric}")
     logger.info(f"Max runs: {args.max_runs or 'unlimited'}")
+    logger.info(f"Workers: {args.workers or 'one per CPU'}")
     
     symbols = [s.strip().upper() for s in args.symbols.split(",")] if args.symbols else None
     
@@ -95,6 +97,9 @@ def cmd_grid_search(args) -> int:
         symbols=symbols,
         initial_equity=args.initial_equity,
         metric=args.metric,
+        engine=args.engine,
+        workers=args.workers,
+        abort_drawdown=args.abort_drawdown,
     )
     
     # Define parameter grids
@@ -135,7 +140,15 @@ def cmd_generate_presets(args) -> int:
     symbols = [s.strip().upper() for s in args.symbols.split(",")] if args.symbols else None
     
     # Run grid search first
-    gs = GridSearch(strategy=args.strategy, symbols=symbols, initial_equity=args.initial_equity)
+    # Runs breaching the drawdown threshold can never become presets, so
+    # stop them as soon as they do
+    gs = GridSearch(
+        strategy=args.strategy,
+        symbols=symbols,
+        initial_equity=args.initial_equity,
+        workers=args.workers,
+        abort_drawdown=args.max_drawdown,
+    )
     
     if args.strategy == "momentum":
         param_grid = {"lookback": [15, 20, 25], "momentum_threshold": [0.015, 0.02, 0.025]}
@@ -185,6 +198,7 @@ def main() -> int:
     bt_parser.add_argument("--data-dir", type=str, default=None)
     bt_parser.add_argument("--output-dir", type=str, default=None)
     bt_parser.add_argument("--cost-bps", type=float, default=None)
+    bt_parser.add_argument("--engine", type=str, default="event", choices=sorted(ENGINE_MODES))
     bt_parser.add_argument("--dry-run", action="store_true")
     bt_parser.set_defaults(func=cmd_backtest)
     
@@ -195,6 +209,9 @@ def main() -> int:
     gs_parser.add_argument("--initial-equity", type=float, default=10000.0)
     gs_parser.add_argument("--metric", type=str, default="sharpe_ratio")
     gs_parser.add_argument("--max-runs", type=int, default=None)
+    gs_parser.add_argument("--engine", type=str, default="event", choices=sorted(ENGINE_MODES))
+    gs_parser.add_argument("--workers", type=int, default=1, help="Worker processes (0 = one per CPU)")
+    gs_parser.add_argument("--abort-drawdown", type=float, default=None)
     gs_parser.set_defaults(func=cmd_grid_search)
     
     # Preset generation command
@@ -206,6 +223,7 @@ def main() -> int:
     pg_parser.add_argument("--min-win-rate", type=float, default=0.45)
     pg_parser.add_argument("--max-drawdown", type=float, default=0.15)
     pg_parser.add_argument("--top-n", type=int, default=3)
+    pg_parser.add_argument("--workers", type=int, default=1, help="Worker processes (0 = one per CPU)")
     pg_parser.add_argument("--dry-run", action="store_true")
     pg_parser.set_defaults(func=cmd_generate_presets)
     
@@ -219,6 +237,7 @@ def main() -> int:
         args.data_dir = None
         args.output_dir = None
         args.cost_bps = None
+        args.engine = "event"
         args.dry_run = False
         return cmd_backtest(args)
     
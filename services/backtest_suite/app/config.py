@@ -14,6 +14,12 @@ class Settings:
     RESULTS_DIR: str = os.getenv("RESULTS_DIR", "/results")
     HISTORICAL_DIR: str = os.getenv("HISTORICAL_DIR", "/historical")
     
+    # Partitioned Parquet dataset: timeframe to read and optional window
+    # (ms, 0 = unbounded) so only overlapping row groups are loaded
+    TIMEFRAME: str = os.getenv("TIMEFRAME", "1m")
+    DATA_START_TS: int = int(os.getenv("DATA_START_TS", "0"))
+    DATA_END_TS: int = int(os.getenv("DATA_END_TS", "0"))
+    
     # Ledger database
     LEDGER_DB: str = os.getenv("LEDGER_DB", "/research/manifest.sqlite")
     
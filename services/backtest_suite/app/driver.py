@@ -1,16 +1,18 @@
 """Data driver for loading and replaying historical market data."""
 
 import glob
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterator
 
+import numpy as np
 import pandas as pd
 from loguru import logger
 
 from .config import settings
 
 
-@dataclass
+@dataclass(slots=True)
 class Bar:
     """OHLCV bar."""
     timestamp: int
@@ -30,7 +32,112 @@ def typical(self) -> float:
         return (self.high + self.low + self.close) / 3
 
 
-from dataclasses import dataclass
+class BarSeries:
+    """Columnar, time-sorted OHLCV arrays for a single symbol.
+    
+    Lookups are served with a forward-moving cursor (O(1) while the caller
+    replays time monotonically) and fall back to ``np.searchsorted`` when
+    the caller jumps around. The most recently handed-out ``Bar`` is reused
+    while the cursor stays on the same row, so stepping a clock finer than
+    the bar interval does not allocate.
+    """
+    
+    __slots__ = (
+        "symbol",
+        "timestamp",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+        "_cursor",
+        "_last_bar",
+    )
+    
+    COLUMNS = (
+        ("timestamp", np.int64),
+        ("open", np.float64),
+        ("high", np.float64),
+        ("low", np.float64),
+        ("close", np.float64),
+        ("volume", np.float64),
+    )
+    
+    def __init__(self, symbol: str, **columns: np.ndarray):
+        """Wrap existing column arrays (no copy when dtypes already match).
+        
+        Args:
+            symbol: Trading symbol
+            **columns: One array per name in ``COLUMNS``, sorted by timestamp
+        """
+        self.symbol = symbol
+        for name, dtype in self.COLUMNS:
+            setattr(self, name, np.ascontiguousarray(columns[name], dtype=dtype))
+        self._cursor = -1
+        self._last_bar: Bar | None = None
+    
+    @classmethod
+    def from_frame(cls, symbol: str, df: pd.DataFrame) -> "BarSeries":
+        """Build a series from a timestamp-sorted OHLCV DataFrame."""
+        return cls(symbol, **{name: df[name].to_numpy() for name, _ in cls.COLUMNS})
+    
+    def __len__(self) -> int:
+        return len(self.timestamp)
+    
+    def index_at(self, timestamp: int) -> int:
+        """Return the index of the last bar at or before ``timestamp`` (-1 if none)."""
+        ts = self.timestamp
+        n = len(ts)
+        i = self._cursor
+        if 0 <= i < n and ts[i] <= timestamp:
+            # Fast path: still on the same bar, or the clock moved one bar forward.
+            nxt = i + 1
+            if nxt == n or ts[nxt] > timestamp:
+                return i
+            if nxt + 1 == n or ts[nxt + 1] > timestamp:
+                self._cursor = nxt
+                return nxt
+        i = int(np.searchsorted(ts, timestamp, side="right")) - 1
+        self._cursor = i
+        return i
+    
+    def bar(self, i: int) -> Bar:
+        """Return the bar at row ``i``."""
+        last = self._last_bar
+        ts = int(self.timestamp[i])
+        if last is not None and last.timestamp == ts:
+            return last
+        bar = Bar(
+            timestamp=ts,
+            open=float(self.open[i]),
+            high=float(self.high[i]),
+            low=float(self.low[i]),
+            close=float(self.close[i]),
+            volume=float(self.volume[i]),
+            symbol=self.symbol,
+        )
+        self._last_bar = bar
+        return bar
+    
+    def iter_range(self, lo: int, hi: int) -> Iterator[Bar]:
+        """Yield bars for rows ``lo`` (inclusive) to ``hi`` (exclusive)."""
+        symbol = self.symbol
+        columns = zip(
+            self.timestamp[lo:hi].tolist(),
+            self.open[lo:hi].tolist(),
+            self.high[lo:hi].tolist(),
+            self.low[lo:hi].tolist(),
+            self.close[lo:hi].tolist(),
+            self.volume[lo:hi].tolist(),
+        )
+        for ts, o, h, l, c, v in columns:
+            yield Bar(timestamp=ts, open=o, high=h, low=l, close=c, volume=v, symbol=symbol)
+    
+    def log_returns(self) -> np.ndarray:
+        """Bar-to-bar log returns of the close, NaNs dropped."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.log(self.close[1:] / self.close[:-1])
+        return returns[~np.isnan(returns)]
 
 
 class DataDriver:
@@ -39,6 +146,10 @@ class DataDriver:
     Supports loading from:
     - Local CSV files
     - Ledger-managed data chunks
+    
+    After loading, each symbol is held as a ``BarSeries`` of contiguous
+    NumPy arrays so per-step lookups during replay are O(1) amortised
+    instead of scanning the whole history.
     """
     
     def __init__(self, symbols: list[str] | None = None):
@@ -49,13 +160,15 @@ def __init__(self, symbols: list[str] | None = None):
         """
         self.symbols = symbols or []
         self.data: dict[str, pd.DataFrame] = {}
+        self.series: dict[str, BarSeries] = {}
+        self._vol_cache: dict[tuple[str, int], float] = {}
         self._loaded = False
     
     def load_historical(self, directory: str = None) -> int:
-        """Load historical data from CSV files.
+        """Load historical data from a partitioned Parquet dataset and/or CSV files.
         
         Args:
-            directory: Directory containing CSV files
+            directory: Dataset root or directory containing CSV files
             
         Returns:
             Number of bars loaded
@@ -63,6 +176,9 @@ def load_historical(self, directory: str = None) -> int:
         directory = directory or settings.HISTORICAL_DIR
         total_bars = 0
         
+        if glob.glob(f"{directory}/symbol=*"):
+            total_bars += self.load_dataset(directory)
+        
         # Find all CSV files
         patterns = [
             f"{directory}/*.csv",
@@ -72,11 +188,17 @@ def load_historical(self, directory: str = None) -> int:
         files = []
         for pattern in patterns:
             files.extend(glob.glob(pattern, recursive=True))
+        # "**" also matches the top level, so de-duplicate before parsing
+        files = list(dict.fromkeys(files))
         
         if not files:
-            logger.warning(f"No CSV files found in {directory}")
-            return 0
+            if total_bars == 0:
+                logger.warning(f"No CSV files or Parquet dataset found in {directory}")
+            return total_bars
         
+        # Collect frames per symbol and merge once at the end rather than
+        # re-concatenating and re-sorting the whole history for every file.
+        frames: dict[str, list[pd.DataFrame]] = {}
         for filepath in files:
             try:
                 df = pd.read_csv(filepath)
@@ -102,15 +224,7 @@ def load_historical(self, directory: str = None) -> int:
                 if self.symbols and symbol not in self.symbols:
                     continue
                 
-                # Add to data store
-                df = df.sort_values("timestamp")
-                
-                if symbol in self.data:
-                    self.data[symbol] = pd.concat([self.data[symbol], df]).drop_duplicates(
-                        subset=["timestamp"]
-                    ).sort_values("timestamp")
-                else:
-                    self.data[symbol] = df
+                frames.setdefault(symbol, []).append(df)
                 
                 total_bars += len(df)
                 logger.info(f"Loaded {len(df)} bars for {symbol} from {filepath}")
@@ -118,9 +232,88 @@ def load_historical(self, directory: str = None) -> int:
             except Exception as e:
                 logger.error(f"Error loading {filepath}: {e}")
         
+        for symbol, parts in frames.items():
+            self._merge_frames(symbol, parts)
+        
+        self._vol_cache.clear()
         self._loaded = True
         return total_bars
     
+    def load_dataset(
+        self,
+        directory: str = None,
+        timeframe: str = None,
+        start_ts: int | None = None,
+        end_ts: int | None = None,
+    ) -> int:
+        """Load bars from a symbol/timeframe/day partitioned Parquet dataset.
+        
+        Only row groups overlapping ``[start_ts, end_ts]`` are decoded (ranges
+        come from the ledger when it indexes the dataset, otherwise from the
+        Parquet footers), and the Arrow columns back the ``BarSeries`` arrays
+        without a pandas round-trip.
+        
+        Args:
+            directory: Dataset root (defaults to HISTORICAL_DIR)
+            timeframe: Bar timeframe partition (defaults to settings.TIMEFRAME)
+            start_ts: Inclusive lower bound in ms (defaults to DATA_START_TS)
+            end_ts: Inclusive upper bound in ms (defaults to DATA_END_TS)
+            
+        Returns:
+            Number of bars loaded
+        """
+        try:
+            from services.common import ohlcv_dataset
+        except ImportError:  # service image ships services/common as /app/common
+            from common import ohlcv_dataset
+        
+        directory = directory or settings.HISTORICAL_DIR
+        timeframe = timeframe or settings.TIMEFRAME
+        if start_ts is None:
+            start_ts = settings.DATA_START_TS or None
+        if end_ts is None:
+            end_ts = settings.DATA_END_TS or None
+        
+        total_bars = 0
+        for symbol in ohlcv_dataset.symbols(directory, timeframe):
+            if self.symbols and symbol not in self.symbols:
+                continue
+            table = ohlcv_dataset.read(
+                directory, symbol, timeframe, start_ts, end_ts,
+                db_path=settings.LEDGER_DB,
+            )
+            if table.num_rows == 0:
+                continue
+            columns = {name: table.column(name).to_numpy() for name, _ in BarSeries.COLUMNS}
+            if symbol in self.series:
+                self._merge_frames(symbol, [pd.DataFrame(columns)])
+            else:
+                self.series[symbol] = BarSeries(symbol, **columns)
+            total_bars += table.num_rows
+            logger.info(f"Loaded {table.num_rows} bars for {symbol} from dataset {directory}")
+        
+        self._vol_cache.clear()
+        self._loaded = True
+        return total_bars
+    
+    def _merge_frames(self, symbol: str, parts: list[pd.DataFrame]) -> None:
+        """Merge new frames into whatever is already loaded for ``symbol``."""
+        if symbol in self.data:
+            parts.insert(0, self.data[symbol])
+        elif symbol in self.series:
+            existing = self.series[symbol]
+            parts.insert(0, pd.DataFrame(
+                {name: getattr(existing, name) for name, _ in BarSeries.COLUMNS}
+            ))
+        if len(parts) == 1:
+            df = parts[0].sort_values("timestamp")
+        else:
+            df = pd.concat(parts, ignore_index=True).drop_duplicates(
+                subset=["timestamp"]
+            ).sort_values("timestamp")
+        self.data[symbol] = df.reset_index(drop=True)
+        self.series[symbol] = BarSeries.from_frame(symbol, self.data[symbol])
+    
     def load_from_incoming(self, directory: str = None) -> int:
         """Load data from the incoming data directory.
         
@@ -133,9 +326,19 @@ def load_from_incoming(self, directory: str = None) -> int:
         directory = directory or settings.DATA_INCOMING
         return self.load_historical(directory)
     
+    def add_series(self, series: BarSeries) -> None:
+        """Register pre-built bar arrays (e.g. views on shared memory)."""
+        self.series[series.symbol] = series
+        self._vol_cache.clear()
+        self._loaded = True
+    
     def get_symbols(self) -> list[str]:
         """Get list of available symbols."""
-        return list(self.data.keys())
+        return list(self.series.keys())
+    
+    def get_series(self, symbol: str) -> BarSeries | None:
+        """Get the columnar bar arrays for a symbol."""
+        return self.series.get(symbol)
     
     def get_time_range(self) -> tuple[int, int]:
         """Get the full time range across all symbols.
@@ -143,11 +346,12 @@ def get_time_range(self) -> tuple[int, int]:
         Returns:
             Tuple of (start_ts, end_ts) in milliseconds
         """
-        if not self.data:
+        series = [s for s in self.series.values() if len(s)]
+        if not series:
             return (0, 0)
         
-        start = min(df["timestamp"].min() for df in self.data.values())
-        end = max(df["timestamp"].max() for df in self.data.values())
+        start = min(s.timestamp[0] for s in series)
+        end = max(s.timestamp[-1] for s in series)
         return (int(start), int(end))
     
     def get_bar_at(self, symbol: str, timestamp: int) -> Bar | None:
@@ -160,25 +364,14 @@ def get_bar_at(self, symbol: str, timestamp: int) -> Bar | None:
         Returns:
             Bar object or None if not found
         """
-        if symbol not in self.data:
+        series = self.series.get(symbol)
+        if series is None:
             return None
         
-        df = self.data[symbol]
-        mask = df["timestamp"] <= timestamp
-        
-        if not mask.any():
+        i = series.index_at(timestamp)
+        if i < 0:
             return None
-        
-        row = df[mask].iloc[-1]
-        return Bar(
-            timestamp=int(row["timestamp"]),
-            open=float(row["open"]),
-            high=float(row["high"]),
-            low=float(row["low"]),
-            close=float(row["close"]),
-            volume=float(row["volume"]),
-            symbol=symbol,
-        )
+        return series.bar(i)
     
     def get_bars_range(
         self, symbol: str, start_ts: int, end_ts: int
@@ -193,25 +386,13 @@ def get_bars_range(
         Returns:
             List of Bar objects
         """
-        if symbol not in self.data:
+        series = self.series.get(symbol)
+        if series is None:
             return []
         
-        df = self.data[symbol]
-        mask = (df["timestamp"] >= start_ts) & (df["timestamp"] <= end_ts)
-        
-        bars = []
-        for _, row in df[mask].iterrows():
-            bars.append(Bar(
-                timestamp=int(row["timestamp"]),
-                open=float(row["open"]),
-                high=float(row["high"]),
-                low=float(row["low"]),
-                close=float(row["close"]),
-                volume=float(row["volume"]),
-                symbol=symbol,
-            ))
-        
-        return bars
+        lo = int(np.searchsorted(series.timestamp, start_ts, side="left"))
+        hi = int(np.searchsorted(series.timestamp, end_ts, side="right"))
+        return list(series.iter_range(lo, hi))
     
     def iter_bars(self, symbol: str) -> Iterator[Bar]:
         """Iterate through all bars for a symbol.
@@ -219,19 +400,11 @@ def iter_bars(self, symbol: str) -> Iterator[Bar]:
         Yields:
             Bar objects in chronological order
         """
-        if symbol not in self.data:
+        series = self.series.get(symbol)
+        if series is None:
             return
         
-        for _, row in self.data[symbol].iterrows():
-            yield Bar(
-                timestamp=int(row["timestamp"]),
-                open=float(row["open"]),
-                high=float(row["high"]),
-                low=float(row["low"]),
-                close=float(row["close"]),
-                volume=float(row["volume"]),
-                symbol=symbol,
-            )
+        yield from series.iter_range(0, len(series))
     
     def compute_returns(self, symbol: str, lookback: int = 20) -> pd.Series:
         """Compute log returns for a symbol.
@@ -243,17 +416,20 @@ def compute_returns(self, symbol: str, lookback: int = 20) -> pd.Series:
         Returns:
             Series of log returns
         """
-        if symbol not in self.data:
+        series = self.series.get(symbol)
+        if series is None:
             return pd.Series()
         
-        df = self.data[symbol]
-        import numpy as np
-        returns = np.log(df["close"] / df["close"].shift(1))
+        close = pd.Series(series.close)
+        returns = np.log(close / close.shift(1))
         return returns.dropna()
     
     def compute_volatility(self, symbol: str, lookback: int = 20) -> float:
         """Compute recent volatility for a symbol.
         
+        The value only depends on the loaded history, so it is computed once
+        per (symbol, lookback) and cached until the next load.
+        
         Args:
             symbol: Trading symbol
             lookback: Number of bars for volatility calculation
@@ -261,11 +437,19 @@ def compute_volatility(self, symbol: str, lookback: int = 20) -> float:
         Returns:
             Annualized volatility
         """
-        returns = self.compute_returns(symbol, lookback)
-        if len(returns) < 2:
-            return 0.02  # Default 2%
+        key = (symbol, lookback)
+        cached = self._vol_cache.get(key)
+        if cached is not None:
+            return cached
         
-        import numpy as np
-        std = returns.tail(lookback).std()
-        # Annualize (assuming minute bars)
-        return float(std * np.sqrt(525600))  # Minutes per year
+        series = self.series.get(symbol)
+        returns = series.log_returns() if series is not None else np.empty(0)
+        if len(returns) < 2:
+            value = 0.02  # Default 2%
+        else:
+            tail = returns[-lookback:]
+            std = float(np.std(tail, ddof=1)) if len(tail) > 1 else float("nan")
+            # Annualize (assuming minute bars)
+            value = float(std * np.sqrt(525600))  # Minutes per year
+        self._vol_cache[key] = value
+        return value
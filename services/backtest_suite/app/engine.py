@@ -54,6 +54,9 @@ def __init__(
         self.current_positions: dict[str, dict] = {}  # symbol -> position info
         self.last_retrain_ts: int = 0
         self.run_id = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        
+        # Stop early once drawdown exceeds this fraction (None = never)
+        self.abort_drawdown: float | None = None
     
     def _init_strategy(self) -> None:
         """Initialize the trading strategy."""
@@ -74,16 +77,35 @@ def load_data(self) -> int:
             bars = self.driver.load_from_incoming()
         
         if bars > 0:
-            start, end = self.driver.get_time_range()
-            step_ms = settings.STEP_MINUTES * 60 * 1000
-            self.clock = SimulationClock(start, end, step_ms)
-            logger.info(
-                f"Loaded {bars} bars for {len(self.driver.get_symbols())} symbols, "
-                f"time range: {datetime.fromtimestamp(start/1000)} to {datetime.fromtimestamp(end/1000)}"
-            )
+            self._init_clock()
+        
+        return bars
+    
+    def attach_data(self, driver: DataDriver) -> int:
+        """Use an already-loaded data driver instead of reading files.
+        
+        Lets callers running many backtests over the same history (grid
+        search) load and sort the data once.
         
+        Returns:
+            Number of bars available
+        """
+        self.driver = driver
+        bars = sum(len(driver.get_series(s)) for s in driver.get_symbols())
+        if bars > 0:
+            self._init_clock()
         return bars
     
+    def _init_clock(self) -> None:
+        """Create the simulation clock spanning the loaded data."""
+        start, end = self.driver.get_time_range()
+        step_ms = settings.STEP_MINUTES * 60 * 1000
+        self.clock = SimulationClock(start, end, step_ms)
+        logger.info(
+            f"Loaded {len(self.driver.get_symbols())} symbols, "
+            f"time range: {datetime.fromtimestamp(start/1000)} to {datetime.fromtimestamp(end/1000)}"
+        )
+    
     def run(self) -> dict[str, Any]:
         """Run the backtest simulation.
         
@@ -104,6 +126,8 @@ def run(self) -> dict[str, Any]:
         logger.info(f"Strategy: {self.strategy_type}, Initial equity: {self.initial_equity}")
         
         step = 0
+        aborted = False
+        peak_equity = float("-inf")
         for ts in self.clock.iter_steps():
             # Get current bars for all symbols
             current_bars: dict[str, Bar] = {}
@@ -143,6 +167,15 @@ def run(self) -> dict[str, Any]:
                     f"Equity: ${self.portfolio.equity:.2f}, "
                     f"Trades: {self.portfolio.trade_count}"
                 )
+            
+            # Stop runs that can no longer meet the drawdown limit
+            if self.abort_drawdown is not None:
+                equity = self.portfolio.equity
+                peak_equity = max(peak_equity, equity)
+                if peak_equity > 0 and (peak_equity - equity) / peak_equity > self.abort_drawdown:
+                    logger.info(f"Drawdown limit {self.abort_drawdown:.2%} breached, stopping run")
+                    aborted = True
+                    break
         
         # Compute final metrics
         metrics = self.metrics.compute_metrics()
@@ -160,6 +193,7 @@ def run(self) -> dict[str, Any]:
             "metrics": metrics.to_dict(),
             "symbols": symbols,
             "bars_processed": step,
+            "aborted": aborted,
         }
     
     def _should_retrain(self, ts: int) -> bool:
@@ -2,14 +2,19 @@
 
 import itertools
 import json
-from dataclasses import dataclass, field
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from multiprocessing.shared_memory import SharedMemory
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
+import numpy as np
 from loguru import logger
 
 from .config import settings
-from .engine import BacktestEngine
+from .driver import BarSeries, DataDriver
+from .vectorized import ENGINE_MODES
 
 
 @dataclass
@@ -18,6 +23,7 @@ class GridSearchResult:
     params: dict[str, Any]
     metrics: dict[str, float]
     run_id: str
+    pruned: bool = False  # stopped early by the drawdown limit
 
 
 @dataclass
@@ -35,6 +41,7 @@ def to_dict(self) -> dict[str, Any]:
             "symbol": self.symbol,
             "param_grid": self.param_grid,
             "total_runs": len(self.all_results),
+            "pruned_runs": sum(1 for r in self.all_results if r.pruned),
             "best_params": self.best_result.params if self.best_result else None,
             "best_metrics": self.best_result.metrics if self.best_result else None,
             "best_run_id": self.best_result.run_id if self.best_result else None,
@@ -46,6 +53,10 @@ class GridSearch:
     
     Runs backtests across all combinations of parameter values
     and identifies the best-performing configuration.
+    
+    Market data is loaded once per search. With ``workers > 1`` the bar
+    arrays are placed in shared memory and combinations are fanned out over
+    a process pool; results are streamed back as runs finish.
     """
     
     def __init__(
@@ -54,6 +65,9 @@ def __init__(
         symbols: list[str] | None = None,
         initial_equity: float = 10000.0,
         metric: str = "sharpe_ratio",
+        engine: str = "event",
+        workers: int = 1,
+        abort_drawdown: float | None = None,
     ):
         """Initialize grid search.
         
@@ -62,11 +76,18 @@ def __init__(
             symbols: Symbols to backtest
             initial_equity: Starting equity
             metric: Metric to optimize ("sharpe_ratio", "total_return", etc.)
+            engine: Engine mode ("event" or "vectorized")
+            workers: Worker processes (1 = run in-process, 0 = one per CPU)
+            abort_drawdown: Stop a run once its drawdown exceeds this
+                fraction; such runs are reported as pruned and never win
         """
         self.strategy = strategy
         self.symbols = symbols
         self.initial_equity = initial_equity
         self.metric = metric
+        self.engine = engine
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.abort_drawdown = abort_drawdown
         self.results: list[GridSearchResult] = []
     
     def search(
@@ -83,39 +104,20 @@ def search(
         Returns:
             GridSearchSummary with results
         """
-        # Generate all combinations
-        param_names = list(param_grid.keys())
-        param_values = list(param_grid.values())
-        combinations = list(itertools.product(*param_values))
-        
-        if max_runs and len(combinations) > max_runs:
-            logger.warning(
-                f"Grid has {len(combinations)} combinations, limiting to {max_runs}"
-            )
-            combinations = combinations[:max_runs]
-        
-        logger.info(f"Starting grid search with {len(combinations)} parameter combinations")
-        
         self.results = []
         best_result = None
         best_metric_value = float("-inf")
         
-        for i, combo in enumerate(combinations):
-            params = dict(zip(param_names, combo))
-            logger.info(f"[{i+1}/{len(combinations)}] Testing params: {params}")
+        for result in self.iter_results(param_grid, max_runs):
+            self.results.append(result)
+            if result.pruned:
+                continue
             
-            try:
-                result = self._run_single(params)
-                self.results.append(result)
-                
-                metric_value = result.metrics.get(self.metric, float("-inf"))
-                if metric_value > best_metric_value:
-                    best_metric_value = metric_value
-                    best_result = result
-                    logger.info(f"  New best {self.metric}: {metric_value:.4f}")
-                    
-            except Exception as e:
-                logger.error(f"  Failed: {e}")
+            metric_value = result.metrics.get(self.metric, float("-inf"))
+            if metric_value > best_metric_value:
+                best_metric_value = metric_value
+                best_result = result
+                logger.info(f"  New best {self.metric}: {metric_value:.4f}")
         
         summary = GridSearchSummary(
             best_result=best_result,
@@ -130,13 +132,99 @@ def search(
         
         return summary
     
-    def _run_single(self, params: dict[str, Any]) -> GridSearchResult:
+    def iter_results(
+        self,
+        param_grid: dict[str, list],
+        max_runs: int | None = None,
+    ) -> Iterator[GridSearchResult]:
+        """Run the grid and yield each result as soon as it finishes.
+        
+        Results arrive in completion order when running in parallel.
+        Closing the iterator early cancels runs that have not started.
+        
+        Args:
+            param_grid: Dict of parameter names to list of values
+            max_runs: Optional limit on number of runs
+            
+        Yields:
+            GridSearchResult per completed run
+        """
+        # Generate all combinations
+        param_names = list(param_grid.keys())
+        param_values = list(param_grid.values())
+        combinations = list(itertools.product(*param_values))
+        
+        if max_runs and len(combinations) > max_runs:
+            logger.warning(
+                f"Grid has {len(combinations)} combinations, limiting to {max_runs}"
+            )
+            combinations = combinations[:max_runs]
+        
+        logger.info(f"Starting grid search with {len(combinations)} parameter combinations")
+        
+        driver = self._load_data()
+        if not driver.get_symbols():
+            logger.error("No data loaded, cannot run grid search")
+            return
+        
+        runs = [dict(zip(param_names, combo)) for combo in combinations]
+        if self.workers <= 1 or len(runs) <= 1:
+            for i, params in enumerate(runs):
+                logger.info(f"[{i+1}/{len(runs)}] Testing params: {params}")
+                try:
+                    yield self._run_single(params, driver, i)
+                except Exception as e:
+                    logger.error(f"  Failed: {e}")
+            return
+        
+        blocks, spec = _share_series(driver)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(runs)),
+                initializer=_init_worker,
+                initargs=(spec, self, asdict(settings)),
+            ) as pool:
+                futures = {
+                    pool.submit(_run_in_worker, params, i): params
+                    for i, params in enumerate(runs)
+                }
+                try:
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            logger.error(f"  Failed {futures[future]}: {e}")
+                            continue
+                        logger.info(f"[{done}/{len(runs)}] Finished params: {result.params}")
+                        yield result
+                finally:
+                    for future in futures:
+                        future.cancel()
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+    
+    def _load_data(self) -> DataDriver:
+        """Load market data once for every run in the grid."""
+        driver = DataDriver(self.symbols)
+        if driver.load_historical() == 0:
+            driver.load_from_incoming()
+        return driver
+    
+    def _run_single(
+        self, params: dict[str, Any], driver: DataDriver, index: int = 0
+    ) -> GridSearchResult:
         """Run a single backtest with given parameters."""
-        engine = BacktestEngine(
+        engine = ENGINE_MODES[self.engine](
             symbols=self.symbols,
             strategy=self.strategy,
             initial_equity=self.initial_equity,
         )
+        engine.attach_data(driver)
+        engine.abort_drawdown = self.abort_drawdown
+        # Runs finishing within the same second must not overwrite each other
+        engine.run_id = f"{engine.run_id}_{index:04d}"
         
         # Apply parameters to strategy
         if hasattr(engine.strategy, "__dict__"):
@@ -151,6 +239,7 @@ def _run_single(self, params: dict[str, Any]) -> GridSearchResult:
             params=params,
             metrics=result.get("metrics", {}),
             run_id=result.get("run_id", "unknown"),
+            pruned=bool(result.get("aborted", False)),
         )
     
     def _save_summary(self, summary: GridSearchSummary) -> None:
@@ -165,6 +254,75 @@ def _save_summary(self, summary: GridSearchSummary) -> None:
         logger.info(f"Grid search results saved to: {summary_file}")
 
 
+# Per-process state for pool workers, set by _init_worker
+_WORKER: dict[str, Any] = {}
+
+
+def _share_series(driver: DataDriver) -> tuple[list[SharedMemory], dict[str, Any]]:
+    """Copy every symbol's bar arrays into shared memory, one block per column.
+    
+    Returns:
+        The owned shared-memory blocks and a picklable spec to attach to them
+    """
+    symbols = driver.get_symbols()
+    lengths = [len(driver.get_series(s)) for s in symbols]
+    total = sum(lengths)
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).tolist()
+    
+    blocks: list[SharedMemory] = []
+    columns: dict[str, str] = {}
+    try:
+        for name, dtype in BarSeries.COLUMNS:
+            block = SharedMemory(create=True, size=max(total * np.dtype(dtype).itemsize, 1))
+            blocks.append(block)
+            shared = np.ndarray((total,), dtype=dtype, buffer=block.buf)
+            for symbol, start, stop in zip(symbols, offsets[:-1], offsets[1:]):
+                shared[start:stop] = getattr(driver.get_series(symbol), name)
+            columns[name] = block.name
+    except Exception:
+        for block in blocks:
+            block.close()
+            block.unlink()
+        raise
+    
+    spec = {
+        "total": total,
+        "columns": columns,
+        "symbols": list(zip(symbols, offsets[:-1], offsets[1:])),
+    }
+    return blocks, spec
+
+
+def _attach_series(spec: dict[str, Any]) -> tuple[DataDriver, list[SharedMemory]]:
+    """Build a DataDriver whose bar arrays are views on the shared blocks."""
+    blocks = []
+    arrays = {}
+    for name, dtype in BarSeries.COLUMNS:
+        block = SharedMemory(name=spec["columns"][name])
+        blocks.append(block)
+        arrays[name] = np.ndarray((spec["total"],), dtype=dtype, buffer=block.buf)
+    
+    driver = DataDriver([s for s, _, _ in spec["symbols"]])
+    for symbol, start, stop in spec["symbols"]:
+        driver.add_series(
+            BarSeries(symbol, **{name: arr[start:stop] for name, arr in arrays.items()})
+        )
+    return driver, blocks
+
+
+def _init_worker(spec: dict[str, Any], search: GridSearch, config: dict[str, Any]) -> None:
+    """Pool initializer: attach to the shared market data once per process."""
+    for key, value in config.items():
+        setattr(settings, key, value)
+    driver, blocks = _attach_series(spec)
+    _WORKER.update(driver=driver, blocks=blocks, search=search)
+
+
+def _run_in_worker(params: dict[str, Any], index: int) -> GridSearchResult:
+    """Run one grid point inside a pool worker."""
+    return _WORKER["search"]._run_single(params, _WORKER["driver"], index)
+
+
 def run_momentum_grid_search() -> GridSearchSummary:
     """Run grid search for momentum strategy."""
     param_grid = {
@@ -110,6 +110,8 @@ def __init__(self, initial_equity: float = 10000.0):
         self.equity_curve: list[EquityPoint] = []
         self.trades: list[TradeRecord] = []
         self.returns: list[float] = []
+        # Column-oriented curve set in bulk by the vectorized engine
+        self._curve: dict[str, np.ndarray] | None = None
     
     def record_equity(
         self,
@@ -137,6 +139,45 @@ def record_equity(
                 ret = (equity - prev) / prev
                 self.returns.append(ret)
     
+    def set_equity_curve(
+        self,
+        timestamps: np.ndarray,
+        equity: np.ndarray,
+        cash: np.ndarray,
+        exposure: np.ndarray,
+        unrealized_pnl: np.ndarray,
+        realized_pnl: np.ndarray,
+    ) -> None:
+        """Set the whole equity curve at once from column arrays.
+        
+        Used by the vectorized engine instead of one ``record_equity`` call
+        per step. Replaces anything recorded so far.
+        """
+        self.equity_curve = []
+        self._curve = {
+            "timestamp": np.asarray(timestamps, dtype=np.int64),
+            "equity": np.asarray(equity, dtype=np.float64),
+            "cash": np.asarray(cash, dtype=np.float64),
+            "exposure": np.asarray(exposure, dtype=np.float64),
+            "unrealized_pnl": np.asarray(unrealized_pnl, dtype=np.float64),
+            "realized_pnl": np.asarray(realized_pnl, dtype=np.float64),
+        }
+        equity = self._curve["equity"]
+        prev = equity[:-1]
+        positive = prev > 0
+        self.returns = ((equity[1:][positive] - prev[positive]) / prev[positive]).tolist()
+    
+    def _column(self, name: str) -> np.ndarray:
+        """Return one equity-curve column as an array."""
+        if self._curve is not None:
+            return self._curve[name]
+        dtype = np.int64 if name == "timestamp" else np.float64
+        return np.fromiter(
+            (getattr(p, name) for p in self.equity_curve),
+            dtype=dtype,
+            count=len(self.equity_curve),
+        )
+    
     def record_trade(self, trade: TradeRecord) -> None:
         """Record a completed trade."""
         self.trades.append(trade)
@@ -149,17 +190,19 @@ def compute_metrics(self) -> BacktestMetrics:
         """
         metrics = BacktestMetrics()
         
-        if not self.equity_curve:
+        timestamps = self._column("timestamp")
+        equity_values = self._column("equity")
+        if len(equity_values) == 0:
             return metrics
         
         # Time range
-        metrics.start_timestamp = self.equity_curve[0].timestamp
-        metrics.end_timestamp = self.equity_curve[-1].timestamp
-        metrics.total_bars = len(self.equity_curve)
+        metrics.start_timestamp = int(timestamps[0])
+        metrics.end_timestamp = int(timestamps[-1])
+        metrics.total_bars = len(equity_values)
         metrics.total_trades = len(self.trades)
         
         # Final equity
-        metrics.final_equity = self.equity_curve[-1].equity
+        metrics.final_equity = float(equity_values[-1])
         
         # Total return
         if self.initial_equity > 0:
@@ -191,27 +234,19 @@ def compute_metrics(self) -> BacktestMetrics:
                     metrics.sortino_ratio = mean_return / downside_std
         
         # Max drawdown
-        equity_values = [p.equity for p in self.equity_curve]
-        if equity_values:
-            metrics.peak_equity = max(equity_values)
-            peak = equity_values[0]
-            max_dd = 0.0
-            dd_start = 0
-            max_dd_duration = 0
-            
-            for i, eq in enumerate(equity_values):
-                if eq > peak:
-                    peak = eq
-                    dd_start = i
-                dd = (peak - eq) / peak if peak > 0 else 0
-                if dd > max_dd:
-                    max_dd = dd
-                    max_dd_duration = i - dd_start
-            
-            metrics.max_drawdown = max_dd
-            if len(self.equity_curve) > 1:
-                step_ms = self.equity_curve[1].timestamp - self.equity_curve[0].timestamp
-                metrics.max_drawdown_duration_ms = max_dd_duration * step_ms
+        metrics.peak_equity = float(equity_values.max())
+        peaks = np.maximum.accumulate(equity_values)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdowns = np.where(peaks > 0, (peaks - equity_values) / peaks, 0.0)
+        worst = int(np.argmax(drawdowns))
+        if drawdowns[worst] > 0:
+            metrics.max_drawdown = float(drawdowns[worst])
+            # The drawdown started at the last strictly-new peak before the trough
+            new_peaks = np.flatnonzero(equity_values[1 : worst + 1] > peaks[:worst]) + 1
+            dd_start = int(new_peaks[-1]) if len(new_peaks) else 0
+            if len(equity_values) > 1:
+                step_ms = int(timestamps[1] - timestamps[0])
+                metrics.max_drawdown_duration_ms = (worst - dd_start) * step_ms
         
         # Trade statistics
         if self.trades:
@@ -237,16 +272,15 @@ def compute_metrics(self) -> BacktestMetrics:
             metrics.total_fees = sum(t.fees for t in self.trades)
         
         # Total costs from equity curve
-        if self.equity_curve:
-            metrics.total_fees = max(
-                metrics.total_fees,
-                sum(p.realized_pnl for p in self.equity_curve if p.realized_pnl < 0)
-            )
+        realized = self._column("realized_pnl")
+        metrics.total_fees = max(metrics.total_fees, float(realized[realized < 0].sum()))
         
         return metrics
     
     def to_dataframe(self) -> pd.DataFrame:
         """Convert equity curve to DataFrame."""
+        if self._curve is not None:
+            return pd.DataFrame(self._curve)
         if not self.equity_curve:
             return pd.DataFrame()
         
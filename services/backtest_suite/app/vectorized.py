@@ -0,0 +1,417 @@
+"""Vectorized fast-path backtest engine.
+
+Computes strategy signals, the equity curve and the portfolio aggregates as
+whole-array NumPy operations instead of stepping every bar through
+``strategy.on_bar``, ``ExecutionModel`` and ``Portfolio``.
+
+Only the (sparse) bars that actually produce a signal are replayed through
+``BacktestEngine._process_signal``, so fills, fees, slippage, position sizing
+and trade records come from exactly the same code as the event-driven path.
+The result is the same ``BacktestMetrics`` the event-driven engine reports.
+"""
+
+from typing import Any
+
+import numpy as np
+from loguru import logger
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .config import settings
+from .driver import BarSeries
+from .engine import BacktestEngine
+from .strategies import MomentumStrategy, Signal, TrendFollowStrategy
+
+# Trend-follow per-bar condition codes fed to the position state machine
+_NONE, _LONG, _LONG_FLAT, _SHORT, _SHORT_FLAT, _FLAT = range(6)
+
+
+def _trailing_sum(values: np.ndarray, window: int, counts: np.ndarray | None = None) -> np.ndarray:
+    """Sum of the ``window`` values ending at each index, oldest first.
+
+    Accumulates column by column so the floating-point result is identical
+    to Python's ``sum()`` over the same list. Indices with fewer than
+    ``window`` predecessors only sum what is available. When ``counts`` is
+    given, only the last ``counts[i]`` values are included at index ``i``.
+    """
+    n = len(values)
+    total = np.zeros(n, dtype=np.float64)
+    for lag in range(window - 1, -1, -1):
+        shifted = np.zeros(n, dtype=np.float64)
+        shifted[lag:] = values[: n - lag]
+        if counts is not None:
+            shifted[counts <= lag] = 0.0
+        total = total + shifted
+    return total
+
+
+def momentum_signals(
+    strategy: MomentumStrategy,
+    close: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    volume: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized ``MomentumStrategy.on_bar`` over a fed bar sequence.
+
+    Returns:
+        Tuple of (buy, sell) boolean arrays aligned with the input bars
+    """
+    n = len(close)
+    lookback = strategy.lookback
+    buy = np.zeros(n, dtype=bool)
+    sell = np.zeros(n, dtype=bool)
+    if lookback < 2 or n < lookback:
+        return buy, sell
+
+    last = close[lookback - 1 :]
+    first = close[: n - lookback + 1]
+    # Window of the lookback bars *before* the current one
+    prior_high = sliding_window_view(high[:-1], lookback - 1).max(axis=1)
+    prior_low = sliding_window_view(low[:-1], lookback - 1).min(axis=1)
+    prior_volume = _trailing_sum(volume[:-1], lookback - 1)[lookback - 2 :]
+    avg_volume = prior_volume / (lookback - 1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        momentum = (last - first) / first
+        vol_ratio = np.where(avg_volume <= 0, 1.0, volume[lookback - 1 :] / avg_volume)
+
+    valid = first > 0
+    confirmed = vol_ratio > strategy.volume_ratio
+    bullish = (momentum > strategy.momentum_threshold) & confirmed
+    bearish = ~bullish & (momentum < -strategy.momentum_threshold) & confirmed
+    buy[lookback - 1 :] = valid & bullish & (last > prior_high)
+    sell[lookback - 1 :] = valid & bearish & (last < prior_low)
+    return buy, sell
+
+
+def trend_follow_indicators(
+    strategy: TrendFollowStrategy,
+    close: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+) -> dict[str, np.ndarray]:
+    """Vectorized MA / ATR / trend-strength series for ``TrendFollowStrategy``.
+
+    Mirrors the bounded history window ``on_bar`` keeps per symbol, so values
+    match bar for bar.
+    """
+    n = len(close)
+    max_period = max(strategy.slow_period, strategy.atr_period) + 10
+    history_len = np.minimum(np.arange(1, n + 1), max_period)
+
+    fast_ma = _trailing_sum(close, strategy.fast_period, history_len) / strategy.fast_period
+    slow_ma = _trailing_sum(close, strategy.slow_period, history_len) / strategy.slow_period
+
+    prev_slow_ma = np.zeros(n, dtype=np.float64)
+    if n > 5:
+        prev_slow_ma[5:] = _trailing_sum(close[:-5], strategy.slow_period) / strategy.slow_period
+    with np.errstate(divide="ignore", invalid="ignore"):
+        trend_strength = np.where(
+            (history_len >= strategy.slow_period + 5) & (slow_ma > 0),
+            (slow_ma - prev_slow_ma) / slow_ma,
+            0.0,
+        )
+
+    # True range of each bar against the previous close
+    prev_close = np.empty(n, dtype=np.float64)
+    prev_close[0] = close[0] if n else 0.0
+    prev_close[1:] = close[:-1]
+    true_range = np.maximum(
+        np.maximum(high - low, np.abs(high - prev_close)), np.abs(low - prev_close)
+    )
+    # on_bar sums the ATR terms newest first over min(atr_period, len - 1) bars
+    tr_count = np.minimum(strategy.atr_period + 1, history_len) - 1
+    tr_sum = np.zeros(n, dtype=np.float64)
+    for lag in range(strategy.atr_period):
+        shifted = np.zeros(n, dtype=np.float64)
+        shifted[lag:] = true_range[: n - lag]
+        shifted[tr_count <= lag] = 0.0
+        tr_sum = tr_sum + shifted
+    with np.errstate(divide="ignore", invalid="ignore"):
+        atr = np.where(tr_count > 0, tr_sum / tr_count, close * 0.02)
+
+    return {
+        "fast_ma": fast_ma,
+        "slow_ma": slow_ma,
+        "trend_strength": trend_strength,
+        "atr": atr,
+        "ready": history_len >= strategy.slow_period,
+    }
+
+
+def trend_follow_signals(
+    strategy: TrendFollowStrategy,
+    close: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, dict[str, np.ndarray]]:
+    """Vectorized ``TrendFollowStrategy.on_bar`` over a fed bar sequence.
+
+    The crossover conditions are computed as arrays; only the bars where
+    the LONG/SHORT/FLAT state can change are walked to resolve the state
+    machine.
+
+    Returns:
+        Tuple of (buy, sell, indicators) aligned with the input bars
+    """
+    ind = trend_follow_indicators(strategy, close, high, low)
+    fast_ma, slow_ma = ind["fast_ma"], ind["slow_ma"]
+    trend = ind["trend_strength"]
+    ready = ind["ready"]
+
+    long_cond = ready & (fast_ma > slow_ma) & (trend > strategy.min_trend_strength)
+    short_cond = ready & (fast_ma < slow_ma) & (trend < -strategy.min_trend_strength)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        converged = ready & (np.abs(fast_ma - slow_ma) / slow_ma < 0.001)
+
+    codes = np.full(len(close), _NONE, dtype=np.int8)
+    codes[converged] = _FLAT
+    codes[long_cond] = np.where(converged[long_cond], _LONG_FLAT, _LONG)
+    codes[short_cond] = np.where(converged[short_cond], _SHORT_FLAT, _SHORT)
+
+    buy = np.zeros(len(close), dtype=bool)
+    sell = np.zeros(len(close), dtype=bool)
+    state = "FLAT"
+    for i, code in zip(np.flatnonzero(codes).tolist(), codes[codes != _NONE].tolist()):
+        if code == _LONG or code == _LONG_FLAT:
+            if state != "LONG":
+                state = "LONG"
+                buy[i] = True
+            elif code == _LONG_FLAT:
+                state = "FLAT"
+        elif code == _SHORT or code == _SHORT_FLAT:
+            if state != "SHORT":
+                state = "SHORT"
+                sell[i] = True
+            elif code == _SHORT_FLAT:
+                state = "FLAT"
+        else:
+            state = "FLAT"
+    return buy, sell, ind
+
+
+class VectorizedBacktestEngine(BacktestEngine):
+    """Whole-array fast path for the stateless bar strategies.
+
+    Produces the same metrics as ``BacktestEngine.run`` for
+    ``MomentumStrategy`` and ``TrendFollowStrategy``. Prequential retraining
+    is skipped: it only calls out to the ML service and does not feed back
+    into these strategies' signals.
+    """
+
+    def run(self) -> dict[str, Any]:
+        """Run the backtest simulation.
+
+        Returns:
+            Dict with results including metrics
+        """
+        if self.clock is None:
+            bars = self.load_data()
+            if bars == 0:
+                logger.error("No data loaded, cannot run backtest")
+                return {"error": "No data loaded"}
+
+        symbols = self.driver.get_symbols()
+        if not symbols:
+            return {"error": "No symbols available"}
+
+        logger.info(f"Starting vectorized backtest with {len(symbols)} symbols")
+        logger.info(f"Strategy: {self.strategy_type}, Initial equity: {self.initial_equity}")
+
+        # Same step grid as SimulationClock.iter_steps()
+        clock = self.clock
+        n_steps = max(0, -(-(clock.end_ts - clock.start_ts) // clock.step_ms))
+        steps = clock.start_ts + np.arange(n_steps, dtype=np.int64) * clock.step_ms
+
+        # Row of each symbol's bar at or before every step (-1 = no bar yet)
+        self._levels: dict[str, dict[str, np.ndarray]] = {}
+        rows: dict[str, np.ndarray] = {}
+        prices: dict[str, np.ndarray] = {}
+        events: list[tuple[int, int, str, int]] = []
+        for order, symbol in enumerate(symbols):
+            series = self.driver.get_series(symbol)
+            idx = np.searchsorted(series.timestamp, steps, side="right") - 1
+            rows[symbol] = idx
+            prices[symbol] = np.where(idx >= 0, series.close[np.maximum(idx, 0)], np.nan)
+
+            fed_steps = np.flatnonzero(idx >= 0)
+            fed = idx[fed_steps]
+            buy, sell, levels = self._signals(series, fed)
+            for side, mask in (("BUY", buy), ("SELL", sell)):
+                for pos in np.flatnonzero(mask).tolist():
+                    events.append((int(fed_steps[pos]), order, side, pos))
+            self._levels[symbol] = levels
+
+        active = np.zeros(n_steps, dtype=bool)
+        for idx in rows.values():
+            active |= idx >= 0
+
+        events.sort()
+        cash_at: list[tuple[int, float, float, float]] = []
+        intervals: dict[str, list[tuple[int, int, float, float]]] = {s: [] for s in symbols}
+        opened: dict[str, tuple[int, float, float]] = {}
+
+        i = 0
+        while i < len(events):
+            step = events[i][0]
+            ts = int(steps[step])
+            # Unrealized PnL as of the previous step's mark-to-market, which
+            # is what position sizing sees in the event-driven loop
+            for symbol, pos in self.portfolio.positions.items():
+                if pos.is_open():
+                    pos.unrealized_pnl = (prices[symbol][step - 1] - pos.avg_entry_price) * pos.quantity
+
+            while i < len(events) and events[i][0] == step:
+                _, order, side, fed_pos = events[i]
+                symbol = symbols[order]
+                bar = self.driver.get_series(symbol).bar(int(rows[symbol][step]))
+                signal = self._make_signal(symbol, side, bar.close, fed_pos)
+                self._process_signal(signal, bar, ts)
+
+                pos = self.portfolio.positions.get(symbol)
+                is_open = pos is not None and pos.is_open()
+                if is_open and symbol not in opened:
+                    opened[symbol] = (step, pos.avg_entry_price, pos.quantity)
+                elif not is_open and symbol in opened:
+                    start, avg, qty = opened.pop(symbol)
+                    intervals[symbol].append((start, step, avg, qty))
+                i += 1
+
+            cash_at.append((
+                step,
+                self.portfolio.cash,
+                self.portfolio.exposure,
+                sum(p.realized_pnl for p in self.portfolio.positions.values()),
+            ))
+
+        for symbol, (start, avg, qty) in opened.items():
+            intervals[symbol].append((start, n_steps, avg, qty))
+
+        # Step functions for cash / exposure / realized PnL between events
+        cash = np.full(n_steps, self.initial_equity, dtype=np.float64)
+        exposure = np.zeros(n_steps, dtype=np.float64)
+        realized = np.zeros(n_steps, dtype=np.float64)
+        if cash_at:
+            change_steps = np.array([c[0] for c in cash_at], dtype=np.int64)
+            which = np.searchsorted(change_steps, np.arange(n_steps), side="right") - 1
+            after = which >= 0
+            cash[after] = np.array([c[1] for c in cash_at])[which[after]]
+            exposure[after] = np.array([c[2] for c in cash_at])[which[after]]
+            realized[after] = np.array([c[3] for c in cash_at])[which[after]]
+
+        # Unrealized PnL per position: marked while open, then held at its
+        # last marked value (closed positions are not re-marked), summed in
+        # portfolio order.
+        unrealized = np.zeros(n_steps, dtype=np.float64)
+        for symbol in self.portfolio.positions:
+            marks = np.full(n_steps, np.nan)
+            for start, end, avg, qty in intervals[symbol]:
+                marks[start:end] = (prices[symbol][start:end] - avg) * qty
+            filled = np.flatnonzero(~np.isnan(marks))
+            if len(filled) == 0:
+                continue
+            carry = np.searchsorted(filled, np.arange(n_steps), side="right") - 1
+            held = np.where(carry >= 0, marks[filled[np.maximum(carry, 0)]], 0.0)
+            unrealized = unrealized + held
+
+        # Leave the portfolio marked as it would be after the final step
+        if n_steps:
+            for symbol, pos in self.portfolio.positions.items():
+                if pos.is_open():
+                    pos.unrealized_pnl = (prices[symbol][-1] - pos.avg_entry_price) * pos.quantity
+
+        recorded = np.flatnonzero(active)
+        equity = cash + unrealized
+        aborted = False
+        if self.abort_drawdown is not None and len(recorded):
+            # Cut the run where the event-driven loop would have stopped
+            curve = equity[recorded]
+            peaks = np.maximum.accumulate(curve)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                breached = (peaks > 0) & ((peaks - curve) / peaks > self.abort_drawdown)
+            if breached.any():
+                aborted = True
+                recorded = recorded[: int(np.argmax(breached)) + 1]
+                last_ts = int(steps[recorded[-1]])
+                self.metrics.trades = [
+                    t for t in self.metrics.trades if t.exit_timestamp <= last_ts
+                ]
+                logger.info(f"Drawdown limit {self.abort_drawdown:.2%} breached, stopping run")
+
+        self.metrics.set_equity_curve(
+            timestamps=steps[recorded],
+            equity=equity[recorded],
+            cash=cash[recorded],
+            exposure=exposure[recorded],
+            unrealized_pnl=unrealized[recorded],
+            realized_pnl=realized[recorded],
+        )
+        if len(recorded):
+            clock.advance_to(int(steps[recorded[-1]]))
+
+        metrics = self.metrics.compute_metrics()
+        self.metrics.save_results(settings.RESULTS_DIR, self.run_id)
+
+        logger.info(f"Backtest complete: {metrics.total_trades} trades")
+        logger.info(f"Total return: {metrics.total_return:.2%}")
+        logger.info(f"Sharpe ratio: {metrics.sharpe_ratio:.3f}")
+        logger.info(f"Max drawdown: {metrics.max_drawdown:.2%}")
+
+        return {
+            "run_id": self.run_id,
+            "metrics": metrics.to_dict(),
+            "symbols": symbols,
+            "bars_processed": len(recorded),
+            "aborted": aborted,
+        }
+
+    def _signals(
+        self, series: BarSeries, fed: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, dict[str, np.ndarray]]:
+        """Compute buy/sell masks over the bar rows the strategy is fed."""
+        close = series.close[fed]
+        high = series.high[fed]
+        low = series.low[fed]
+        if isinstance(self.strategy, TrendFollowStrategy):
+            buy, sell, ind = trend_follow_signals(self.strategy, close, high, low)
+            return buy, sell, {"atr": ind["atr"], "trend_strength": ind["trend_strength"]}
+        buy, sell = momentum_signals(self.strategy, close, high, low, series.volume[fed])
+        lookback = self.strategy.lookback
+        momentum = np.zeros(len(close))
+        if len(close) >= lookback:
+            first = close[: len(close) - lookback + 1]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                momentum[lookback - 1 :] = (close[lookback - 1 :] - first) / first
+        return buy, sell, {"momentum": momentum}
+
+    def _make_signal(self, symbol: str, side: str, close: float, fed_pos: int) -> Signal:
+        """Build the ``Signal`` the strategy would have emitted for this bar."""
+        levels = self._levels[symbol]
+        strategy = self.strategy
+        sign = 1 if side == "BUY" else -1
+        if isinstance(strategy, TrendFollowStrategy):
+            atr = float(levels["atr"][fed_pos])
+            trend = float(levels["trend_strength"][fed_pos])
+            return Signal(
+                symbol=symbol,
+                side=side,
+                strength=min(abs(trend) / strategy.min_trend_strength, 1.0),
+                stop_loss=close - sign * atr * strategy.atr_stop_mult,
+                take_profit=close + sign * atr * strategy.atr_target_mult,
+                reason="vectorized MA crossover",
+            )
+        momentum = float(levels["momentum"][fed_pos])
+        return Signal(
+            symbol=symbol,
+            side=side,
+            strength=min(abs(momentum) / strategy.momentum_threshold, 1.0),
+            stop_loss=close * (1 - sign * strategy.stop_loss_pct),
+            take_profit=close * (1 + sign * strategy.take_profit_pct),
+            reason="vectorized momentum breakout",
+        )
+
+
+ENGINE_MODES: dict[str, type[BacktestEngine]] = {
+    "event": BacktestEngine,
+    "vectorized": VectorizedBacktestEngine,
+}
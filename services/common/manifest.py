@@ -27,6 +27,19 @@
 CREATE INDEX IF NOT EXISTS idx_files_status ON files(status);
 CREATE INDEX IF NOT EXISTS idx_files_time ON files(symbol, timeframe, t_start, t_end);
 
+CREATE TABLE IF NOT EXISTS row_groups(
+  file_id TEXT NOT NULL,
+  path TEXT NOT NULL,
+  rg INTEGER NOT NULL,
+  symbol TEXT NOT NULL,
+  timeframe TEXT NOT NULL,
+  t_start INTEGER NOT NULL,
+  t_end INTEGER NOT NULL,
+  num_rows INTEGER NOT NULL,
+  PRIMARY KEY(file_id, rg)
+);
+CREATE INDEX IF NOT EXISTS idx_row_groups_time ON row_groups(symbol, timeframe, t_start, t_end);
+
 CREATE TABLE IF NOT EXISTS watermarks(
   name TEXT PRIMARY KEY,
   value INTEGER NOT NULL
@@ -202,6 +215,140 @@ def _delete_file_by_id(file_id: str, db_path: str = DEFAULT_DB):
         conn.close()
 
 
+def _insert_dataset_file(
+    cur: sqlite3.Cursor,
+    path: str,
+    symbol: str,
+    timeframe: str,
+    row_groups: list[tuple[int, int, int, int]],
+    replace: bool,
+) -> tuple[str, bool]:
+    st = os.stat(path)
+    sha = sha256_file(path)
+    verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+    now = time.time()
+    # Dataset files are durable: register them as already processed so the
+    # landing-queue consumers (claim_unprocessed) never claim and delete them.
+    cur.execute(
+        f"""
+      {verb} INTO files(file_id, path, symbol, timeframe, t_start, t_end, sha256, size_bytes, status, created_at, processed_at)
+      VALUES(?,?,?,?,?,?,?,?,?,?,?)
+    """,
+        (
+            sha,
+            path,
+            symbol,
+            timeframe,
+            min(g[1] for g in row_groups),
+            max(g[2] for g in row_groups),
+            sha,
+            st.st_size,
+            "processed",
+            now,
+            now,
+        ),
+    )
+    if cur.rowcount <= 0:
+        return sha, False
+    cur.execute("DELETE FROM row_groups WHERE file_id=?", (sha,))
+    cur.executemany(
+        "INSERT INTO row_groups(file_id, path, rg, symbol, timeframe, t_start, t_end, num_rows) VALUES(?,?,?,?,?,?,?,?)",
+        [
+            (sha, path, int(rg), symbol, timeframe, int(t0), int(t1), int(n))
+            for rg, t0, t1, n in row_groups
+        ],
+    )
+    return sha, True
+
+
+def register_dataset_file(
+    path: str,
+    symbol: str,
+    timeframe: str,
+    row_groups: list[tuple[int, int, int, int]],
+    db_path: str = DEFAULT_DB,
+) -> tuple[str, bool]:
+    """
+    Register a partitioned-dataset Parquet file together with the time range of
+    each of its row groups, given as (row_group, t_start, t_end, num_rows).
+    Returns (file_id, inserted_new: bool); identical content is not registered twice.
+    """
+    conn = _connect(db_path)
+    try:
+        cur = conn.cursor()
+        file_id, inserted = _insert_dataset_file(
+            cur, path, symbol, timeframe, row_groups, replace=False
+        )
+        conn.commit()
+        return file_id, inserted
+    finally:
+        conn.close()
+
+
+def replace_dataset_files(
+    old_paths: list[str],
+    path: str,
+    symbol: str,
+    timeframe: str,
+    row_groups: list[tuple[int, int, int, int]],
+    db_path: str = DEFAULT_DB,
+) -> str:
+    """
+    Atomically swap the row-group index of 'old_paths' for the compacted file at
+    'path'. The old files are marked deleted; removing them from disk is left to
+    the caller once readers can no longer be routed to them.
+    """
+    conn = _connect(db_path)
+    try:
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        now = time.time()
+        for old in old_paths:
+            cur.execute("DELETE FROM row_groups WHERE path=?", (old,))
+            cur.execute(
+                "UPDATE files SET status='deleted', deleted_at=? WHERE path=? AND status!='deleted'",
+                (now, old),
+            )
+        file_id, _ = _insert_dataset_file(cur, path, symbol, timeframe, row_groups, replace=True)
+        conn.commit()
+        return file_id
+    finally:
+        conn.close()
+
+
+def find_row_groups(
+    symbol: str,
+    timeframe: str,
+    t_start: int | None = None,
+    t_end: int | None = None,
+    db_path: str = DEFAULT_DB,
+) -> list[dict]:
+    """
+    Return the indexed row groups whose [t_start, t_end] overlaps the requested
+    window (either bound may be None), ordered by time.
+    """
+    conn = _connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """
+          SELECT path, rg, t_start, t_end, num_rows FROM row_groups
+          WHERE symbol=? AND timeframe=? AND t_end>=? AND t_start<=?
+          ORDER BY t_start ASC, path ASC, rg ASC
+        """,
+            (
+                symbol,
+                timeframe,
+                int(t_start) if t_start is not None else -(1 << 62),
+                int(t_end) if t_end is not None else 1 << 62,
+            ),
+        )
+        return [dict(r) for r in cur.fetchall()]
+    finally:
+        conn.close()
+
+
 def set_watermark(name: str, value: int, db_path: str = DEFAULT_DB):
     conn = _connect(db_path)
     try:
@@ -0,0 +1,299 @@
+"""
+Symbol/timeframe/day partitioned Parquet dataset for OHLCV bars.
+
+Layout::
+
+    <root>/symbol=BTCUSDT/timeframe=1m/date=2024-01-31/part-<t_start>-<t_end>.parquet
+
+Every appended batch lands as one part file per UTC day it touches, written in
+small row groups. Each file is registered in the manifest ledger together with
+the [t_start, t_end] range of every row group, so readers open only the row
+groups overlapping the window they need. Closed days are compacted into a
+single de-duplicated file so cold reads touch one file per day.
+"""
+
+import logging
+import os
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from . import manifest
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+SCHEMA = pa.schema([("timestamp", pa.int64())] + [(c, pa.float64()) for c in COLUMNS[1:]])
+ROW_GROUP_ROWS = int(os.environ.get("DATASET_ROW_GROUP_ROWS", "360"))
+DAY_MS = 86_400_000
+
+
+def partition_key(symbol: str) -> str:
+    """Directory/index key for a symbol ("BTC/USDT" -> "BTCUSDT")."""
+    return symbol.replace("/", "").upper()
+
+
+def day_of(ts_ms: int) -> str:
+    return datetime.fromtimestamp(ts_ms // 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _day_start(day: str) -> int:
+    dt = datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def series_dir(root: str, symbol: str, timeframe: str) -> Path:
+    return Path(root) / f"symbol={partition_key(symbol)}" / f"timeframe={timeframe}"
+
+
+def partition_dir(root: str, symbol: str, timeframe: str, day: str) -> Path:
+    return series_dir(root, symbol, timeframe) / f"date={day}"
+
+
+def symbols(root: str, timeframe: str) -> list[str]:
+    """Symbol keys that have data for 'timeframe' under 'root'."""
+    return sorted(
+        p.parent.name.split("=", 1)[1]
+        for p in Path(root).glob(f"symbol=*/timeframe={timeframe}")
+        if p.is_dir()
+    )
+
+
+def _to_table(df) -> pa.Table:
+    frame = df[list(COLUMNS)]
+    return pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False)
+
+
+def _dedupe_sorted(table: pa.Table) -> pa.Table:
+    """Sort by timestamp, keeping the last occurrence of duplicated timestamps."""
+    ts = table.column("timestamp").to_numpy()
+    if len(ts) == 0:
+        return table
+    if np.all(ts[1:] > ts[:-1]):
+        return table
+    order = np.argsort(ts, kind="stable")
+    ts_sorted = ts[order]
+    keep = np.empty(len(ts_sorted), dtype=bool)
+    keep[:-1] = ts_sorted[1:] != ts_sorted[:-1]
+    keep[-1] = True
+    return table.take(pa.array(order[keep]))
+
+
+def _write(
+    table: pa.Table, path: Path, key: str, timeframe: str, row_group_rows: int
+) -> list[tuple[int, int, int, int]]:
+    """Write a timestamp-sorted table atomically and return its row-group ranges."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    # Stamp the series identity into the footer so identical bars of two
+    # symbols do not share a content hash (the ledger dedups by sha256).
+    table = table.replace_schema_metadata({"symbol": key, "timeframe": timeframe})
+    pq.write_table(table, tmp, row_group_size=row_group_rows)
+    os.replace(tmp, path)
+    ts = table.column("timestamp").to_numpy()
+    groups = []
+    for rg, lo in enumerate(range(0, len(ts), row_group_rows)):
+        hi = min(lo + row_group_rows, len(ts))
+        groups.append((rg, int(ts[lo]), int(ts[hi - 1]), hi - lo))
+    return groups
+
+
+def _free_path(directory: Path, stem: str) -> Path:
+    path = directory / f"{stem}.parquet"
+    n = 1
+    while path.exists():
+        path = directory / f"{stem}-{n}.parquet"
+        n += 1
+    return path
+
+
+def append(
+    root: str,
+    symbol: str,
+    timeframe: str,
+    df,
+    db_path: str = manifest.DEFAULT_DB,
+    row_group_rows: int = ROW_GROUP_ROWS,
+) -> int:
+    """
+    Append a batch of bars (DataFrame with COLUMNS) to the dataset.
+    Returns the number of rows newly registered; batches whose content is
+    already in the ledger are dropped.
+    """
+    table = _dedupe_sorted(_to_table(df))
+    if table.num_rows == 0:
+        return 0
+    ts = table.column("timestamp").to_numpy()
+    days = ts // DAY_MS
+    bounds = [0, *(np.flatnonzero(np.diff(days)) + 1).tolist(), len(ts)]
+    key = partition_key(symbol)
+    written = 0
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        chunk = table.slice(lo, hi - lo)
+        t_start, t_end = int(ts[lo]), int(ts[hi - 1])
+        directory = partition_dir(root, symbol, timeframe, day_of(t_start))
+        path = _free_path(directory, f"part-{t_start}-{t_end}")
+        groups = _write(chunk, path, key, timeframe, row_group_rows)
+        _, inserted = manifest.register_dataset_file(
+            str(path.resolve()), key, timeframe, groups, db_path=db_path
+        )
+        if inserted:
+            written += chunk.num_rows
+        else:
+            # Duplicate content; drop the file immediately
+            os.remove(path)
+    return written
+
+
+def compact(
+    root: str,
+    symbol: str,
+    timeframe: str,
+    day: str,
+    db_path: str = manifest.DEFAULT_DB,
+    row_group_rows: int = ROW_GROUP_ROWS,
+) -> bool:
+    """
+    Merge all files of one day partition into a single de-duplicated file.
+    Later parts win on duplicated timestamps. Returns True if anything changed.
+    """
+    directory = partition_dir(root, symbol, timeframe, day)
+    files = sorted(directory.glob("*.parquet"), key=lambda p: p.stat().st_mtime_ns)
+    if len(files) < 2:
+        return False
+    table = _dedupe_sorted(
+        pa.concat_tables([pq.read_table(f, schema=SCHEMA) for f in files]).combine_chunks()
+    )
+    ts = table.column("timestamp").to_numpy()
+    path = directory / f"compacted-{int(ts[0])}-{int(ts[-1])}.parquet"
+    groups = _write(table, path, partition_key(symbol), timeframe, row_group_rows)
+    old = [str(f.resolve()) for f in files]
+    new = str(path.resolve())
+    manifest.replace_dataset_files(
+        old, new, partition_key(symbol), timeframe, groups, db_path=db_path
+    )
+    for f in old:
+        if f == new:
+            continue
+        try:
+            os.remove(f)
+        except OSError as exc:
+            logger.warning("Failed to remove compacted part %s: %s", f, exc)
+    return True
+
+
+def compact_closed(
+    root: str,
+    symbol: str,
+    timeframe: str,
+    before_ts: int,
+    db_path: str = manifest.DEFAULT_DB,
+    row_group_rows: int = ROW_GROUP_ROWS,
+) -> int:
+    """Compact every day partition that ends at or before 'before_ts'. Returns days compacted."""
+    compacted = 0
+    for day_path in sorted(series_dir(root, symbol, timeframe).glob("date=*")):
+        day = day_path.name.split("=", 1)[1]
+        if _day_start(day) + DAY_MS > before_ts:
+            continue
+        if compact(root, symbol, timeframe, day, db_path=db_path, row_group_rows=row_group_rows):
+            compacted += 1
+    return compacted
+
+
+def _plan_from_manifest(
+    symbol: str, timeframe: str, t_start: int | None, t_end: int | None, db_path: str
+) -> list[tuple[str, list[int]]] | None:
+    try:
+        rows = manifest.find_row_groups(
+            partition_key(symbol), timeframe, t_start, t_end, db_path=db_path
+        )
+    except sqlite3.Error:
+        return None
+    if not rows:
+        return None
+    plan: dict[str, list[int]] = {}
+    for row in rows:
+        plan.setdefault(row["path"], []).append(int(row["rg"]))
+    if not all(os.path.exists(p) for p in plan):
+        # Ledger written from another mount (or racing a compaction); scan instead
+        return None
+    return [(p, sorted(set(rgs))) for p, rgs in plan.items()]
+
+
+def _plan_from_files(
+    root: str, symbol: str, timeframe: str, t_start: int | None, t_end: int | None
+) -> list[tuple[str, list[int]]]:
+    plan = []
+    for day_path in sorted(series_dir(root, symbol, timeframe).glob("date=*")):
+        day_start = _day_start(day_path.name.split("=", 1)[1])
+        if t_end is not None and day_start > t_end:
+            continue
+        if t_start is not None and day_start + DAY_MS <= t_start:
+            continue
+        for path in sorted(day_path.glob("*.parquet")):
+            meta = pq.read_metadata(path)
+            col = meta.schema.to_arrow_schema().get_field_index("timestamp")
+            groups = []
+            for rg in range(meta.num_row_groups):
+                stats = meta.row_group(rg).column(col).statistics
+                if stats is not None and stats.has_min_max:
+                    if t_end is not None and stats.min > t_end:
+                        continue
+                    if t_start is not None and stats.max < t_start:
+                        continue
+                groups.append(rg)
+            if groups:
+                plan.append((str(path), groups))
+    return plan
+
+
+def read(
+    root: str,
+    symbol: str,
+    timeframe: str,
+    t_start: int | None = None,
+    t_end: int | None = None,
+    columns: tuple[str, ...] | list[str] = COLUMNS,
+    db_path: str | None = None,
+) -> pa.Table:
+    """
+    Read bars in [t_start, t_end] (inclusive, either bound may be None).
+
+    Only row groups overlapping the window are decoded: their ranges come from
+    the ledger when 'db_path' indexes this dataset, otherwise from partition
+    names and Parquet footer statistics. The result is sorted, de-duplicated
+    and held in single chunks so numeric columns convert to NumPy without copying.
+    """
+    columns = list(columns)
+    read_columns = columns if "timestamp" in columns else ["timestamp", *columns]
+    plan = None
+    if db_path and os.path.exists(db_path):
+        plan = _plan_from_manifest(symbol, timeframe, t_start, t_end, db_path)
+    if plan is None:
+        plan = _plan_from_files(root, symbol, timeframe, t_start, t_end)
+    tables = []
+    for path, groups in plan:
+        try:
+            tables.append(pq.ParquetFile(path).read_row_groups(groups, columns=read_columns))
+        except FileNotFoundError:
+            logger.warning("Dataset file vanished during read: %s", path)
+    if not tables:
+        return SCHEMA.empty_table().select(columns)
+    table = pa.concat_tables(tables)
+    if t_start is not None or t_end is not None:
+        ts = table.column("timestamp")
+        mask = None
+        if t_start is not None:
+            mask = pc.greater_equal(ts, t_start)
+        if t_end is not None:
+            upper = pc.less_equal(ts, t_end)
+            mask = upper if mask is None else pc.and_(mask, upper)
+        table = table.filter(mask)
+    table = _dedupe_sorted(table.combine_chunks())
+    return table.select(columns).combine_chunks()
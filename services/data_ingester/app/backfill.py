@@ -0,0 +1,175 @@
+"""Concurrent multi-symbol OHLCV backfill under a shared exchange rate budget."""
+
+import asyncio
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+import pandas as pd
+from loguru import logger
+
+from services.common import manifest, ohlcv_dataset
+
+from .config import settings
+
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+AsyncExchangeClient = Any
+
+
+class TokenBucket:
+    """Async token bucket shared by every symbol worker talking to one exchange.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Waiters are served in arrival order, so a burst of symbols cannot starve
+    a slow one.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1.0))
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, cost: float = 1.0) -> None:
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= cost:
+                    self._tokens -= cost
+                    return
+                await asyncio.sleep((cost - self._tokens) / self.rate)
+
+
+def watermark_name(symbol: str, timeframe: str) -> str:
+    return f"ingest:{settings.EXCHANGE}:{symbol}:{timeframe}"
+
+
+def budget_for(ex: AsyncExchangeClient) -> TokenBucket:
+    """Rate budget from RATE_LIMIT_RPS, else the client's ccxt rateLimit, else SLEEP_MS."""
+    rps = float(settings.RATE_LIMIT_RPS)
+    if rps <= 0:
+        interval_ms = float(getattr(ex, "rateLimit", 0) or settings.SLEEP_MS or 1000)
+        rps = 1000.0 / interval_ms
+    burst = float(settings.RATE_LIMIT_BURST) or rps
+    return TokenBucket(rps, burst)
+
+
+async def backfill_symbol(
+    ex: AsyncExchangeClient,
+    symbol: str,
+    timeframe: str,
+    bucket: TokenBucket,
+    until_ms: int | None = None,
+    max_pages: int | None = None,
+) -> int:
+    """Page one symbol forward from its watermark until it reaches ``until_ms``.
+
+    The watermark is checkpointed after every page, so a failure or restart
+    resumes from the last landed page instead of the beginning.
+
+    Returns:
+        Number of new rows landed
+    """
+    wm_name = watermark_name(symbol, timeframe)
+    since = await asyncio.to_thread(
+        manifest.get_watermark, wm_name, settings.START_TS, settings.LEDGER_DB
+    )
+    if since is None:
+        since = 0
+    if until_ms is None:
+        until_ms = int(time.time() * 1000)
+
+    landed = 0
+    pages = 0
+    while since <= until_ms and (max_pages is None or pages < max_pages):
+        await bucket.acquire(settings.REQUEST_COST)
+        batch = await ex.fetch_ohlcv(
+            symbol, timeframe=timeframe, since=since, limit=settings.BATCH_LIMIT
+        )
+        pages += 1
+        if not batch:
+            break
+        df = pd.DataFrame(batch, columns=OHLCV_COLUMNS)
+        t_end = int(df["timestamp"].max())
+        if t_end < since:
+            break
+        landed += await asyncio.to_thread(
+            ohlcv_dataset.append,
+            settings.DATA_LANDING,
+            symbol,
+            timeframe,
+            df,
+            settings.LEDGER_DB,
+        )
+        # Checkpoint conservatively at t_end + 1ms to avoid overlap
+        since = t_end + 1
+        await asyncio.to_thread(manifest.set_watermark, wm_name, since, settings.LEDGER_DB)
+        # A short page is not proof of reaching the head: exchanges cap page
+        # size below BATCH_LIMIT, so only an empty page or until_ms stops us.
+
+    if pages:
+        await asyncio.to_thread(
+            ohlcv_dataset.compact_closed,
+            settings.DATA_LANDING,
+            symbol,
+            timeframe,
+            since - 1,
+            settings.LEDGER_DB,
+        )
+    return landed
+
+
+async def backfill(
+    ex: AsyncExchangeClient,
+    symbols: Iterable[str],
+    timeframe: str | None = None,
+    bucket: TokenBucket | None = None,
+    concurrency: int | None = None,
+    until_ms: int | None = None,
+    max_pages: int | None = None,
+) -> dict[str, int]:
+    """Backfill many symbols concurrently against one exchange client.
+
+    All symbols share ``bucket``; at most ``concurrency`` symbols hold a page
+    in flight. A failing symbol is logged and keeps its last checkpoint while
+    the others carry on.
+
+    Returns:
+        Rows landed per symbol (symbols that failed are omitted)
+    """
+    timeframe = timeframe or settings.TIMEFRAME
+    bucket = bucket or budget_for(ex)
+    gate = asyncio.Semaphore(max(int(concurrency or settings.BACKFILL_CONCURRENCY), 1))
+    if until_ms is None:
+        until_ms = int(time.time() * 1000)
+
+    async def _one(sym: str) -> tuple[str, int]:
+        async with gate:
+            return sym, await backfill_symbol(ex, sym, timeframe, bucket, until_ms, max_pages)
+
+    symbols = list(symbols)
+    results = await asyncio.gather(*(_one(s) for s in symbols), return_exceptions=True)
+    out: dict[str, int] = {}
+    for sym, res in zip(symbols, results):
+        if isinstance(res, BaseException):
+            if isinstance(res, asyncio.CancelledError):
+                raise res
+            logger.opt(exception=res).error("backfill error for {}", sym)
+            continue
+        out[res[0]] = res[1]
+    return out
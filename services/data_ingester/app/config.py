@@ -15,7 +15,7 @@ class Settings:
     # OHLCV timeframe
     TIMEFRAME: str = os.getenv("TIMEFRAME", "1m")
     
-    # Directory for landing files
+    # Root of the symbol/timeframe/day partitioned Parquet dataset
     DATA_LANDING: str = os.getenv("DATA_LANDING", "/ml/incoming")
     
     # Ledger database for tracking downloaded files
@@ -27,8 +27,18 @@ class Settings:
     # Batch limit for OHLCV fetches
     BATCH_LIMIT: int = int(os.getenv("BATCH_LIMIT", "1000"))
     
-    # Sleep between fetches (ms)
+    # Sleep between fetches (ms); fallback request budget when neither
+    # RATE_LIMIT_RPS nor the client's own rateLimit is available
     SLEEP_MS: int = int(os.getenv("SLEEP_MS", "500"))
+    
+    # Shared request budget across all symbols (tokens/sec, 0 = use the
+    # exchange client's rateLimit), burst size and token cost per page
+    RATE_LIMIT_RPS: float = float(os.getenv("RATE_LIMIT_RPS", "0"))
+    RATE_LIMIT_BURST: float = float(os.getenv("RATE_LIMIT_BURST", "0"))
+    REQUEST_COST: float = float(os.getenv("REQUEST_COST", "1"))
+    
+    # Symbols paged concurrently during backfill
+    BACKFILL_CONCURRENCY: int = int(os.getenv("BACKFILL_CONCURRENCY", "16"))
 
 
 settings = Settings()
@@ -3,33 +3,25 @@
 from pathlib import Path
 from typing import Any
 
-import ccxt
-import pandas as pd
+import ccxt.async_support as ccxt_async
 from fastapi import FastAPI
 from loguru import logger
 
-from services.common import manifest
+from services.common import manifest, ohlcv_dataset
 from shared.dry_run import install_dry_run_guard, log_dry_run_banner
 
+from . import backfill
 from .config import settings
 
-_FETCH_ERRORS = (
-    ccxt.BaseError,
-    ValueError,
-    RuntimeError,
-    OSError,
-)
-
-ExchangeClient = Any
-
 
 app = FastAPI(title="data-ingester", version="0.1.0")
 install_dry_run_guard(app, allow_paths={"/health"})
 log_dry_run_banner("services.data_ingester")
 
 
-def _client() -> ExchangeClient:
-    ex = getattr(ccxt, settings.EXCHANGE)()
+def _client() -> backfill.AsyncExchangeClient:
+    # Requests are paced by the shared token bucket in backfill, not by ccxt
+    ex = getattr(ccxt_async, settings.EXCHANGE)({"enableRateLimit": False})
     # Optionally configure apiKey/secret via env for private endpoints if needed
     if os.getenv("API_KEY"):
         ex.apiKey = os.getenv("API_KEY")
@@ -38,12 +30,6 @@ def _client() -> ExchangeClient:
     return ex
 
 
-def _landing_dir(sym: str, tf: str) -> Path:
-    p = Path(settings.DATA_LANDING) / sym.replace("/", "_") / tf
-    p.mkdir(parents=True, exist_ok=True)
-    return p
-
-
 @app.on_event("startup")
 def on_start() -> None:
     Path(settings.DATA_LANDING).mkdir(parents=True, exist_ok=True)
@@ -57,58 +43,43 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
-@app.post("/ingest_once")
-def ingest_once() -> dict[str, int]:
+def _symbols() -> list[str]:
+    return [s.strip() for s in settings.SYMBOLS.split(",") if s.strip()]
+
+
+async def _run_backfill(max_pages: int | None) -> dict[str, int]:
     ex = _client()
+    try:
+        return await backfill.backfill(ex, _symbols(), max_pages=max_pages)
+    finally:
+        await ex.close()
+
+
+@app.post("/ingest_once")
+async def ingest_once() -> dict[str, int]:
+    """Fetch the next page for every symbol, concurrently under the rate budget."""
+    landed = await _run_backfill(max_pages=1)
+    return {"downloaded": int(sum(landed.values()))}
+
+
+@app.post("/backfill")
+async def run_backfill() -> dict[str, Any]:
+    """Page every symbol forward from its watermark until it is caught up."""
+    landed = await _run_backfill(max_pages=None)
+    return {"downloaded": int(sum(landed.values())), "symbols": landed}
+
+
+@app.post("/compact")
+def compact() -> dict[str, int]:
+    """Compact every closed day partition of the configured symbols."""
     tf = settings.TIMEFRAME
-    out = {"downloaded": 0}
-    for sym in [s.strip() for s in settings.SYMBOLS.split(",") if s.strip()]:
-        wm_name = f"ingest:{settings.EXCHANGE}:{sym}:{tf}"
-        since = manifest.get_watermark(
-            wm_name, default=settings.START_TS, db_path=settings.LEDGER_DB
-        )
-        if since is None:
-            since = 0
-        # ccxt expects ms
-        dl_dir = _landing_dir(sym, tf)
+    now_ms = int(time.time() * 1000)
+    out = {"compacted": 0}
+    for sym in _symbols():
         try:
-            # fetch in chunks
-            int(time.time() * 1000)
-            batch = ex.fetch_ohlcv(sym, timeframe=tf, since=since, limit=settings.BATCH_LIMIT)
-            if not batch:
-                continue
-            df = pd.DataFrame(
-                batch, columns=["timestamp", "open", "high", "low", "close", "volume"]
-            )
-            t_start = int(df["timestamp"].min())
-            t_end = int(df["timestamp"].max())
-            # Write CSV with deterministic name
-            name = f"{sym.replace('/','_')}__{tf}__{t_start}_{t_end}.csv"
-            path = str((dl_dir / name).resolve())
-            df.to_csv(path, index=False)
-            # Register in ledger (dedup by sha256)
-            file_id, inserted = manifest.register_file(
-                path=path,
-                symbol=sym,
-                timeframe=tf,
-                t_start=t_start,
-                t_end=t_end,
-                db_path=settings.LEDGER_DB,
+            out["compacted"] += ohlcv_dataset.compact_closed(
+                settings.DATA_LANDING, sym, tf, now_ms, db_path=settings.LEDGER_DB
             )
-            if inserted:
-                out["downloaded"] += len(df)
-                # Advance watermark conservatively to t_end + 1ms to avoid overlap
-                manifest.set_watermark(wm_name, t_end + 1, db_path=settings.LEDGER_DB)
-            else:
-                # Duplicate content; delete the file immediately
-                try:
-                    os.remove(path)
-                except FileNotFoundError:
-                    logger.warning("Duplicate download missing on disk %s", path)
-        except _FETCH_ERRORS:
-            logger.exception("ingest error for %s", sym)
-        # Respect extra delay to avoid rate limits
-        delay = max(int(settings.SLEEP_MS), 0) / 1000.0
-        if delay > 0:
-            time.sleep(delay)
-    return {"downloaded": int(out["downloaded"])}
+        except OSError:
+            logger.exception("compaction error for %s", sym)
+    return out
@@ -2,6 +2,7 @@
 
 import logging
 import os
+import time
 from typing import Any
 
 import numpy as np
@@ -90,7 +91,11 @@ def train_once(
 
 
 def _load_training_data() -> np.ndarray | None:
-    """Load training data from the data directory."""
+    """Load training data from the partitioned dataset, else the data directory."""
+    data = _load_dataset_training_data()
+    if data is not None:
+        return data
+    
     data_dir = os.getenv("ML_DATA_DIR", "/ml/data")
     
     # Try to load incoming data files
@@ -106,37 +111,9 @@ def _load_training_data() -> np.ndarray | None:
         dfs = []
         for f in files[:10]:  # Limit to 10 files
             try:
-                df = pd.read_csv(f)
-                if "close" in df.columns:
-                    # Align with engine/strategies/policy_hmm.py features
-                    # 1. Log Returns
-                    df["ret"] = np.log(df["close"] / df["close"].shift(1))
-                    
-                    # 2. Volatility (20)
-                    df["vol"] = df["ret"].rolling(20).std()
-                    
-                    # 3. VWAP Deviation
-                    if "volume" in df.columns:
-                        vwap = (df["close"] * df["volume"]).cumsum() / df["volume"].cumsum()
-                        df["dev_vwap"] = (df["close"] - vwap) / vwap
-                        
-                        # 5. Volume Spike (20) - (Index 5 in list, but we compute parallel)
-                        vol_safe = df["volume"].replace(0, 1) # avoid div by zero
-                        df["vol_spike"] = df["volume"] / vol_safe.rolling(20).mean()
-                    else:
-                        df["dev_vwap"] = 0.0
-                        df["vol_spike"] = 1.0
-
-                    # 4. Z-Score (30)
-                    r30_mean = df["close"].rolling(30).mean()
-                    r30_std = df["close"].rolling(30).std()
-                    df["zscore"] = (df["close"] - r30_mean) / r30_std
-
-                    # Drop NaN from rolling windows
-                    df_clean = df[["ret", "vol", "dev_vwap", "zscore", "vol_spike"]].dropna()
-                    
-                    if not df_clean.empty:
-                        dfs.append(df_clean.values)
+                features = _features(pd.read_csv(f))
+                if features is not None:
+                    dfs.append(features)
             except Exception:
                 continue
         
@@ -148,6 +125,85 @@ def _load_training_data() -> np.ndarray | None:
         return None
 
 
+def _load_dataset_training_data() -> np.ndarray | None:
+    """Load the recent training window from the ingester's Parquet dataset.
+    
+    Only row groups overlapping the last ML_TRAIN_LOOKBACK_DAYS are read, using
+    the ledger's row-group index when available.
+    """
+    root = os.getenv("ML_DATASET_DIR", os.getenv("DATA_LANDING", "/ml/incoming"))
+    if not os.path.isdir(root):
+        return None
+    try:
+        from services.common import ohlcv_dataset
+    except ImportError:
+        logger.warning(
+            "Parquet dataset reader unavailable; training from CSV files instead", exc_info=True
+        )
+        return None
+    
+    timeframe = os.getenv("ML_TIMEFRAME", os.getenv("TIMEFRAME", "1m"))
+    lookback_days = float(os.getenv("ML_TRAIN_LOOKBACK_DAYS", "30"))
+    t_end = int(time.time() * 1000)
+    t_start = t_end - int(lookback_days * ohlcv_dataset.DAY_MS)
+    db_path = os.getenv("LEDGER_DB")
+    
+    dfs = []
+    for symbol in ohlcv_dataset.symbols(root, timeframe):
+        try:
+            table = ohlcv_dataset.read(
+                root, symbol, timeframe, t_start, t_end,
+                columns=("timestamp", "close", "volume"),
+                db_path=db_path,
+            )
+            features = _features(table.to_pandas())
+            if features is not None:
+                dfs.append(features)
+        except Exception:
+            logger.warning("Failed to load dataset window for %s", symbol, exc_info=True)
+    
+    if dfs:
+        return np.concatenate(dfs, axis=0)
+    return None
+
+
+def _features(df) -> np.ndarray | None:
+    """Per-bar feature rows for one symbol's time-ordered OHLCV frame."""
+    if "close" not in df.columns:
+        return None
+    
+    # Align with engine/strategies/policy_hmm.py features
+    # 1. Log Returns
+    df["ret"] = np.log(df["close"] / df["close"].shift(1))
+    
+    # 2. Volatility (20)
+    df["vol"] = df["ret"].rolling(20).std()
+    
+    # 3. VWAP Deviation
+    if "volume" in df.columns:
+        vwap = (df["close"] * df["volume"]).cumsum() / df["volume"].cumsum()
+        df["dev_vwap"] = (df["close"] - vwap) / vwap
+        
+        # 5. Volume Spike (20) - (Index 5 in list, but we compute parallel)
+        vol_safe = df["volume"].replace(0, 1) # avoid div by zero
+        df["vol_spike"] = df["volume"] / vol_safe.rolling(20).mean()
+    else:
+        df["dev_vwap"] = 0.0
+        df["vol_spike"] = 1.0
+
+    # 4. Z-Score (30)
+    r30_mean = df["close"].rolling(30).mean()
+    r30_std = df["close"].rolling(30).std()
+    df["zscore"] = (df["close"] - r30_mean) / r30_std
+
+    # Drop NaN from rolling windows
+    df_clean = df[["ret", "vol", "dev_vwap", "zscore", "vol_spike"]].dropna()
+    
+    if df_clean.empty:
+        return None
+    return df_clean.values
+
+
 def _create_default_model(n_states: int, tag: str, promote: bool) -> dict[str, Any]:
     """Create a default/untrained model for bootstrap purposes."""
     try:
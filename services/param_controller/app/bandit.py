@@ -3,6 +3,16 @@
 import numpy as np
 from typing import Optional
 
+# Recompute each arm's inverse from scratch after this many rank-1 updates
+REFRESH_EVERY = 1000
+
+
+def _inverse(A: np.ndarray) -> np.ndarray:
+    try:
+        return np.linalg.inv(A)
+    except np.linalg.LinAlgError:
+        return np.linalg.pinv(A)
+
 
 class LinTS:
     """Linear Thompson Sampling contextual bandit.
@@ -31,29 +41,74 @@ def _get_arm(self, arm: int) -> dict:
         """Get or initialize arm posterior params."""
         if arm not in self._arms:
             self._arms[arm] = {
-                "A": self.l2 * np.eye(self.d),  # Precision matrix
-                "b": np.zeros(self.d),           # Weighted sum of rewards
-                "n": 0,                          # Number of observations
+                "A": self.l2 * np.eye(self.d),          # Precision matrix
+                "A_inv": np.eye(self.d) / self.l2,      # Its inverse (kept incrementally)
+                "b": np.zeros(self.d),                  # Weighted sum of rewards
+                "n": 0,                                 # Number of observations
             }
         return self._arms[arm]
     
+    def get_state(self, arm: int) -> dict:
+        """Posterior state of an arm (A, A_inv, b, n), e.g. for persistence."""
+        return self._get_arm(arm)
+    
+    def set_state(self, arm: int, state: dict) -> None:
+        """Restore a persisted arm posterior."""
+        A = np.asarray(state["A"], dtype=float).reshape(self.d, self.d)
+        A_inv = state.get("A_inv")
+        self._arms[arm] = {
+            "A": A.copy(),
+            "A_inv": (
+                np.asarray(A_inv, dtype=float).reshape(self.d, self.d).copy()
+                if A_inv is not None
+                else _inverse(A)
+            ),
+            "b": np.asarray(state["b"], dtype=float).reshape(self.d).copy(),
+            "n": int(state.get("n", 0)),
+        }
+    
     def update(self, arm: int, x: np.ndarray, reward: float) -> None:
         """Update posterior for an arm given observation.
         
+        O(d^2): the inverse is kept current with a Sherman-Morrison rank-1
+        update and recomputed from A every REFRESH_EVERY observations to
+        bound floating-point drift.
+        
         Args:
             arm: Arm index
             x: Feature vector at time of pull
             reward: Observed reward
         """
         state = self._get_arm(arm)
-        x = np.array(x).flatten()
+        x = np.array(x, dtype=float).flatten()
         
         # Update precision: A += x @ x.T
         state["A"] += np.outer(x, x)
         
+        # (A + x x^T)^-1 = A^-1 - (A^-1 x)(A^-1 x)^T / (1 + x^T A^-1 x)
+        Ax = state["A_inv"] @ x
+        state["A_inv"] -= np.outer(Ax, Ax) / (1.0 + x @ Ax)
+        
         # Update weighted rewards: b += reward * x
         state["b"] += reward * x
         state["n"] += 1
+        if state["n"] % REFRESH_EVERY == 0:
+            state["A_inv"] = _inverse(state["A"])
+    
+    def fit(self, arm: int, X: np.ndarray, rewards: np.ndarray) -> None:
+        """Fold a batch of observations for one arm into its posterior at once.
+        
+        Args:
+            arm: Arm index
+            X: Feature matrix of shape (n, d)
+            rewards: Rewards of shape (n,)
+        """
+        state = self._get_arm(arm)
+        X = np.asarray(X, dtype=float).reshape(-1, self.d)
+        state["A"] += X.T @ X
+        state["b"] += X.T @ np.asarray(rewards, dtype=float)
+        state["n"] += X.shape[0]
+        state["A_inv"] = _inverse(state["A"])
     
     def choose(self, X: np.ndarray) -> int:
         """Choose an arm using Thompson sampling.
@@ -72,10 +127,7 @@ def choose(self, X: np.ndarray) -> int:
             x = X[arm]
             
             # Compute posterior mean and variance
-            try:
-                A_inv = np.linalg.inv(state["A"])
-            except np.linalg.LinAlgError:
-                A_inv = np.linalg.pinv(state["A"])
+            A_inv = state["A_inv"]
             
             # Posterior mean: theta = A^-1 @ b
             theta_mean = A_inv @ state["b"]
@@ -88,6 +140,29 @@ def choose(self, X: np.ndarray) -> int:
         
         return int(np.argmax(samples))
     
+    def choose_many(self, X: np.ndarray, K: int) -> np.ndarray:
+        """Thompson-sample an arm for many contexts at once.
+        
+        Every row of X is one independent request whose context is shared by
+        all K arms (the per-request form of ``choose``).
+        
+        Args:
+            X: Context matrix of shape (n, d)
+            K: Number of arms
+            
+        Returns:
+            Chosen arm index per row, shape (n,)
+        """
+        X = np.asarray(X, dtype=float).reshape(-1, self.d)
+        states = [self._get_arm(arm) for arm in range(K)]
+        A_inv = np.stack([st["A_inv"] for st in states])                 # (K, d, d)
+        theta = np.einsum("kde,ke->kd", A_inv, np.stack([st["b"] for st in states]))
+        means = X @ theta.T                                              # (n, K)
+        quad = np.einsum("nd,kde,ne->nk", X, A_inv, X)
+        std = self.alpha * np.sqrt(np.maximum(quad, 0.0))
+        samples = means + std * np.random.randn(*means.shape)
+        return np.argmax(samples, axis=1)
+    
     def expected_reward(self, arm: int, x: np.ndarray) -> float:
         """Compute expected reward for an arm given context.
         
@@ -101,10 +176,5 @@ def expected_reward(self, arm: int, x: np.ndarray) -> float:
         state = self._get_arm(arm)
         x = np.array(x).flatten()
         
-        try:
-            A_inv = np.linalg.inv(state["A"])
-        except np.linalg.LinAlgError:
-            A_inv = np.linalg.pinv(state["A"])
-        
-        theta = A_inv @ state["b"]
+        theta = state["A_inv"] @ state["b"]
         return float(x @ theta)
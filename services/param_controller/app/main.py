@@ -1,6 +1,9 @@
 
 
 import logging
+from collections.abc import Iterable
+from typing import Any
+
 import numpy as np
 from fastapi import FastAPI, HTTPException
 
@@ -13,14 +16,18 @@
 
 logger = logging.getLogger("param_controller")
 
-from shared.dry_run import install_dry_run_guard, log_dry_run_banner
+from shared.dry_run import dry_run_enabled, install_dry_run_guard, log_dry_run_banner
 
 from . import store
 from .bandit import LinTS
 from .config import settings
 
+POLICY_VERSION = "0.1.0"
+
 app = FastAPI(title="param-controller", version="0.1.0")
-install_dry_run_guard(app, allow_paths={"/health"})
+# POST /params only reads (bulk selection; posterior rebuilds stay in memory
+# under DRY_RUN), so it stays open in dry-run
+install_dry_run_guard(app, allow_paths={"/health", "/params"})
 log_dry_run_banner("services.param_controller")
 
 
@@ -45,41 +52,149 @@ def register_preset(strategy: str, instrument: str, body: dict[str, Any]) -> dic
     return {"ok": True}
 
 
+def _effective_keys(feature_keys: list[str]) -> list[str]:
+    # No features anywhere: fall back to a constant bias term
+    return feature_keys or ["bias"]
+
+
+def _vector(keys: list[str], features: dict[str, Any]) -> np.ndarray:
+    return np.array([float(features.get(k, 0.0)) for k in keys], dtype=float)
+
+
+def _rebuild_posterior(
+    strategy: str, instrument: str, extra_keys: Iterable[str] = (), persist: bool = True
+) -> tuple[list[str], dict[str, dict]]:
+    """Replay the full outcome history into fresh per-preset posteriors and persist them.
+    
+    Only needed when the feature schema (or L2) changes; otherwise posteriors
+    are updated incrementally in report_outcome. With ``persist=False`` the
+    result is only returned (dry-run).
+    """
+    history = store.fetch_outcomes(settings.PC_DB, strategy, instrument, limit=None)
+    feat_keys = sorted({k for _, _, feats in history for k in feats} | set(extra_keys))
+    keys = _effective_keys(feat_keys)
+    by_preset: dict[str, tuple[list[np.ndarray], list[float]]] = {}
+    for preset_id, reward, feat_dict in history:
+        rows, rewards = by_preset.setdefault(preset_id, ([], []))
+        rows.append(_vector(keys, feat_dict))
+        rewards.append(reward)
+    bandit = LinTS(d=len(keys), l2=settings.L2)
+    arms = {}
+    for idx, (preset_id, (rows, rewards)) in enumerate(by_preset.items()):
+        bandit.fit(idx, np.vstack(rows), np.array(rewards))
+        arms[preset_id] = bandit.get_state(idx)
+    if not persist:
+        return feat_keys, arms
+    store.save_posteriors(
+        settings.PC_DB, strategy, instrument, feat_keys, settings.L2, arms, replace_all=True
+    )
+    logger.info(
+        "rebuilt posterior %s/%s from %d outcomes (features=%s)",
+        strategy, instrument, len(history), feat_keys,
+    )
+    return feat_keys, arms
+
+
+def _load_posterior(
+    strategy: str, instrument: str, feature_keys: Iterable[str]
+) -> tuple[list[str], dict[str, dict]]:
+    """Persisted posterior covering 'feature_keys', rebuilt from history if the schema changed."""
+    wanted = set(feature_keys)
+    keys, l2, arms = store.load_posteriors(settings.PC_DB, strategy, instrument)
+    if keys is not None and l2 == settings.L2 and wanted <= set(keys):
+        return keys, arms
+    if dry_run_enabled():
+        # Selection must not write in dry-run; rebuild in memory only
+        return _rebuild_posterior(strategy, instrument, wanted | set(keys or ()), persist=False)
+    with store.transaction(settings.PC_DB):
+        # Re-check under the write lock; another worker may have rebuilt already
+        keys, l2, arms = store.load_posteriors(settings.PC_DB, strategy, instrument)
+        if keys is not None and l2 == settings.L2 and wanted <= set(keys):
+            return keys, arms
+        return _rebuild_posterior(strategy, instrument, wanted | set(keys or ()))
+
+
+def _select(
+    strategy: str, instrument: str, feature_sets: list[dict[str, Any]]
+) -> list[dict[str, Any]] | None:
+    """Pick a preset for each feature set of one strategy/instrument in one pass.
+    
+    Returns None when no presets are registered.
+    """
+    presets = store.list_presets(settings.PC_DB, strategy, instrument)
+    if not presets:
+        return None
+    wanted = {k for feats in feature_sets for k in feats}
+    feat_keys, arms = _load_posterior(strategy, instrument, wanted)
+    keys = _effective_keys(feat_keys)
+    X = np.vstack([
+        _vector(keys, feats) if feat_keys else np.ones(1) for feats in feature_sets
+    ])
+    bandit = LinTS(d=len(keys), l2=settings.L2)
+    for idx, (pid, _) in enumerate(presets):
+        state = arms.get(pid)
+        if state is not None:
+            bandit.set_state(idx, state)
+    # Sample from posterior conditioned on historical outcomes
+    chosen = bandit.choose_many(X, len(presets))
+    out = []
+    for k in chosen:
+        pid, params = presets[int(k)]
+        out.append({
+            "config_id": f"{strategy}:{instrument}:{pid}",
+            "params": params,
+            "policy_version": POLICY_VERSION,
+            "features_used": keys,
+        })
+    return out
+
+
 @app.get("/param/{strategy}/{instrument}")
 def get_param(
     strategy: str, instrument: str, features: dict[str, float] | None = None
 ) -> dict[str, Any]:
-    presets = store.list_presets(settings.PC_DB, strategy, instrument)
-    if not presets:
+    selected = _select(strategy, instrument, [features or {}])
+    if selected is None:
         raise HTTPException(404, "no presets registered")
-    history = store.fetch_outcomes(settings.PC_DB, strategy, instrument)
-    history_feature_keys = {k for _, _, feats in history for k in feats.keys()}
-    provided_features = features or {}
-    feat_keys = sorted(set(provided_features.keys()) | history_feature_keys)
-    if not feat_keys:
-        feat_keys = ["bias"]
-        provided_features = {"bias": 1.0}
-    x = np.array([provided_features.get(k, 0.0) for k in feat_keys], dtype=float)
-    K = len(presets)
-    X = np.vstack([x for _ in range(K)])
-    bandit = LinTS(d=x.size, l2=settings.L2)
-    preset_index = {pid: idx for idx, (pid, _) in enumerate(presets)}
-    for preset_id, reward, feat_dict in history:
-        idx = preset_index.get(preset_id)
-        if idx is None:
-            continue
-        vec = np.array([feat_dict.get(k, 0.0) for k in feat_keys], dtype=float)
-        bandit.update(idx, vec, reward)
-    # Sample from posterior conditioned on historical outcomes
-    k = bandit.choose(X)
-    pid, params = presets[k]
-    config_id = f"{strategy}:{instrument}:{pid}"
-    return {
-        "config_id": config_id,
-        "params": params,
-        "policy_version": "0.1.0",
-        "features_used": feat_keys,
-    }
+    return selected[0]
+
+
+@app.post("/params")
+def get_params_bulk(body: dict[str, Any]) -> dict[str, Any]:
+    """Score many (strategy, instrument, features) requests in one call.
+    
+    Body: {"requests": [{"strategy", "instrument", "features", "have"}]} where
+    the optional "have" is the caller's current config_id. Requests whose
+    selection equals "have" are left out of "results" (delta response) and
+    only counted in "unchanged"; pairs without presets come back with an
+    "error" instead.
+    """
+    requests = body.get("requests")
+    if not isinstance(requests, list):
+        raise HTTPException(400, "requests list required")
+    groups: dict[tuple[str, str], list[int]] = {}
+    for i, req in enumerate(requests):
+        if not isinstance(req, dict) or not req.get("strategy") or not req.get("instrument"):
+            raise HTTPException(400, f"requests[{i}]: strategy and instrument required")
+        groups.setdefault((str(req["strategy"]), str(req["instrument"])), []).append(i)
+
+    results: list[dict[str, Any]] = []
+    unchanged = 0
+    for (strategy, instrument), idxs in groups.items():
+        selected = _select(
+            strategy, instrument, [requests[i].get("features") or {} for i in idxs]
+        )
+        for pos, i in enumerate(idxs):
+            ident = {"strategy": strategy, "instrument": instrument}
+            if selected is None:
+                results.append({**ident, "error": "no presets registered"})
+                continue
+            choice = selected[pos]
+            if requests[i].get("have") == choice["config_id"]:
+                unchanged += 1
+                continue
+            results.append({**ident, **choice})
+    return {"results": results, "unchanged": unchanged, "policy_version": POLICY_VERSION}
 
 
 @app.post("/learn/outcome/{strategy}/{instrument}/{preset_id}")
@@ -88,5 +203,21 @@ def report_outcome(
 ) -> dict[str, bool]:
     reward = float(body.get("reward", 0.0))
     features = body.get("features", {})
-    store.log_outcome(settings.PC_DB, strategy, instrument, preset_id, reward, features)
+    with store.transaction(settings.PC_DB):
+        store.log_outcome(settings.PC_DB, strategy, instrument, preset_id, reward, features)
+        keys, l2, arms = store.load_posteriors(settings.PC_DB, strategy, instrument)
+        if keys is None or l2 != settings.L2 or not set(features) <= set(keys):
+            # New feature key (or first outcome): rebuild once, including this outcome
+            _rebuild_posterior(strategy, instrument, set(features) | set(keys or ()))
+        else:
+            # O(d^2) rank-1 update of this preset's posterior only
+            eff = _effective_keys(keys)
+            bandit = LinTS(d=len(eff), l2=settings.L2)
+            if preset_id in arms:
+                bandit.set_state(0, arms[preset_id])
+            bandit.update(0, _vector(eff, features), reward)
+            store.save_posteriors(
+                settings.PC_DB, strategy, instrument, keys, settings.L2,
+                {preset_id: bandit.get_state(0)},
+            )
     return {"ok": True}
@@ -2,11 +2,57 @@
 
 import json
 import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 
 _conn_cache: dict[str, sqlite3.Connection] = {}
+_locks: dict[str, threading.RLock] = {}
+_tx_depth: dict[str, int] = {}
+
+
+def _lock(db_path: str) -> threading.RLock:
+    lock = _locks.get(db_path)
+    if lock is None:
+        lock = _locks.setdefault(db_path, threading.RLock())
+    return lock
+
+
+def _commit(db_path: str, conn: sqlite3.Connection) -> None:
+    """Commit unless an enclosing transaction() owns the commit."""
+    if not _tx_depth.get(db_path):
+        conn.commit()
+
+
+@contextmanager
+def transaction(db_path: str) -> Iterator[sqlite3.Connection]:
+    """Run the enclosed store calls as one write transaction.
+    
+    BEGIN IMMEDIATE serializes read-modify-write cycles (outcome + posterior)
+    across worker processes; the lock does the same across threads sharing
+    the cached connection.
+    """
+    with _lock(db_path):
+        conn = _get_conn(db_path)
+        outer = not _tx_depth.get(db_path)
+        if outer:
+            conn.execute("BEGIN IMMEDIATE")
+        _tx_depth[db_path] = _tx_depth.get(db_path, 0) + 1
+        try:
+            yield conn
+        except BaseException:
+            _tx_depth[db_path] -= 1
+            if outer:
+                conn.rollback()
+            raise
+        _tx_depth[db_path] -= 1
+        if outer:
+            conn.commit()
 
 
 def _get_conn(db_path: str) -> sqlite3.Connection:
@@ -44,6 +90,29 @@ def init(db_path: str) -> None:
         
         CREATE INDEX IF NOT EXISTS idx_outcomes_lookup 
             ON outcomes(strategy, instrument);
+        
+        -- Incremental LinTS posterior per preset, valid for one feature schema
+        CREATE TABLE IF NOT EXISTS posterior_schema (
+            strategy TEXT NOT NULL,
+            instrument TEXT NOT NULL,
+            feature_keys TEXT NOT NULL,
+            l2 REAL NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (strategy, instrument)
+        );
+        
+        CREATE TABLE IF NOT EXISTS posteriors (
+            strategy TEXT NOT NULL,
+            instrument TEXT NOT NULL,
+            preset_id TEXT NOT NULL,
+            d INTEGER NOT NULL,
+            n INTEGER NOT NULL,
+            A BLOB NOT NULL,
+            A_inv BLOB NOT NULL,
+            b BLOB NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (strategy, instrument, preset_id)
+        );
     """)
     conn.commit()
 
@@ -57,12 +126,13 @@ def upsert_preset(
 ) -> None:
     """Insert or update a preset configuration."""
     conn = _get_conn(db_path)
-    conn.execute(
-        """INSERT OR REPLACE INTO presets (strategy, instrument, preset_id, params)
-           VALUES (?, ?, ?, ?)""",
-        (strategy, instrument, preset_id, json.dumps(params)),
-    )
-    conn.commit()
+    with _lock(db_path):
+        conn.execute(
+            """INSERT OR REPLACE INTO presets (strategy, instrument, preset_id, params)
+               VALUES (?, ?, ?, ?)""",
+            (strategy, instrument, preset_id, json.dumps(params)),
+        )
+        _commit(db_path, conn)
 
 
 def list_presets(
@@ -95,21 +165,25 @@ def log_outcome(
 ) -> None:
     """Log an outcome (reward) for a preset selection."""
     conn = _get_conn(db_path)
-    conn.execute(
-        """INSERT INTO outcomes (strategy, instrument, preset_id, reward, features)
-           VALUES (?, ?, ?, ?, ?)""",
-        (strategy, instrument, preset_id, reward, json.dumps(features or {})),
-    )
-    conn.commit()
+    with _lock(db_path):
+        conn.execute(
+            """INSERT INTO outcomes (strategy, instrument, preset_id, reward, features)
+               VALUES (?, ?, ?, ?, ?)""",
+            (strategy, instrument, preset_id, reward, json.dumps(features or {})),
+        )
+        _commit(db_path, conn)
 
 
 def fetch_outcomes(
     db_path: str,
     strategy: str,
     instrument: str,
-    limit: int = 1000,
+    limit: int | None = 1000,
 ) -> list[tuple[str, float, dict[str, float]]]:
-    """Fetch historical outcomes for bandit training.
+    """Fetch historical outcomes for bandit training (newest first).
+    
+    Args:
+        limit: Maximum rows to return; None for the full history
     
     Returns:
         List of (preset_id, reward, features) tuples
@@ -118,9 +192,9 @@ def fetch_outcomes(
     cursor = conn.execute(
         """SELECT preset_id, reward, features FROM outcomes
            WHERE strategy = ? AND instrument = ?
-           ORDER BY created_at DESC
+           ORDER BY created_at DESC, id DESC
            LIMIT ?""",
-        (strategy, instrument, limit),
+        (strategy, instrument, -1 if limit is None else limit),
     )
     return [
         (row["preset_id"], row["reward"], json.loads(row["features"] or "{}"))
@@ -153,10 +227,95 @@ def delete_preset(
 ) -> bool:
     """Delete a preset."""
     conn = _get_conn(db_path)
+    with _lock(db_path):
+        cursor = conn.execute(
+            """DELETE FROM presets
+               WHERE strategy = ? AND instrument = ? AND preset_id = ?""",
+            (strategy, instrument, preset_id),
+        )
+        _commit(db_path, conn)
+    return cursor.rowcount > 0
+
+
+def load_posteriors(
+    db_path: str,
+    strategy: str,
+    instrument: str,
+) -> tuple[list[str] | None, float | None, dict[str, dict[str, Any]]]:
+    """Load the persisted bandit posterior for a strategy/instrument pair.
+    
+    Returns:
+        (feature_keys, l2, {preset_id: {"A", "A_inv", "b", "n"}}); feature_keys
+        is None when no posterior has been built yet
+    """
+    conn = _get_conn(db_path)
+    row = conn.execute(
+        """SELECT feature_keys, l2 FROM posterior_schema
+           WHERE strategy = ? AND instrument = ?""",
+        (strategy, instrument),
+    ).fetchone()
+    if row is None:
+        return None, None, {}
+    keys = json.loads(row["feature_keys"])
     cursor = conn.execute(
-        """DELETE FROM presets
-           WHERE strategy = ? AND instrument = ? AND preset_id = ?""",
-        (strategy, instrument, preset_id),
+        """SELECT preset_id, d, n, A, A_inv, b FROM posteriors
+           WHERE strategy = ? AND instrument = ?""",
+        (strategy, instrument),
     )
-    conn.commit()
-    return cursor.rowcount > 0
+    arms: dict[str, dict[str, Any]] = {}
+    for r in cursor:
+        d = r["d"]
+        arms[r["preset_id"]] = {
+            "A": np.frombuffer(r["A"], dtype=np.float64).reshape(d, d),
+            "A_inv": np.frombuffer(r["A_inv"], dtype=np.float64).reshape(d, d),
+            "b": np.frombuffer(r["b"], dtype=np.float64),
+            "n": r["n"],
+        }
+    return keys, row["l2"], arms
+
+
+def save_posteriors(
+    db_path: str,
+    strategy: str,
+    instrument: str,
+    feature_keys: list[str],
+    l2: float,
+    arms: dict[str, dict[str, Any]],
+    replace_all: bool = False,
+) -> None:
+    """Persist arm posteriors valid for 'feature_keys'.
+    
+    Args:
+        replace_all: Drop every stored arm first (schema rebuild)
+    """
+    conn = _get_conn(db_path)
+    with _lock(db_path):
+        if replace_all:
+            conn.execute(
+                "DELETE FROM posteriors WHERE strategy = ? AND instrument = ?",
+                (strategy, instrument),
+            )
+        conn.execute(
+            """INSERT OR REPLACE INTO posterior_schema (strategy, instrument, feature_keys, l2)
+               VALUES (?, ?, ?, ?)""",
+            (strategy, instrument, json.dumps(list(feature_keys)), float(l2)),
+        )
+        conn.executemany(
+            """INSERT OR REPLACE INTO posteriors
+               (strategy, instrument, preset_id, d, n, A, A_inv, b)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            [
+                (
+                    strategy,
+                    instrument,
+                    preset_id,
+                    len(state["b"]),
+                    int(state["n"]),
+                    np.ascontiguousarray(state["A"], dtype=np.float64).tobytes(),
+                    np.ascontiguousarray(state["A_inv"], dtype=np.float64).tobytes(),
+                    np.ascontiguousarray(state["b"], dtype=np.float64).tobytes(),
+                )
+                for preset_id, state in arms.items()
+            ],
+        )
+        _commit(db_path, conn)
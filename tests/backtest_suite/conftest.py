@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.backtest_suite.app import engine as engine_module
+from services.backtest_suite.app.config import settings
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    rng = np.random.default_rng(7)
+    base = 1_700_000_000_000
+    data_dir = tmp_path / "historical"
+    data_dir.mkdir()
+    for offset, (symbol, drift) in enumerate([("AAAUSDT", 4e-4), ("BBBUSDT", -3e-4), ("CCCUSDT", 1e-4)]):
+        n = 1500
+        # Irregular 1-3 minute spacing and staggered starts so the clock
+        # replays stale bars and symbols join part-way through.
+        ts = base + offset * 17 * 60_000 + np.cumsum(rng.integers(1, 4, n)) * 60_000
+        close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.004, n)))
+        pd.DataFrame(
+            {
+                "timestamp": ts,
+                "open": close,
+                "high": close * (1 + rng.uniform(0, 0.003, n)),
+                "low": close * (1 - rng.uniform(0, 0.003, n)),
+                "close": close,
+                "volume": rng.lognormal(1.0, 1.0, n),
+            }
+        ).to_csv(data_dir / f"{symbol}.csv", index=False)
+
+    monkeypatch.setattr(settings, "HISTORICAL_DIR", str(data_dir))
+    monkeypatch.setattr(settings, "RESULTS_DIR", str(tmp_path / "results"))
+    monkeypatch.setattr(engine_module.BacktestEngine, "_trigger_retrain", lambda self: None)
+    return data_dir
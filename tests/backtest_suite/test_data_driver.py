@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+from services.backtest_suite.app.driver import DataDriver
+
+
+def _write_csv(path, timestamps, closes):
+    pd.DataFrame(
+        {
+            "timestamp": timestamps,
+            "open": closes,
+            "high": [c + 1 for c in closes],
+            "low": [c - 1 for c in closes],
+            "close": closes,
+            "volume": [10.0] * len(closes),
+        }
+    ).to_csv(path, index=False)
+
+
+def _reference_bar_at(df, ts):
+    hit = df[df["timestamp"] <= ts]
+    return None if hit.empty else hit.iloc[-1]
+
+
+def test_get_bar_at_matches_mask_scan(tmp_path):
+    base = 1_700_000_000_000
+    # Two files for the same symbol, out of order and with an overlapping row.
+    _write_csv(tmp_path / "BTCUSDT_b.csv", [base + 3 * 60_000, base + 2 * 60_000], [103.0, 102.0])
+    _write_csv(tmp_path / "BTCUSDT_a.csv", [base, base + 60_000, base + 2 * 60_000], [100.0, 101.0, 999.0])
+
+    driver = DataDriver()
+    assert driver.load_historical(str(tmp_path)) == 5
+    df = driver.data["BTCUSDT"]
+    assert df["timestamp"].is_monotonic_increasing
+    assert len(df) == 4
+
+    assert driver.get_time_range() == (base, base + 3 * 60_000)
+
+    # Forward replay at a finer step than the bars, then a backwards jump.
+    probes = list(range(base - 30_000, base + 5 * 60_000, 30_000)) + [base + 30_000, base - 1]
+    for ts in probes:
+        bar = driver.get_bar_at("BTCUSDT", ts)
+        expected = _reference_bar_at(df, ts)
+        if expected is None:
+            assert bar is None
+            continue
+        assert bar.timestamp == int(expected["timestamp"])
+        assert bar.close == float(expected["close"])
+        assert bar.symbol == "BTCUSDT"
+
+    assert driver.get_bar_at("ETHUSDT", base) is None
+
+
+def test_range_iteration_and_volatility(tmp_path):
+    base = 1_700_000_000_000
+    closes = [100.0 + np.sin(i) for i in range(50)]
+    _write_csv(tmp_path / "ETHUSDT.csv", [base + i * 60_000 for i in range(50)], closes)
+
+    driver = DataDriver(["ETHUSDT"])
+    driver.load_historical(str(tmp_path))
+
+    bars = driver.get_bars_range("ETHUSDT", base + 10 * 60_000, base + 19 * 60_000)
+    assert np.allclose([b.close for b in bars], closes[10:20])
+    assert np.allclose([b.close for b in driver.iter_bars("ETHUSDT")], closes)
+
+    returns = driver.compute_returns("ETHUSDT")
+    expected = float(returns.tail(20).std() * np.sqrt(525600))
+    assert np.isclose(driver.compute_volatility("ETHUSDT", 20), expected)
+
+
+def test_parquet_dataset_matches_csv_and_prunes_window(history, tmp_path, monkeypatch):
+    from services.common import manifest, ohlcv_dataset
+    from services.backtest_suite.app.config import settings
+
+    ledger = str(tmp_path / "ledger.sqlite")
+    root = str(tmp_path / "dataset")
+    manifest.init(ledger)
+    monkeypatch.setattr(settings, "LEDGER_DB", ledger)
+    for csv in sorted(history.glob("*.csv")):
+        df = pd.read_csv(csv)
+        for lo in range(0, len(df), 400):
+            ohlcv_dataset.append(root, csv.stem, "1m", df.iloc[lo:lo + 400], db_path=ledger)
+
+    from_csv = DataDriver()
+    from_csv.load_historical(str(history))
+    from_parquet = DataDriver()
+    assert from_parquet.load_historical(root) == 3 * 1500
+    assert sorted(from_parquet.get_symbols()) == sorted(from_csv.get_symbols())
+    for symbol in from_csv.get_symbols():
+        expected, got = from_csv.get_series(symbol), from_parquet.get_series(symbol)
+        for name, _ in expected.COLUMNS:
+            assert np.array_equal(getattr(expected, name), getattr(got, name))
+        assert from_csv.compute_returns(symbol).equals(from_parquet.compute_returns(symbol))
+    assert len(from_parquet.compute_returns("BBBUSDT")) == 1499
+
+    start, end = from_csv.get_time_range()
+    lo, hi = start + (end - start) // 3, start + (end - start) // 2
+    windowed = DataDriver(["BBBUSDT"])
+    windowed.load_dataset(root, start_ts=lo, end_ts=hi)
+    series = from_csv.get_series("BBBUSDT")
+    mask = (series.timestamp >= lo) & (series.timestamp <= hi)
+    assert np.array_equal(windowed.get_series("BBBUSDT").close, series.close[mask])
@@ -0,0 +1,36 @@
+from services.backtest_suite.app.grid_search import GridSearch
+
+GRID = {"fast_period": [5, 10], "slow_period": [20, 30]}
+
+
+def _by_params(results):
+    return {tuple(r.params.items()): (r.metrics, r.pruned) for r in results}
+
+
+def test_parallel_grid_matches_serial(history):
+    serial = GridSearch(strategy="trend_follow", engine="vectorized").search(GRID)
+    parallel = GridSearch(strategy="trend_follow", engine="vectorized", workers=2).search(GRID)
+
+    assert len(parallel.all_results) == 4
+    assert _by_params(parallel.all_results) == _by_params(serial.all_results)
+    assert parallel.best_result.params == serial.best_result.params
+    assert len({r.run_id for r in parallel.all_results}) == 4
+
+
+def test_drawdown_limit_prunes_runs(history):
+    gs = GridSearch(strategy="trend_follow", engine="event", abort_drawdown=0.01)
+    summary = gs.search(GRID)
+
+    pruned = [r for r in summary.all_results if r.pruned]
+    assert pruned
+    assert all(r.metrics["max_drawdown"] > 0.01 for r in pruned)
+    assert summary.best_result is None or not summary.best_result.pruned
+    assert summary.to_dict()["pruned_runs"] == len(pruned)
+
+
+def test_iter_results_streams_and_stops_early(history):
+    gs = GridSearch(strategy="momentum", engine="vectorized", workers=2)
+    stream = gs.iter_results({"lookback": [10, 15, 20, 25]})
+    first = next(stream)
+    stream.close()
+    assert first.params["lookback"] in (10, 15, 20, 25)
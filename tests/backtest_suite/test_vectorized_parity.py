@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from services.backtest_suite.app.engine import BacktestEngine
+from services.backtest_suite.app.vectorized import VectorizedBacktestEngine
+
+
+@pytest.mark.parametrize(
+    "strategy, params",
+    [
+        ("momentum", {}),
+        ("momentum", {"lookback": 10, "momentum_threshold": 0.01, "volume_ratio": 1.2}),
+        ("trend_follow", {}),
+        ("trend_follow", {"fast_period": 5, "slow_period": 20, "min_trend_strength": 0.0005}),
+    ],
+)
+def test_vectorized_matches_event_driven(history, strategy, params):
+    results = []
+    for cls in (BacktestEngine, VectorizedBacktestEngine):
+        engine = cls(strategy=strategy)
+        for key, value in params.items():
+            setattr(engine.strategy, key, value)
+        results.append((engine, engine.run()))
+
+    (event_engine, event_result), (fast_engine, fast_result) = results
+    assert event_result["metrics"]["total_trades"] > 0
+    assert fast_result["metrics"] == event_result["metrics"]
+    assert fast_result["bars_processed"] == event_result["bars_processed"]
+
+    event_curve = event_engine.metrics.to_dataframe()
+    fast_curve = fast_engine.metrics.to_dataframe()
+    pd.testing.assert_frame_equal(fast_curve, event_curve, check_exact=True)
+    assert [t.pnl for t in fast_engine.metrics.trades] == [t.pnl for t in event_engine.metrics.trades]
+    assert fast_engine.portfolio.cash == event_engine.portfolio.cash
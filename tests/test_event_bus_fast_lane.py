@@ -0,0 +1,131 @@
+import asyncio
+import copy
+import json
+
+import pytest
+
+from engine.core.event_bus import EventBus, FrozenEvent
+from engine.feeds.market_data_dispatcher import MarketDataDispatcher
+
+
+def test_frozen_event_is_read_only_but_dict_compatible():
+    evt = FrozenEvent({"symbol": "BTCUSDT", "price": 1.0, "meta": {"k": 1}})
+    with pytest.raises(TypeError):
+        evt["price"] = 2.0
+    with pytest.raises(TypeError):
+        evt.update(price=2.0)
+    with pytest.raises(TypeError):
+        evt.pop("price")
+    assert json.loads(json.dumps(evt))["price"] == 1.0
+    clone = dict(evt)
+    clone["price"] = 2.0
+    assert evt["price"] == 1.0
+    deep = copy.deepcopy(evt)
+    assert isinstance(deep, FrozenEvent) and deep == evt and deep["meta"] is not evt["meta"]
+
+
+async def test_fast_topic_delivers_in_publish_order():
+    bus = EventBus(max_workers=1)
+    await bus.start()
+    try:
+        seen = []
+        publisher = asyncio.current_task()
+
+        def sync_handler(evt):
+            seen.append(("sync", evt["i"], evt))
+
+        async def async_handler(evt):
+            # Own Task: the publisher's task, cancel scopes and context stay out of it
+            assert asyncio.current_task() is not publisher
+            seen.append(("async", evt["i"], evt))
+
+        bus.subscribe("market.trade", sync_handler)
+        bus.subscribe("market.trade", async_handler)
+
+        dispatcher = MarketDataDispatcher(bus, source="unit")
+        for i in range(50):
+            dispatcher.handle_stream_event({"type": "trade", "symbol": "BTCUSDT", "i": i})
+        await bus.publish("market.trade", {"i": 50})
+        # Sync handlers ran inline, before publish returned
+        assert [i for kind, i, _ in seen if kind == "sync"] == list(range(51))
+        await asyncio.sleep(0)
+
+        assert [i for kind, i, _ in seen if kind == "async"] == list(range(51))
+        # Both handlers got the very same frozen payload object
+        by_kind = {(kind, i): evt for kind, i, evt in seen}
+        for i in range(51):
+            assert by_kind[("sync", i)] is by_kind[("async", i)]
+            assert isinstance(by_kind[("sync", i)], FrozenEvent)
+        assert seen[0][2]["source"] == "unit"
+        assert bus.get_stats()["delivered"] == 102
+    finally:
+        await bus.stop()
+        bus.shutdown(wait=False)
+
+
+async def test_async_handler_errors_and_cancellation_stay_off_the_publisher():
+    bus = EventBus(max_workers=1)
+    await bus.start()
+    try:
+        async def raises_immediately(evt):
+            raise RuntimeError("boom")
+
+        async def cancels_itself(evt):
+            asyncio.current_task().cancel()
+            await asyncio.sleep(0)
+
+        bus.subscribe("market.book", raises_immediately)
+        bus.subscribe("market.book", cancels_itself)
+        async with asyncio.timeout(1.0):
+            bus.emit("market.book", {"symbol": "BTCUSDT"})
+            await asyncio.sleep(0.01)  # the publisher was neither failed nor cancelled
+        assert bus.get_stats()["failed"] == 1
+    finally:
+        await bus.stop()
+        bus.shutdown(wait=False)
+
+
+async def test_suspending_and_failing_handlers_are_isolated():
+    bus = EventBus(max_workers=1)
+    await bus.start()
+    finished = []
+    gate = asyncio.Event()
+
+    async def slow(evt):
+        await gate.wait()
+        finished.append(evt["i"])
+
+    def broken(evt):
+        raise RuntimeError("boom")
+
+    after = []
+    bus.subscribe("market.tick", slow)
+    bus.subscribe("market.tick", broken)
+    bus.subscribe("market.tick", lambda evt: after.append(evt["i"]))
+
+    bus.fire("market.tick", {"i": 1})
+    bus.fire("market.tick", {"i": 2})
+    assert after == [1, 2]
+    assert finished == []
+    assert bus.get_stats()["failed"] == 2
+
+    gate.set()
+    await bus.stop()
+    bus.shutdown(wait=False)
+    assert sorted(finished) == [1, 2]
+
+
+async def test_slow_lane_topics_still_use_queue():
+    bus = EventBus(max_workers=1)
+    await bus.start()
+    got = []
+
+    async def handler(evt):
+        got.append((evt["i"], isinstance(evt, FrozenEvent)))
+
+    bus.subscribe("order.filled", handler)
+    await bus.publish("order.filled", {"i": 1})
+    assert got == []  # queued, not delivered inline
+    await bus.stop()
+    bus.shutdown(wait=False)
+    assert got == [(1, False)]
@@ -0,0 +1,170 @@
+import asyncio
+import threading
+
+import pytest
+
+from engine import metrics
+from engine.core.event_bus import EventBus
+
+
+def _gauge(metric, **labels):
+    return metric.labels(**labels)._value.get()
+
+
+def test_topics_route_to_longest_prefix_lane():
+    bus = EventBus(max_workers=1)
+    try:
+        assert bus._lane_for("order.filled").name == "critical"
+        assert bus._lane_for("risk.violation").name == "critical"
+        assert bus._lane_for("market.tick").name == "quotes"
+        assert bus._lane_for("market.kline").name == "feeds"
+        assert bus._lane_for("strategy.signal").name == "default"
+        assert bus._lane_for("events.external_feed").name == "default"
+        assert bus._lane_for("events.other").name == "feeds"
+        with pytest.raises(ValueError):
+            bus.add_lane("bogus", ("x.",), policy="drop_newest")
+    finally:
+        bus.shutdown()
+
+
+async def test_critical_lane_not_delayed_by_saturated_feed_lane():
+    bus = EventBus(max_workers=1)
+    bus.add_lane("feeds", ("market.", "signal."), "drop_oldest", maxsize=50, concurrency=2)
+    await bus.start()
+    try:
+        release = asyncio.Event()
+        filled = asyncio.Event()
+
+        async def slow_feed(evt):
+            await release.wait()
+
+        async def on_fill(evt):
+            filled.set()
+
+        bus.subscribe("market.kline", slow_feed)
+        bus.subscribe("order.filled", on_fill)
+        for i in range(500):
+            await bus.publish("market.kline", {"symbol": "BTCUSDT", "i": i})
+        lanes = bus.get_stats()["lanes"]
+        assert lanes["feeds"]["depth"] == 50
+        assert lanes["feeds"]["dropped"] == 450
+        assert _gauge(metrics.eventbus_queue_depth, lane="feeds") == 50
+
+        await bus.publish("order.filled", {"symbol": "BTCUSDT"})
+        await asyncio.wait_for(filled.wait(), timeout=1.0)
+        lanes = bus.get_stats()["lanes"]
+        # Feed handlers are still stuck holding both slots
+        assert lanes["feeds"]["depth"] == 48
+        assert lanes["critical"]["dropped"] == 0
+    finally:
+        release.set()
+        await bus.stop()
+        bus.shutdown()
+
+
+async def test_coalesce_lane_keeps_latest_payload_per_symbol():
+    bus = EventBus(max_workers=1)
+    bus.add_lane("quotes", ("quote.",), "coalesce", maxsize=100, concurrency=1)
+    await bus.start()
+    try:
+        gate = asyncio.Event()
+        seen = []
+
+        async def handler(evt):
+            await gate.wait()
+            seen.append((evt["symbol"], evt["px"]))
+
+        bus.subscribe("quote.top", handler)
+        await bus.publish("quote.top", {"symbol": "BTCUSDT", "px": 0})
+        await asyncio.sleep(0.01)  # first event occupies the only slot
+        for px in range(1, 6):
+            await bus.publish("quote.top", {"symbol": "BTCUSDT", "px": px})
+            await bus.publish("quote.top", {"symbol": "ETHUSDT", "px": px * 10})
+
+        stats = bus.get_stats()["lanes"]["quotes"]
+        assert stats["depth"] == 2
+        assert stats["coalesced"] == 8
+        gate.set()
+        for _ in range(50):
+            if len(seen) == 3:
+                break
+            await asyncio.sleep(0.01)
+        assert seen == [("BTCUSDT", 0), ("BTCUSDT", 5), ("ETHUSDT", 50)]
+    finally:
+        await bus.stop()
+        bus.shutdown()
+
+
+async def test_block_lane_applies_backpressure_and_drains_on_stop():
+    bus = EventBus(max_workers=1)
+    bus.add_lane("critical", ("order.",), "block", maxsize=2, concurrency=1)
+    await bus.start()
+    seen = []
+    gate = asyncio.Event()
+
+    async def handler(evt):
+        await gate.wait()
+        seen.append(evt["i"])
+
+    bus.subscribe("order.new", handler)
+    for i in range(3):
+        await bus.publish("order.new", {"i": i})
+    await asyncio.sleep(0.01)
+    blocked = asyncio.create_task(bus.publish("order.new", {"i": 3}))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    assert bus.get_stats()["lanes"]["critical"]["oldest_age_sec"] > 0
+    gate.set()
+    await asyncio.wait_for(blocked, timeout=1.0)
+    await bus.stop()
+    bus.shutdown()
+    assert seen == [0, 1, 2, 3]
+
+
+async def test_critical_sync_handlers_do_not_wait_for_shared_pool():
+    bus = EventBus(max_workers=1)
+    await bus.start()
+    release = threading.Event()
+    try:
+        filled = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def slow_strategy(evt):
+            release.wait(5.0)
+
+        def on_fill(evt):
+            loop.call_soon_threadsafe(filled.set)
+
+        bus.subscribe("strategy.tick", slow_strategy)
+        bus.subscribe("order.filled", on_fill)
+        await bus.publish("strategy.tick", {})
+        await asyncio.sleep(0.01)  # the only shared worker is now busy
+        await bus.publish("order.filled", {"symbol": "BTCUSDT"})
+        await asyncio.wait_for(filled.wait(), timeout=1.0)
+    finally:
+        release.set()
+        await bus.stop()
+        bus.shutdown()
+
+
+async def test_oldest_age_gauge_advances_without_queue_activity():
+    bus = EventBus(max_workers=1)
+    bus.add_lane("critical", ("order.",), "block", maxsize=10, concurrency=1)
+    await bus.start()
+    gate = asyncio.Event()
+    try:
+        async def handler(evt):
+            await gate.wait()
+
+        bus.subscribe("order.new", handler)
+        for i in range(2):
+            await bus.publish("order.new", {"i": i})
+        await asyncio.sleep(0.01)
+        first = metrics.eventbus_queue_oldest_age_seconds.labels(lane="critical")._child_samples()[0].value
+        await asyncio.sleep(0.05)
+        later = metrics.eventbus_queue_oldest_age_seconds.labels(lane="critical")._child_samples()[0].value
+        assert later >= first + 0.04
+    finally:
+        gate.set()
+        await bus.stop()
+        bus.shutdown()
@@ -0,0 +1,200 @@
+import asyncio
+import json
+
+import pytest
+
+from engine.core import binance_market_stream as bms
+from engine.core.binance_market_stream import BinanceMarketStream, make_decoder
+
+AGG_TRADE = {
+    "stream": "btcusdt@aggTrade",
+    "data": {
+        "e": "aggTrade",
+        "E": 1700000000100,
+        "s": "BTCUSDT",
+        "a": 1,
+        "p": "43123.45",
+        "q": "0.015",
+        "f": 1,
+        "l": 2,
+        "T": 1700000000000,
+        "m": True,
+    },
+}
+FORCE_ORDER = {
+    "stream": "!forceOrder@arr",
+    "data": {
+        "e": "forceOrder",
+        "E": 1568014460893,
+        "o": {"s": "ETHUSDT", "S": "SELL", "o": "LIMIT", "q": "0.5", "p": "2000", "ap": "1999.5"},
+    },
+}
+
+
+def _frame(i: int) -> str:
+    data = dict(AGG_TRADE["data"], p=str(100 + i), T=1700000000000 + i)
+    return json.dumps({"stream": AGG_TRADE["stream"], "data": data})
+
+
+@pytest.mark.skipif(bms.msgspec is None, reason="msgspec not installed")
+@pytest.mark.parametrize("frame", [AGG_TRADE, FORCE_ORDER, AGG_TRADE["data"]])
+def test_struct_decoder_matches_dict_decoder(frame):
+    raw = json.dumps(frame)
+    expected = make_decoder("json")(raw)
+    assert expected is not None
+    assert make_decoder("msgspec")(raw) == expected
+    assert make_decoder("msgspec")(raw.encode()) == expected
+
+
+def test_decoder_ignores_control_and_unknown_frames():
+    for kind in ("json", "auto"):
+        decode = make_decoder(kind)
+        assert decode('{"result": null, "id": 1}') is None
+        assert decode('{"stream": "x@depth", "data": {"e": "depthUpdate"}}') is None
+
+
+async def test_slow_consumer_never_blocks_reader_and_drops_oldest():
+    gate = asyncio.Event()
+    batches = []
+
+    async def on_batch(events):
+        await gate.wait()
+        batches.append([e["price"] for e in events])
+
+    stream = BinanceMarketStream(["BTCUSDT"], on_batch=on_batch, buffer_size=8, batch_size=3)
+    consumer = asyncio.create_task(stream._consume())
+    try:
+        for i in range(3):
+            stream.push_frame(_frame(i))
+        await asyncio.sleep(0)  # consumer takes the first batch and blocks on the handler
+        for i in range(3, 20):
+            stream.push_frame(_frame(i))  # reader keeps going while the consumer is stuck
+        stats = stream.get_stats()
+        assert stats["frames"] == 20
+        assert stats["frames_behind"] == 8
+        assert stats["dropped"] == 9
+
+        gate.set()
+        for _ in range(100):
+            if stream.get_stats()["dispatched"] == 11:
+                break
+            await asyncio.sleep(0)
+        assert [len(b) for b in batches] == [3, 3, 3, 2]
+        assert [p for b in batches for p in b] == [100.0, 101.0, 102.0] + [
+            float(100 + i) for i in range(12, 20)
+        ]
+        assert stream.get_stats()["frames_behind"] == 0
+        assert stream.get_stats()["decode_seconds_total"] > 0
+    finally:
+        consumer.cancel()
+
+
+class FakeSocket:
+    def __init__(self, url):
+        self.url = url
+        self.sent = []
+        self.frames = asyncio.Queue()
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.closed = True
+        return False
+
+    async def send(self, msg):
+        self.sent.append(json.loads(msg))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        frame = await self.frames.get()
+        if frame is None:
+            raise StopAsyncIteration
+        return frame
+
+    def subscribed(self):
+        streams = set()
+        for msg in self.sent:
+            if msg["method"] == "SUBSCRIBE":
+                streams |= set(msg["params"])
+            else:
+                streams -= set(msg["params"])
+        return streams
+
+
+async def _settle(predicate, rounds=200):
+    for _ in range(rounds):
+        if predicate():
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError("condition not reached")
+
+
+async def test_streams_shard_across_connections_and_update_by_delta(monkeypatch):
+    monkeypatch.setenv("MARKET_STREAM_STAGGER_SEC", "0")
+    sockets = []
+
+    def connect(url):
+        sockets.append(FakeSocket(url))
+        return sockets[-1]
+
+    stream = BinanceMarketStream(
+        ["AAAUSDT", "BBBUSDT", "CCCUSDT", "DDDUSDT", "EEEUSDT"],
+        max_streams_per_conn=2,
+        connect=connect,
+    )
+    stream._control_interval = 0
+    runner = asyncio.create_task(stream.run())
+    try:
+        await _settle(lambda: len(sockets) == 3 and all(s.sent for s in sockets))
+        assert all(s.url.endswith("/stream") for s in sockets)
+        owned = [s.subscribed() for s in sockets]
+        assert sorted(len(o) for o in owned) == [1, 2, 2]
+        assert set().union(*owned) == {f"{c * 3}usdt@aggTrade" for c in "abcde"}
+
+        # Rotate one symbol out and one in: only deltas, no reconnects
+        stream.subscribe(["AAAUSDT", "BBBUSDT", "CCCUSDT", "DDDUSDT", "FFFUSDT"])
+        await _settle(lambda: "fffusdt@aggTrade" in set().union(*(s.subscribed() for s in sockets)))
+        assert len(sockets) == 3 and not any(s.closed for s in sockets)
+        streams = set().union(*(s.subscribed() for s in sockets))
+        assert "eeeusdt@aggTrade" not in streams
+        assert sum(len(s.sent) for s in sockets) == 5
+        assert [sh["connects"] for sh in stream.get_stats()["shards"]] == [1, 1, 1]
+    finally:
+        stream.stop()
+        for s in sockets:
+            s.frames.put_nowait(None)
+        await asyncio.wait_for(runner, timeout=2.0)
+
+
+def test_aggtrade_id_gaps_are_counted_per_symbol():
+    stream = BinanceMarketStream(["BTCUSDT"])
+    for trade_id in (10, 11, 12, 20, 21, 21):
+        data = dict(AGG_TRADE["data"], a=trade_id)
+        stream.push_frame(json.dumps({"stream": AGG_TRADE["stream"], "data": data}))
+    events = stream._decode_batch()
+    assert [e["trade_id"] for e in events] == [10, 11, 12, 20, 21, 21]
+    stats = stream.get_stats()
+    assert stats["gaps"] == 1
+    assert stats["missed_trades"] == 7
+    assert stats["gaps_by_symbol"] == {"BTCUSDT": 1}
+
+
+def test_resubscribed_symbol_does_not_report_a_gap():
+    stream = BinanceMarketStream(["BTCUSDT"])
+
+    def feed(*ids):
+        for trade_id in ids:
+            data = dict(AGG_TRADE["data"], a=trade_id)
+            stream.push_frame(json.dumps({"stream": AGG_TRADE["stream"], "data": data}))
+        stream._decode_batch()
+
+    feed(10, 11)
+    stream.subscribe(["ETHUSDT"])
+    stream.subscribe(["ETHUSDT", "BTCUSDT"])
+    feed(5_000, 5_001)
+    stats = stream.get_stats()
+    assert stats["gaps"] == 0 and stats["missed_trades"] == 0
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from engine.core import venue_specs
+
+
+def _entry(symbol, step="0.001", tick="0.10", notional="5"):
+    return {
+        "symbol": symbol,
+        "filters": [
+            {"filterType": "PRICE_FILTER", "tickSize": tick},
+            {"filterType": "LOT_SIZE", "stepSize": step, "minQty": step},
+            {"filterType": "MIN_NOTIONAL", "minNotional": notional},
+        ],
+    }
+
+
+class Response:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        return None
+
+    def json(self):
+        return self.payload
+
+
+class FakeHTTP:
+    def __init__(self, listing):
+        self.listing = listing
+        self.calls = []
+
+    async def get(self, url, params=None, headers=None):
+        self.calls.append(params)
+        await asyncio.sleep(0.01)
+        if params and "symbol" in params:
+            rows = [e for e in self.listing if e["symbol"] == params["symbol"]]
+        else:
+            rows = list(self.listing)
+        return Response({"symbols": rows})
+
+
+@pytest.fixture()
+def rest(tmp_path, monkeypatch):
+    monkeypatch.setenv("EXCHANGE_FILTERS_DIR", str(tmp_path))
+    # Imported here: importing engine.core.binance at collection time pins it to a
+    # settings cache that test_binance_futures_integration later leaves in futures mode
+    from engine.core.binance import BinanceREST
+
+    def make(listing):
+        client = BinanceREST(market="spot")
+        client._client = FakeHTTP(listing)
+        return client
+
+    return make
+
+
+async def test_cold_lookups_share_one_bulk_load_then_single_flight_new_listing(rest):
+    listing = [_entry("BTCUSDT", "0.00001"), _entry("ETHUSDT"), _entry("SOLUSDT", "0.01")]
+    client = rest(listing)
+
+    got = await asyncio.gather(*(client.exchange_filter(s) for s in ["BTCUSDT", "ETHUSDT.BINANCE"] * 10))
+    assert client._client.calls == [None]
+    assert {f.symbol for f in got} == {"BTCUSDT", "ETHUSDT"}
+    assert got[0].step_size == 0.00001 and got[0].tick_size == 0.1 and got[0].min_notional == 5.0
+
+    listing.append(_entry("NEWUSDT", "1"))
+    got = await asyncio.gather(*(client.exchange_filter("NEWUSDT") for _ in range(5)))
+    assert client._client.calls == [None, {"symbol": "NEWUSDT"}]
+    assert all(f.step_size == 1.0 for f in got)
+    assert (await client.exchange_filter("SOLUSDT")).step_size == 0.01
+    assert len(client._client.calls) == 2
+
+
+async def test_restart_starts_from_persisted_table(rest):
+    first = rest([_entry("BTCUSDT"), _entry("ETHUSDT")])
+    table = await first.preload_filters()
+    assert table.complete and len(table.filters) == 2
+
+    second = rest([])
+    assert (await second.exchange_filter("ETHUSDT")).min_qty == 0.001
+    assert second._client.calls == []
+
+
+async def test_preload_publishes_venue_specs(rest, monkeypatch):
+    monkeypatch.setattr(venue_specs, "SPECS", dict(venue_specs.SPECS))
+    before = venue_specs.SPECS_VERSION.get("BINANCE", 0)
+    client = rest([_entry("BTCUSDT", "0.0001", notional="100"), _entry("XYZUSDT", "10")])
+    await client.preload_filters(publish_specs=True)
+    assert venue_specs.SPECS_VERSION["BINANCE"] == before + 1
+    spec = venue_specs.SPECS["BINANCE"]["BTCUSDT"]
+    assert (spec.step_size, spec.min_notional) == (0.0001, 100.0)
+    assert venue_specs.SPECS["BINANCE"]["XYZUSDT"].min_qty == 10.0
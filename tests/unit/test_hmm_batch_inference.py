@@ -0,0 +1,145 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from engine.inference.regime_batcher import RegimeBatcher
+from engine.strategies import policy_hmm as hmm
+
+SYMBOLS = [f"S{i:02d}USDT" for i in range(40)]
+
+
+class FakeGaussianHMM:
+    """hmmlearn-shaped model: stacked rows are one sequence in predict_proba."""
+
+    def __init__(self):
+        rng = np.random.default_rng(3)
+        self.startprob_ = np.array([0.5, 0.3, 0.2])
+        self.means_ = rng.normal(size=(3, 5))
+        self.calls = 0
+
+    def _compute_log_likelihood(self, X):
+        self.calls += 1
+        return -0.5 * ((X[:, None, :] - self.means_[None]) ** 2).sum(axis=2)
+
+    def predict_proba(self, X):
+        # Single observation only: forward-backward of a length-1 sequence
+        assert len(X) == 1
+        p = self.startprob_ * np.exp(self._compute_log_likelihood(np.asarray(X, dtype=float))[0])
+        return np.array([p / p.sum()])
+
+
+class CountingModel:
+    def __init__(self):
+        self.rows = []
+
+    def predict_proba(self, X):
+        self.rows.append(len(X))
+        return np.tile([0.6, 0.3, 0.1], (len(X), 1))
+
+
+@pytest.fixture()
+def fresh(monkeypatch):
+    def reset():
+        for sym in SYMBOLS:
+            for state in (hmm._prices, hmm._vols, hmm._vol_managers, hmm._rolling):
+                state.pop(sym, None)
+
+    reset()
+    monkeypatch.setattr(hmm, "_batcher", RegimeBatcher(hmm.predict_batch, window_ms=5, max_batch=64))
+    monkeypatch.setattr(hmm, "_model", None)
+    for sym in SYMBOLS:
+        for i in range(5):
+            hmm.ingest_tick(sym, 100.0 + i + SYMBOLS.index(sym), 1.0 + i)
+    yield
+    reset()
+
+
+def test_hmm_batch_matches_single_observation_posteriors(fresh, monkeypatch):
+    mdl = FakeGaussianHMM()
+    monkeypatch.setattr(hmm, "_model", mdl)
+    X = np.array([hmm._features(sym) for sym in SYMBOLS])
+    batched = hmm.predict_batch(X)
+    single = np.vstack([mdl.predict_proba([row]) for row in X])
+    np.testing.assert_allclose(batched, single, rtol=1e-12)
+
+
+
+def test_hmm_batch_falls_back_to_per_row_without_private_api(fresh, monkeypatch):
+    reference = FakeGaussianHMM()
+
+    class PublicOnlyHMM:
+        startprob_ = reference.startprob_
+
+        def predict_proba(self, X):
+            return reference.predict_proba(X)
+
+    monkeypatch.setattr(hmm, "_model", PublicOnlyHMM())
+    X = np.array([hmm._features(sym) for sym in SYMBOLS])
+    single = np.vstack([reference.predict_proba([row]) for row in X])
+    np.testing.assert_allclose(hmm.predict_batch(X), single, rtol=1e-12)
+
+async def test_concurrent_regime_requests_share_one_predict(fresh, monkeypatch):
+    mdl = CountingModel()
+    monkeypatch.setattr(hmm, "_model", mdl)
+
+    results = await asyncio.gather(*(hmm.get_regime_async(sym) for sym in SYMBOLS))
+    assert mdl.rows == [40]
+    assert all(r["regime"] == "BULL" for r in results)
+    assert hmm._batcher.get_stats()["batches"] == 1
+
+    # Same tick: both the sync and async paths are cache hits
+    for sym in SYMBOLS:
+        assert hmm.get_regime(sym)["probs"] == pytest.approx([0.6, 0.3, 0.1])
+    await hmm.get_regime_async(SYMBOLS[0])
+    assert mdl.rows == [40]
+
+    hmm.ingest_tick(SYMBOLS[0], 150.0, 1.0)
+    hmm.get_regime(SYMBOLS[0])
+    assert mdl.rows == [40, 1]
+
+
+async def test_lone_request_does_not_wait_out_the_window():
+    calls = []
+
+    def predict(X):
+        calls.append(len(X))
+        return np.full((len(X), 3), 1 / 3)
+
+    batcher = RegimeBatcher(predict, window_ms=10_000, max_batch=64)
+    await asyncio.wait_for(batcher.submit("BTCUSDT", 1, [0.1, 0.2]), 1.0)
+    # Requests issued together still share a batch
+    await asyncio.wait_for(
+        asyncio.gather(*(batcher.submit(s, 1, [0.1, 0.2]) for s in SYMBOLS[:3])), 1.0
+    )
+    assert calls == [1, 3]
+    # Once symbols arrive together, later requests are held for the window
+    pending = asyncio.create_task(batcher.submit("BTCUSDT", 2, [0.1, 0.2]))
+    await asyncio.sleep(0.01)
+    assert not pending.done()
+    batcher.flush()
+    await pending
+    assert calls == [1, 3, 1]
+
+
+async def test_newer_tick_supersedes_pending_row(fresh, monkeypatch):
+    mdl = CountingModel()
+    monkeypatch.setattr(hmm, "_model", mdl)
+    sym = SYMBOLS[0]
+    first = asyncio.create_task(hmm.get_regime_async(sym))
+    await asyncio.sleep(0)
+    hmm.ingest_tick(sym, 200.0, 1.0)
+    second = await hmm.get_regime_async(sym)
+    assert (await first) == second
+    assert mdl.rows == [1]
+    assert hmm._rolling[sym].regime[0] == hmm._rolling[sym].seq
+
+
+async def test_model_reload_invalidates_cached_regimes(fresh, monkeypatch):
+    first = CountingModel()
+    monkeypatch.setattr(hmm, "_model", first)
+    await hmm.get_regime_async(SYMBOLS[0])
+    second = CountingModel()
+    monkeypatch.setattr(hmm, "_model", second)
+    hmm.get_regime(SYMBOLS[0])
+    assert first.rows == [1] and second.rows == [1]
@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+from engine.feeds.kline_service import KlineService
+
+T0 = 1_700_000_000.0 - 1_700_000_000.0 % 3600  # hour-aligned
+
+
+class Clock:
+    def __init__(self, now=T0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _rest_rows(start_ms, count, tf_ms=60_000, base=100.0):
+    rows = []
+    for i in range(count):
+        px = base + i
+        rows.append([start_ms + i * tf_ms, px, px + 1, px - 1, px + 0.5, 10.0, start_ms + (i + 1) * tf_ms - 1, 10.0 * px])
+    return rows
+
+
+class Fetcher:
+    def __init__(self, rows_for=None):
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.rows_for = rows_for
+
+    async def __call__(self, symbol, interval, limit):
+        self.calls.append((symbol, interval, limit))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return self.rows_for(symbol, interval, limit)
+
+
+def _trades(service, clock, symbol, minutes, per_min=6):
+    prices = []
+    for i in range(minutes * per_min):
+        ts = T0 + i * (60.0 / per_min)
+        px = 100.0 + ((i * 7) % 13) - 6 + i * 0.01
+        clock.now = ts
+        service.ingest([{"type": "trade", "symbol": symbol, "price": px, "quantity": 0.5, "ts": ts}])
+        prices.append((ts, px))
+    return prices
+
+
+async def test_streamed_symbol_served_locally_with_rollup():
+    clock = Clock()
+
+    async def no_rest(*args, **kwargs):
+        raise AssertionError("REST hit for a streamed symbol")
+
+    service = KlineService(market="futures", fetch=no_rest, clock=clock)
+    prices = _trades(service, clock, "BTCUSDT", 130)
+
+    one = await service.klines("BTCUSDT.BINANCE", interval="1m", limit=60)
+    assert len(one) == 60 and one[-1][4] == prices[-1][1]
+    five = await service.klines("BTCUSDT", interval="5m", limit=20)
+    assert len(five) == 20
+    # Brute-force 5m bars from the raw trades
+    expected = {}
+    for ts, px in prices:
+        bucket = int(ts // 300) * 300_000
+        bar = expected.setdefault(bucket, [bucket, px, px, px, px, 0.0])
+        bar[2], bar[3], bar[4], bar[5] = max(bar[2], px), min(bar[3], px), px, bar[5] + 0.5
+    for row in five:
+        exp = expected[int(row[0])]
+        assert row[1:6] == pytest.approx(exp[1:6])
+    # Later trades keep extending the rolled-up series in place
+    clock.now += 10
+    service.ingest([{"symbol": "BTCUSDT", "price": 999.0, "quantity": 1.0, "ts": clock.now}])
+    assert (await service.klines("BTCUSDT", interval="5m", limit=20))[-1][4] == 999.0
+    assert service.get_stats()["rollup"] == 1
+
+
+async def test_backfill_is_single_flight_and_bounded():
+    clock = Clock()
+    fetch = Fetcher(lambda s, i, n: _rest_rows(T0 * 1000 - (n - 1) * 60_000, n))
+    service = KlineService(market="futures", fetch=fetch, concurrency=3, clock=clock)
+    symbols = [f"S{i}USDT" for i in range(9)]
+    out = await asyncio.gather(
+        *(service.klines(s, interval="1m", limit=50) for s in symbols * 3)
+    )
+    assert len(fetch.calls) == 9
+    assert fetch.peak <= 3
+    assert all(len(rows) == 50 for rows in out)
+
+
+async def test_stale_series_refreshes_only_its_tail():
+    clock = Clock(T0 + 5)
+    start = T0 * 1000 - 99 * 60_000
+
+    def rows_for(symbol, interval, limit):
+        # The exchange's view: 100 bars ending at the current minute
+        end = int(clock.now // 60) * 60_000
+        return [r for r in _rest_rows(start, 200) if r[0] <= end][-limit:]
+
+    fetch = Fetcher(rows_for)
+    service = KlineService(market="futures", fetch=fetch, ttl_sec=30.0, clock=clock)
+    first = await service.klines("ETHUSDT", interval="1m", limit=100)
+    assert fetch.calls == [("ETHUSDT", "1m", 100)]
+    assert (await service.klines("ETHUSDT", interval="1m", limit=100)) == first
+
+    clock.now += 185  # three minutes later, TTL long expired
+    latest = await service.klines("ETHUSDT", interval="1m", limit=100)
+    assert fetch.calls[-1] == ("ETHUSDT", "1m", 5)
+    assert latest == [[*r[:6], r[6], r[7]] for r in rows_for("ETHUSDT", "1m", 100)]
+
+
+async def test_stream_gap_forces_backfill():
+    clock = Clock()
+    fetch = Fetcher(lambda s, i, n: _rest_rows(int(clock.now // 60) * 60_000 - (n - 1) * 60_000, n))
+    service = KlineService(market="futures", fetch=fetch, gap_sec=60.0, clock=clock)
+    _trades(service, clock, "SOLUSDT", 40)
+    assert len(await service.klines("SOLUSDT", interval="1m", limit=30)) == 30
+    assert fetch.calls == []
+
+    clock.now += 600  # stream was down for ten minutes
+    service.ingest([{"symbol": "SOLUSDT", "price": 50.0, "quantity": 1.0, "ts": clock.now}])
+    rows = await service.klines("SOLUSDT", interval="1m", limit=30)
+    assert fetch.calls == [("SOLUSDT", "1m", 30)]
+    assert len(rows) == 30
+
+
+async def test_trades_streamed_during_backfill_reach_the_forming_bar():
+    clock = Clock(T0 + 30)
+    service = KlineService(market="futures", clock=clock)
+
+    async def fetch(symbol, interval, limit):
+        # The exchange's snapshot, then trades arrive before the response does
+        rows = _rest_rows(T0 * 1000 - (limit - 1) * 300_000, limit, 300_000)
+        for dt, px in ((1.0, 999.0), (2.0, 1.0)):
+            service.ingest([{"symbol": symbol, "price": px, "quantity": 2.0, "ts": clock.now + dt}])
+        return rows
+
+    rows = await service.klines("XUSDT", interval="5m", limit=10, fetch=fetch)
+    assert rows[-1][0] == T0 * 1000
+    assert rows[-1][2] == 999.0 and rows[-1][3] == 1.0 and rows[-1][4] == 1.0
+    assert rows[-1][5] == 10.0 + 4.0
+    assert service._pending_trades == {}
+
+
+def test_sync_batch_for_worker_threads():
+    clock = Clock()
+    fetch = Fetcher(lambda s, i, n: _rest_rows(T0 * 1000 - (n - 1) * 300_000, n, 300_000))
+    service = KlineService(market="futures", fetch=fetch, concurrency=2, clock=clock)
+    out = service.klines_many_sync(["AUSDT", "BUSDT.BINANCE", "CUSDT"], interval="5m", limit=24)
+    assert sorted(out) == ["AUSDT", "BUSDT", "CUSDT"]
+    assert fetch.peak <= 2 and len(fetch.calls) == 3
+    again = service.klines_many_sync(["AUSDT"], interval="5m", limit=24)
+    assert again["AUSDT"] == out["AUSDT"] and len(fetch.calls) == 3
@@ -0,0 +1,176 @@
+import pytest
+
+from engine.core import order_router
+from engine.core.market_cache import MarketDataCache
+
+
+class Clock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _rest_atr(klines, n):
+    # Same reduction _MDAdapter.atr applies to exchange klines
+    prev_close, trs = None, []
+    for _, _, high, low, close in klines[-(n + 1) :]:
+        trs.append(high - low if prev_close is None else max(high - low, abs(high - prev_close), abs(low - prev_close)))
+        prev_close = close
+    trs = trs[1:]
+    return sum(trs) / len(trs)
+
+
+def test_atr_matches_klines_built_from_the_same_trades():
+    clock = Clock()
+    cache = MarketDataCache(clock=clock)
+    start = 1_700_000_040.0  # minute-aligned
+    prices = [100 + ((i * 37) % 23) - 11 + i * 0.05 for i in range(1200)]
+    klines = {}
+    for i, px in enumerate(prices):
+        ts = start + i * 2.5
+        if 400 <= i < 460:  # two and a half quiet minutes
+            continue
+        clock.now = ts
+        cache.update("BTCUSDT.BINANCE", px, ts)
+        bucket = int(ts // 60)
+        bar = klines.setdefault(bucket, [bucket * 60.0, px, px, px, px])
+        bar[2], bar[3], bar[4] = max(bar[2], px), min(bar[3], px), px
+    # Exchange klines carry flat bars for minutes without trades
+    rows, prev = [], None
+    for bucket in range(min(klines), max(klines) + 1):
+        bar = klines.get(bucket) or [bucket * 60.0, prev[4], prev[4], prev[4], prev[4]]
+        rows.append(bar)
+        prev = bar
+
+    for n in (3, 14, 30):
+        assert cache.atr("BTCUSDT", tf="1m", n=n) == pytest.approx(_rest_atr(rows, n))
+    assert [tuple(r) for r in rows[-20:-1]] == cache.bars("BTCUSDT", "1m")[-19:]
+    # 50 minutes of trades: enough 5m bars for a short ATR only
+    assert cache.atr("BTCUSDT", tf="5m", n=5) > 0
+    assert cache.atr("BTCUSDT", tf="5m", n=14) is None
+
+
+def test_stale_or_unknown_symbols_miss():
+    clock = Clock()
+    cache = MarketDataCache(max_age_sec=5.0, clock=clock)
+    cache.on_trade({"symbol": "ETHUSDT", "price": "2000.5", "ts": clock.now})
+    cache.on_book({"symbol": "ETHUSDT", "bid_price": 2000.0, "ask_price": 2001.0})
+    assert cache.last("ETHUSDT.BINANCE") == 2000.5
+    assert cache.quote("ETHUSDT") == (2000.0, 2001.0)
+    assert cache.last("SOLUSDT") is None
+    clock.now += 6.0
+    assert cache.last("ETHUSDT") is None
+    assert cache.atr("ETHUSDT", tf="1m", n=1) is None
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 3
+
+
+class FakeBus:
+    def subscribe(self, topic, handler):
+        pass
+
+    def unsubscribe(self, topic, handler):
+        pass
+
+
+class RestClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def ticker_price(self, symbol, market=None):
+        self.calls += 1
+        return 42.0
+
+
+async def test_router_price_skips_rest_while_cache_is_fresh(monkeypatch):
+    clock = Clock()
+    cache = MarketDataCache(max_age_sec=5.0, clock=clock)
+    monkeypatch.setattr(order_router, "MARKET_CACHE", cache)
+    client = RestClient()
+
+    assert await order_router._resolve_last_price(client, "BINANCE", "BTCUSDT", "BTCUSDT.BINANCE") == 42.0
+    assert client.calls == 1
+    cache.update("BTCUSDT", 43000.0, clock.now)
+    assert await order_router._resolve_last_price(client, "BINANCE", "BTCUSDT", "BTCUSDT.BINANCE") == 43000.0
+    assert client.calls == 1
+    clock.now += 10.0
+    assert await order_router._resolve_last_price(client, "BINANCE", "BTCUSDT", "BTCUSDT.BINANCE") == 42.0
+    assert client.calls == 2
+
+
+async def test_router_price_bypasses_cache_for_another_market(monkeypatch):
+    clock = Clock()
+    cache = MarketDataCache(max_age_sec=5.0, clock=clock)
+    cache.attach(FakeBus(), venue="BINANCE", market="futures")
+    monkeypatch.setattr(order_router, "MARKET_CACHE", cache)
+    cache.update("BTCUSDT", 43000.0, clock.now)
+    client = RestClient()
+
+    args = (client, "BINANCE", "BTCUSDT", "BTCUSDT.BINANCE")
+    assert await order_router._resolve_last_price(*args) == 43000.0
+    assert await order_router._resolve_last_price(*args, market="futures") == 43000.0
+    assert await order_router._resolve_last_price(*args, market="spot") == 42.0
+    margin = (client, "BINANCE_MARGIN", "BTCUSDT", "BTCUSDT.BINANCE_MARGIN")
+    assert await order_router._resolve_last_price(*margin) == 42.0
+    assert await order_router._resolve_last_price(client, "IBKR", "BTCUSDT", "BTCUSDT.IBKR") == 42.0
+    assert client.calls == 3
+
+
+def test_quote_freshness_follows_the_book():
+    clock = Clock()
+    cache = MarketDataCache(max_age_sec=5.0, clock=clock)
+    cache.on_book({"symbol": "ETHUSDT", "bid_price": 2000.0, "ask_price": 2001.0})
+    assert cache.quote("ETHUSDT") == (2000.0, 2001.0)  # no trade needed
+    clock.now += 4.0
+    cache.on_trade({"symbol": "ETHUSDT", "price": 2000.5, "ts": clock.now})
+    clock.now += 2.0
+    # Trades keep the symbol fresh but the book is 6s old
+    assert cache.last("ETHUSDT") == 2000.5
+    assert cache.quote("ETHUSDT") is None
+    assert cache.quote("ETHUSDT", max_age=10.0) == (2000.0, 2001.0)
+
+
+def test_md_adapter_reads_cache_before_klines(monkeypatch):
+    clock = Clock(1_700_000_040.0)
+    cache = MarketDataCache(clock=clock)
+    monkeypatch.setattr(order_router, "MARKET_CACHE", cache)
+    for i, px in enumerate([100.0, 102.0, 99.0, 101.0, 104.0]):
+        clock.now = 1_700_000_040.0 + i * 60
+        cache.update("BTCUSDT", px, clock.now)
+
+    class Router:
+        _venue = "BINANCE"
+
+        def exchange_client(self):
+            raise AssertionError("REST klines requested while cache is fresh")
+
+    md = order_router._MDAdapter(Router())
+    assert md.last("BTCUSDT") == 104.0
+    assert md.atr("BTCUSDT", tf="1m", n=4) == pytest.approx((2 + 3 + 2 + 3) / 4)
+
+
+def test_md_adapter_bypasses_cache_for_another_venue_or_market(monkeypatch):
+    clock = Clock(1_700_000_040.0)
+    cache = MarketDataCache(clock=clock)
+    cache.attach(FakeBus(), venue="BINANCE", market="futures")
+    monkeypatch.setattr(order_router, "MARKET_CACHE", cache)
+    for i, px in enumerate([100.0, 102.0, 99.0, 101.0, 104.0]):
+        clock.now = 1_700_000_040.0 + i * 60
+        cache.update("BTCUSDT", px, clock.now)
+
+    class Router:
+        _venue = "BINANCE"
+
+        async def get_last_price(self, symbol):
+            return 42.0
+
+        def exchange_client(self):
+            return None
+
+    assert order_router._MDAdapter(Router(), market="futures").last("BTCUSDT") == 104.0
+    spot = order_router._MDAdapter(Router(), market="spot")
+    assert spot.last("BTCUSDT") == 42.0
+    assert spot.atr("BTCUSDT", tf="1m", n=4) == 0.0
+    assert order_router._MDAdapter(Router()).last("BTCUSDT.IBKR") == 42.0
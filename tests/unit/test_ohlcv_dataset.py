@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from services.common import manifest, ohlcv_dataset
+
+DAY = ohlcv_dataset.DAY_MS
+BASE = 1_700_006_400_000  # 2023-11-15 00:00 UTC
+
+
+def _bars(start, n, step=60_000, close0=100.0):
+    ts = start + np.arange(n, dtype=np.int64) * step
+    close = close0 + np.arange(n, dtype=float)
+    return pd.DataFrame(
+        {
+            "timestamp": ts,
+            "open": close,
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": np.full(n, 5.0),
+        }
+    )
+
+
+def test_append_partitions_by_day_and_indexes_row_groups(tmp_path):
+    db = str(tmp_path / "ledger.sqlite")
+    root = str(tmp_path / "dataset")
+    manifest.init(db)
+
+    # 1000 one-minute bars starting 2h before midnight span two UTC days
+    df = _bars(BASE + DAY - 2 * 3_600_000, 1000)
+    assert ohlcv_dataset.append(root, "BTC/USDT", "1m", df, db_path=db, row_group_rows=50) == 1000
+    # Same content again is dropped by the ledger
+    assert ohlcv_dataset.append(root, "BTC/USDT", "1m", df, db_path=db, row_group_rows=50) == 0
+
+    days = sorted(p.name for p in ohlcv_dataset.series_dir(root, "BTC/USDT", "1m").iterdir())
+    assert days == ["date=2023-11-15", "date=2023-11-16"]
+    assert ohlcv_dataset.symbols(root, "1m") == ["BTCUSDT"]
+    assert len(list((tmp_path / "dataset").rglob("*.parquet"))) == 2
+
+    groups = manifest.find_row_groups("BTCUSDT", "1m", db_path=db)
+    assert sum(g["num_rows"] for g in groups) == 1000
+    lo, hi = BASE + DAY + 60 * 60_000, BASE + DAY + 90 * 60_000
+    window = manifest.find_row_groups("BTCUSDT", "1m", lo, hi, db_path=db)
+    assert 1 <= len(window) <= 2
+    assert all(g["t_end"] >= lo and g["t_start"] <= hi for g in window)
+
+
+def test_read_prunes_and_matches_filesystem_scan(tmp_path):
+    db = str(tmp_path / "ledger.sqlite")
+    root = str(tmp_path / "dataset")
+    manifest.init(db)
+    df = _bars(BASE, 3 * 1440)
+    for lo in range(0, len(df), 700):
+        ohlcv_dataset.append(root, "ETHUSDT", "1m", df.iloc[lo:lo + 700], db_path=db)
+
+    lo, hi = BASE + DAY + 123 * 60_000, BASE + 2 * DAY + 45 * 60_000
+    expected = df[(df["timestamp"] >= lo) & (df["timestamp"] <= hi)].reset_index(drop=True)
+
+    indexed = ohlcv_dataset.read(root, "ETHUSDT", "1m", lo, hi, db_path=db)
+    scanned = ohlcv_dataset.read(root, "ETHUSDT", "1m", lo, hi)
+    pd.testing.assert_frame_equal(indexed.to_pandas(), expected)
+    pd.testing.assert_frame_equal(scanned.to_pandas(), expected)
+
+    plan = ohlcv_dataset._plan_from_manifest("ETHUSDT", "1m", lo, hi, db)
+    total = sum(pq.read_metadata(p).num_row_groups for p in {p for p, _ in ohlcv_dataset._plan_from_files(root, "ETHUSDT", "1m", None, None)})
+    assert sum(len(rgs) for _, rgs in plan) < total
+
+    # Numeric columns come back as single chunks that view the Arrow buffers
+    close = indexed.column("close")
+    assert close.num_chunks == 1
+    close.chunk(0).to_numpy(zero_copy_only=True)
+
+
+def test_compaction_dedupes_and_swaps_ledger_rows(tmp_path):
+    db = str(tmp_path / "ledger.sqlite")
+    root = str(tmp_path / "dataset")
+    manifest.init(db)
+    first = _bars(BASE, 600)
+    # Overlapping re-fetch with revised closes for the last 100 bars of the first batch
+    second = _bars(BASE + 500 * 60_000, 400, close0=10_000.0)
+    ohlcv_dataset.append(root, "BTCUSDT", "1m", first, db_path=db)
+    ohlcv_dataset.append(root, "BTCUSDT", "1m", second, db_path=db)
+
+    # The day is still open, so nothing is compacted yet
+    assert ohlcv_dataset.compact_closed(root, "BTCUSDT", "1m", BASE + 900 * 60_000, db_path=db) == 0
+    assert ohlcv_dataset.compact_closed(root, "BTCUSDT", "1m", BASE + DAY, db_path=db) == 1
+
+    files = list(ohlcv_dataset.partition_dir(root, "BTCUSDT", "1m", "2023-11-15").glob("*.parquet"))
+    assert len(files) == 1 and files[0].name.startswith("compacted-")
+
+    table = ohlcv_dataset.read(root, "BTCUSDT", "1m", db_path=db).to_pandas()
+    assert len(table) == 900
+    assert table["timestamp"].is_monotonic_increasing
+    assert table["close"].iloc[500] == 10_000.0
+
+    groups = manifest.find_row_groups("BTCUSDT", "1m", db_path=db)
+    assert {g["path"] for g in groups} == {str(files[0].resolve())}
+    assert sum(g["num_rows"] for g in groups) == 900
+
+
+def test_identical_bars_of_two_symbols_are_both_landed(tmp_path):
+    db = str(tmp_path / "ledger.sqlite")
+    root = str(tmp_path / "dataset")
+    manifest.init(db)
+    df = _bars(BASE, 10)
+    assert ohlcv_dataset.append(root, "BTCUSDT", "1m", df, db_path=db) == 10
+    assert ohlcv_dataset.append(root, "ETHUSDT", "1m", df, db_path=db) == 10
+    assert ohlcv_dataset.symbols(root, "1m") == ["BTCUSDT", "ETHUSDT"]
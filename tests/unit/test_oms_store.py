@@ -0,0 +1,96 @@
+import pytest
+
+from engine.core.oms_models import OrderRecord
+from engine.core.oms_store import OMSStore
+from engine.storage import sqlite as store
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    for name in ("_DB", "_READ_DB", "_DB_PATH"):
+        monkeypatch.setattr(store, name, None)
+    con = store._conn(str(tmp_path / "trades.db"))
+    store._apply_schema(con, "engine/storage/schema.sql")
+    _flush(con)  # drop rows queued by other tests
+    con.execute("DELETE FROM oms_orders")
+    con.commit()
+    yield con
+    if store._READ_DB is not None:
+        store._READ_DB.close()
+    con.close()
+
+
+def _flush(con):
+    batch = []
+    while not store._Q.empty():
+        batch.append(store._Q.get_nowait())
+    store._flush(con, batch)
+
+
+def _order(i, symbol="BTCUSDT.BINANCE", status="NEW"):
+    return OrderRecord(
+        id=f"o{i}", client_key=f"k{i}", symbol=symbol, side="BUY", order_type="LIMIT",
+        quantity=1.0, price=100.0 + i, status=status, venue_order_id=f"v{i}",
+        created_at=1.0, updated_at=1.0,
+    )
+
+
+def test_open_index_and_eviction(db):
+    oms = OMSStore(backend=store)
+    for i in range(6):
+        oms.upsert(_order(i, "ETHUSDT.BINANCE" if i % 2 else "BTCUSDT.BINANCE"), "TEST")
+    oms.upsert(_order(6, "AAPL.IBKR", status="ACCEPTED"), "TEST")
+    oms.upsert(_order(7, status="FILLED"), "TEST")  # terminal on arrival: never kept in memory
+
+    assert oms.count_open() == 7
+    assert {o.id for o in oms.list_open(venue="IBKR")} == {"o6"}
+    assert {o.id for o in oms.list_open(venue="BINANCE", symbol="ETHUSDT.BINANCE")} == {"o1", "o3", "o5"}
+    assert list(oms.list_open(status="PARTIALLY_FILLED")) == []
+
+    oms.close("o3", "CANCELED")
+    oms.close("missing", "CANCELED")
+    assert oms.count_open() == 6
+    assert {o.id for o in oms.list_open(symbol="ETHUSDT.BINANCE")} == {"o1", "o5"}
+    # Closed orders stay reachable before and after the write-behind flush
+    assert oms.get("o3").status == "CANCELED"
+    oms._persist()
+    _flush(db)
+    assert oms.get("o3").status == "CANCELED" and oms.get("o7").status == "FILLED"
+
+    # Re-opening an order moves it between index buckets
+    oms.upsert(_order(1, status="PARTIALLY_FILLED"), "TEST")
+    assert {o.id for o in oms.list_open(status="PARTIALLY_FILLED")} == {"o1"}
+    assert {o.id for o in oms.list_open(status="NEW", symbol="ETHUSDT.BINANCE")} == {"o5"}
+
+
+def test_upsert_after_in_place_status_change_reindexes(db):
+    oms = OMSStore(backend=store)
+    record = _order(0)
+    oms.upsert(record, "TEST")
+    # The reconciler mutates the stored record, then upserts it again
+    record.status = "PARTIALLY_FILLED"
+    oms.upsert(record, "TEST")
+    assert list(oms.list_open(status="NEW")) == []
+    assert [o.id for o in oms.list_open(status="PARTIALLY_FILLED")] == ["o0"]
+    record.status = "FILLED"
+    oms.upsert(record, "TEST")
+    assert oms.count_open() == 0
+    for status in ("NEW", "PARTIALLY_FILLED", "FILLED"):
+        assert list(oms.list_open(status=status)) == []
+    assert list(oms.list_open(symbol="BTCUSDT.BINANCE")) == []
+
+
+def test_warm_restart_loads_only_open_orders(db):
+    oms = OMSStore(backend=store)
+    for i in range(5):
+        oms.upsert(_order(i), "TEST")
+    oms.close("o0", "FILLED")
+    oms.close("o4", "CANCELED")
+    oms._persist()
+    _flush(db)
+    assert db.execute("SELECT COUNT(*) FROM oms_orders").fetchone()[0] == 5
+
+    restarted = OMSStore(backend=store)
+    assert restarted.load_open() == 3
+    assert {o.id for o in restarted.list_open(venue="BINANCE")} == {"o1", "o2", "o3"}
+    assert restarted.get("o2").venue_order_id == "v2"
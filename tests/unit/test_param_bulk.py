@@ -0,0 +1,119 @@
+import types
+
+import httpx
+import numpy as np
+import pytest
+
+from engine.services import param_client
+from engine.services.param_client import ParamControllerBridge
+from services.param_controller.app import main, store
+
+
+# A few legacy check scripts swap httpx for a MagicMock in sys.modules at import time
+real_httpx = pytest.mark.skipif(
+    not isinstance(param_client.httpx, types.ModuleType) or not isinstance(httpx, types.ModuleType),
+    reason="httpx replaced by a mock elsewhere in the session",
+)
+
+
+@pytest.fixture()
+def pc_db(tmp_path, monkeypatch):
+    db = str(tmp_path / "pc.db")
+    monkeypatch.setattr(main.settings, "PC_DB", db)
+    store.init(db)
+    for sym in ("BTCUSDT", "ETHUSDT"):
+        for pid, val in (("a", 1), ("b", 2)):
+            main.register_preset("trend", sym, {"preset_id": pid, "params": {"k": val}})
+    return db
+
+
+def test_bulk_selection_groups_and_reports_deltas(pc_db, monkeypatch):
+    # Deterministic sampling: preset "b" always wins
+    monkeypatch.setattr(np.random, "randn", lambda *shape: np.tile([-10.0, 10.0], (shape[0], 1)))
+    body = {
+        "requests": [
+            {"strategy": "trend", "instrument": "BTCUSDT", "features": {"vol": 1.0}},
+            {"strategy": "trend", "instrument": "ETHUSDT", "have": "trend:ETHUSDT:b"},
+            {"strategy": "scalp", "instrument": "BTCUSDT"},
+        ]
+    }
+    out = main.get_params_bulk(body)
+    assert out["unchanged"] == 1
+    assert out["results"] == [
+        {
+            "strategy": "trend",
+            "instrument": "BTCUSDT",
+            "config_id": "trend:BTCUSDT:b",
+            "params": {"k": 2},
+            "policy_version": main.POLICY_VERSION,
+            "features_used": ["vol"],
+        },
+        {"strategy": "scalp", "instrument": "BTCUSDT", "error": "no presets registered"},
+    ]
+
+
+
+def test_bulk_selection_does_not_persist_rebuilds_in_dry_run(pc_db, monkeypatch):
+    main.report_outcome("trend", "BTCUSDT", "a", {"reward": 1.0, "features": {"vol": 1.0}})
+    monkeypatch.setenv("DRY_RUN", "1")
+    body = {"requests": [{"strategy": "trend", "instrument": "BTCUSDT", "features": {"spread": 2.0}}]}
+    assert main.get_params_bulk(body)["results"][0]["features_used"] == ["spread", "vol"]
+    keys, _, arms = store.load_posteriors(pc_db, "trend", "BTCUSDT")
+    assert keys == ["vol"] and set(arms) == {"a"}
+
+@real_httpx
+async def test_bridge_refreshes_all_watches_in_one_round_trip(pc_db, monkeypatch):
+    monkeypatch.setattr(np.random, "randn", lambda *shape: np.tile([10.0, -10.0], (shape[0], 1)))
+    calls = []
+    asgi = httpx.ASGITransport(app=main.app)
+
+    class Recording(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request):
+            calls.append((request.method, request.url.path))
+            return await asgi.handle_async_request(request)
+
+    bridge = ParamControllerBridge("http://pc", transport=Recording())
+    for sym in ("BTCUSDT", "ETHUSDT", "SOLUSDT"):
+        bridge.register_symbol("trend", sym, features={"vol": 0.5})
+    try:
+        await bridge.refresh_once()
+        assert calls == [("POST", "/params")]
+        first = bridge.get_params("trend", "BTCUSDT")
+        assert first["config_id"] == "trend:BTCUSDT:a"
+        assert first["params"] == {"k": 1}
+        assert bridge.get_params("trend", "SOLUSDT") is None
+
+        # Same selection next cycle: delta response keeps the entry, refreshes features
+        bridge.update_features("trend", "BTCUSDT", {"vol": 0.9})
+        await bridge.refresh_once()
+        assert calls == [("POST", "/params")] * 2
+        again = bridge.get_params("trend", "BTCUSDT")
+        assert again["config_id"] == "trend:BTCUSDT:a"
+        assert again["features"] == {"vol": 0.9}
+    finally:
+        await bridge.stop()
+
+
+@real_httpx
+async def test_bridge_falls_back_to_per_watch_fetch_without_bulk_endpoint():
+    calls = []
+
+    def handler(request):
+        calls.append((request.method, request.url.path))
+        if request.url.path == "/params":
+            return httpx.Response(404)
+        return httpx.Response(200, json={"config_id": "trend:BTCUSDT:a", "params": {"k": 1}})
+
+    bridge = ParamControllerBridge("http://pc", transport=httpx.MockTransport(handler))
+    bridge.register_symbol("trend", "BTCUSDT")
+    try:
+        await bridge.refresh_once()
+        await bridge.refresh_once()
+        assert calls == [
+            ("POST", "/params"),
+            ("GET", "/param/trend/BTCUSDT"),
+            ("GET", "/param/trend/BTCUSDT"),
+        ]
+        assert bridge.get_params("trend", "BTCUSDT")["params"] == {"k": 1}
+    finally:
+        await bridge.stop()
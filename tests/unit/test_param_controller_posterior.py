@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from services.param_controller.app import main, store
+from services.param_controller.app.bandit import LinTS
+
+
+def test_incremental_inverse_matches_batch_fit():
+    rng = np.random.default_rng(7)
+    X = rng.normal(size=(2500, 4))
+    r = X @ np.array([0.5, -1.0, 0.0, 2.0]) + rng.normal(scale=0.1, size=2500)
+
+    online = LinTS(d=4, l2=1.0)
+    for x, reward in zip(X, r):
+        online.update(0, x, reward)
+    batch = LinTS(d=4, l2=1.0)
+    batch.fit(0, X, r)
+
+    a, b = online.get_state(0), batch.get_state(0)
+    assert a["n"] == b["n"] == 2500
+    np.testing.assert_allclose(a["A"], b["A"])
+    np.testing.assert_allclose(a["A_inv"], np.linalg.inv(a["A"]), atol=1e-10)
+    np.testing.assert_allclose(a["A_inv"] @ a["b"], b["A_inv"] @ b["b"], atol=1e-8)
+
+
+@pytest.fixture()
+def pc_db(tmp_path, monkeypatch):
+    db = str(tmp_path / "pc.db")
+    monkeypatch.setattr(main.settings, "PC_DB", db)
+    store.init(db)
+    for pid, val in (("a", 1), ("b", 2)):
+        main.register_preset("trend", "BTCUSDT", {"preset_id": pid, "params": {"k": val}})
+    return db
+
+
+def test_outcomes_update_persisted_posterior_without_replay(pc_db, monkeypatch):
+    rng = np.random.default_rng(1)
+    feats = lambda: {"vol": float(rng.normal()), "trend": float(rng.normal())}  # noqa: E731
+    main.report_outcome("trend", "BTCUSDT", "a", {"reward": 1.0, "features": feats()})
+
+    fetch_outcomes = store.fetch_outcomes
+
+    def no_replay(*args, **kwargs):
+        raise AssertionError("history replayed on the hot path")
+
+    monkeypatch.setattr(store, "fetch_outcomes", no_replay)
+    for i in range(200):
+        pid = "a" if i % 3 else "b"
+        main.report_outcome("trend", "BTCUSDT", pid, {"reward": float(i % 5), "features": feats()})
+    out = main.get_param("trend", "BTCUSDT", {"vol": 0.2, "trend": -1.0})
+    assert out["features_used"] == ["trend", "vol"]
+    assert out["params"] in ({"k": 1}, {"k": 2})
+    monkeypatch.setattr(store, "fetch_outcomes", fetch_outcomes)
+
+    keys, _, incremental = store.load_posteriors(pc_db, "trend", "BTCUSDT")
+    _, rebuilt = main._rebuild_posterior("trend", "BTCUSDT")
+    assert keys == ["trend", "vol"]
+    for pid in ("a", "b"):
+        assert incremental[pid]["n"] == rebuilt[pid]["n"]
+        np.testing.assert_allclose(incremental[pid]["A"], rebuilt[pid]["A"])
+        np.testing.assert_allclose(incremental[pid]["b"], rebuilt[pid]["b"])
+        np.testing.assert_allclose(incremental[pid]["A_inv"], rebuilt[pid]["A_inv"], atol=1e-10)
+
+
+def test_new_feature_key_rebuilds_schema_once(pc_db):
+    main.report_outcome("trend", "BTCUSDT", "a", {"reward": 1.0, "features": {"vol": 1.0}})
+    main.report_outcome("trend", "BTCUSDT", "b", {"reward": 0.0, "features": {"vol": 2.0}})
+    out = main.get_param("trend", "BTCUSDT", {"vol": 1.0, "spread": 3.0})
+    assert out["features_used"] == ["spread", "vol"]
+    keys, _, arms = store.load_posteriors(pc_db, "trend", "BTCUSDT")
+    assert keys == ["spread", "vol"]
+    # Old outcomes carry a zero for the new key: prior precision on that axis
+    assert arms["a"]["A"][0, 0] == pytest.approx(main.settings.L2)
+    assert arms["a"]["A"][1, 1] == pytest.approx(main.settings.L2 + 1.0)
@@ -0,0 +1,83 @@
+import math
+import random
+
+import pytest
+
+from engine.strategies import policy_hmm as hmm
+
+
+def _batch_features(sym):
+    """The original full-window recomputation, kept as the parity reference."""
+    P, V = hmm._prices[sym], hmm._vols[sym]
+    if len(P) < 3:
+        return None
+    rets = [0.0]
+    for i in range(1, len(P)):
+        try:
+            r = math.log(P[i] / P[i - 1])
+        except (ValueError, ZeroDivisionError):
+            r = 0.0
+        rets.append(r)
+    inst_vol = hmm._vol_managers[sym].get_annualized_vol()
+    if inst_vol == 0.0:
+        inst_vol = hmm._vola(rets[-20:]) * math.sqrt(525600)
+    vwap = hmm._vwap(list(P), list(V))
+    return [
+        rets[-1],
+        inst_vol,
+        (P[-1] - vwap) / vwap,
+        hmm._zscore(list(P)[-30:]),
+        float(V[-1]) / max(1.0, sum(list(V)[-20:]) / 20.0),
+    ]
+
+
+@pytest.fixture()
+def sym():
+    name = "PARITYUSDT"
+    for state in (hmm._prices, hmm._vols, hmm._vol_managers, hmm._rolling):
+        state.pop(name, None)
+    yield name
+    for state in (hmm._prices, hmm._vols, hmm._vol_managers, hmm._rolling):
+        state.pop(name, None)
+
+
+def test_streaming_features_match_batch_recompute(sym):
+    rng = random.Random(13)
+    window = hmm._prices[sym].maxlen
+    price = 43000.0
+    # Flat prices first keep the vol manager cold and exercise the std fallback
+    ticks = [(price, 1.0)] * 5
+    for _ in range(window * 4):
+        price *= math.exp(rng.gauss(0.0, 0.002))
+        ticks.append((price, rng.choice([0.0, 0.5, 1.0, 3.0, rng.uniform(0.0, 50.0)])))
+
+    checked = 0
+    for price, volume in ticks:
+        hmm.ingest_tick(sym, price, volume)
+        expected = _batch_features(sym)
+        got = hmm._features(sym)
+        if expected is None:
+            assert got is None
+            continue
+        assert got == pytest.approx(expected, rel=1e-9, abs=1e-9)
+        checked += 1
+    assert checked == len(ticks) - 2
+
+
+def test_features_cached_until_next_tick(sym):
+    for px in (100.0, 101.0, 102.0):
+        hmm.ingest_tick(sym, px, 2.0)
+    first = hmm._features(sym)
+    assert hmm._features(sym) is first
+    hmm.ingest_tick(sym, 103.0, 2.0)
+    assert hmm._features(sym) is not first
+
+
+def test_cleared_buffers_rebuild_rolling_state(sym):
+    for px in (100.0, 101.0, 102.0):
+        hmm.ingest_tick(sym, px, 1.0)
+    hmm._prices.pop(sym)
+    hmm._vols.pop(sym)
+    for px in (200.0, 190.0, 180.0):
+        hmm.ingest_tick(sym, px, 1.0)
+    assert hmm._features(sym) == pytest.approx(_batch_features(sym), rel=1e-12)
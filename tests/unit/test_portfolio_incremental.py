@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from engine.core.portfolio import Portfolio, Position
+
+
+def _brute(portfolio):
+    positions = portfolio.state.positions.values()
+    exposure = sum(abs(p.quantity * p.last_price) for p in positions)
+    upl = sum(p.upl for p in positions)
+    return exposure, upl, portfolio.state.balances.get("USDT", 0.0) + upl
+
+
+def test_running_totals_match_full_resum():
+    rng = random.Random(5)
+    pf = Portfolio({"USDT": 100_000.0})
+    symbols = [f"S{i:03d}USDT.BINANCE" for i in range(300)]
+    for step in range(20_000):
+        sym = rng.choice(symbols)
+        if step % 10 == 0:
+            pf.apply_fill(sym, rng.choice(["BUY", "SELL"]), rng.uniform(0.1, 2.0), rng.uniform(50, 150), 0.01)
+        else:
+            pf.update_price(sym, rng.uniform(50, 150))
+        if step % 997 == 0:
+            exposure, upl, equity = _brute(pf)
+            assert pf.state.exposure == pytest.approx(exposure, rel=1e-9)
+            assert pf.state.unrealized == pytest.approx(upl, rel=1e-9, abs=1e-6)
+            assert pf.state.equity == pytest.approx(equity, rel=1e-9)
+    assert not hasattr(Position("X"), "__dict__")
+
+
+def test_closing_everything_returns_exact_zero_totals():
+    pf = Portfolio({"USDT": 1000.0})
+    pf.apply_fill("BTCUSDT.BINANCE", "BUY", 0.1, 30000.0, 0.0)
+    pf.apply_fill("ETHUSDT.BINANCE", "SELL", 1.0, 2000.0, 0.0)
+    pf.update_price("BTCUSDT.BINANCE", 30100.3)
+    pf.apply_fill("ETHUSDT.BINANCE", "BUY", 1.0, 1990.0, 0.0)
+    pf.apply_fill("BTCUSDT.BINANCE", "SELL", 0.1, 30100.3, 0.0)
+    assert pf.state.positions == {}
+    assert pf.state.exposure == 0.0
+    assert pf.state.unrealized == 0.0
+    assert pf.state.realized == pytest.approx(0.1 * 100.3 + 10.0)
+
+
+def test_external_position_edits_trigger_resync():
+    pf = Portfolio({"USDT": 0.0})
+    pf.apply_fill("BTCUSDT.BINANCE", "BUY", 1.0, 100.0, 0.0)
+    # Like the venue position import: mutate the dict directly, no recalculation
+    pf.state.positions.clear()
+    pf.state.positions["ETHUSDT"] = Position("ETHUSDT", quantity=2.0, avg_price=10.0, last_price=10.0)
+    pf.update_price("ETHUSDT", 12.0)
+    assert pf.state.exposure == 24.0
+    assert pf.state.unrealized == 4.0
+    pf.state.positions = {"SOLUSDT": Position("SOLUSDT", quantity=1.0, avg_price=5.0, last_price=5.0)}
+    pf.update_price("SOLUSDT", 6.0)
+    assert (pf.state.exposure, pf.state.unrealized) == (6.0, 1.0)
+
+
+def test_snapshots_are_lazy_and_versioned(monkeypatch):
+    built = []
+    notified = []
+    pf = Portfolio({"USDT": 10.0}, on_change=notified.append)
+    real = pf.state.snapshot
+    monkeypatch.setattr(pf.state, "snapshot", lambda: built.append(1) or real())
+
+    for i in range(5):
+        pf.apply_fill("BTCUSDT.BINANCE", "BUY", 0.01, 100.0 + i, 0.0)
+    assert notified == [pf] * 5
+    assert built == []
+
+    first = pf.snapshot()
+    assert pf.snapshot() == first and len(built) == 1
+    version = pf.version
+    pf.update_price("BTCUSDT.BINANCE", 110.0)
+    assert pf.version == version + 1
+    assert pf.snapshot() != first and len(built) == 2
+
+
+def test_direct_wallet_writes_invalidate_cached_snapshot():
+    pf = Portfolio({"USDT": 100.0})
+    assert pf.snapshot()["equity"] == 100.0
+    # Like OrderRouter.fetch_account_snapshot: fields written without a Portfolio method
+    pf.state.cash = pf.state.equity = 5000.0
+    assert pf.snapshot()["equity"] == 5000.0
+    assert pf.snapshot()["cash"] == 5000.0
+
+
+def test_changes_to_a_returned_snapshot_do_not_leak():
+    pf = Portfolio({"USDT": 100.0})
+    pf.apply_fill("BTCUSDT.BINANCE", "BUY", 0.5, 100.0, 0.0)
+    snap = pf.snapshot()
+    expected = pf.snapshot()
+    # What GET /portfolio does to the dict it gets back
+    snap["equity"] = 1.0
+    snap["positions"][0]["last_price_quote"] = 0.0
+    snap["positions"].append({"symbol": "ETHUSDT"})
+    snap["pnl"]["realized"] = 99.0
+    snap["quote_ccy"] = "USDT"
+    assert pf.snapshot() == expected
@@ -0,0 +1,88 @@
+import importlib
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def PriceBridge(monkeypatch):
+    # Legacy tests swap ``engine.services`` for a mock at collection time
+    if not hasattr(sys.modules.get("engine.services"), "__path__"):
+        monkeypatch.delitem(sys.modules, "engine.services", raising=False)
+    return importlib.import_module("engine.services.price_bridge").PriceBridge
+
+
+class FakeClient:
+    def __init__(self, batch_status=200, tick_status=200):
+        self.batch_status = batch_status
+        self.tick_status = tick_status
+        self.posts = []
+
+    async def post(self, url, json=None, headers=None):
+        self.posts.append((url.rsplit("/api", 1)[1], json))
+        status = self.batch_status if url.endswith("/batch") else self.tick_status
+        return SimpleNamespace(status_code=status, is_success=200 <= status < 300)
+
+    async def aclose(self):
+        pass
+
+
+async def test_one_batch_per_flush_with_latest_tick_per_symbol(PriceBridge):
+    client = FakeClient()
+    bridge = PriceBridge(http_client=client)
+    for i in range(5):
+        for n in range(100):
+            bridge._on_tick({"symbol": f"S{n}USDT", "price": float(i), "ts": i})
+    bridge._on_tick({"price": 1.0})  # no symbol: dropped
+
+    assert await bridge._flush() == 100
+    assert len(client.posts) == 1
+    path, body = client.posts[0]
+    assert path == "/events/price/batch"
+    assert len(body["ticks"]) == 100 and {t["price"] for t in body["ticks"]} == {4.0}
+    assert await bridge._flush() == 0 and len(client.posts) == 1
+
+
+async def test_falls_back_to_per_symbol_posts_without_batch_endpoint(PriceBridge):
+    client = FakeClient(batch_status=404)
+    bridge = PriceBridge(http_client=client)
+    bridge._on_tick({"symbol": "BTCUSDT", "price": 1.0})
+    bridge._on_tick({"symbol": "ETHUSDT", "price": 2.0})
+    assert await bridge._flush() == 2
+    assert [p for p, _ in client.posts] == ["/events/price/batch", "/events/price", "/events/price"]
+
+    bridge._on_tick({"symbol": "BTCUSDT", "price": 3.0})
+    await bridge._flush()
+    assert client.posts[-1] == ("/events/price", {"symbol": "BTCUSDT", "price": 3.0})
+    assert len(client.posts) == 4  # batch endpoint is not retried
+
+
+async def test_failed_pushes_are_retried_unless_superseded(PriceBridge):
+    client = FakeClient(batch_status=503)
+    bridge = PriceBridge(http_client=client)
+    bridge._on_tick({"symbol": "BTCUSDT", "price": 1.0})
+    bridge._on_tick({"symbol": "ETHUSDT", "price": 2.0})
+    assert await bridge._flush() == 0
+
+    bridge._on_tick({"symbol": "BTCUSDT", "price": 3.0})
+    client.batch_status = 200
+    assert await bridge._flush() == 2
+    pushed = {t["symbol"]: t["price"] for t in client.posts[-1][1]["ticks"]}
+    assert pushed == {"BTCUSDT": 3.0, "ETHUSDT": 2.0}
+
+    # Rejected as invalid: logged and dropped, not retried forever
+    client.batch_status = 422
+    bridge._on_tick({"symbol": "BTCUSDT", "price": 4.0})
+    assert await bridge._flush() == 0
+    assert await bridge._flush() == 0 and len(client.posts) == 3
+
+
+async def test_failed_fallback_posts_are_retried(PriceBridge):
+    client = FakeClient(batch_status=404, tick_status=500)
+    bridge = PriceBridge(http_client=client)
+    bridge._on_tick({"symbol": "BTCUSDT", "price": 1.0})
+    assert await bridge._flush() == 0
+    client.tick_status = 200
+    assert await bridge._flush() == 1
+    assert client.posts[-1] == ("/events/price", {"symbol": "BTCUSDT", "price": 1.0})
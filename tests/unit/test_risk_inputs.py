@@ -0,0 +1,112 @@
+import json
+import os
+
+import pytest
+
+from engine import risk, risk_inputs
+from engine.config import load_risk_config
+from engine.core import order_router
+from engine.risk_inputs import RiskInputWatcher
+
+
+def _write(path, text):
+    path.write_text(text)
+    # Make sure the change is visible even on coarse-mtime filesystems
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+@pytest.fixture()
+def watcher(tmp_path):
+    return RiskInputWatcher(tmp_path / "alloc.json", tmp_path / "trading_enabled.flag", poll_sec=3600)
+
+
+def test_snapshot_reloads_only_when_files_change(watcher, monkeypatch):
+    reads = []
+    real_read = risk_inputs.read_allocations
+    monkeypatch.setattr(risk_inputs, "read_allocations", lambda p: reads.append(p) or real_read(p))
+
+    assert watcher.current().version == 0
+    _write(watcher.allocations_path, json.dumps({"allocations": {"trend": 250, "bad": "x"}}))
+    _write(watcher.flag_path, "false")
+    assert watcher.current().allocations == {}  # within the poll interval
+    watcher.invalidate()
+    snap = watcher.current()
+    assert dict(snap.allocations) == {"trend": 250.0}
+    assert snap.trading_disabled is True
+    for _ in range(3):
+        watcher.invalidate()
+        assert watcher.current() is snap
+    assert len(reads) == 1
+
+    # A torn write keeps the last good caps until the file parses again
+    _write(watcher.allocations_path, '{"allocations": {"trend"')
+    watcher.invalidate()
+    assert watcher.current() is snap
+    _write(watcher.flag_path, "true")
+    watcher.invalidate()
+    assert watcher.current().trading_disabled is False
+    assert watcher.current().allocations == snap.allocations
+
+
+@pytest.fixture()
+def rails(watcher, monkeypatch):
+    monkeypatch.setenv("TRADING_ENABLED", "true")
+    monkeypatch.setenv("TRADE_SYMBOLS", "BTCUSDT,ETHUSDT")
+    monkeypatch.setenv("MIN_NOTIONAL_USDT", "5")
+    monkeypatch.setenv("MAX_NOTIONAL_USDT", "1000")
+    monkeypatch.setenv("MAX_ORDERS_PER_MIN", "100000")
+    monkeypatch.setenv("SYMBOL_LOCK_TTL_SEC", "0")
+    for cap in ("SYMBOL", "TOTAL", "VENUE"):
+        monkeypatch.setenv(f"EXPOSURE_CAP_{cap}_USD", "1000000")
+    monkeypatch.setattr(order_router, "portfolio_snapshot", lambda: {"positions": []}, raising=False)
+    monkeypatch.setattr(risk, "RISK_INPUTS", watcher)
+    monkeypatch.setattr(risk, "get_cached_params", lambda *_: None)
+    return risk.RiskRails(load_risk_config())
+
+
+def _order(rails, quote, strategy_id="trend", symbol="BTCUSDT.BINANCE"):
+    return rails.check_order(
+        symbol=symbol, side="BUY", quote=quote, quantity=None, strategy_id=strategy_id, dry_run=True
+    )
+
+
+def test_check_order_uses_allocation_snapshot(rails, watcher):
+    _write(watcher.allocations_path, json.dumps({"allocations": {"trend": 50, "dead": 0}}))
+    watcher.invalidate()
+    ok, err = _order(rails, 40.0)
+    assert ok, err
+    ok, err = _order(rails, 60.0)
+    assert not ok and err["error"] == "NOTIONAL_TOO_LARGE" and err["max_notional_usdt"] == 50.0
+    ok, err = _order(rails, 10.0, strategy_id="dead")
+    assert not ok and err["error"] == "STRATEGY_BANKRUPT"
+    ok, err = _order(rails, 10.0, symbol="BNBUSDT.BINANCE")
+    assert not ok and err["error"] == "SYMBOL_NOT_ALLOWED"
+
+    # New allocations take effect on the next poll without touching the rails
+    _write(watcher.allocations_path, json.dumps({"allocations": {"trend": 500}}))
+    watcher.invalidate()
+    assert _order(rails, 60.0)[0]
+
+
+def test_effective_config_memoised_until_inputs_change(rails, watcher, monkeypatch):
+    params = {"params": {"max_notional_usdt": 5000.0}}
+    monkeypatch.setattr(risk, "get_cached_params", lambda *_: params)
+    rails._last_equity = 1000.0
+    first = rails._effective_risk("BTCUSDT.BINANCE", "trend", watcher.current())
+    assert first.cfg.max_notional_usdt == 500.0  # clamped to 50% of equity
+    assert first.allowed_bases == frozenset({"BTCUSDT", "ETHUSDT"})
+    assert rails._effective_risk("BTCUSDT.BINANCE", "trend", watcher.current()) is first
+
+    rails._last_equity = 400.0
+    assert rails._effective_risk("BTCUSDT.BINANCE", "trend", watcher.current()).cfg.max_notional_usdt == 200.0
+    params = {"params": {"max_notional_usdt": 100.0}}
+    assert rails._effective_risk("BTCUSDT.BINANCE", "trend", watcher.current()).cfg.max_notional_usdt == 100.0
+
+
+def test_flag_file_disables_trading(rails, watcher):
+    assert _order(rails, 10.0)[0]
+    _write(watcher.flag_path, "off")
+    watcher.invalidate()
+    ok, err = _order(rails, 10.0)
+    assert not ok and err["error"] == "TRADING_DISABLED"
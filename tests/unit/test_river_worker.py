@@ -0,0 +1,126 @@
+import asyncio
+import atexit
+import concurrent.futures
+import os
+import threading
+
+from engine.inference.river_worker import RiverWorker
+
+
+class CountingPolicy:
+    """Stateful stand-in for RiverPolicy: remembers every sample it has seen."""
+
+    def __init__(self):
+        self.seen = {}
+        self.saves = 0
+        self.pid = os.getpid()
+
+    def on_tick(self, symbol, features, price):
+        self.seen[symbol] = self.seen.get(symbol, 0) + 1
+        return {
+            "prediction": int(price > features["ref"]),
+            "seen": self.seen[symbol],
+            "pid": self.pid,
+            "drift": price < 0,
+        }
+
+    def save(self):
+        self.saves += 1
+
+
+async def test_worker_process_keeps_state_across_batches():
+    worker = RiverWorker(CountingPolicy, mode="process", snapshot_sec=3600, max_batch=64)
+    try:
+        for i in range(500):
+            worker.submit("BTCUSDT", {"ref": 100.0}, 100.0 + (i % 3) - 1)
+        last = await worker.update("BTCUSDT", {"ref": 100.0}, 105.0)
+        # One policy instance saw every sample, in another process
+        assert last["seen"] == 501
+        assert last["prediction"] == 1
+        assert last["pid"] != os.getpid()
+        assert worker.latest("BTCUSDT") == last
+        stats = worker.get_stats()
+        assert stats["processed"] == 501 and stats["dropped"] == 0
+        # Samples queued while the worker was busy travel together
+        assert stats["batches"] < 501
+        assert stats["snapshots"] == 0
+    finally:
+        worker.stop()
+    assert not worker.get_stats()["alive"]
+
+
+async def test_inline_worker_snapshots_on_drift_and_stop_not_per_tick():
+    policy = CountingPolicy()
+    worker = RiverWorker(lambda: policy, mode="inline", snapshot_sec=3600)
+    assert worker.submit("ETHUSDT", {"ref": 1.0}, 2.0)["seen"] == 1
+    for _ in range(100):
+        worker.submit("ETHUSDT", {"ref": 1.0}, 2.0)
+    assert policy.saves == 0
+    result = await worker.update("ETHUSDT", {"ref": 1.0}, -1.0)
+    assert result["drift"] is True
+    assert policy.saves == 1
+    worker.submit("ETHUSDT", {"ref": 1.0}, 2.0)
+    worker.stop()
+    assert policy.saves == 2
+
+
+async def test_cold_worker_spawns_off_the_caller_and_registers_atexit_once(monkeypatch):
+    worker = RiverWorker(CountingPolicy, mode="process", snapshot_sec=3600)
+    spawned_on, registered = [], []
+    start_process = worker._start_process
+
+    def tracking_start():
+        spawned_on.append(threading.current_thread().name)
+        start_process()
+
+    monkeypatch.setattr(worker, "_start_process", tracking_start)
+    monkeypatch.setattr(atexit, "register", registered.append)
+    try:
+        assert worker.submit("BTCUSDT", {"ref": 100.0}, 101.0) == {}
+        result = await asyncio.wait_for(worker.update("BTCUSDT", {"ref": 100.0}, 101.0), 30)
+        assert result["seen"] == 2
+        worker._proc.kill()
+        worker._proc.join(5)
+        await asyncio.wait_for(worker.update("BTCUSDT", {"ref": 100.0}, 101.0), 30)
+        assert spawned_on == ["river-worker-start", "river-worker-start"]
+        assert registered == [worker.stop]
+    finally:
+        worker.stop()
+
+
+async def test_dead_worker_process_is_restarted():
+    worker = RiverWorker(CountingPolicy, mode="process", snapshot_sec=3600)
+    try:
+        first = await worker.update("BTCUSDT", {"ref": 100.0}, 101.0)
+        worker._proc.kill()
+        worker._proc.join(5)
+        # The next update starts a fresh process instead of hanging on the dead pipe
+        again = await asyncio.wait_for(worker.update("BTCUSDT", {"ref": 100.0}, 101.0), 30)
+        assert again["seen"] == 1 and again["pid"] != first["pid"]
+        assert await asyncio.wait_for(worker.update("BTCUSDT", {"ref": 100.0}, 99.0), 30) == {
+            **again, "seen": 2, "prediction": 0
+        }
+        stats = worker.get_stats()
+        assert stats["restarts"] == 1 and stats["alive"]
+    finally:
+        worker.stop()
+
+
+def test_full_queue_drops_oldest_sample():
+    worker = RiverWorker(CountingPolicy, mode="process", max_pending=3)
+    worker._started = True  # no process: observe the queue directly
+    for i in range(5):
+        worker.submit("BTCUSDT", {"ref": 0.0}, float(i))
+    assert [price for _, _, price, _ in worker._queue] == [2.0, 3.0, 4.0]
+    assert worker.get_stats()["dropped"] == 2
+
+
+def test_dropping_a_sample_whose_caller_gave_up_is_harmless():
+    worker = RiverWorker(CountingPolicy, mode="process", max_pending=1)
+    worker._started = True
+    abandoned = concurrent.futures.Future()
+    worker._queue.append(("BTCUSDT", {"ref": 0.0}, 1.0, abandoned))
+    abandoned.cancel()
+    worker.submit("BTCUSDT", {"ref": 0.0}, 2.0)
+    assert abandoned.cancelled()
+    assert [price for _, _, price, _ in worker._queue] == [2.0]
@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from engine.storage import sqlite as store
+
+SCHEMA = "engine/storage/schema.sql"
+
+
+@pytest.fixture
+def con(tmp_path, monkeypatch):
+    for name in ("_DB", "_READ_DB", "_DB_PATH"):
+        monkeypatch.setattr(store, name, None)
+    con = store._conn(str(tmp_path / "trades.db"))
+    store._apply_schema(con, SCHEMA)
+    yield con
+    if store._READ_DB is not None:
+        store._READ_DB.close()
+    con.close()
+
+
+def _fill(i, ts, symbol="BTCUSDT"):
+    return {
+        "id": f"f{i}",
+        "order_id": f"o{i}",
+        "venue": "binance",
+        "symbol": symbol,
+        "side": "BUY" if i % 2 else "SELL",
+        "qty": 1.0,
+        "price": 100.0 + i,
+        "ts": ts,
+    }
+
+
+def _drain():
+    batch = []
+    while not store._Q.empty():
+        batch.append(store._Q.get_nowait())
+    return batch
+
+
+def test_mixed_batch_flushes_per_statement(con):
+    _drain()
+    for i in range(5):
+        store.insert_fill(_fill(i, 1_000 + i))
+        store.insert_order(
+            {"id": "o1", "venue": "binance", "symbol": "BTCUSDT", "side": "BUY", "qty": 1.0,
+             "status": f"S{i}", "ts_accept": 1_000, "ts_update": 1_000 + i}
+        )
+    store.insert_equity("binance", 1000.0, 900.0, 100.0, 2_000)
+    batch = _drain()
+    calls = []
+    con.set_trace_callback(calls.append)
+    store._flush(con, batch)
+    con.set_trace_callback(None)
+
+    assert con.execute("SELECT COUNT(*) FROM fills").fetchone()[0] == 5
+    # Upserts of the same key keep queue order
+    assert con.execute("SELECT status FROM orders WHERE id='o1'").fetchone()[0] == "S4"
+    assert [r["ts"] for r in store.get_recent_fills(limit=2)] == [1_004, 1_003]
+    assert store.get_equity_curve()[0]["equity_usd"] == 1000.0
+    # One transaction for the whole batch
+    assert sum(1 for c in calls if c.startswith("BEGIN")) == 1
+
+
+def test_prune_in_chunks_and_reclaim_pages(con):
+    old = [_fill(i, 1_000 + i) for i in range(400)]
+    new = [_fill(1_000 + i, 9_000 + i, "ETHUSDT") for i in range(3)]
+    batch = []
+    for d in old + new:
+        store.insert_fill(d)
+        batch.extend(_drain())
+    store._flush(con, batch)
+
+    deletes = []
+    con.set_trace_callback(lambda sql: sql.startswith("DELETE") and deletes.append(sql))
+    assert store._prune(con, 5_000, chunk=70, pause=0.0) == 400
+    con.set_trace_callback(None)
+    assert len(deletes) == 6 + 3  # 400 fills in chunks of 70, then one pass per other table
+    assert {r["symbol"] for r in store.get_recent_fills()} == {"ETHUSDT"}
+
+    assert con.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    assert con.execute("PRAGMA freelist_count").fetchone()[0] > 0
+    store._reclaim(con, pages=1, pause=0.0)
+    assert con.execute("PRAGMA freelist_count").fetchone()[0] == 0
+    plan = " ".join(
+        str(r[-1]) for r in con.execute("EXPLAIN QUERY PLAN SELECT rowid FROM fills WHERE ts < 1 LIMIT 5")
+    )
+    assert "idx_fills_ts" in plan
+
+
+def test_readers_do_not_wait_for_writer_lock(con):
+    _drain()
+    store.insert_fill(_fill(1, 1))
+    store._flush(con, _drain())
+    out = []
+    with store._LOCK:
+        reader = threading.Thread(target=lambda: out.append(store.get_recent_fills()))
+        reader.start()
+        reader.join(timeout=2.0)
+        assert not reader.is_alive()
+    assert out[0][0]["id"] == "f1"
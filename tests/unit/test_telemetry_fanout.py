@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+from engine.services.telemetry_broadcaster import TelemetryBroadcaster
+
+
+class Socket:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.frames = []
+
+    async def send(self, text):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.frames.append(json.loads(text))
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_slow_client_does_not_hold_back_others():
+    hub = TelemetryBroadcaster(client_buffer=4, send_timeout=5.0)
+    fast, slow = Socket(), Socket(delay=10.0)
+    hub.add_client(fast.send)
+    slow_client = hub.add_client(slow.send)
+
+    for i in range(10):
+        await hub.broadcast({"type": "account_update", "data": {"seq": i}})
+        await _settle()
+    assert [f["data"]["seq"] for f in fast.frames] == list(range(10))
+    assert hub.get_stats()["encoded"] == 10  # once per message, not per client
+    assert slow.frames == [] and slow_client.dropped > 0
+    await hub.stop()
+
+
+async def test_market_data_is_coalesced_per_symbol_and_filtered():
+    hub = TelemetryBroadcaster(market_fps=0.1)  # frames flushed by hand below
+    everything, btc_ticks = Socket(), Socket()
+    hub.add_client(everything.send)
+    hub.add_client(btc_ticks.send, topics=["market.tick"], symbols=["BTCUSDT.BINANCE"])
+
+    for i in range(100):
+        hub.publish_market("market.tick", {"symbol": "BTCUSDT", "price": 100.0 + i})
+        hub.publish_market("market.tick", {"symbol": "ETHUSDT", "price": 10.0 + i})
+    hub.publish_market("trade", {"symbol": "BTCUSDT", "price": 1.0, "quantity": 2.0})
+    assert hub.flush_market() == 3
+    await hub.broadcast({"type": "venues", "data": [{"id": "BINANCE"}]})
+    await _settle()
+
+    assert {(f["type"], f["data"]["symbol"]): f["data"]["price"] for f in everything.frames if f["type"] != "venues"} == {
+        ("market.tick", "BTCUSDT"): 199.0,
+        ("market.tick", "ETHUSDT"): 109.0,
+        ("trade", "BTCUSDT"): 1.0,
+    }
+    assert [(f["type"], f["data"]["price"]) for f in btc_ticks.frames] == [("market.tick", 199.0)]
+    stats = hub.get_stats()
+    assert stats["market_in"] == 201 and stats["market_out"] == 3
+
+    # Without listeners nothing is retained
+    await hub.stop()
+    hub.publish_market("market.tick", {"symbol": "BTCUSDT", "price": 1.0})
+    assert hub.flush_market() == 0
+
+
+async def test_frame_loop_and_failed_client_removal():
+    hub = TelemetryBroadcaster(market_fps=200.0)
+
+    async def broken(text):
+        raise ConnectionError("socket gone")
+
+    good = Socket()
+    hub.add_client(good.send)
+    bad = hub.add_client(broken)
+    hub.publish_market("market.tick", {"symbol": "SOLUSDT", "price": 5.0})
+    await asyncio.sleep(0.05)
+    assert good.frames[0]["data"]["price"] == 5.0
+    assert bad.closed
+    await hub.broadcast({"type": "account_update", "data": {}})
+    assert hub.get_stats()["clients"] == 1
+    await hub.stop()
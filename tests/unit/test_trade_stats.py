@@ -0,0 +1,109 @@
+import random
+import statistics
+
+import pytest
+
+from engine.core.trade_stats import TradeStats
+
+
+def _replay(fills, curve):
+    # The per-request replay /trades/stats used to run
+    state, trips = {}, []
+    for f in sorted(fills, key=lambda x: x["ts"]):
+        net, avg = state.get(f["symbol"], (0.0, 0.0))
+        signed = f["qty"] if f["side"] == "BUY" else -f["qty"]
+        if net == 0:
+            net, avg = signed, f["price"]
+        elif (net > 0) != (signed > 0):
+            trips.append(((f["price"] - avg) if net > 0 else (avg - f["price"])) / avg * 100)
+            net += signed
+            if abs(net) < 1e-10:
+                net, avg = 0.0, 0.0
+        else:
+            cost = avg * abs(net) + f["price"] * abs(signed)
+            net += signed
+            avg = cost / abs(net)
+        state[f["symbol"]] = (net, avg)
+    peak, max_dd = curve[0], 0.0
+    for eq in curve:
+        peak = max(peak, eq)
+        max_dd = max(max_dd, (peak - eq) / peak * 100)
+    sharpe = round(statistics.mean(trips) / statistics.stdev(trips) * 252**0.5, 2)
+    return trips, round(max_dd, 2), sharpe
+
+
+def _history(seed=7, count=600):
+    rng = random.Random(seed)
+    fills = []
+    for i in range(count):
+        fills.append(
+            {
+                "symbol": rng.choice(["BTCUSDT", "ETHUSDT", "SOLUSDT"]),
+                "side": rng.choice(["BUY", "SELL"]),
+                "qty": rng.choice([0.5, 1.0, 2.0]),
+                "price": 100 + rng.uniform(-5, 5),
+                "ts": 1_000 + i,
+            }
+        )
+    curve = [1000 + rng.uniform(-50, 50) + i for i in range(200)]
+    return fills, curve
+
+
+def test_incremental_matches_full_replay():
+    fills, curve = _history()
+    trips, max_dd, sharpe = _replay(fills, curve)
+
+    live = TradeStats(window=10_000)
+    for f in fills:
+        live.on_fill(
+            {"symbol": f"{f['symbol']}.BINANCE", "side": f["side"], "filled_qty": f["qty"],
+             "avg_price": f["price"], "ts": f["ts"]}
+        )
+    for eq in curve:
+        live.on_equity({"equity_usd": eq})
+    out = live.summary()
+    assert out["total_trades"] == len(trips)
+    assert out["win_rate"] == round(sum(r > 0 for r in trips) / len(trips) * 100, 2)
+    assert out["returns"] == pytest.approx(trips[-50:])
+    assert out["max_drawdown"] == max_dd
+    assert out["sharpe"] == pytest.approx(sharpe, abs=0.011)
+
+    # Seeding from stored rows (newest first, as SQLite returns them) gives the same answer
+    seeded = TradeStats(window=10_000)
+    seeded.seed(reversed(fills), [{"equity_usd": eq, "ts": i} for i, eq in enumerate(curve)][::-1])
+    assert seeded.summary() == out
+
+
+def test_window_evicts_oldest_trips_and_summary_is_cached():
+    fills, curve = _history(seed=3)
+    trips, _, _ = _replay(fills, curve)
+    stats = TradeStats(window=40)
+    stats.seed(fills)
+    out = stats.summary()
+    assert out["total_trades"] == 40
+    assert out["win_rate"] == round(sum(r > 0 for r in trips[-40:]) / 40 * 100, 2)
+    assert stats.summary() is out
+
+    stats.on_fill({"symbol": "XRPUSDT", "side": "BUY", "filled_qty": 1.0, "avg_price": 1.0})
+    assert stats.summary() is out  # opening a position does not change the stats
+    stats.on_fill({"symbol": "XRPUSDT", "side": "SELL", "filled_qty": 1.0, "avg_price": 1.1})
+    updated = stats.summary()
+    assert updated is not out and updated["returns"][-1] == pytest.approx(10.0)
+
+
+def test_max_drawdown_covers_last_snapshots_only():
+    rng = random.Random(11)
+    curve = [1000.0, 500.0] + [900 + rng.uniform(-20, 20) + i for i in range(600)]
+    stats = TradeStats(drawdown_window=500)
+    for eq in curve:
+        stats.on_equity({"equity_usd": eq})
+    peak, expected = curve[-500], 0.0
+    for eq in curve[-500:]:
+        peak = max(peak, eq)
+        expected = max(expected, (peak - eq) / peak * 100)
+    assert stats.summary()["max_drawdown"] == round(expected, 2) < 10
+
+    # The early 50% crash is still inside a wider window
+    wide = TradeStats(drawdown_window=1000)
+    wide.seed([], [{"equity_usd": eq, "ts": i} for i, eq in enumerate(curve)])
+    assert wide.summary()["max_drawdown"] == 50.0
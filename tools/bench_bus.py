@@ -1,34 +1,361 @@
 #!/usr/bin/env python3
 """
-Microbench: EventBus publish/deliver throughput.
+Microbench: engine tick hot path.
 
-Usage: python tools/bench_bus.py [n_events]
+Stages (each timed per event with perf_counter_ns):
+
+  bus       EventBus.publish -> subscriber on a queued lane, one event in flight
+  decode    raw aggTrade JSON -> BinanceMarketStream._handle_message
+  dispatch  normalized trade -> MarketDataDispatcher -> market.trade subscriber
+  strategy  strategy.on_tick
+  risk      RiskRails.check_order
+  router    OrderRouter.market_quote against an in-process fake venue
+  e2e       raw JSON -> stream -> dispatcher -> bus -> on_tick -> risk -> router
+
+Reports p50/p99/p999 latency (microseconds) and throughput per stage as JSON,
+so runs can be diffed across commits.
+
+Usage: python -m tools.bench_bus [n_events] [--stages bus,decode,...] [--json out.json]
 """
 
+import argparse
 import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
 import sys
 import time
+from collections.abc import Awaitable, Callable
+from typing import Any
 
 from engine.core.event_bus import BUS
 
+STAGES = ("bus", "decode", "dispatch", "strategy", "risk", "router", "e2e")
+SYMBOL = "BTCUSDT"
+BASE_PRICE = 50_000.0
 
-async def noop(_):
-    return None
 
+def _percentile(sorted_ns: list[int], q: float) -> float:
+    """Nearest-rank percentile in microseconds."""
+    if not sorted_ns:
+        return 0.0
+    rank = max(1, math.ceil(q * len(sorted_ns)))
+    return sorted_ns[min(rank, len(sorted_ns)) - 1] / 1000.0
 
-async def main(n: int = 10000):
-    await BUS.start()
-    BUS.subscribe("bench", noop)
+
+def _summary(samples: list[int], wall_s: float) -> dict[str, Any]:
+    ordered = sorted(samples)
+    n = len(ordered)
+    return {
+        "events": n,
+        "wall_s": round(wall_s, 6),
+        "throughput_eps": round(n / max(wall_s, 1e-9), 1),
+        "p50_us": round(_percentile(ordered, 0.50), 2),
+        "p99_us": round(_percentile(ordered, 0.99), 2),
+        "p999_us": round(_percentile(ordered, 0.999), 2),
+        "max_us": round(ordered[-1] / 1000.0, 2) if n else 0.0,
+        "mean_us": round(sum(ordered) / n / 1000.0, 2) if n else 0.0,
+    }
+
+
+def _agg_trades(n: int) -> list[str]:
+    """Combined-stream aggTrade frames as they arrive off the socket."""
+    now_ms = int(time.time() * 1000)
+    frames = []
+    for i in range(n):
+        price = BASE_PRICE * (1.0 + 0.001 * math.sin(i / 50.0))
+        frames.append(
+            json.dumps(
+                {
+                    "stream": f"{SYMBOL.lower()}@aggTrade",
+                    "data": {
+                        "e": "aggTrade",
+                        "E": now_ms + i,
+                        "s": SYMBOL,
+                        "a": i,
+                        "p": f"{price:.2f}",
+                        "q": "0.00100",
+                        "f": i,
+                        "l": i,
+                        "T": now_ms + i,
+                        "m": bool(i & 1),
+                    },
+                }
+            )
+        )
+    return frames
+
+
+class FakeVenue:
+    """In-process Binance client: fills every IOC order immediately at the last price."""
+
+    def __init__(self, price: float = BASE_PRICE) -> None:
+        self.price = price
+        self.orders = 0
+
+    def ticker_price(self, symbol: str, *, market: str | None = None) -> float:
+        return self.price
+
+    async def exchange_filter(self, symbol: str, *, market: str | None = None) -> None:
+        return None
+
+    async def order_status(self, *args: Any, **kwargs: Any) -> None:
+        return None
+
+    async def submit_limit_order(
+        self, symbol: str, side: str, quantity: float, price: float, **kwargs: Any
+    ) -> dict[str, Any]:
+        self.orders += 1
+        return {
+            "symbol": symbol,
+            "orderId": self.orders,
+            "status": "FILLED",
+            "executedQty": quantity,
+            "filled_qty_base": quantity,
+            "avg_fill_price": self.price,
+            "time_in_force": kwargs.get("time_in_force", "IOC"),
+        }
+
+    async def submit_market_quote(
+        self, symbol: str, side: str, quote: float, market: str | None = None
+    ) -> dict[str, Any]:
+        qty = quote / self.price
+        return await self.submit_limit_order(symbol, side, qty, self.price)
+
+
+async def _time_calls(
+    n: int, call: Callable[[int], Awaitable[Any] | Any]
+) -> tuple[list[int], float]:
+    samples = []
+    clock = time.perf_counter_ns
     t0 = time.perf_counter()
     for i in range(n):
-        await BUS.publish("bench", {"i": i})
-    # allow queue to drain
-    await asyncio.sleep(0.1)
-    t1 = time.perf_counter()
-    print({"events": n, "elapsed_s": t1 - t0, "throughput_eps": n / max(t1 - t0, 1e-6)})
-    await BUS.stop()
+        start = clock()
+        res = call(i)
+        if asyncio.iscoroutine(res):
+            await res
+        samples.append(clock() - start)
+    return samples, time.perf_counter() - t0
+
+
+async def bench_bus(n: int) -> tuple[list[int], float]:
+    """Publish on a queued topic and wait for the subscriber before the next event."""
+    samples: list[int] = []
+    delivered = asyncio.Event()
+    clock = time.perf_counter_ns
+
+    async def handler(evt: dict[str, Any]) -> None:
+        samples.append(clock() - evt["t0"])
+        delivered.set()
+
+    BUS.subscribe("bench.bus", handler)
+    try:
+        t0 = time.perf_counter()
+        for i in range(n):
+            delivered.clear()
+            await BUS.publish("bench.bus", {"i": i, "t0": clock()})
+            await asyncio.wait_for(delivered.wait(), timeout=5.0)
+        return samples, time.perf_counter() - t0
+    finally:
+        BUS.unsubscribe("bench.bus", handler)
+
+
+def _stream(on_event: Callable[[dict], Any] | None):
+    from engine.core.binance_market_stream import BinanceMarketStream
+
+    return BinanceMarketStream([SYMBOL], on_event=on_event)
+
+
+async def bench_decode(n: int) -> tuple[list[int], float]:
+    frames = _agg_trades(n)
+    stream = _stream(lambda evt: None)
+    return await _time_calls(n, lambda i: stream._handle_message(frames[i]))
+
+
+async def bench_dispatch(n: int) -> tuple[list[int], float]:
+    from engine.feeds.market_data_dispatcher import MarketDataDispatcher
+
+    seen = 0
+
+    def handler(evt: dict[str, Any]) -> None:
+        nonlocal seen
+        seen += 1
+
+    dispatcher = MarketDataDispatcher(BUS, source="bench")
+    events = [
+        {"type": "trade", "symbol": SYMBOL, "price": BASE_PRICE, "quantity": 0.001, "ts": i}
+        for i in range(n)
+    ]
+    BUS.subscribe("market.trade", handler)
+    try:
+        return await _time_calls(n, lambda i: dispatcher.handle_stream_event(events[i]))
+    finally:
+        BUS.unsubscribe("market.trade", handler)
+
+
+async def bench_strategy(n: int) -> tuple[list[int], float]:
+    from engine import strategy
+
+    now = time.time()
+    return await _time_calls(
+        n,
+        lambda i: strategy.on_tick(
+            f"{SYMBOL}.BINANCE", BASE_PRICE * (1.0 + 0.001 * math.sin(i / 50.0)), now + i, 1.0
+        ),
+    )
+
+
+def _risk_call() -> Callable[[int], Any]:
+    from engine.strategy import RAILS
+
+    def call(_: int) -> Any:
+        return RAILS.check_order(
+            symbol=f"{SYMBOL}.BINANCE", side="BUY", quote=25.0, quantity=None, dry_run=True
+        )
+
+    return call
+
+
+async def bench_risk(n: int) -> tuple[list[int], float]:
+    return await _time_calls(n, _risk_call())
+
+
+def _router():
+    from engine.core.order_router import OrderRouter
+    from engine.core.portfolio import Portfolio
+
+    return OrderRouter(FakeVenue(), Portfolio(), venue="BINANCE")
+
+
+async def bench_router(n: int) -> tuple[list[int], float]:
+    router = _router()
+    return await _time_calls(
+        n, lambda i: router.market_quote(f"{SYMBOL}.BINANCE", "BUY" if i & 1 else "SELL", 25.0)
+    )
+
+
+async def bench_e2e(n: int) -> tuple[list[int], float]:
+    """Whole tick path; each sample spans socket frame in -> venue ack out."""
+    from engine import strategy
+    from engine.feeds.market_data_dispatcher import MarketDataDispatcher
+
+    frames = _agg_trades(n)
+    router = _router()
+    risk = _risk_call()
+    finished = 0
+    errors = 0
+
+    async def on_trade(evt: dict[str, Any]) -> None:
+        nonlocal finished, errors
+        try:
+            qualified = f"{evt['symbol']}.BINANCE"
+            await strategy.on_tick(qualified, evt["price"], evt["ts"], evt.get("quantity"))
+            ok, _ = risk(0)
+            if ok:
+                await router.market_quote(qualified, evt["side"].upper(), 25.0)
+        except Exception:  # noqa: BLE001 - a failing stage must not stall the bench
+            errors += 1
+        finally:
+            finished += 1
+
+    dispatcher = MarketDataDispatcher(BUS, source="bench")
+    stream = _stream(dispatcher.handle_stream_event)
+    BUS.subscribe("market.trade", on_trade)
+    samples = []
+    clock = time.perf_counter_ns
+    try:
+        t0 = time.perf_counter()
+        for i in range(n):
+            start = clock()
+            await stream._handle_message(frames[i])
+            # Handlers that suspend finish on their own task; wait for them
+            while finished <= i:
+                await asyncio.sleep(0)
+            samples.append(clock() - start)
+        wall = time.perf_counter() - t0
+    finally:
+        BUS.unsubscribe("market.trade", on_trade)
+    if errors:
+        # ERROR so it survives the quiet logging level set in __main__
+        logging.getLogger(__name__).error(
+            "e2e: %d/%d events raised inside the tick path; latencies include them", errors, n
+        )
+    return samples, wall
+
+
+BENCHES: dict[str, Callable[[int], Awaitable[tuple[list[int], float]]]] = {
+    "bus": bench_bus,
+    "decode": bench_decode,
+    "dispatch": bench_dispatch,
+    "strategy": bench_strategy,
+    "risk": bench_risk,
+    "router": bench_router,
+    "e2e": bench_e2e,
+}
+
+
+def _git_rev() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+async def main(n: int = 10000, stages: tuple[str, ...] = STAGES, warmup: int = 200) -> dict:
+    await BUS.start()
+    results: dict[str, Any] = {}
+    try:
+        for stage in stages:
+            bench = BENCHES[stage]
+            if warmup:
+                await bench(warmup)
+            samples, wall = await bench(n)
+            results[stage] = _summary(samples, wall)
+    finally:
+        await BUS.stop()
+    return {
+        "bench": "engine_hot_path",
+        "commit": _git_rev(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "events": n,
+        "ts": time.time(),
+        "stages": results,
+    }
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("n_events", nargs="?", type=int, default=10000)
+    parser.add_argument(
+        "--stages",
+        default=",".join(STAGES),
+        help=f"comma list of stages to run (default: all of {','.join(STAGES)})",
+    )
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--json", dest="json_path", help="also write the report to this file")
+    args = parser.parse_args(argv)
+    args.stages = tuple(s.strip() for s in args.stages.split(",") if s.strip())
+    unknown = [s for s in args.stages if s not in BENCHES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+    return args
 
 
 if __name__ == "__main__":
-    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
-    asyncio.run(main(n))
+    args = _parse_args(sys.argv[1:])
+    # Keep per-tick warnings from dominating the measurement
+    logging.basicConfig(level=logging.ERROR)
+    report = asyncio.run(main(args.n_events, args.stages, args.warmup))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")